@@ -0,0 +1,88 @@
+"""Coalescing of bursts of control changes into one charger write.
+
+Dragging the current slider (in the web UI or VRM) fires many
+``/SetCurrent`` changes per second. Each change is accepted and reflected
+immediately, but the Modbus work it triggers (station limit read, phase
+read, verified current write) is deferred: the first change of a burst
+arms a one-shot timer and every change until it fires is merged into the
+same pending evaluation. The timer is never pushed back, so the final
+value reaches the charger at most one window after the burst started.
+
+Example:
+    ```python
+    coalescer = CommandCoalescer(driver._apply_coalesced, window_ms=250)
+    coalescer.submit("SetCurrent change", 10.0, apply=True)
+    ```
+"""
+
+from typing import Any, Callable, List, Optional
+
+from gi.repository import GLib
+
+# apply(source, requested_current, apply_current, refresh_station_max)
+ApplyFn = Callable[[str, Optional[float], bool, bool], Any]
+ScheduleFn = Callable[[int, Callable[[], bool]], Any]
+
+
+class CommandCoalescer:
+    """Merge control changes submitted within ``window_ms`` into one call."""
+
+    def __init__(
+        self,
+        apply: ApplyFn,
+        window_ms: int = 250,
+        schedule: Optional[ScheduleFn] = None,
+    ) -> None:
+        self._apply = apply
+        self.window_ms = window_ms
+        self._schedule: ScheduleFn = schedule or GLib.timeout_add
+        self._sources: List[str] = []
+        self._requested: Optional[float] = None
+        self._apply_current = False
+        self._refresh_station = False
+        self._armed = False
+        # Counters: changes accepted vs. charger evaluations actually run
+        self.submitted = 0
+        self.flushes = 0
+
+    @property
+    def pending(self) -> bool:
+        return bool(self._sources)
+
+    def submit(
+        self,
+        source: str,
+        requested: Optional[float] = None,
+        apply: bool = False,
+        refresh_station: bool = False,
+    ) -> None:
+        """Queue a change; the latest ``requested`` value wins."""
+        self.submitted += 1
+        if source not in self._sources:
+            self._sources.append(source)
+        if requested is not None:
+            self._requested = requested
+        self._apply_current = self._apply_current or apply
+        self._refresh_station = self._refresh_station or refresh_station
+        if self.window_ms <= 0:
+            self.flush()
+        elif not self._armed:
+            self._armed = True
+            self._schedule(self.window_ms, self.flush)
+
+    def flush(self) -> bool:
+        """Run the merged evaluation; returns False so GLib drops the timer."""
+        self._armed = False
+        if not self._sources:
+            return False
+        source = " + ".join(self._sources)
+        requested = self._requested
+        apply_current = self._apply_current
+        refresh_station = self._refresh_station
+        self._sources = []
+        self._requested = None
+        self._apply_current = False
+        self._refresh_station = False
+        self.flushes += 1
+        self._apply(source, requested, apply_current, refresh_station)
+        return False
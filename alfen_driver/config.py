@@ -38,7 +38,7 @@ import dataclasses
 import json
 import logging
 import os
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Set
 
 import yaml
 
@@ -155,6 +155,8 @@ class LoggingConfig:
         backup_count: Number of rotated log files to keep.
         console_output: Whether to also log to console.
         json_format: Whether to use JSON formatting.
+        tick_timings: Record per-stage poll and Modbus timings at startup
+            (also switchable at runtime via ``/api/debug/timings``).
     """
 
     level: str = "INFO"
@@ -164,6 +166,7 @@ class LoggingConfig:
     backup_count: int = 5
     console_output: bool = True
     json_format: bool = False
+    tick_timings: bool = False
 
     def __post_init__(self) -> None:
         """Validate logging configuration."""
@@ -236,6 +239,9 @@ class TibberConfig:
         strategy: Selection strategy. "level" (default) to use coarse price levels, "threshold" to compare against max_price_total, or "percentile" to compare against a percentile of upcoming prices.
         max_price_total: Absolute price threshold (same units as Tibber total) for strategy=="threshold".
         cheap_percentile: Fraction (0..1) of cheapest upcoming prices that should be considered chargeable for strategy=="percentile".
+        live_enabled: Subscribe to Tibber Pulse real-time grid measurements.
+        live_grid_source: How AUTO mode uses the live grid power: "fallback" (only when Victron consumption data is missing), "prefer" (whenever a fresh reading exists), or "cross_check" (use the more conservative of both).
+        live_max_age_seconds: Ignore live readings older than this.
     """
 
     access_token: str = ""
@@ -246,6 +252,9 @@ class TibberConfig:
     strategy: str = "level"
     max_price_total: float = 0.0
     cheap_percentile: float = 0.3
+    live_enabled: bool = False
+    live_grid_source: str = "fallback"
+    live_max_age_seconds: float = 10.0
 
 
 @dataclasses.dataclass
@@ -274,6 +283,9 @@ class ControlsConfig:
         min_charge_duration_seconds: Minimum charging session duration.
         current_update_interval: Interval for refreshing current settings.
         verify_delay: Verification delay in milliseconds.
+        command_coalesce_ms: Window in which bursts of mode/start-stop/set
+            current changes are collapsed into one current write (0 applies
+            every change immediately).
     """
 
     current_tolerance: float = 0.5
@@ -286,6 +298,7 @@ class ControlsConfig:
     min_charge_duration_seconds: int = 300
     current_update_interval: int = 30000
     verify_delay: int = 100
+    command_coalesce_ms: int = 250
 
     def __post_init__(self) -> None:
         """Validate control configuration."""
@@ -305,6 +318,12 @@ class ControlsConfig:
             raise ValidationError(
                 "max_set_current", self.max_set_current, "must be positive"
             )
+        if not 0 <= self.command_coalesce_ms <= 5000:
+            raise ValidationError(
+                "command_coalesce_ms",
+                self.command_coalesce_ms,
+                "must be between 0 and 5000",
+            )
 
 
 @dataclasses.dataclass
@@ -314,10 +333,12 @@ class WebConfig:
     Attributes:
         host: Bind address (default 127.0.0.1). Use 0.0.0.0 to listen on all interfaces.
         port: TCP port (default 8088).
+        profiler: Enable the ``/api/debug/profile`` sampling profiler.
     """
 
     host: str = "127.0.0.1"
     port: int = 8088
+    profiler: bool = False
 
     def __post_init__(self) -> None:
         if not isinstance(self.host, str) or not self.host:
@@ -326,19 +347,58 @@ class WebConfig:
             raise ValidationError("web.port", self.port, "must be between 1 and 65535")
 
 
+@dataclasses.dataclass
+class ArchiveConfig:
+    """Per-minute metrics archive configuration.
+
+    Attributes:
+        enabled: Keep a memory-mapped archive of per-minute aggregates.
+        path: Archive file location.
+        max_size_mb: File size cap; the oldest minutes are overwritten once full
+            (1 MB holds roughly 29 days).
+    """
+
+    enabled: bool = True
+    path: str = "/data/alfen_driver_metrics.bin"
+    max_size_mb: float = 16.0
+
+    def __post_init__(self) -> None:
+        if not isinstance(self.path, str) or not self.path:
+            raise ValidationError(
+                "archive.path", self.path, "must be a non-empty string"
+            )
+        if not (0.1 <= float(self.max_size_mb) <= 1024):
+            raise ValidationError(
+                "archive.max_size_mb", self.max_size_mb, "must be between 0.1 and 1024"
+            )
+
+
 @dataclasses.dataclass
 class PricingConfig:
     """Pricing configuration for computing session cost.
 
     Attributes:
-        source: 'victron' to use Victron-provided price if available, or 'static' to use a fixed rate.
+        source: 'victron' to use Victron-provided price if available, 'static' to use a fixed rate,
+            or 'dynamic' to use the price providers below.
         static_rate_eur_per_kwh: Static energy rate in EUR/kWh used when source=='static' or as fallback.
         currency_symbol: Currency symbol to display for costs.
+        providers: Price providers in failover order ('tibber', 'feed', 'file').
+        feed_url: URL of a day-ahead price feed (provider 'feed').
+        feed_format: Format of the feed/file: 'json' or 'csv'.
+        file_path: Path to a local price file (provider 'file').
+        refresh_interval_seconds: How often to refresh the feed/file providers.
+        cache_file: Disk cache of the last good price timeline ('' disables).
     """
 
     source: str = "static"
     static_rate_eur_per_kwh: float = 0.25
     currency_symbol: str = "€"
+    providers: List[str] = dataclasses.field(default_factory=lambda: ["tibber"])
+    feed_url: str = ""
+    feed_format: str = "json"
+    file_path: str = ""
+    refresh_interval_seconds: int = 3600
+    cache_file: str = "/data/alfen_driver_prices.json"
 
 
 @dataclasses.dataclass
@@ -358,6 +418,7 @@ class Config:
         timezone: Timezone for schedule operations.
         web: Web server binding configuration.
         pricing: Pricing configuration for session cost computation.
+        archive: Per-minute metrics archive configuration.
     """
 
     modbus: ModbusConfig
@@ -372,6 +433,7 @@ class Config:
     timezone: str = "UTC"
     web: WebConfig = dataclasses.field(default_factory=WebConfig)
     pricing: PricingConfig = dataclasses.field(default_factory=PricingConfig)
+    archive: ArchiveConfig = dataclasses.field(default_factory=ArchiveConfig)
 
     def __post_init__(self) -> None:
         """Perform basic validation."""
@@ -388,6 +450,18 @@ class Config:
                 "poll_interval_ms", self.poll_interval_ms, "must be positive"
             )
 
+    def diff(self, other: "Config") -> Set[str]:
+        """Return the names of the top-level settings that differ in ``other``.
+
+        Sections are compared as whole dataclasses, so defaults filled in by
+        ``from_dict`` and legacy schedule fields do not show up as changes.
+        """
+        return {
+            field.name
+            for field in dataclasses.fields(self)
+            if getattr(self, field.name) != getattr(other, field.name)
+        }
+
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> "Config":
         """Create Config from dictionary with validation.
@@ -445,6 +519,7 @@ class Config:
 
         # Web config
         web_cfg = WebConfig(**data.get("web", {}))
+        archive = ArchiveConfig(**data.get("archive", {}))
 
         # Create main config
         return cls(
@@ -460,6 +535,7 @@ class Config:
             timezone=data.get("timezone", "UTC"),
             web=web_cfg,
             pricing=pricing,
+            archive=archive,
         )
 
 
@@ -1,251 +1,373 @@
-from typing import Any, Dict
+"""Canonical configuration schema.
 
-from .config_validator import ConfigValidator
+One description of every setting serves three consumers: the web UI renders
+its form from it (``/api/config/schema``), ``ConfigValidator`` compiles it
+into its field checks (see ``schema_validator``), and
+``ConfigValidator.get_config_schema`` derives its documentation view from
+it. The schema is built once at import; callers must not mutate it.
+"""
 
+from typing import Any, Dict, List, Tuple
 
-def get_config_schema() -> Dict[str, Any]:
-    return {
-        "sections": {
-            "modbus": {
-                "title": "Modbus",
-                "type": "object",
-                "fields": {
-                    "ip": {"type": "string", "format": "ipv4", "title": "Charger IP"},
-                    "port": {
-                        "type": "integer",
-                        "min": ConfigValidator.VALID_PORT_RANGE[0],
-                        "max": ConfigValidator.VALID_PORT_RANGE[1],
-                        "title": "Port",
-                    },
-                    "socket_slave_id": {
-                        "type": "integer",
-                        "min": ConfigValidator.VALID_SLAVE_ID_RANGE[0],
-                        "max": ConfigValidator.VALID_SLAVE_ID_RANGE[1],
-                        "title": "Socket slave ID",
-                    },
-                    "station_slave_id": {
-                        "type": "integer",
-                        "min": ConfigValidator.VALID_SLAVE_ID_RANGE[0],
-                        "max": ConfigValidator.VALID_SLAVE_ID_RANGE[1],
-                        "title": "Station slave ID",
-                    },
+# Valid ranges shared with ConfigValidator
+CURRENT_RANGE: Tuple[float, float] = (0.0, 80.0)  # Amperes
+PORT_RANGE: Tuple[int, int] = (1, 65535)
+SLAVE_ID_RANGE: Tuple[int, int] = (1, 247)
+POLL_INTERVAL_RANGE: Tuple[int, int] = (100, 60000)  # Milliseconds
+DEVICE_INSTANCE_RANGE: Tuple[int, int] = (0, 255)
+LOG_LEVELS: List[str] = ["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"]
+
+
+CONFIG_SCHEMA: Dict[str, Any] = {
+    "sections": {
+        "modbus": {
+            "title": "Modbus",
+            "type": "object",
+            "required": True,
+            "fields": {
+                "ip": {
+                    "type": "string",
+                    "format": "ipv4",
+                    "required": True,
+                    "title": "Charger IP",
+                    "label": "Modbus IP address",
+                    "hint": "Use the charger's IPv4 address (e.g., '192.168.1.100')",
+                },
+                "port": {
+                    "type": "integer",
+                    "min": PORT_RANGE[0],
+                    "max": PORT_RANGE[1],
+                    "title": "Port",
+                    "hint": "Use standard Modbus TCP port 502 or a valid port number",
+                },
+                "socket_slave_id": {
+                    "type": "integer",
+                    "min": SLAVE_ID_RANGE[0],
+                    "max": SLAVE_ID_RANGE[1],
+                    "title": "Socket slave ID",
+                },
+                "station_slave_id": {
+                    "type": "integer",
+                    "min": SLAVE_ID_RANGE[0],
+                    "max": SLAVE_ID_RANGE[1],
+                    "title": "Station slave ID",
                 },
             },
-            "defaults": {
-                "title": "Defaults",
-                "type": "object",
-                "fields": {
-                    "intended_set_current": {
-                        "type": "number",
-                        "min": ConfigValidator.VALID_CURRENT_RANGE[0],
-                        "max": ConfigValidator.VALID_CURRENT_RANGE[1],
-                        "step": 0.1,
-                        "title": "Intended set current (A)",
-                    },
-                    "station_max_current": {
-                        "type": "number",
-                        "min": ConfigValidator.VALID_CURRENT_RANGE[0],
-                        "max": ConfigValidator.VALID_CURRENT_RANGE[1],
-                        "step": 0.1,
-                        "title": "Station max current (A)",
-                    },
+        },
+        "defaults": {
+            "title": "Defaults",
+            "type": "object",
+            "fields": {
+                "intended_set_current": {
+                    "type": "number",
+                    "min": CURRENT_RANGE[0],
+                    "max": CURRENT_RANGE[1],
+                    "step": 0.1,
+                    "title": "Intended set current (A)",
+                },
+                "station_max_current": {
+                    "type": "number",
+                    "min": CURRENT_RANGE[0],
+                    "max": CURRENT_RANGE[1],
+                    "step": 0.1,
+                    "title": "Station max current (A)",
                 },
             },
-            "controls": {
-                "title": "Controls & Safety",
-                "type": "object",
-                "fields": {
-                    "current_tolerance": {
-                        "type": "number",
-                        "min": 0.0,
-                        "step": 0.01,
-                        "title": "Verification tolerance (A)",
-                    },
-                    "update_difference_threshold": {
-                        "type": "number",
-                        "min": 0.0,
-                        "step": 0.01,
-                        "title": "Update threshold (A)",
-                    },
-                    "verification_delay": {
-                        "type": "number",
-                        "min": 0.0,
-                        "step": 0.01,
-                        "title": "Verification delay (s)",
-                    },
-                    "retry_delay": {
-                        "type": "number",
-                        "min": 0.0,
-                        "step": 0.01,
-                        "title": "Retry delay (s)",
-                    },
-                    "max_retries": {
-                        "type": "integer",
-                        "min": 1,
-                        "title": "Max retries",
-                    },
-                    "watchdog_interval_seconds": {
-                        "type": "integer",
-                        "min": 1,
-                        "title": "Watchdog interval (s)",
-                    },
-                    "max_set_current": {
-                        "type": "number",
-                        "min": 0.01,
-                        "step": 0.1,
-                        "title": "Max set current (A)",
-                    },
-                    "min_charge_duration_seconds": {
-                        "type": "integer",
-                        "min": 0,
-                        "title": "Min charge duration (s)",
-                    },
-                    "current_update_interval": {
-                        "type": "integer",
-                        "min": 0,
-                        "title": "Current update interval (ms)",
-                    },
-                    "verify_delay": {
-                        "type": "integer",
-                        "min": 0,
-                        "title": "Verify delay (ms)",
-                    },
+        },
+        "controls": {
+            "title": "Controls & Safety",
+            "type": "object",
+            "fields": {
+                "current_tolerance": {
+                    "type": "number",
+                    "min": 0.0,
+                    "step": 0.01,
+                    "title": "Verification tolerance (A)",
+                    "label": "Current tolerance",
+                },
+                "update_difference_threshold": {
+                    "type": "number",
+                    "min": 0.0,
+                    "step": 0.01,
+                    "title": "Update threshold (A)",
+                },
+                "verification_delay": {
+                    "type": "number",
+                    "min": 0.0,
+                    "step": 0.01,
+                    "title": "Verification delay (s)",
+                },
+                "retry_delay": {
+                    "type": "number",
+                    "min": 0.0,
+                    "step": 0.01,
+                    "title": "Retry delay (s)",
+                },
+                "max_retries": {
+                    "type": "integer",
+                    "min": 1,
+                    "title": "Max retries",
+                },
+                "watchdog_interval_seconds": {
+                    "type": "integer",
+                    "min": 1,
+                    "title": "Watchdog interval (s)",
+                },
+                "max_set_current": {
+                    "type": "number",
+                    "min": 0.01,
+                    "max": CURRENT_RANGE[1],
+                    "step": 0.1,
+                    "title": "Max set current (A)",
+                },
+                "min_charge_duration_seconds": {
+                    "type": "integer",
+                    "min": 0,
+                    "title": "Min charge duration (s)",
+                },
+                "current_update_interval": {
+                    "type": "integer",
+                    "min": 0,
+                    "title": "Current update interval (ms)",
+                },
+                "verify_delay": {
+                    "type": "integer",
+                    "min": 0,
+                    "title": "Verify delay (ms)",
+                },
+                "command_coalesce_ms": {
+                    "type": "integer",
+                    "min": 0,
+                    "max": 5000,
+                    "title": "Coalesce control changes within (ms)",
                 },
             },
-            "logging": {
-                "title": "Logging",
-                "type": "object",
-                "fields": {
-                    "level": {
-                        "type": "enum",
-                        "values": ConfigValidator.VALID_LOG_LEVELS,
-                        "title": "Level",
-                    },
-                    "file": {"type": "string", "title": "File path"},
-                    "format": {
-                        "type": "enum",
-                        "values": ["structured", "simple"],
-                        "title": "Format",
-                    },
-                    "max_file_size_mb": {
-                        "type": "integer",
-                        "min": 1,
-                        "title": "Max file size (MB)",
-                    },
-                    "backup_count": {"type": "integer", "min": 0, "title": "Backups"},
-                    "console_output": {"type": "boolean", "title": "Console output"},
-                    "json_format": {"type": "boolean", "title": "JSON format"},
+        },
+        "logging": {
+            "title": "Logging",
+            "type": "object",
+            "fields": {
+                "level": {
+                    "type": "enum",
+                    "values": LOG_LEVELS,
+                    "ignore_case": True,
+                    "title": "Level",
+                    "label": "Log level",
+                },
+                "file": {
+                    "type": "string",
+                    "nonempty": True,
+                    "title": "File path",
+                    "label": "Log file path",
+                },
+                "format": {
+                    "type": "enum",
+                    "values": ["structured", "simple"],
+                    "title": "Format",
+                },
+                "max_file_size_mb": {
+                    "type": "integer",
+                    "min": 1,
+                    "title": "Max file size (MB)",
+                },
+                "backup_count": {"type": "integer", "min": 0, "title": "Backups"},
+                "console_output": {"type": "boolean", "title": "Console output"},
+                "json_format": {"type": "boolean", "title": "JSON format"},
+                "tick_timings": {
+                    "type": "boolean",
+                    "title": "Record per-stage tick timings",
                 },
             },
-            "tibber": {
-                "title": "Tibber (optional)",
-                "type": "object",
-                "fields": {
-                    "enabled": {"type": "boolean", "title": "Enabled"},
-                    "access_token": {"type": "string", "title": "Access token"},
-                    "home_id": {"type": "string", "title": "Home ID"},
-                    "charge_on_cheap": {"type": "boolean", "title": "Charge on CHEAP"},
-                    "charge_on_very_cheap": {
-                        "type": "boolean",
-                        "title": "Charge on VERY_CHEAP",
-                    },
-                    "strategy": {
-                        "type": "enum",
-                        "values": ["level", "threshold", "percentile"],
-                        "title": "Strategy",
-                    },
-                    "max_price_total": {
-                        "type": "number",
-                        "min": 0.0,
-                        "step": 0.001,
-                        "title": "Max price (threshold)",
-                    },
-                    "cheap_percentile": {
-                        "type": "number",
-                        "min": 0.0,
-                        "max": 1.0,
-                        "step": 0.01,
-                        "title": "Cheap percentile",
-                    },
+        },
+        "tibber": {
+            "title": "Tibber (optional)",
+            "type": "object",
+            "fields": {
+                "enabled": {"type": "boolean", "title": "Enabled"},
+                "access_token": {"type": "string", "title": "Access token"},
+                "home_id": {"type": "string", "title": "Home ID"},
+                "charge_on_cheap": {"type": "boolean", "title": "Charge on CHEAP"},
+                "charge_on_very_cheap": {
+                    "type": "boolean",
+                    "title": "Charge on VERY_CHEAP",
+                },
+                "strategy": {
+                    "type": "enum",
+                    "values": ["level", "threshold", "percentile"],
+                    "title": "Strategy",
+                },
+                "max_price_total": {
+                    "type": "number",
+                    "min": 0.0,
+                    "step": 0.001,
+                    "title": "Max price (threshold)",
+                },
+                "cheap_percentile": {
+                    "type": "number",
+                    "min": 0.0,
+                    "max": 1.0,
+                    "step": 0.01,
+                    "title": "Cheap percentile",
+                },
+                "live_enabled": {
+                    "type": "boolean",
+                    "title": "Live grid feed (Pulse)",
+                },
+                "live_grid_source": {
+                    "type": "enum",
+                    "values": ["fallback", "prefer", "cross_check"],
+                    "title": "Live grid usage",
+                },
+                "live_max_age_seconds": {
+                    "type": "number",
+                    "min": 1.0,
+                    "step": 1.0,
+                    "title": "Live reading max age (s)",
                 },
             },
-            "pricing": {
-                "title": "Pricing",
-                "type": "object",
-                "fields": {
-                    "source": {
+        },
+        "pricing": {
+            "title": "Pricing",
+            "type": "object",
+            "fields": {
+                "source": {
+                    "type": "enum",
+                    "values": ["victron", "static", "dynamic"],
+                    "title": "Session cost source",
+                },
+                "static_rate_eur_per_kwh": {
+                    "type": "number",
+                    "min": 0.0,
+                    "step": 0.001,
+                    "title": "Static rate (EUR/kWh)",
+                },
+                "currency_symbol": {
+                    "type": "string",
+                    "nonempty": True,
+                    "title": "Currency symbol",
+                    "hint": "Use symbols like '€', '$', '£'",
+                },
+                "providers": {
+                    "type": "array",
+                    "items": {
                         "type": "enum",
-                        "values": ["victron", "static"],
-                        "title": "Session cost source",
-                    },
-                    "static_rate_eur_per_kwh": {
-                        "type": "number",
-                        "min": 0.0,
-                        "step": 0.001,
-                        "title": "Static rate (EUR/kWh)",
+                        "values": ["tibber", "feed", "file"],
+                        "label": "provider",
                     },
-                    "currency_symbol": {"type": "string", "title": "Currency symbol"},
+                    "hint": "List providers in failover order, e.g. ['tibber', 'file']",
+                    "ui": "csv",
+                    "title": "Price providers (failover order)",
                 },
-            },
-            "schedule": {
-                "title": "Schedules",
-                "type": "list",
-                "item": {
-                    "type": "object",
-                    "fields": {
-                        "active": {"type": "boolean", "title": "Active"},
-                        "days": {
-                            "type": "array",
-                            "items": {"type": "integer", "min": 0, "max": 6},
-                            "ui": "days",
-                            "title": "Days",
-                        },
-                        "start_time": {"type": "time", "title": "Start time"},
-                        "end_time": {"type": "time", "title": "End time"},
-                    },
+                "feed_url": {"type": "string", "title": "Day-ahead feed URL"},
+                "feed_format": {
+                    "type": "enum",
+                    "values": ["json", "csv"],
+                    "title": "Feed/file format",
                 },
-            },
-            "registers": {
-                "title": "Registers (advanced)",
-                "type": "object",
-                "advanced": True,
-                "fields": {
-                    # Expose a subset commonly tweaked; the rest rely on defaults
-                    "station_max_current": {
-                        "type": "integer",
-                        "min": 0,
-                        "title": "Station max current (reg 1100)",
-                    },
+                "file_path": {"type": "string", "title": "Local price file"},
+                "refresh_interval_seconds": {
+                    "type": "integer",
+                    "min": 60,
+                    "step": 60,
+                    "title": "Price refresh interval (s)",
                 },
+                "cache_file": {"type": "string", "title": "Price cache file"},
             },
-            "web": {
-                "title": "Web UI",
+        },
+        "schedule": {
+            "title": "Schedules",
+            "label": "Schedule",
+            "type": "list",
+            "item": {
                 "type": "object",
                 "fields": {
-                    "host": {"type": "string", "title": "Bind address"},
-                    "port": {
-                        "type": "integer",
-                        "min": 1,
-                        "max": 65535,
-                        "title": "Port",
+                    "active": {"type": "boolean", "title": "Active"},
+                    "days": {
+                        "type": "array",
+                        "items": {
+                            "type": "integer",
+                            "min": 0,
+                            "max": 6,
+                            "label": "day",
+                            "hint": "Use day numbers 0-6 (0=Monday, 6=Sunday)",
+                        },
+                        "ui": "days",
+                        "title": "Days",
                     },
+                    "start_time": {"type": "time", "title": "Start time"},
+                    "end_time": {"type": "time", "title": "End time"},
                 },
             },
-            "device_instance": {
-                "title": "Device instance",
-                "type": "integer",
-                "min": ConfigValidator.VALID_DEVICE_INSTANCE_RANGE[0],
-                "max": ConfigValidator.VALID_DEVICE_INSTANCE_RANGE[1],
+        },
+        "registers": {
+            "title": "Registers (advanced)",
+            "type": "object",
+            "advanced": True,
+            "fields": {
+                # Expose a subset commonly tweaked; the rest rely on defaults
+                "station_max_current": {
+                    "type": "integer",
+                    "min": 0,
+                    "title": "Station max current (reg 1100)",
+                },
             },
-            "poll_interval_ms": {
-                "title": "Poll interval (ms)",
-                "type": "integer",
-                "min": ConfigValidator.VALID_POLL_INTERVAL_RANGE[0],
-                "max": ConfigValidator.VALID_POLL_INTERVAL_RANGE[1],
+        },
+        "web": {
+            "title": "Web UI",
+            "type": "object",
+            "fields": {
+                "host": {"type": "string", "nonempty": True, "title": "Bind address"},
+                "port": {
+                    "type": "integer",
+                    "min": 1,
+                    "max": 65535,
+                    "title": "Port",
+                },
+                "profiler": {
+                    "type": "boolean",
+                    "title": "Enable sampling profiler endpoint",
+                },
             },
-            "timezone": {
-                "title": "Timezone",
-                "type": "string",
+        },
+        "archive": {
+            "title": "Metrics archive",
+            "type": "object",
+            "fields": {
+                "enabled": {"type": "boolean", "title": "Enabled"},
+                "path": {"type": "string", "nonempty": True, "title": "Archive file"},
+                "max_size_mb": {
+                    "type": "number",
+                    "min": 0.1,
+                    "max": 1024,
+                    "step": 0.1,
+                    "title": "Max size (MB)",
+                },
             },
-        }
+        },
+        "device_instance": {
+            "title": "Device instance",
+            "type": "integer",
+            "min": DEVICE_INSTANCE_RANGE[0],
+            "max": DEVICE_INSTANCE_RANGE[1],
+            "hint": "Use a value between 0 and 255 (typically 0 for the first device)",
+        },
+        "poll_interval_ms": {
+            "title": "Poll interval (ms)",
+            "type": "integer",
+            "min": POLL_INTERVAL_RANGE[0],
+            "max": POLL_INTERVAL_RANGE[1],
+            "label": "Poll interval",
+            "hint": "Use a value between 100ms and 60000ms",
+        },
+        "timezone": {
+            "title": "Timezone",
+            "type": "string",
+            "format": "timezone",
+        },
     }
+}
+
+
+def get_config_schema() -> Dict[str, Any]:
+    """Return the shared, read-only configuration schema."""
+    return CONFIG_SCHEMA
@@ -30,14 +30,30 @@ Example:
     ```
 """
 
-import ipaddress
-import re
+import dataclasses
 from dataclasses import dataclass
-from typing import Any, Dict, List, Optional, Tuple
-
-import pytz
-
+from typing import Any, Collection, Dict, List, Optional, Tuple
+
+from .config import Config
+from .config_schema import (
+    CONFIG_SCHEMA,
+    CURRENT_RANGE,
+    DEVICE_INSTANCE_RANGE,
+    LOG_LEVELS,
+    POLL_INTERVAL_RANGE,
+    PORT_RANGE,
+    SLAVE_ID_RANGE,
+)
 from .exceptions import ConfigurationError
+from .schema_validator import (
+    compile_schema,
+    is_valid_ip,
+    is_valid_time,
+    is_valid_timezone,
+)
+
+# Compiled once: per-field checks with their bounds and enums resolved
+_COMPILED_SCHEMA = compile_schema(CONFIG_SCHEMA)
 
 
 @dataclass
@@ -72,14 +88,14 @@ class ConfigValidator:
         _auto_correct: Whether to automatically fix minor issues.
     """
 
-    # Valid ranges for configuration values
-    VALID_CURRENT_RANGE = (0.0, 80.0)  # Amperes
+    # Valid ranges for configuration values (defined by the schema)
+    VALID_CURRENT_RANGE = CURRENT_RANGE  # Amperes
     VALID_VOLTAGE_RANGE = (100.0, 500.0)  # Volts
-    VALID_PORT_RANGE = (1, 65535)
-    VALID_SLAVE_ID_RANGE = (1, 247)
-    VALID_POLL_INTERVAL_RANGE = (100, 60000)  # Milliseconds
-    VALID_DEVICE_INSTANCE_RANGE = (0, 255)
-    VALID_LOG_LEVELS = ["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"]
+    VALID_PORT_RANGE = PORT_RANGE
+    VALID_SLAVE_ID_RANGE = SLAVE_ID_RANGE
+    VALID_POLL_INTERVAL_RANGE = POLL_INTERVAL_RANGE  # Milliseconds
+    VALID_DEVICE_INSTANCE_RANGE = DEVICE_INSTANCE_RANGE
+    VALID_LOG_LEVELS = LOG_LEVELS
 
     def __init__(self, auto_correct: bool = False):
         """Initialize the configuration validator.
@@ -91,11 +107,15 @@ class ConfigValidator:
         self._warnings: List[ValidationError] = []
         self._auto_correct = auto_correct
 
-    def validate(self, config: Dict[str, Any]) -> Tuple[bool, List[ValidationError]]:
+    def validate(
+        self, config: Dict[str, Any], sections: Optional[Collection[str]] = None
+    ) -> Tuple[bool, List[ValidationError]]:
         """Validate a configuration dictionary.
 
         Args:
             config: The configuration dictionary to validate.
+            sections: Only validate these top-level keys (e.g. the ones that
+                changed, see ``Config.diff``); all of them when None.
 
         Returns:
             Tuple of (is_valid, errors) where is_valid is True if no errors,
@@ -115,46 +135,37 @@ class ConfigValidator:
         self._errors = []
         self._warnings = []
 
-        # Validate required top-level sections
-        self._validate_required_sections(config)
-
-        # Validate each section
-        if "modbus" in config:
-            self._validate_modbus_config(config["modbus"])
-
-        if "registers" in config:
-            self._validate_registers_config(config["registers"])
-
-        if "defaults" in config:
-            self._validate_defaults_config(config["defaults"])
-
-        if "controls" in config:
-            self._validate_controls_config(config["controls"])
-
-        if "schedule" in config:
-            self._validate_schedule_config(config["schedule"])
+        def wanted(*names: str) -> bool:
+            return sections is None or any(name in sections for name in names)
 
-        if "logging" in config:
-            self._validate_logging_config(config["logging"])
+        # Field checks compiled from the schema: one pass, every bad field
+        _COMPILED_SCHEMA.validate(config, self._add_error, sections)
 
-        if "pricing" in config:
-            self._validate_pricing_config(config["pricing"])
+        # Checks the schema cannot express
+        registers = config.get("registers")
+        if isinstance(registers, dict) and wanted("registers"):
+            self._validate_registers_config(registers)
 
-        # Validate global settings
-        self._validate_global_settings(config)
+        self._validate_advisories(
+            config, wanted("controls"), wanted("poll_interval_ms")
+        )
 
         # Validate cross-field relationships
-        self._validate_relationships(config)
+        if wanted("defaults", "controls"):
+            self._validate_relationships(config)
 
         # Return results
         all_issues = self._errors + self._warnings
         return len(self._errors) == 0, all_issues
 
-    def validate_or_raise(self, config: Dict[str, Any]) -> None:
+    def validate_or_raise(
+        self, config: Dict[str, Any], sections: Optional[Collection[str]] = None
+    ) -> None:
         """Validate configuration and raise exception if invalid.
 
         Args:
             config: The configuration dictionary to validate.
+            sections: Only validate these top-level keys; all when None.
 
         Raises:
             ConfigurationError: If configuration is invalid, with detailed
@@ -170,7 +181,7 @@ class ConfigValidator:
                 print(f"❌ Configuration error: {e}")
             ```
         """
-        is_valid, errors = self.validate(config)
+        is_valid, errors = self.validate(config, sections)
         if not is_valid:
             error_messages = []
             for error in errors:
@@ -214,101 +225,6 @@ class ConfigValidator:
             )
         )
 
-    def _validate_required_sections(self, config: Dict[str, Any]) -> None:
-        """Validate that required configuration sections exist."""
-        required_sections = ["modbus"]
-
-        for section in required_sections:
-            if section not in config:
-                self._add_error(
-                    section,
-                    f"Required configuration section '{section}' is missing",
-                    None,
-                    f"Add a '{section}' section to your configuration file",
-                )
-
-    def _validate_modbus_config(self, modbus: Dict[str, Any]) -> None:
-        """Validate Modbus configuration section."""
-        # Validate IP address
-        if "ip" not in modbus:
-            self._add_error(
-                "modbus.ip",
-                "Modbus IP address is required",
-                None,
-                "Add 'ip' field with the Alfen charger's IP address "
-                "(e.g., '192.168.1.100')",
-            )
-        else:
-            ip = modbus["ip"]
-            if not self._is_valid_ip(ip):
-                self._add_error(
-                    "modbus.ip",
-                    f"Invalid IP address format: '{ip}'",
-                    ip,
-                    "Use a valid IPv4 address format " "(e.g., '192.168.1.100')",
-                )
-
-        # Validate port
-        port = modbus.get("port", 502)
-        if not isinstance(port, int):
-            self._add_error(
-                "modbus.port",
-                f"Port must be an integer, got {type(port).__name__}",
-                port,
-                "Use an integer value between 1 and 65535 (default: 502)",
-            )
-        elif not self.VALID_PORT_RANGE[0] <= port <= self.VALID_PORT_RANGE[1]:
-            self._add_error(
-                "modbus.port",
-                f"Port {port} is out of valid range " f"{self.VALID_PORT_RANGE}",
-                port,
-                "Use standard Modbus TCP port 502 or a valid port number",
-            )
-
-        # Validate slave IDs
-        socket_slave = modbus.get("socket_slave_id", 1)
-        if not isinstance(socket_slave, int):
-            self._add_error(
-                "modbus.socket_slave_id",
-                f"Socket slave ID must be integer, "
-                f"got {type(socket_slave).__name__}",
-                socket_slave,
-                "Use an integer value between 1 and 247 " "(typically 1 for Alfen)",
-            )
-        elif (
-            not self.VALID_SLAVE_ID_RANGE[0]
-            <= socket_slave
-            <= self.VALID_SLAVE_ID_RANGE[1]
-        ):
-            self._add_error(
-                "modbus.socket_slave_id",
-                f"Socket slave ID {socket_slave} out of range "
-                f"{self.VALID_SLAVE_ID_RANGE[:2]}",
-                socket_slave,
-                "Use slave ID 1 for Alfen socket data",
-            )
-
-        station_slave = modbus.get("station_slave_id", 200)
-        if not isinstance(station_slave, int):
-            self._add_error(
-                "modbus.station_slave_id",
-                f"Station slave ID must be integer, got {type(station_slave).__name__}",
-                station_slave,
-                "Use an integer value between 1 and 247 (typically 200 for Alfen)",
-            )
-        elif (
-            not self.VALID_SLAVE_ID_RANGE[0]
-            <= station_slave
-            <= self.VALID_SLAVE_ID_RANGE[1]
-        ):
-            self._add_error(
-                "modbus.station_slave_id",
-                f"Station slave ID {station_slave} out of range "
-                f"{self.VALID_SLAVE_ID_RANGE[:2]}",
-                station_slave,
-                "Use slave ID 200 for Alfen station control",
-            )
-
     def _validate_registers_config(self, registers: Dict[str, Any]) -> None:
         """Validate register addresses configuration."""
         expected_registers = {
@@ -356,90 +272,16 @@ class ConfigValidator:
                         description,
                     )
 
-    def _validate_defaults_config(self, defaults: Dict[str, Any]) -> None:
-        """Validate default values configuration."""
-        # Validate intended current
-        current = defaults.get("intended_set_current", 6.0)
-        if not isinstance(current, (int, float)):
-            self._add_error(
-                "defaults.intended_set_current",
-                f"Current must be a number, got {type(current).__name__}",
-                current,
-                "Use a numeric value in amperes (e.g., 6.0)",
-            )
-        elif not self.VALID_CURRENT_RANGE[0] <= current <= self.VALID_CURRENT_RANGE[1]:
-            self._add_error(
-                "defaults.intended_set_current",
-                f"Current {current}A is out of valid range {self.VALID_CURRENT_RANGE}",
-                current,
-                f"Use current between {self.VALID_CURRENT_RANGE[0]}A-"
-                f"{self.VALID_CURRENT_RANGE[1]}A",
-            )
-
-        # Validate station max current
-        max_current = defaults.get("station_max_current", 32.0)
-        if not isinstance(max_current, (int, float)):
-            self._add_error(
-                "defaults.station_max_current",
-                f"Max current must be a number, got {type(max_current).__name__}",
-                max_current,
-                "Use a numeric value in amperes (e.g., 32.0)",
-            )
-        elif (
-            not self.VALID_CURRENT_RANGE[0]
-            <= max_current
-            <= self.VALID_CURRENT_RANGE[1]
-        ):
-            self._add_error(
-                "defaults.station_max_current",
-                f"Max current {max_current}A out of range {self.VALID_CURRENT_RANGE}",
-                max_current,
-                f"Use max current between {self.VALID_CURRENT_RANGE[0]}A-"
-                f"{self.VALID_CURRENT_RANGE[1]}A",
-            )
-
-    def _validate_controls_config(self, controls: Dict[str, Any]) -> None:
-        """Validate control settings configuration."""
-        # Validate max set current
-        max_current = controls.get("max_set_current", 64.0)
-        if not isinstance(max_current, (int, float)):
-            self._add_error(
-                "controls.max_set_current",
-                f"Max set current must be a number, got {type(max_current).__name__}",
-                max_current,
-                "Use a numeric value in amperes",
-            )
-        elif (
-            not self.VALID_CURRENT_RANGE[0]
-            <= max_current
-            <= self.VALID_CURRENT_RANGE[1]
-        ):
-            self._add_error(
-                "controls.max_set_current",
-                f"Max set current {max_current}A out of range "
-                f"{self.VALID_CURRENT_RANGE}",
-                max_current,
-                "Check your charger's maximum current rating",
-            )
-
-        # Validate current tolerance
-        tolerance = controls.get("current_tolerance", 0.5)
-        if not isinstance(tolerance, (int, float)):
-            self._add_error(
-                "controls.current_tolerance",
-                f"Current tolerance must be a number, "
-                f"got {type(tolerance).__name__}",
-                tolerance,
-                "Use a numeric value in amperes (e.g., 0.5)",
-            )
-        elif tolerance < 0:
-            self._add_error(
-                "controls.current_tolerance",
-                f"Current tolerance cannot be negative: {tolerance}",
-                tolerance,
-                "Use a positive tolerance value (e.g., 0.5A)",
-            )
-        elif tolerance > 5.0:
+    def _validate_advisories(
+        self, config: Dict[str, Any], controls: bool, poll_interval: bool
+    ) -> None:
+        """Warn about valid but questionable values."""
+        tolerance = (
+            config.get("controls", {}).get("current_tolerance")
+            if controls and isinstance(config.get("controls"), dict)
+            else None
+        )
+        if isinstance(tolerance, (int, float)) and tolerance > 5.0:
             self._add_warning(
                 "controls.current_tolerance",
                 f"Large current tolerance {tolerance}A may cause verification issues",
@@ -447,267 +289,60 @@ class ConfigValidator:
                 "Consider using a smaller tolerance (e.g., 0.5A to 1.0A)",
             )
 
-    def _validate_schedule_config(self, schedule: Dict[str, Any]) -> None:
-        """Validate schedule configuration."""
-        items = schedule.get("items", [])
-
-        if not isinstance(items, list):
-            self._add_error(
-                "schedule.items",
-                f"Schedule items must be a list, got {type(items).__name__}",
-                items,
-                "Use a list of schedule configurations",
-            )
-            return
-
-        for i, item in enumerate(items):
-            if not isinstance(item, dict):
-                self._add_error(
-                    f"schedule.items[{i}]",
-                    f"Schedule item must be a dictionary, got {type(item).__name__}",
-                    item,
-                    "Each schedule item should have 'active', 'days', "
-                    "and time settings",
-                )
-                continue
-
-            # Validate schedule fields
-            if "active" in item and not isinstance(item["active"], bool):
-                self._add_error(
-                    f"schedule.items[{i}].active",
-                    f"Active flag must be boolean, got {type(item['active']).__name__}",
-                    item["active"],
-                    "Use true or false",
-                )
-
-            # Validate days
-            if "days" in item:
-                days = item["days"]
-                if not isinstance(days, list):
-                    self._add_error(
-                        f"schedule.items[{i}].days",
-                        f"Days must be a list, got {type(days).__name__}",
-                        days,
-                        "Use a list of day numbers (0=Monday, 6=Sunday)",
-                    )
-                else:
-                    for day in days:
-                        if not isinstance(day, int) or not 0 <= day <= 6:
-                            self._add_error(
-                                f"schedule.items[{i}].days",
-                                f"Invalid day value: {day}",
-                                day,
-                                "Use day numbers 0-6 (0=Monday, 6=Sunday)",
-                            )
-
-            # Validate time format
-            for time_field in ["start_time", "end_time"]:
-                if time_field in item:
-                    time_str = item[time_field]
-                    if not self._is_valid_time_format(time_str):
-                        self._add_error(
-                            f"schedule.items[{i}].{time_field}",
-                            f"Invalid time format: '{time_str}'",
-                            time_str,
-                            "Use HH:MM format (e.g., '08:00' or '22:30')",
-                        )
-
-    def _validate_logging_config(self, logging: Dict[str, Any]) -> None:
-        """Validate logging configuration."""
-        # Validate log level
-        level = logging.get("level", "INFO")
-        if not isinstance(level, str):
-            self._add_error(
-                "logging.level",
-                f"Log level must be a string, got {type(level).__name__}",
-                level,
-                f"Use one of: {', '.join(self.VALID_LOG_LEVELS)}",
-            )
-        elif level.upper() not in self.VALID_LOG_LEVELS:
-            self._add_error(
-                "logging.level",
-                f"Invalid log level: '{level}'",
-                level,
-                f"Use one of: {', '.join(self.VALID_LOG_LEVELS)}",
-            )
-
-        # Validate log file path
-        if "file" in logging:
-            file_path = logging["file"]
-            if not isinstance(file_path, str):
-                self._add_error(
-                    "logging.file",
-                    f"Log file path must be a string, got {type(file_path).__name__}",
-                    file_path,
-                    "Use a valid file path (e.g., '/var/log/alfen_driver.log')",
-                )
-            elif not file_path:
-                self._add_error(
-                    "logging.file",
-                    "Log file path cannot be empty",
-                    file_path,
-                    "Specify a valid log file path or remove this field",
-                )
-
-    def _validate_pricing_config(self, pricing: Dict[str, Any]) -> None:
-        """Validate pricing configuration section."""
-        source = pricing.get("source", "static")
-        if not isinstance(source, str) or source not in {"victron", "static"}:
-            self._add_error(
-                "pricing.source",
-                "Invalid pricing source (must be 'victron' or 'static')",
-                source,
-                "Choose 'victron' to read from Victron system or 'static' to use a fixed rate",
-            )
-        rate = pricing.get("static_rate_eur_per_kwh", 0.25)
-        if not isinstance(rate, (int, float)) or rate < 0:
-            self._add_error(
-                "pricing.static_rate_eur_per_kwh",
-                "Static rate must be a non-negative number",
-                rate,
-                "Provide a valid EUR/kWh value like 0.25",
-            )
-        currency = pricing.get("currency_symbol", "€")
-        if not isinstance(currency, str) or not currency:
-            self._add_error(
-                "pricing.currency_symbol",
-                "Currency symbol must be a non-empty string",
-                currency,
-                "Use symbols like '€', '$', '£'",
+        interval = config.get("poll_interval_ms") if poll_interval else None
+        if (
+            isinstance(interval, int)
+            and self.VALID_POLL_INTERVAL_RANGE[0] <= interval < 500
+        ):
+            self._add_warning(
+                "poll_interval_ms",
+                f"Very short poll interval {interval}ms may cause high CPU usage",
+                interval,
+                "Consider using 1000ms or higher for normal operation",
             )
 
-    def _validate_global_settings(self, config: Dict[str, Any]) -> None:
-        """Validate global configuration settings."""
-        # Validate device instance
-        if "device_instance" in config:
-            instance = config["device_instance"]
-            if not isinstance(instance, int):
-                self._add_error(
-                    "device_instance",
-                    f"Device instance must be an integer, "
-                    f"got {type(instance).__name__}",
-                    instance,
-                    "Use an integer value (typically 0 for first device)",
-                )
-            elif (
-                not self.VALID_DEVICE_INSTANCE_RANGE[0]
-                <= instance
-                <= self.VALID_DEVICE_INSTANCE_RANGE[1]
-            ):
-                self._add_error(
-                    "device_instance",
-                    f"Device instance {instance} is out of valid range "
-                    f"{self.VALID_DEVICE_INSTANCE_RANGE}",
-                    instance,
-                    "Use a value between 0 and 255",
-                )
-
-        # Validate poll interval
-        if "poll_interval_ms" in config:
-            interval = config["poll_interval_ms"]
-            if not isinstance(interval, int):
-                self._add_error(
-                    "poll_interval_ms",
-                    f"Poll interval must be an integer, got {type(interval).__name__}",
-                    interval,
-                    "Use an integer value in milliseconds (e.g., 1000 for 1 second)",
-                )
-            elif (
-                not self.VALID_POLL_INTERVAL_RANGE[0]
-                <= interval
-                <= self.VALID_POLL_INTERVAL_RANGE[1]
-            ):
-                self._add_error(
-                    "poll_interval_ms",
-                    f"Poll interval {interval}ms is out of valid range "
-                    f"{self.VALID_POLL_INTERVAL_RANGE}",
-                    interval,
-                    "Use a value between 100ms and 60000ms",
-                )
-            elif interval < 500:
-                self._add_warning(
-                    "poll_interval_ms",
-                    f"Very short poll interval {interval}ms may cause high CPU usage",
-                    interval,
-                    "Consider using 1000ms or higher for normal operation",
-                )
-
-        # Validate timezone
-        if "timezone" in config:
-            tz = config["timezone"]
-            if not isinstance(tz, str):
-                self._add_error(
-                    "timezone",
-                    f"Timezone must be a string, got {type(tz).__name__}",
-                    tz,
-                    "Use a valid timezone string (e.g., 'Europe/Amsterdam')",
-                )
-            elif not self._is_valid_timezone(tz):
-                self._add_error(
-                    "timezone",
-                    f"Invalid timezone: '{tz}'",
-                    tz,
-                    "Use a valid timezone like 'UTC', 'Europe/Amsterdam', "
-                    "or 'America/New_York'",
-                )
-
     def _validate_relationships(self, config: Dict[str, Any]) -> None:
         """Validate relationships between configuration values."""
-        # Check that intended current doesn't exceed max current
-        if "defaults" in config and "controls" in config:
-            intended = config["defaults"].get("intended_set_current", 6.0)
-            max_set = config["controls"].get("max_set_current", 64.0)
+        defaults = config.get("defaults")
+        controls = config.get("controls")
+        if not isinstance(defaults, dict) or not isinstance(controls, dict):
+            return
+        intended = defaults.get("intended_set_current", 6.0)
+        station_max = defaults.get("station_max_current", 32.0)
+        max_set = controls.get("max_set_current", 64.0)
+        if not isinstance(max_set, (int, float)):
+            return
 
-            if isinstance(intended, (int, float)) and isinstance(max_set, (int, float)):
-                if intended > max_set:
-                    self._add_error(
-                        "defaults.intended_set_current",
-                        f"Intended current {intended}A exceeds max set "
-                        f"current {max_set}A",
-                        intended,
-                        f"Reduce intended current to {max_set}A or less, "
-                        f"or increase max_set_current",
-                    )
+        # Check that intended current doesn't exceed max current
+        if isinstance(intended, (int, float)) and intended > max_set:
+            self._add_error(
+                "defaults.intended_set_current",
+                f"Intended current {intended}A exceeds max set current {max_set}A",
+                intended,
+                f"Reduce intended current to {max_set}A or less, "
+                f"or increase max_set_current",
+            )
 
         # Check that station max current is reasonable
-        if "defaults" in config:
-            station_max = config["defaults"].get("station_max_current", 32.0)
-            if "controls" in config:
-                max_set = config["controls"].get("max_set_current", 64.0)
-
-                if isinstance(station_max, (int, float)) and isinstance(
-                    max_set, (int, float)
-                ):
-                    if max_set > station_max:
-                        self._add_warning(
-                            "controls.max_set_current",
-                            f"Max set current {max_set}A exceeds station max "
-                            f"{station_max}A",
-                            max_set,
-                            f"The charger may limit current to {station_max}A",
-                        )
+        if isinstance(station_max, (int, float)) and max_set > station_max:
+            self._add_warning(
+                "controls.max_set_current",
+                f"Max set current {max_set}A exceeds station max {station_max}A",
+                max_set,
+                f"The charger may limit current to {station_max}A",
+            )
 
     def _is_valid_ip(self, ip: str) -> bool:
         """Check if a string is a valid IP address."""
-        try:
-            ipaddress.ip_address(ip)
-            return True
-        except (ValueError, TypeError):
-            return False
+        return is_valid_ip(ip)
 
     def _is_valid_time_format(self, time_str: str) -> bool:
         """Check if a string is in HH:MM format (requires zero-padding)."""
-        # Require zero-padding: HH:MM format only
-        pattern = r"^([0-1][0-9]|2[0-3]):([0-5][0-9])$"
-        return bool(re.match(pattern, time_str))
+        return is_valid_time(time_str)
 
     def _is_valid_timezone(self, tz: str) -> bool:
         """Check if a string is a valid timezone."""
-        try:
-            pytz.timezone(tz)
-            return True
-        except (pytz.UnknownTimeZoneError, AttributeError):
-            return False
+        return is_valid_timezone(tz)
 
     def get_config_schema(self) -> Dict[str, Any]:
         """Get the expected configuration schema with descriptions.
@@ -723,110 +358,60 @@ class ConfigValidator:
             print(json.dumps(schema, indent=2))
             ```
         """
-        return {
-            "modbus": {
-                "type": "object",
-                "required": True,
-                "description": "Modbus TCP connection settings",
-                "fields": {
-                    "ip": {
-                        "type": "string",
-                        "required": True,
-                        "format": "ipv4",
-                        "description": "IP address of the Alfen charger",
-                        "example": "192.168.1.100",
-                    },
-                    "port": {
-                        "type": "integer",
-                        "required": False,
-                        "default": 502,
-                        "range": [1, 65535],
-                        "description": "Modbus TCP port",
-                    },
-                    "socket_slave_id": {
-                        "type": "integer",
-                        "required": False,
-                        "default": 1,
-                        "range": [1, 247],
-                        "description": "Slave ID for socket data "
-                        "(voltages, currents, power)",
-                    },
-                    "station_slave_id": {
-                        "type": "integer",
-                        "required": False,
-                        "default": 200,
-                        "range": [1, 247],
-                        "description": "Slave ID for station control",
-                    },
-                },
-            },
-            "defaults": {
-                "type": "object",
-                "required": False,
-                "description": "Default operational values",
-                "fields": {
-                    "intended_set_current": {
-                        "type": "float",
-                        "required": False,
-                        "default": 6.0,
-                        "range": [0.0, 80.0],
-                        "unit": "amperes",
-                        "description": "Default charging current",
-                    },
-                    "station_max_current": {
-                        "type": "float",
-                        "required": False,
-                        "default": 32.0,
-                        "range": [0.0, 80.0],
-                        "unit": "amperes",
-                        "description": "Maximum current the station can provide",
-                    },
-                },
-            },
-            "controls": {
-                "type": "object",
-                "required": False,
-                "description": "Control and safety limits",
-                "fields": {
-                    "max_set_current": {
-                        "type": "float",
-                        "required": False,
-                        "default": 64.0,
-                        "range": [0.0, 80.0],
-                        "unit": "amperes",
-                        "description": "Maximum current that can be set",
-                    },
-                    "current_tolerance": {
-                        "type": "float",
-                        "required": False,
-                        "default": 0.5,
-                        "range": [0.0, 5.0],
-                        "unit": "amperes",
-                        "description": "Tolerance for current verification",
-                    },
-                },
-            },
-            "device_instance": {
-                "type": "integer",
-                "required": False,
-                "default": 0,
-                "range": [0, 255],
-                "description": "Venus OS device instance number",
-            },
-            "poll_interval_ms": {
-                "type": "integer",
-                "required": False,
-                "default": 1000,
-                "range": [100, 60000],
-                "unit": "milliseconds",
-                "description": "Polling interval for reading charger data",
-            },
-            "timezone": {
-                "type": "string",
-                "required": False,
-                "default": "UTC",
-                "format": "timezone",
-                "description": "Timezone for schedule operations",
-                "example": "Europe/Amsterdam",
-            },
+        return _documentation_schema()
+
+
+def _field_default(field: "dataclasses.Field[Any]") -> Any:
+    if field.default is not dataclasses.MISSING:
+        return field.default
+    if field.default_factory is not dataclasses.MISSING:
+        return field.default_factory()
+    return dataclasses.MISSING
+
+
+def _describe(spec: Dict[str, Any], required: bool, default: Any) -> Dict[str, Any]:
+    entry: Dict[str, Any] = {
+        "type": spec.get("type", "string"),
+        "required": required,
+        "description": spec.get("title", ""),
+    }
+    if default is not dataclasses.MISSING:
+        entry["default"] = default
+    if "min" in spec and "max" in spec:
+        entry["range"] = [spec["min"], spec["max"]]
+    for key in ("values", "format"):
+        if key in spec:
+            entry[key] = spec[key]
+    return entry
+
+
+def _documentation_schema() -> Dict[str, Any]:
+    """Describe each setting from the canonical schema and Config defaults."""
+    config_fields = {field.name: field for field in dataclasses.fields(Config)}
+    schema: Dict[str, Any] = {}
+    for name, spec in CONFIG_SCHEMA["sections"].items():
+        config_field = config_fields.get(name)
+        required = bool(spec.get("required"))
+        if spec.get("type") != "object":
+            default = (
+                _field_default(config_field) if config_field else dataclasses.MISSING
+            )
+            schema[name] = _describe(spec, required, default)
+            continue
+        section_defaults: Dict[str, Any] = {}
+        if config_field is not None and dataclasses.is_dataclass(config_field.type):
+            section_defaults = {
+                field.name: _field_default(field)
+                for field in dataclasses.fields(config_field.type)
+            }
+        entry = _describe(spec, required, dataclasses.MISSING)
+        entry["fields"] = {
+            field: _describe(
+                field_spec,
+                bool(field_spec.get("required")),
+                section_defaults.get(field, dataclasses.MISSING),
+            )
+            for field, field_spec in spec.get("fields", {}).items()
         }
+        schema[name] = entry
+    return schema
@@ -88,3 +88,31 @@ class SessionDefaults:
     ENERGY_THRESHOLD_KWH = 0.01
     SESSION_END_DELAY_SECONDS = 30
     START_CONFIRMATION_SECONDS = 5
+    # Flat (static/Victron) rates are re-read once per slot of this length
+    COST_FLAT_RATE_SLOT_SECONDS = 900
+    # Per-tick meter steps outside [0, this] are glitched reads or gaps
+    METER_MAX_TICK_KWH = 1.0
+    # Session journal: energy step between checkpoints and events per compaction
+    JOURNAL_CHECKPOINT_KWH = 0.1
+    JOURNAL_COMPACT_EVENTS = 200
+    # Statistics rollup: longer gaps between ticks are not counted as charging
+    STATS_MAX_TICK_SECONDS = 60
+    # The rollup is tens of kB; stage it at session end and at this interval
+    STATS_PERSIST_SECONDS = 900
+
+
+class WebDefaults:
+    """Web server defaults."""
+
+    # /api/stream: idle keep-alive interval, slow-client cutoff, client cap
+    STREAM_HEARTBEAT_SECONDS = 15.0
+    STREAM_WRITE_TIMEOUT_SECONDS = 10.0
+    STREAM_MAX_CLIENTS = 16
+
+    # /api/debug/profile: default and maximum run length, sampling period
+    PROFILE_DEFAULT_SECONDS = 10.0
+    PROFILE_MAX_SECONDS = 60.0
+    PROFILE_INTERVAL_SECONDS = 0.005
+
+    # /api/archive: widest range per request (7 days = 10080 minute rows)
+    ARCHIVE_MAX_SPAN_SECONDS = 7 * 86400
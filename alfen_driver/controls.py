@@ -14,7 +14,12 @@ from .exceptions import (
 )
 from .logging_utils import get_logger, log_charging_event
 from .logic import compute_effective_current, read_active_phases
-from .modbus_utils import decode_floats, read_holding_registers, retry_modbus_operation
+from .modbus_utils import (
+    _timed_modbus,
+    decode_floats,
+    read_holding_registers,
+    retry_modbus_operation,
+)
 
 CLAMP_EPSILON = 0.01  # Tolerance for clamping comparison
 
@@ -57,7 +62,9 @@ def set_current(
         builder = BinaryPayloadBuilder(byteorder=Endian.BIG, wordorder=Endian.BIG)
         builder.add_32bit_float(float(target_amps))
         payload = builder.to_registers()
-        client.write_registers(
+        _timed_modbus(
+            "write",
+            client.write_registers,
             ModbusRegisters.SOCKET_MODBUS_MAX_CURRENT,
             payload,
             slave=config.modbus.socket_slave_id,
@@ -214,7 +221,9 @@ def update_station_max_current(
     """
 
     def read_op() -> float:
-        rr_max_c = client.read_holding_registers(
+        rr_max_c = _timed_modbus(
+            "read",
+            client.read_holding_registers,
             ModbusRegisters.STATION_ACTIVE_MAX_CURRENT,
             2,
             slave=config.modbus.station_slave_id,
@@ -2,14 +2,16 @@
 """Simplified Alfen EV Charger driver for Victron Venus OS."""
 
 import dataclasses
+import logging
 import math
 import os
+import signal
 import sys
-import threading
 import time
 import uuid
+from collections import ChainMap
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
 
 sys.path.insert(
     1, os.path.join(os.path.dirname(__file__), "/opt/victronenergy/dbus-modbus-client")
@@ -20,12 +22,14 @@ from gi.repository import GLib  # noqa: E402
 from pymodbus.client import ModbusTcpClient  # noqa: E402
 from pymodbus.exceptions import ModbusException  # noqa: E402
 
+from .command_coalescer import CommandCoalescer  # noqa: E402
 from .config import CONFIG_PATH, Config, load_config  # noqa: E402
 from .config_validator import ConfigValidator  # noqa: E402
 from .constants import (  # noqa: E402
     ChargingLimits,
     ModbusRegisters,
     PollingIntervals,
+    SessionDefaults,
 )
 from .controls import (  # noqa: E402
     set_current,
@@ -41,6 +45,7 @@ from .exceptions import ModbusError  # noqa: E402
 from .logging_utils import (  # noqa: E402
     LogContext,
     get_logger,
+    log_performance,
     set_context,
     setup_root_logging,
 )
@@ -48,21 +53,44 @@ from .logic import (  # noqa: E402
     apply_mode_specific_status,  # noqa: E402
     compute_effective_current,
     get_complete_status,
+    get_energy_flows,
     read_active_phases,
 )
+from .logic import (  # noqa: E402
+    set_charge_planner as set_logic_charge_planner,
+)
 from .logic import (  # noqa: E402
     set_config as set_logic_config,
 )
+from .logic import (  # noqa: E402
+    set_live_feed as set_logic_live_feed,
+)
+from .measurements import Measurements  # noqa: E402
+from .metrics import (  # noqa: E402
+    DBUS_PUBLISHES,
+    DECODE_SECONDS,
+    REGISTRY,
+    TICK_SECONDS,
+)
+from .metrics_archive import MetricsArchive, MinuteAggregator  # noqa: E402
 from .modbus_utils import (  # noqa: E402
     decode_32bit_float,
-    decode_64bit_float,
     read_holding_registers,
     read_modbus_string,
     reconnect,
 )
 from .persistence import PersistenceManager  # noqa: E402
-from .session_manager import ChargingSessionManager  # noqa: E402
+from .pricing import PriceEngine  # noqa: E402
+from .schedule_plan import ChargePlanner  # noqa: E402
+from .session_history import SessionHistory, SessionRecord  # noqa: E402
+from .session_journal import SessionJournal  # noqa: E402
+from .session_manager import ChargingSession, ChargingSessionManager  # noqa: E402
+from .session_stats import SessionStatsRollup  # noqa: E402
+from .status_snapshot import StatusSnapshot  # noqa: E402
 from .tibber import get_hourly_overview_text  # noqa: E402
+from .tibber_live import TibberLiveFeed  # noqa: E402
+from .timeseries import TimeSeriesRecorder  # noqa: E402
+from .timings import TIMINGS  # noqa: E402
 
 try:
     import dbus
@@ -73,6 +101,8 @@ except ImportError:  # pragma: no cover
 class MutableValue:
     """Simple mutable value wrapper for callbacks."""
 
+    __slots__ = ("value",)
+
     def __init__(self, value: Any) -> None:
         self.value = value
 
@@ -103,7 +133,27 @@ class AlfenDriver:
 
         # Initialize components
         self.persistence = PersistenceManager("/data/alfen_driver_config.json")
-        self.session_manager = ChargingSessionManager()
+        self.session_history = SessionHistory("/data/alfen_driver_sessions.db")
+        self.session_stats = SessionStatsRollup()
+        self._stats_staged_at = time.time()
+        self.session_manager = ChargingSessionManager(
+            self._record_session,
+            SessionJournal("/data/alfen_driver_sessions.journal"),
+            self.session_stats,
+        )
+        # Constant-memory 1 s / 10 s / 1 min history for the web UI charts
+        self.timeseries = TimeSeriesRecorder(
+            ("power", "current", "voltage", "setpoint", "station")
+        )
+        # Long-term per-minute archive (layout is fixed at startup)
+        self.metrics_archive: Optional[MetricsArchive] = None
+        self.archive_aggregator: Optional[MinuteAggregator] = None
+        if self.config.archive.enabled:
+            self.metrics_archive = MetricsArchive(
+                self.config.archive.path,
+                int(self.config.archive.max_size_mb * 1024 * 1024),
+            )
+            self.archive_aggregator = MinuteAggregator(self.metrics_archive)
 
         # Initialize Modbus client
         self.client = ModbusTcpClient(
@@ -114,9 +164,24 @@ class AlfenDriver:
         # Initialize state
         self._init_state()
 
+        # Bursts of control changes are collapsed into one charger write
+        self.command_coalescer = CommandCoalescer(
+            self._apply_coalesced, self.config.controls.command_coalesce_ms
+        )
+        TIMINGS.enabled = self.config.logging.tick_timings
+
         # Set config in logic module for Tibber access
         set_logic_config(self.config)
 
+        # Precompiled SCHEDULED-mode decision table (rebuilt daily / on change)
+        self.price_engine = PriceEngine(self.config.pricing, self.config.tibber)
+        self.charge_planner = ChargePlanner(self.config, self.price_engine)
+        set_logic_charge_planner(self.charge_planner)
+
+        # Optional Tibber Pulse real-time grid feed for AUTO mode
+        self.tibber_live_feed: Optional[TibberLiveFeed] = None
+        self._sync_tibber_live_feed()
+
         # Setup D-Bus service
         self._setup_dbus()
 
@@ -129,40 +194,46 @@ class AlfenDriver:
         # Log current configuration settings at startup
         self._log_startup_settings()
 
-        # HTTP status snapshot state for web server readers
-        self.status_lock = threading.Lock()
-        # Initialize a non-empty default snapshot so /api/status is useful before first poll
-        self.status_snapshot: Dict[str, Any] = {
-            "mode": int(self.current_mode.value),
-            "start_stop": int(self.start_stop.value),
-            "set_current": float(self.intended_set_current.value),
-            "station_max_current": float(self.station_max_current),
-            "status": 0,
-            "ac_current": 0.0,
-            "ac_power": 0.0,
-            "energy_forward_kwh": 0.0,
-            "l1_voltage": 0.0,
-            "l2_voltage": 0.0,
-            "l3_voltage": 0.0,
-            "l1_current": 0.0,
-            "l2_current": 0.0,
-            "l3_current": 0.0,
-            "l1_power": 0.0,
-            "l2_power": 0.0,
-            "l3_power": 0.0,
-            "active_phases": 0,
-            "charging_time_sec": 0,
-            "charging_time": 0,
-            "firmware": "",
-            "serial": "",
-            "product_name": "Alfen EV Charger",
-            "device_instance": int(self.config.device_instance),
-            "session": {},
-            "applied_current": float(self.intended_set_current.value),
-        }
+        # Versioned HTTP status snapshot for web server readers. Initialize
+        # non-empty defaults so /api/status is useful before the first poll
+        self.status = StatusSnapshot(
+            {
+                "mode": int(self.current_mode.value),
+                "start_stop": int(self.start_stop.value),
+                "set_current": float(self.intended_set_current.value),
+                "station_max_current": float(self.station_max_current),
+                "status": 0,
+                "ac_current": 0.0,
+                "ac_power": 0.0,
+                "energy_forward_kwh": 0.0,
+                "l1_voltage": 0.0,
+                "l2_voltage": 0.0,
+                "l3_voltage": 0.0,
+                "l1_current": 0.0,
+                "l2_current": 0.0,
+                "l3_current": 0.0,
+                "l1_power": 0.0,
+                "l2_power": 0.0,
+                "l3_power": 0.0,
+                "active_phases": 0,
+                "charging_time_sec": 0,
+                "charging_time": 0,
+                **self._static_info,
+                "device_instance": int(self.config.device_instance),
+                "session": {},
+                "applied_current": float(self.intended_set_current.value),
+            }
+        )
+
+        self._register_metrics()
 
         self.logger.info("Driver initialization complete")
 
+    @property
+    def status_snapshot(self) -> Dict[str, Any]:
+        """The latest published HTTP status snapshot (never mutated)."""
+        return self.status.current
+
     def _merge_status_snapshot(self, updates: Dict[str, Any]) -> None:
         """Safely merge partial updates into the HTTP status snapshot.
 
@@ -171,10 +242,7 @@ class AlfenDriver:
         not yet run again.
         """
         try:
-            with self.status_lock:
-                current = dict(self.status_snapshot)
-                current.update(updates)
-                self.status_snapshot = current
+            self.status.update(updates)
         except Exception as exc:
             # Do not allow snapshot issues to interrupt callbacks; log at debug
             self.logger.debug(f"snapshot merge failed: {exc}")
@@ -230,10 +298,105 @@ class AlfenDriver:
                     return rate
                 # Fallback to static rate if defined
                 return float(src.static_rate_eur_per_kwh)
+            if src.source == "dynamic":
+                rate = self.price_engine.price_at(time.time())
+                if rate is not None:
+                    return rate
+                return float(src.static_rate_eur_per_kwh)
         except Exception as e:
             self.logger.debug(f"Failed to resolve energy rate: {e}")
         return None
 
+    def _record_timeseries(self, snapshot: Dict[str, Any]) -> None:
+        """Feed the per-poll values shown in the UI chart into the recorder."""
+        voltages = [
+            v
+            for v in (
+                snapshot["l1_voltage"],
+                snapshot["l2_voltage"],
+                snapshot["l3_voltage"],
+            )
+            if math.isfinite(v) and v > 1.0
+        ]
+        # Same "allowed current" the UI plots: applied in AUTO/SCHEDULED
+        setpoint = (
+            snapshot["applied_current"]
+            if snapshot["mode"] in (EVC_MODE.AUTO.value, EVC_MODE.SCHEDULED.value)
+            else snapshot["set_current"]
+        )
+        now = time.time()
+        if self.archive_aggregator is not None:
+            self.archive_aggregator.add(
+                now,
+                snapshot["ac_power"],
+                snapshot["total_energy_kwh"],
+                setpoint,
+                snapshot.get("energy_rate"),
+                snapshot["status"],
+            )
+        self.timeseries.record(
+            now,
+            {
+                "power": snapshot["ac_power"],
+                "current": snapshot["ac_current"],
+                "voltage": sum(voltages) / len(voltages) if voltages else math.nan,
+                "setpoint": setpoint,
+                "station": snapshot["station_max_current"],
+            },
+        )
+
+    @staticmethod
+    def _energy_sources(session: ChargingSession) -> Dict[str, Any]:
+        split = session.attribution
+        share = split.solar_share
+        return {
+            **split.to_dict(),
+            "solar_share": round(share, 3) if share is not None else None,
+        }
+
+    def _record_session(self, session: ChargingSession) -> None:
+        """Append a finished session to the durable history."""
+        end_time = session.end_time or datetime.now()
+        end_energy = (
+            session.end_energy_kwh
+            if session.end_energy_kwh is not None
+            else session.current_energy_kwh
+        )
+        self.session_history.append(
+            SessionRecord(
+                start_ts=session.start_time.timestamp(),
+                end_ts=end_time.timestamp(),
+                start_energy_kwh=session.start_energy_kwh,
+                end_energy_kwh=end_energy,
+                peak_power_w=session.peak_power_w,
+                cost=session.cost.cost if session.cost.slots else None,
+                mode=int(self.current_mode.value),
+            )
+        )
+        # Stage the updated rollups right away rather than at the next interval
+        self._persist_state(include_stats=True)
+
+    def _price_slot_at(self, now: float) -> Optional[Tuple[float, float, float]]:
+        """Return (start, end, price) of the price slot covering ``now``.
+
+        Dynamic pricing uses the price engine's slots; flat rates are treated
+        as short slots so a changed rate is picked up without per-tick lookups.
+        """
+        pricing = getattr(self.config, "pricing", None)
+        if pricing is None:
+            return None
+        if pricing.source == "dynamic":
+            timeline = self.price_engine.get_timeline(now)
+            point = timeline.point_at(now) if timeline is not None else None
+            if point is not None:
+                return point.start, point.end, point.price
+        rate = self._get_energy_rate()
+        if rate is None:
+            return None
+        width = float(SessionDefaults.COST_FLAT_RATE_SLOT_SECONDS)
+        slot_start = now - (now % width)
+        return slot_start, slot_start + width, float(rate)
+
     def _to_iso8601(self, value: Any) -> Optional[str]:
         """Convert various timestamp representations to ISO 8601 string.
 
@@ -257,13 +420,6 @@ class AlfenDriver:
             return None
         return None
 
-    def _svc_value(self, path: str, default: Any) -> Any:
-        """Safely read a value from the VeDbusService, returning a default on error."""
-        try:
-            return self.service[path]
-        except Exception:
-            return default
-
     def _determine_config_file_path(self) -> str:
         """Determine the active configuration file path used by the driver."""
         local_path = os.path.join(os.getcwd(), "alfen_driver_config.yaml")
@@ -278,15 +434,47 @@ class AlfenDriver:
         """Return the current configuration as a dictionary."""
         return dataclasses.asdict(self.config)
 
+    def get_price_timeline(self) -> Dict[str, Any]:
+        """Return the price engine state, refreshing providers if due."""
+        self.price_engine.get_timeline(time.time())
+        return self.price_engine.to_dict()
+
+    def get_charge_plan(self) -> Dict[str, Any]:
+        """Return the day's SCHEDULED-mode plan, compiling it if needed."""
+        self.charge_planner.decision(
+            time.time(),
+            self.schedules,
+            self.config.timezone,
+            self.station_max_current,
+        )
+        return self.charge_planner.to_dict()
+
     def apply_config_from_dict(self, new_config_dict: Dict[str, Any]) -> Dict[str, Any]:
         """Validate, persist, and apply a new configuration at runtime.
 
-        Returns a result dict: { ok: bool, error: Optional[str] }
+        Only the top-level sections that differ from the running config are
+        validated and handed to their subsystem (see ``_reconfigure``); an
+        unchanged document is a no-op. Nothing here talks to the charger:
+        parameters that depend on Modbus settings are re-read by the next
+        poll tick.
+
+        Returns a result dict: { ok: bool, error: Optional[str], changed: [...] }
         """
         try:
+            try:
+                new_config = Config.from_dict(new_config_dict)
+            except Exception:
+                # Let the full validator explain what is wrong, if it can
+                ConfigValidator().validate_or_raise(new_config_dict)
+                raise
+
+            changed = self.config.diff(new_config)
+            if not changed:
+                return {"ok": True, "changed": []}
+
             # Validate
             validator = ConfigValidator()
-            validator.validate_or_raise(new_config_dict)
+            validator.validate_or_raise(new_config_dict, sections=changed)
 
             # Persist to YAML (atomically)
             temp_path = f"{self.config_file_path}.tmp"
@@ -294,48 +482,91 @@ class AlfenDriver:
                 yaml.safe_dump(new_config_dict, f, sort_keys=False)
             os.replace(temp_path, self.config_file_path)
 
-            # Recreate Config instance
-            new_config = Config.from_dict(new_config_dict)
-
-            # If Modbus connection parameters changed, recreate client
-            old_host = self.config.modbus.ip
-            old_port = self.config.modbus.port
-            new_host = new_config.modbus.ip
-            new_port = new_config.modbus.port
-            if old_host != new_host or old_port != new_port:
-                try:
-                    self.client.close()
-                except Exception as exc:
-                    self.logger.debug(f"Error closing Modbus client: {exc}")
-                self.client = ModbusTcpClient(host=new_host, port=new_port)
-
-            # Swap config and propagate
+            old_config = self.config
             self.config = new_config
             set_logic_config(self.config)
-            self.schedules = (
-                self.config.schedule.items if hasattr(self.config, "schedule") else []
-            )
-
-            # Refresh charger parameters (max current, phases, status)
-            self._read_charger_parameters()
+            self._reconfigure(changed, old_config)
+            self.logger.info(f"Configuration applied: {', '.join(sorted(changed))}")
 
-            # Update snapshot with new device instance, etc.
-            with self.status_lock:
-                current = dict(self.status_snapshot)
-                current["device_instance"] = int(self.config.device_instance)
-                self.status_snapshot = current
+            return {"ok": True, "changed": sorted(changed)}
+        except Exception as exc:  # pragma: no cover - runtime safe-guard
+            return {"ok": False, "error": str(exc)}
 
-            # Reflect limits that may have changed due to config apply
+    def _reconfigure(self, changed: Set[str], old_config: Config) -> None:
+        """Propagate changed config sections to the subsystems using them."""
+        config = self.config
+        if "modbus" in changed and (old_config.modbus.ip, old_config.modbus.port) != (
+            config.modbus.ip,
+            config.modbus.port,
+        ):
+            # Creating the client does not connect; the next tick does
+            try:
+                self.client.close()
+            except Exception as exc:
+                self.logger.debug(f"Error closing Modbus client: {exc}")
+            self.client = ModbusTcpClient(
+                host=config.modbus.ip, port=config.modbus.port
+            )
+        if changed & {"modbus", "registers", "defaults"}:
+            # Max current, phases and status are re-read by the next tick
+            self._charger_params_stale = True
+        if "controls" in changed:
+            self.command_coalescer.window_ms = config.controls.command_coalesce_ms
+        if "logging" in changed:
+            logging.getLogger().setLevel(
+                getattr(logging, config.logging.level.upper(), logging.INFO)
+            )
+            # A runtime timings toggle survives saves that leave it unchanged
+            if config.logging.tick_timings != old_config.logging.tick_timings:
+                TIMINGS.enabled = config.logging.tick_timings
+        if changed & {"pricing", "tibber"}:
+            self.price_engine.set_config(config.pricing, config.tibber)
+        if "tibber" in changed:
+            self._sync_tibber_live_feed()
+        if "schedule" in changed:
+            self.schedules = config.schedule.items
+        if changed & {"schedule", "timezone", "pricing", "tibber"}:
+            self.charge_planner.set_config(config)
+        else:
+            # Same inputs: keep the compiled plan
+            self.charge_planner.config = config
+        if "device_instance" in changed:
             self._merge_status_snapshot(
-                {
-                    "station_max_current": float(self.station_max_current),
-                    "set_current": float(self.intended_set_current.value),
-                }
+                {"device_instance": int(config.device_instance)}
             )
 
-            return {"ok": True}
-        except Exception as exc:  # pragma: no cover - runtime safe-guard
-            return {"ok": False, "error": str(exc)}
+    def _refresh_charger_parameters(self) -> None:
+        """Re-read charger parameters after a Modbus-related config change."""
+        self._charger_params_stale = False
+        self._read_charger_parameters()
+        self._merge_status_snapshot(
+            {"station_max_current": float(self.station_max_current)}
+        )
+
+    def _sync_tibber_live_feed(self) -> None:
+        """Start, restart or stop the Tibber live feed to match the config."""
+        tibber_cfg = self.config.tibber
+        wanted = bool(
+            tibber_cfg.enabled and tibber_cfg.live_enabled and tibber_cfg.access_token
+        )
+        feed = self.tibber_live_feed
+        if feed is not None and (
+            not wanted
+            or feed.config.access_token != tibber_cfg.access_token
+            or feed.config.home_id != tibber_cfg.home_id
+        ):
+            feed.stop()
+            self.tibber_live_feed = None
+            feed = None
+        if wanted and feed is None:
+            feed = TibberLiveFeed(tibber_cfg)
+            feed.start()
+            self.tibber_live_feed = feed
+            self.logger.info("Tibber live grid feed started")
+        elif feed is not None:
+            # Same credentials: keep the socket, pick up other tuning values
+            feed.config = tibber_cfg
+        set_logic_live_feed(self.tibber_live_feed)
 
     def _init_state(self) -> None:
         """Initialize driver state variables."""
@@ -351,6 +582,9 @@ class AlfenDriver:
         self.last_poll_time: float = 0
         self.active_phases: int = 3  # Default to 3-phase
         self.last_status: int = 0  # Track last status for change detection
+        self.station_temperature: Optional[float] = None
+        # Set by a config change; the next poll re-reads charger parameters
+        self._charger_params_stale = False
 
         # Track hourly overview emission to avoid spam; store last hour key
         self._last_overview_hour_key: Optional[str] = None
@@ -387,6 +621,12 @@ class AlfenDriver:
         )
 
         # Update static paths (these are already created by register_dbus_service)
+        # and keep a copy for the status snapshot
+        self._static_info: Dict[str, str] = {
+            "firmware": "Unknown",
+            "serial": "Unknown",
+            "product_name": "Alfen EV Charger",
+        }
         self.service["/FirmwareVersion"] = "Unknown"
         self.service["/Serial"] = "Unknown"
         self.service["/ProductName"] = "Alfen EV Charger"
@@ -409,6 +649,7 @@ class AlfenDriver:
             )
             if firmware:
                 self.service["/FirmwareVersion"] = firmware
+                self._static_info["firmware"] = firmware
                 self.logger.info(f"Firmware version: {firmware}")
         except Exception as e:
             self.logger.debug(f"Could not read firmware version: {e}")
@@ -423,6 +664,7 @@ class AlfenDriver:
             )
             if serial:
                 self.service["/Serial"] = serial
+                self._static_info["serial"] = serial
                 self.logger.info(f"Serial number: {serial}")
         except Exception as e:
             self.logger.debug(f"Could not read serial number: {e}")
@@ -437,6 +679,7 @@ class AlfenDriver:
             )
             if manufacturer:
                 self.service["/ProductName"] = f"{manufacturer} EV Charger"
+                self._static_info["product_name"] = f"{manufacturer} EV Charger"
                 self.logger.info(f"Manufacturer: {manufacturer}")
         except Exception as e:
             self.logger.debug(f"Could not read manufacturer: {e}")
@@ -520,32 +763,30 @@ class AlfenDriver:
             # Update HTTP snapshot immediately
             self._merge_status_snapshot({"mode": int(self.current_mode.value)})
 
-            # Apply immediate current change for MANUAL mode
+            # Apply current change for MANUAL mode (coalesced)
             if self.current_mode.value == EVC_MODE.MANUAL.value:
-                self._apply_current_change("Mode change", force_verify=True)
-
-            self.logger.info(
-                f"Mode changed to {EVC_MODE(self.current_mode.value).name}"
-            )
+                self.command_coalescer.submit("Mode change", apply=True)
 
-            # When switching to SCHEDULED, print an overview immediately
-            if (
-                self.current_mode.value == EVC_MODE.SCHEDULED.value
-                and getattr(self.config, "tibber", None)
-                and self.config.tibber.enabled
-            ):
-                try:
-                    overview = get_hourly_overview_text(self.config.tibber)
-                    if overview:
-                        self.logger.info(overview)
-                except Exception as e:
-                    self.logger.debug(
-                        f"Failed to log Tibber overview on mode change: {e}"
-                    )
+            self._log_mode_change()
             return True
         except (ValueError, TypeError):
             return False
 
+    def _log_mode_change(self) -> None:
+        """Log the new mode; switching to SCHEDULED also logs the price overview."""
+        self.logger.info(f"Mode changed to {EVC_MODE(self.current_mode.value).name}")
+        if (
+            self.current_mode.value == EVC_MODE.SCHEDULED.value
+            and getattr(self.config, "tibber", None)
+            and self.config.tibber.enabled
+        ):
+            try:
+                overview = get_hourly_overview_text(self.config.tibber)
+                if overview:
+                    self.logger.info(overview)
+            except Exception as e:
+                self.logger.debug(f"Failed to log Tibber overview on mode change: {e}")
+
     def startstop_callback(self, path: str, value: Any) -> bool:
         """Handle start/stop change callback."""
         try:
@@ -566,7 +807,7 @@ class AlfenDriver:
                 if self.start_stop.value == EVC_CHARGE.ENABLED.value
                 else 0.0
             )
-            self._apply_current_change("StartStop change", target, force_verify=True)
+            self.command_coalescer.submit("StartStop change", target, apply=True)
 
             action = (
                 "enabled"
@@ -583,15 +824,6 @@ class AlfenDriver:
         try:
             requested = max(0.0, min(ChargingLimits.MAX_CURRENT, float(value)))
 
-            # Update station max current
-            self.station_max_current = update_station_max_current(
-                self.client,
-                self.config,
-                self.service,
-                self.config.defaults,
-                self.logger,
-            )
-
             self.intended_set_current.value = requested
             try:
                 self.service["/SetCurrent"] = round(self.intended_set_current.value, 1)
@@ -604,11 +836,14 @@ class AlfenDriver:
                 {"set_current": float(self.intended_set_current.value)}
             )
 
-            # Apply immediate change for MANUAL mode
-            if self.current_mode.value == EVC_MODE.MANUAL.value:
-                self._apply_current_change(
-                    "SetCurrent change", requested, force_verify=True
-                )
+            # Refresh the station max current and, in MANUAL mode, apply the
+            # new current once the burst of slider changes has settled
+            self.command_coalescer.submit(
+                "SetCurrent change",
+                requested,
+                apply=self.current_mode.value == EVC_MODE.MANUAL.value,
+                refresh_station=True,
+            )
 
             self.logger.info(
                 f"SetCurrent changed to {self.intended_set_current.value:.2f} A"
@@ -620,6 +855,124 @@ class AlfenDriver:
                 reconnect(self.client, self.logger)
             return False
 
+    def _apply_coalesced(
+        self,
+        source: str,
+        requested: Optional[float],
+        apply_current: bool,
+        refresh_station: bool,
+    ) -> None:
+        """Run the Modbus work for a coalesced burst of control changes."""
+        try:
+            if refresh_station:
+                self.station_max_current = update_station_max_current(
+                    self.client,
+                    self.config,
+                    self.service,
+                    self.config.defaults,
+                    self.logger,
+                )
+                self._merge_status_snapshot(
+                    {"station_max_current": float(self.station_max_current)}
+                )
+            if apply_current:
+                self._apply_current_change(source, requested, force_verify=True)
+        except ModbusException as e:
+            self.logger.error(f"{source} error: {e}")
+            reconnect(self.client, self.logger)
+        except Exception as e:
+            # Runs from a GLib timer; never let it escape
+            self.logger.error(f"{source} failed: {e}")
+
+    def apply_commands(self, commands: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Apply several control changes with one current evaluation.
+
+        Each command is ``{"command": name, "value": value}`` with ``name``
+        one of ``mode``, ``start_stop`` or ``set_current``; later commands
+        override earlier ones. All commands are validated before any is
+        applied, so an invalid batch changes nothing. The combined state is
+        then persisted and published once, and the charger current is
+        re-evaluated and written once (with the same rules as the
+        individual callbacks).
+
+        Returns:
+            ``{"ok": True, "applied": bool}``, or ``{"ok": False, "error": str}``
+            for an invalid batch or one that failed while being applied.
+        """
+        changes: Dict[str, Any] = {}
+        try:
+            for command in commands:
+                name = command["command"]
+                value = command["value"]
+                if name == "mode":
+                    changes[name] = EVC_MODE(int(value)).value
+                elif name == "start_stop":
+                    changes[name] = EVC_CHARGE(int(bool(value))).value
+                elif name == "set_current":
+                    changes[name] = max(
+                        0.0, min(ChargingLimits.MAX_CURRENT, float(value))
+                    )
+                else:
+                    raise ValueError(f"Unknown command {name!r}")
+        except (KeyError, TypeError, ValueError) as e:
+            return {"ok": False, "error": f"Invalid command: {e}"}
+        if not changes:
+            return {"ok": True, "applied": False}
+
+        snapshot: Dict[str, Any] = {}
+        try:
+            if "set_current" in changes:
+                self.station_max_current = update_station_max_current(
+                    self.client,
+                    self.config,
+                    self.service,
+                    self.config.defaults,
+                    self.logger,
+                )
+                self.intended_set_current.value = changes["set_current"]
+                snapshot["set_current"] = float(changes["set_current"])
+                self._write_dbus("/SetCurrent", round(changes["set_current"], 1))
+            if "mode" in changes:
+                self.current_mode.value = changes["mode"]
+                snapshot["mode"] = changes["mode"]
+                self._write_dbus("/Mode", changes["mode"])
+            if "start_stop" in changes:
+                self.start_stop.value = changes["start_stop"]
+                snapshot["start_stop"] = changes["start_stop"]
+                self._write_dbus("/StartStop", changes["start_stop"])
+            self._persist_state()
+            self._merge_status_snapshot(snapshot)
+            self.logger.info(f"Commands applied: {changes}")
+            if "mode" in changes:
+                self._log_mode_change()
+
+            enabled = self.start_stop.value == EVC_CHARGE.ENABLED.value
+            manual = self.current_mode.value == EVC_MODE.MANUAL.value
+            if "start_stop" in changes or (
+                manual and ("mode" in changes or "set_current" in changes)
+            ):
+                target = self.intended_set_current.value if enabled else 0.0
+                applied = self._apply_current_change(
+                    "Commands", target, force_verify=True
+                )
+                return {"ok": True, "applied": applied}
+            return {"ok": True, "applied": False}
+        except ModbusException as e:
+            self.logger.error(f"Command batch error: {e}")
+            reconnect(self.client, self.logger)
+            return {"ok": False, "error": str(e)}
+        except Exception as e:
+            # Runs on the GLib loop for the web server; report, never raise
+            self.logger.error(f"Command batch failed: {e}")
+            return {"ok": False, "error": str(e)}
+
+    def _write_dbus(self, path: str, value: Any) -> None:
+        """Reflect a value on D-Bus so VRM and other consumers see it."""
+        try:
+            self.service[path] = value
+        except Exception as exc:
+            self.logger.debug(f"Failed to write {path} to D-Bus: {exc}")
+
     def fetch_raw_data(self) -> Dict[str, Optional[List[int]]]:
         """Fetch raw data from Modbus registers."""
         raw_data: Dict[str, Optional[List[int]]] = {}
@@ -747,10 +1100,16 @@ class AlfenDriver:
 
     def _restore_state(self) -> None:
         """Restore persisted state and session data."""
-        # Restore session manager state
-        session_state = self.persistence.get_section("session")
-        if session_state:
-            self.session_manager.restore_state(session_state)
+        # Restore session manager state from the journal; older versions kept
+        # it in the state file, which is migrated once
+        if not self.session_manager.recover_from_journal():
+            session_state = self.persistence.get_section("session")
+            if session_state:
+                self.session_manager.restore_state(session_state)
+                self.session_manager.compact_journal()
+                self.persistence.remove("session")
+
+        self.session_stats.restore(self.persistence.get_section("stats"))
 
         # Restore other state
         self.insufficient_solar_start = self.persistence.get(
@@ -790,228 +1149,211 @@ class AlfenDriver:
                         f"Days: {bin(schedule.days_mask)[2:].zfill(7)}"
                     )
 
-    def process_logic(self, raw_data: Dict[str, Optional[List[int]]]) -> None:
-        """Process business logic based on raw data."""
-        # Get power and energy values
-        power_w = 0.0
-        energy_kwh = 0.0
-
-        power_data = raw_data.get("power")
-        if power_data and len(power_data) >= 8:
-            try:
-                # Total power is in the last two registers of the 8-register block
-                power_w = decode_32bit_float(power_data[6:8])
-            except Exception as e:
-                self.logger.debug(f"Could not decode power: {e}")
-                power_w = 0.0
-
-        energy_data = raw_data.get("energy")
-        if energy_data and len(energy_data) >= 4:
-            try:
-                energy_kwh = decode_64bit_float(energy_data) / 1000.0
-            except Exception as e:
-                self.logger.debug(f"Could not decode energy: {e}")
-                energy_kwh = 0.0
-
-        # Persist state if session state changed
-        prev_session_active = self.session_manager.current_session is not None
+    def process_logic(self, measurements: Measurements) -> None:
+        """Process business logic based on this tick's measurements."""
+        power_w = measurements.charging_power_w
+        energy_kwh = measurements.energy_kwh
+        if energy_kwh is None:
+            # A failed meter read is not a reset; sessions resume next tick
+            return
 
-        # Update session manager
-        self.session_manager.update(power_w, energy_kwh)
+        # Update session manager (pricing each tick's energy delta); session
+        # transitions are journaled by the manager itself. System flows split
+        # the session's energy into solar/battery/grid; AUTO mode's last read
+        # is reused when fresh
+        flows = (
+            get_energy_flows()
+            if power_w > 0 and self.session_manager.current_session is not None
+            else None
+        )
+        self.session_manager.update(power_w, energy_kwh, self._price_slot_at, flows)
 
-        # Check if session state changed and persist if needed
-        curr_session_active = self.session_manager.current_session is not None
-        if prev_session_active != curr_session_active:
-            self._persist_state()
+    def update_dbus_paths(self, measurements: Measurements) -> None:
+        """Update D-Bus paths and the status snapshot with this tick's values."""
+        # Only fields read this tick are updated; the snapshot keeps the
+        # previous value of anything that could not be read
+        updates: Dict[str, Any] = {}
 
-    def update_dbus_paths(self, raw_data: Dict[str, Optional[List[int]]]) -> None:
-        """Update D-Bus paths with fetched data."""
         # Update voltages
-        voltages = raw_data.get("voltages")
-        if voltages and len(voltages) >= 6:
-            self.service["/Ac/L1/Voltage"] = round(decode_32bit_float(voltages[0:2]), 1)
-            self.service["/Ac/L2/Voltage"] = round(decode_32bit_float(voltages[2:4]), 1)
-            self.service["/Ac/L3/Voltage"] = round(decode_32bit_float(voltages[4:6]), 1)
+        voltages = measurements.voltages
+        if voltages is not None:
+            v1, v2, v3 = (round(v, 1) for v in voltages)
+            self.service["/Ac/L1/Voltage"] = v1
+            self.service["/Ac/L2/Voltage"] = v2
+            self.service["/Ac/L3/Voltage"] = v3
+            updates.update(l1_voltage=v1, l2_voltage=v2, l3_voltage=v3)
 
         # Update currents
-        currents = raw_data.get("currents")
-        if currents and len(currents) >= 6:
-            i1 = decode_32bit_float(currents[0:2])
-            i2 = decode_32bit_float(currents[2:4])
-            i3 = decode_32bit_float(currents[4:6])
-            self.service["/Ac/L1/Current"] = round(i1, 2)
-            self.service["/Ac/L2/Current"] = round(i2, 2)
-            self.service["/Ac/L3/Current"] = round(i3, 2)
+        currents = measurements.currents
+        if currents is not None:
+            i1, i2, i3 = (round(i, 2) for i in currents)
+            self.service["/Ac/L1/Current"] = i1
+            self.service["/Ac/L2/Current"] = i2
+            self.service["/Ac/L3/Current"] = i3
             # Set /Ac/Current to max phase current
             # (likely what Victron displays as charging current)
-            max_current = round(max(i1, i2, i3), 2)
+            max_current = max(i1, i2, i3)
             self.service["/Ac/Current"] = max_current
             # Also update /Current for Victron UI display
             self.service["/Current"] = max_current
+            updates.update(
+                l1_current=i1, l2_current=i2, l3_current=i3, ac_current=max_current
+            )
 
         # Update power
-        power = raw_data.get("power")
-        if power and len(power) >= 8:
-            self.service["/Ac/L1/Power"] = round(decode_32bit_float(power[0:2]), 0)
-            self.service["/Ac/L2/Power"] = round(decode_32bit_float(power[2:4]), 0)
-            self.service["/Ac/L3/Power"] = round(decode_32bit_float(power[4:6]), 0)
-            total_power = decode_32bit_float(power[6:8])
-            self.service["/Ac/Power"] = round(total_power, 0)
+        phase_power = measurements.phase_power
+        if phase_power is not None and measurements.power_w is not None:
+            p1, p2, p3 = (round(p, 0) for p in phase_power)
+            total_power = round(measurements.power_w, 0)
+            self.service["/Ac/L1/Power"] = p1
+            self.service["/Ac/L2/Power"] = p2
+            self.service["/Ac/L3/Power"] = p3
+            self.service["/Ac/Power"] = total_power
+            updates.update(l1_power=p1, l2_power=p2, l3_power=p3, ac_power=total_power)
 
         # Update energy (session-based)
-        energy = raw_data.get("energy")
-        energy_kwh = 0.0
-        if energy and len(energy) >= 4:
-            energy_kwh = decode_64bit_float(energy) / 1000.0
+        energy_kwh = measurements.energy_kwh or 0.0
         if self.session_manager.current_session:
-            session_energy = max(
-                0.0, energy_kwh - self.session_manager.current_session.start_energy_kwh
+            energy_forward = round(
+                max(
+                    0.0,
+                    energy_kwh - self.session_manager.current_session.start_energy_kwh,
+                ),
+                3,
             )
-            self.service["/Ac/Energy/Forward"] = round(session_energy, 3)
         elif (
             self.session_manager.last_session
             and self.session_manager.last_session.end_energy_kwh is not None
         ):
-            self.service["/Ac/Energy/Forward"] = round(
+            energy_forward = round(
                 self.session_manager.last_session.energy_delivered_kwh, 3
             )
         else:
-            self.service["/Ac/Energy/Forward"] = 0.0
+            energy_forward = 0.0
+        self.service["/Ac/Energy/Forward"] = energy_forward
+
+        DBUS_PUBLISHES.inc()
 
         # Update session stats
         stats = self.session_manager.get_session_stats()
         duration_min = stats.get("session_duration_min", 0)
         if isinstance(duration_min, (int, float)):
-            self.service["/ChargingTime"] = int(duration_min * 60)
+            charging_time = int(duration_min * 60)
         else:
-            self.service["/ChargingTime"] = 0
+            charging_time = 0
+        self.service["/ChargingTime"] = charging_time
 
-        # Build HTTP status snapshot for web UI
+        # Update the HTTP status snapshot for the web UI
         try:
-            snapshot: Dict[str, Any] = {}
-            snapshot["mode"] = int(self.current_mode.value)
-            snapshot["start_stop"] = int(self.start_stop.value)
-            snapshot["set_current"] = float(self.intended_set_current.value)
-            snapshot["station_max_current"] = float(self.station_max_current)
-            snapshot["status"] = int(self._svc_value("/Status", 0))
-            snapshot["ac_current"] = float(self._svc_value("/Ac/Current", 0.0))
-            snapshot["ac_power"] = float(self._svc_value("/Ac/Power", 0.0))
-            snapshot["energy_forward_kwh"] = float(
-                self._svc_value("/Ac/Energy/Forward", 0.0)
+            updates.update(
+                mode=int(self.current_mode.value),
+                start_stop=int(self.start_stop.value),
+                set_current=float(self.intended_set_current.value),
+                station_max_current=float(self.station_max_current),
+                status=int(self.last_status),
+                energy_forward_kwh=float(energy_forward),
+                active_phases=int(getattr(self, "active_phases", 0) or 0),
+                charging_time_sec=charging_time,
+                # Provide legacy alias expected by UI fallback
+                charging_time=charging_time,
+                # Include total lifetime energy from meter
+                total_energy_kwh=float(energy_kwh),
+                device_instance=int(self.config.device_instance),
+                persistence_bytes_today=self.persistence.bytes_written_today,
+                # Maintain last applied current for UI display logic
+                applied_current=float(self.last_sent_current),
+                **self._static_info,
             )
-            snapshot["l1_voltage"] = float(self._svc_value("/Ac/L1/Voltage", 0.0))
-            snapshot["l2_voltage"] = float(self._svc_value("/Ac/L2/Voltage", 0.0))
-            snapshot["l3_voltage"] = float(self._svc_value("/Ac/L3/Voltage", 0.0))
-            snapshot["l1_current"] = float(self._svc_value("/Ac/L1/Current", 0.0))
-            snapshot["l2_current"] = float(self._svc_value("/Ac/L2/Current", 0.0))
-            snapshot["l3_current"] = float(self._svc_value("/Ac/L3/Current", 0.0))
-            snapshot["l1_power"] = float(self._svc_value("/Ac/L1/Power", 0.0))
-            snapshot["l2_power"] = float(self._svc_value("/Ac/L2/Power", 0.0))
-            snapshot["l3_power"] = float(self._svc_value("/Ac/L3/Power", 0.0))
-
-            # Derive phase power from voltage * current if reported power is not finite
-            l1_v = snapshot["l1_voltage"]
-            l1_i = snapshot["l1_current"]
-            l2_v = snapshot["l2_voltage"]
-            l2_i = snapshot["l2_current"]
-            l3_v = snapshot["l3_voltage"]
-            l3_i = snapshot["l3_current"]
-
-            if not math.isfinite(snapshot["l1_power"]):
-                if (
-                    math.isfinite(l1_v)
-                    and math.isfinite(l1_i)
-                    and abs(l1_v) > 1.0
-                    and abs(l1_i) > 0.01
-                ):
-                    snapshot["l1_power"] = round(l1_v * l1_i, 0)
-                else:
-                    snapshot["l1_power"] = 0.0
-            if not math.isfinite(snapshot["l2_power"]):
-                if (
-                    math.isfinite(l2_v)
-                    and math.isfinite(l2_i)
-                    and abs(l2_v) > 1.0
-                    and abs(l2_i) > 0.01
-                ):
-                    snapshot["l2_power"] = round(l2_v * l2_i, 0)
-                else:
-                    snapshot["l2_power"] = 0.0
-            if not math.isfinite(snapshot["l3_power"]):
-                if (
-                    math.isfinite(l3_v)
-                    and math.isfinite(l3_i)
-                    and abs(l3_v) > 1.0
-                    and abs(l3_i) > 0.01
-                ):
-                    snapshot["l3_power"] = round(l3_v * l3_i, 0)
-                else:
-                    snapshot["l3_power"] = 0.0
+            self._derive_phase_power(updates)
+            updates.update(self._pricing_snapshot(energy_forward))
+            updates["session"] = self._session_snapshot()
 
-            # If total AC power is not finite, sum phase powers
-            if not math.isfinite(snapshot["ac_power"]):
-                snapshot["ac_power"] = (
-                    snapshot["l1_power"] + snapshot["l2_power"] + snapshot["l3_power"]
-                )
+            self.status.update(updates)
+            self._record_timeseries(self.status.current)
+        except Exception as e:
+            self.logger.debug(f"Failed to update HTTP snapshot: {e}")
 
-            snapshot["active_phases"] = int(getattr(self, "active_phases", 0) or 0)
-            snapshot["charging_time_sec"] = int(self._svc_value("/ChargingTime", 0))
-            # Provide legacy alias expected by UI fallback
-            snapshot["charging_time"] = snapshot["charging_time_sec"]
-            # Include total lifetime energy from meter
-            snapshot["total_energy_kwh"] = float(energy_kwh)
-            snapshot["firmware"] = str(self._svc_value("/FirmwareVersion", ""))
-            snapshot["serial"] = str(self._svc_value("/Serial", ""))
-            snapshot["product_name"] = str(self._svc_value("/ProductName", ""))
-            snapshot["device_instance"] = int(self.config.device_instance)
-
-            # Maintain last applied current for UI display logic
-            snapshot["applied_current"] = float(self.last_sent_current)
-
-            # Pricing information and session cost
-            try:
-                rate = self._get_energy_rate()
-                currency = getattr(
-                    getattr(self.config, "pricing", None), "currency_symbol", "€"
-                )
-                snapshot["pricing_source"] = getattr(
-                    getattr(self.config, "pricing", None), "source", "static"
-                )
-                snapshot["pricing_currency"] = currency
-                snapshot["energy_rate"] = rate if rate is not None else None
-                session_energy = snapshot["energy_forward_kwh"]
-                if isinstance(session_energy, (int, float)) and rate is not None:
-                    snapshot["session_cost"] = round(
-                        float(session_energy) * float(rate), 2
-                    )
-                else:
-                    snapshot["session_cost"] = None
-            except Exception as e:
-                self.logger.debug(f"Failed to compute session cost: {e}")
+    def _derive_phase_power(self, updates: Dict[str, Any]) -> None:
+        """Replace non-finite power readings in ``updates``.
 
+        Phase power falls back to voltage * current and total power to the
+        sum of the phases; voltages and currents not read this tick come
+        from the published snapshot.
+        """
+        if "ac_power" not in updates:
+            return
+        values = ChainMap(updates, self.status.current)
+        for phase in ("l1", "l2", "l3"):
+            key = f"{phase}_power"
+            if math.isfinite(updates[key]):
+                continue
+            voltage = values[f"{phase}_voltage"]
+            current = values[f"{phase}_current"]
             if (
-                hasattr(self.session_manager, "current_session")
-                and self.session_manager.current_session is not None
+                math.isfinite(voltage)
+                and math.isfinite(current)
+                and abs(voltage) > 1.0
+                and abs(current) > 0.01
             ):
-                cs = self.session_manager.current_session
-                snapshot["session"] = {
-                    "start_ts": self._to_iso8601(getattr(cs, "start_time", None)),
-                    "start_energy_kwh": cs.start_energy_kwh,
-                }
-            elif self.session_manager.last_session is not None:
-                ls = self.session_manager.last_session
-                snapshot["session"] = {
-                    "start_ts": self._to_iso8601(getattr(ls, "start_time", None)),
-                    "end_ts": self._to_iso8601(getattr(ls, "end_time", None)),
-                    "energy_delivered_kwh": ls.energy_delivered_kwh,
-                }
+                updates[key] = round(voltage * current, 0)
             else:
-                snapshot["session"] = {}
+                updates[key] = 0.0
+        # If total AC power is not finite, sum phase powers
+        if not math.isfinite(updates["ac_power"]):
+            updates["ac_power"] = (
+                updates["l1_power"] + updates["l2_power"] + updates["l3_power"]
+            )
 
-            with self.status_lock:
-                self.status_snapshot = snapshot
+    def _pricing_snapshot(self, session_energy: float) -> Dict[str, Any]:
+        """Pricing information and session cost for the status snapshot."""
+        try:
+            rate = self._get_energy_rate()
+            pricing = getattr(self.config, "pricing", None)
+            timeline = self.price_engine.timeline
+            values: Dict[str, Any] = {
+                "pricing_source": getattr(pricing, "source", "static"),
+                "pricing_currency": getattr(pricing, "currency_symbol", "€"),
+                "pricing_provider": (
+                    timeline.source if self.price_engine.enabled and timeline else None
+                ),
+                "energy_rate": rate,
+            }
+            current = self.session_manager.current_session
+            session = current or self.session_manager.last_session
+            if session is not None and session.cost.slots:
+                # Integrated per price slot while the energy was delivered
+                values["session_cost"] = round(session.cost.cost, 2)
+                # Closed slots only while charging: unchanged between ticks
+                values["session_cost_slots"] = session.cost.slot_summary(
+                    include_open=session is not current
+                )
+            elif rate is not None:
+                values["session_cost"] = round(session_energy * float(rate), 2)
+            else:
+                values["session_cost"] = None
+            return values
         except Exception as e:
-            self.logger.debug(f"Failed to update HTTP snapshot: {e}")
+            self.logger.debug(f"Failed to compute session cost: {e}")
+            return {}
+
+    def _session_snapshot(self) -> Dict[str, Any]:
+        """Current (or last) session summary for the status snapshot."""
+        cs = self.session_manager.current_session
+        if cs is not None:
+            return {
+                "start_ts": self._to_iso8601(getattr(cs, "start_time", None)),
+                "start_energy_kwh": cs.start_energy_kwh,
+                "energy_sources": self._energy_sources(cs),
+            }
+        ls = self.session_manager.last_session
+        if ls is not None:
+            return {
+                "start_ts": self._to_iso8601(getattr(ls, "start_time", None)),
+                "end_ts": self._to_iso8601(getattr(ls, "end_time", None)),
+                "energy_delivered_kwh": ls.energy_delivered_kwh,
+                "energy_sources": self._energy_sources(ls),
+            }
+        return {}
 
     def _apply_current_change(
         self,
@@ -1216,29 +1558,110 @@ class AlfenDriver:
         except Exception as e:
             self.logger.debug(f"Failed to update status: {e}")
 
+    def _read_station_temperature(self) -> None:
+        """Refresh the station's internal temperature (for monitoring)."""
+        try:
+            regs = read_holding_registers(
+                self.client,
+                ModbusRegisters.STATION_TEMPERATURE,
+                2,
+                self.config.modbus.station_slave_id,
+            )
+            value = decode_32bit_float(regs)
+            self.station_temperature = value if math.isfinite(value) else None
+        except Exception as e:
+            self.logger.debug(f"Failed to read station temperature: {e}")
+            return
+        self._merge_status_snapshot({"station_temperature": self.station_temperature})
+
+    def _register_metrics(self) -> None:
+        """Expose status snapshot values as gauges, read at scrape time."""
+
+        def field(key: str) -> Callable[[], Optional[float]]:
+            def read() -> Optional[float]:
+                value = self.status.current.get(key)
+                return float(value) if isinstance(value, (int, float)) else None
+
+            return read
+
+        def phases(quantity: str) -> Callable[[], Dict[str, Optional[float]]]:
+            def read() -> Dict[str, Optional[float]]:
+                return {f"L{n}": field(f"l{n}_{quantity}")() for n in (1, 2, 3)}
+
+            return read
+
+        gauges = (
+            ("alfen_phase_voltage_volts", "Phase voltage", phases("voltage")),
+            ("alfen_phase_current_amps", "Phase current", phases("current")),
+            ("alfen_phase_power_watts", "Phase active power", phases("power")),
+        )
+        for name, description, fn in gauges:
+            REGISTRY.gauge(name, description, fn, label="phase")
+        for name, description, key in (
+            ("alfen_power_watts", "Total active power", "ac_power"),
+            ("alfen_setpoint_amps", "Current sent to the charger", "applied_current"),
+            ("alfen_set_current_amps", "User set current", "set_current"),
+            (
+                "alfen_station_max_current_amps",
+                "Station max current",
+                "station_max_current",
+            ),
+            (
+                "alfen_station_temperature_celsius",
+                "Station temperature",
+                "station_temperature",
+            ),
+            ("alfen_status", "Victron EV charger status code", "status"),
+            ("alfen_mode", "Charging mode (0 manual, 1 auto, 2 scheduled)", "mode"),
+            ("alfen_energy_total_kwh", "Lifetime meter reading", "total_energy_kwh"),
+        ):
+            REGISTRY.gauge(name, description, field(key))
+        REGISTRY.gauge(
+            "alfen_status_version",
+            "Status snapshot version",
+            lambda: float(self.status.version),
+        )
+
     def poll(self) -> bool:
         """Main polling loop iteration."""
+        tick_started = time.perf_counter()
         try:
             # Ensure connection
             if not self.client.is_socket_open():
                 if not self.client.connect():
                     raise ModbusError("connection", "Failed to connect to Modbus TCP")
 
-            # Fetch data
-            raw_data = self.fetch_raw_data()
+            if self._charger_params_stale:
+                self._refresh_charger_parameters()
+
+            # Fetch data and decode it once for this tick
+            with TIMINGS.stage("fetch"):
+                raw_data = self.fetch_raw_data()
+            decode_started = time.perf_counter()
+            with TIMINGS.stage("decode"):
+                measurements = Measurements.from_raw(raw_data)
+            DECODE_SECONDS.observe(time.perf_counter() - decode_started)
 
             # Process logic
-            self.process_logic(raw_data)
+            with TIMINGS.stage("logic"):
+                self.process_logic(measurements)
 
             # Update D-Bus
-            self.update_dbus_paths(raw_data)
+            with TIMINGS.stage("dbus"):
+                self.update_dbus_paths(measurements)
 
             # Apply controls
-            self.apply_controls()
+            with TIMINGS.stage("controls"):
+                self.apply_controls()
 
-            # Persist state periodically
+            # Stage state periodically; writes are coalesced and skipped
+            # when nothing changed
             if time.time() - self.last_poll_time > 60:  # Every minute
-                self._persist_state()
+                with TIMINGS.stage("periodic"):
+                    self._read_station_temperature()
+                    self._persist_state()
+                    if self.metrics_archive is not None:
+                        self.metrics_archive.flush()
                 self.last_poll_time = time.time()
 
             return True
@@ -1252,18 +1675,75 @@ class AlfenDriver:
             self.logger.error(f"Unexpected error in poll: {e}")
             # Avoid stopping the GLib timeout; continue polling
             return True
+        finally:
+            # Staged changes (e.g. from UI callbacks) are written even while
+            # the charger is unreachable
+            self.persistence.flush_due()
+            self._record_tick(tick_started)
+
+    def _record_tick(self, tick_started: float) -> None:
+        """Record the tick duration; log slow ticks with their stage split."""
+        now = time.perf_counter()
+        duration = now - tick_started
+        TICK_SECONDS.observe(duration)
+        if not TIMINGS.enabled:
+            return
+        TIMINGS.record("tick", duration, now)
+        duration_ms = duration * 1000
+        if duration_ms > self.config.poll_interval_ms:
+            log_performance(
+                self.logger,
+                "poll",
+                round(duration_ms, 3),
+                success=False,
+                stages=TIMINGS.last(),
+            )
 
     def run(self) -> None:
         """Run the main driver loop."""
         # Schedule first poll
         GLib.timeout_add(PollingIntervals.DEFAULT, self.poll)
 
-        # Start main loop
+        # Start main loop; SIGTERM/SIGINT quit it so shutdown() runs
         mainloop = GLib.MainLoop()
-        mainloop.run()
+        for signum in (signal.SIGTERM, signal.SIGINT):
+            GLib.unix_signal_add(GLib.PRIORITY_HIGH, signum, self._quit, mainloop)
+        try:
+            mainloop.run()
+        finally:
+            self.shutdown()
+
+    def _quit(self, mainloop: Any) -> bool:
+        self.logger.info("Stopping driver")
+        mainloop.quit()
+        return False
 
-    def _persist_state(self) -> None:
-        """Persist current state to disk."""
+    def shutdown(self) -> None:
+        """Write staged state and release resources before exiting.
+
+        Changes staged by UI callbacks within the debounce window would
+        otherwise be lost on restart.
+        """
+        try:
+            self._persist_state(include_stats=True)
+        finally:
+            self.persistence.flush()
+        if self.tibber_live_feed is not None:
+            self.tibber_live_feed.stop()
+        if self.metrics_archive is not None:
+            self.metrics_archive.close()
+        self.session_history.close()
+        self.client.close()
+
+    def _persist_state(self, include_stats: bool = False) -> None:
+        """Stage current state for persistence.
+
+        Only changed keys are marked dirty; the write itself happens from
+        ``poll`` via ``flush_due`` once the debounce window has passed.
+        Session accounting is kept in the session journal instead; the
+        statistics rollup is staged at most every ``STATS_PERSIST_SECONDS``
+        unless ``include_stats`` is set.
+        """
         self.persistence.update(
             {
                 "mode": self.current_mode.value,
@@ -1272,6 +1752,10 @@ class AlfenDriver:
                 "insufficient_solar_start": self.insufficient_solar_start,
             }
         )
-        # Save session state
-        self.persistence.set_section("session", self.session_manager.get_state())
-        self.persistence.save_state()
+        now = time.time()
+        if (
+            include_stats
+            or now - self._stats_staged_at >= SessionDefaults.STATS_PERSIST_SECONDS
+        ):
+            self.persistence.set_section("stats", self.session_stats.to_dict())
+            self._stats_staged_at = now
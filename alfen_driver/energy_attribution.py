@@ -0,0 +1,100 @@
+"""Attribution of charged energy to solar, battery and grid.
+
+Each tick the EV's power is split using the system flows Venus OS reports
+(PV production, AC consumption including the EV, battery power): PV first
+covers the household load, what is left goes to the EV; battery discharge
+first covers any household deficit, then the EV; the remainder is grid.
+The tick's metered energy delta is divided in the same proportions and
+accumulated in three running totals, so per-session state is O(1).
+"""
+
+import dataclasses
+from typing import Any, Dict, Optional, Tuple
+
+
+@dataclasses.dataclass(frozen=True)
+class EnergyFlows:
+    """Instantaneous system flows from ``com.victronenergy.system``.
+
+    Attributes:
+        pv_w: Total PV production (DC and AC-coupled).
+        consumption_w: AC consumption, including the EV charger.
+        battery_w: Battery power; positive while charging, negative while
+            discharging.
+    """
+
+    pv_w: float
+    consumption_w: float
+    battery_w: float
+
+
+def split_power(ev_power_w: float, flows: EnergyFlows) -> Tuple[float, float, float]:
+    """Return the (solar, battery, grid) fractions of the EV's power."""
+    if ev_power_w <= 0:
+        return 0.0, 0.0, 0.0
+    house_w = max(0.0, flows.consumption_w - ev_power_w)
+    pv_w = max(0.0, flows.pv_w)
+    solar_w = min(ev_power_w, max(0.0, pv_w - house_w))
+    house_deficit_w = max(0.0, house_w - pv_w)
+    battery_out_w = max(0.0, -flows.battery_w)
+    battery_w = min(ev_power_w - solar_w, max(0.0, battery_out_w - house_deficit_w))
+    solar = solar_w / ev_power_w
+    battery = battery_w / ev_power_w
+    return solar, battery, max(0.0, 1.0 - solar - battery)
+
+
+class EnergyAttribution:
+    """Running solar/battery/grid split of a session's energy."""
+
+    __slots__ = ("solar_kwh", "battery_kwh", "grid_kwh")
+
+    def __init__(
+        self, solar_kwh: float = 0.0, battery_kwh: float = 0.0, grid_kwh: float = 0.0
+    ) -> None:
+        self.solar_kwh = solar_kwh
+        self.battery_kwh = battery_kwh
+        self.grid_kwh = grid_kwh
+
+    def add(
+        self, energy_kwh: float, ev_power_w: float, flows: Optional[EnergyFlows]
+    ) -> float:
+        """Attribute ``energy_kwh``; returns the solar part.
+
+        Without flows (or without measurable EV power) the energy is counted
+        as grid, which keeps the three totals summing to the session energy.
+        """
+        if energy_kwh <= 0:
+            return 0.0
+        solar, battery, grid = (
+            split_power(ev_power_w, flows) if flows is not None else (0.0, 0.0, 1.0)
+        )
+        if solar + battery + grid == 0:
+            grid = 1.0
+        self.solar_kwh += energy_kwh * solar
+        self.battery_kwh += energy_kwh * battery
+        self.grid_kwh += energy_kwh * grid
+        return energy_kwh * solar
+
+    @property
+    def total_kwh(self) -> float:
+        return self.solar_kwh + self.battery_kwh + self.grid_kwh
+
+    @property
+    def solar_share(self) -> Optional[float]:
+        total = self.total_kwh
+        return self.solar_kwh / total if total > 0 else None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "solar_kwh": round(self.solar_kwh, 4),
+            "battery_kwh": round(self.battery_kwh, 4),
+            "grid_kwh": round(self.grid_kwh, 4),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "EnergyAttribution":
+        return cls(
+            float(data.get("solar_kwh", 0.0)),
+            float(data.get("battery_kwh", 0.0)),
+            float(data.get("grid_kwh", 0.0)),
+        )
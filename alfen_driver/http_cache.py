@@ -0,0 +1,117 @@
+"""Pre-encoded HTTP payloads with strong ETags and cached compression.
+
+A payload is serialized once; each content coding (gzip, and brotli when
+the optional ``brotli`` package is installed) is compressed on first use
+and kept, so repeated requests for an unchanged resource cost a dict
+lookup. Conditional requests with a matching ``If-None-Match`` get a 304.
+
+Example:
+    ```python
+    payload = EncodedPayload(json.dumps(data).encode(), "application/json")
+    return payload.respond(request)
+    ```
+"""
+
+import gzip
+import hashlib
+from typing import Dict, Optional
+
+from aiohttp import web
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover
+    brotli = None
+
+# Smaller bodies are not worth the compression headers and CPU
+MIN_COMPRESS_BYTES = 256
+
+
+def negotiate_encoding(accept_encoding: str) -> str:
+    """Pick ``br``, ``gzip`` or ``identity`` from an Accept-Encoding header."""
+    accepted = set()
+    for item in accept_encoding.lower().split(","):
+        coding, _, params = item.strip().partition(";")
+        q = params.strip()
+        if q.startswith("q="):
+            try:
+                if float(q[2:]) <= 0:
+                    continue
+            except ValueError:
+                continue
+        accepted.add(coding.strip())
+    if brotli is not None and "br" in accepted:
+        return "br"
+    if "gzip" in accepted:
+        return "gzip"
+    return "identity"
+
+
+def _compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return bytes(brotli.compress(body))
+    # mtime=0 keeps the output byte-identical for identical input
+    return gzip.compress(body, compresslevel=6, mtime=0)
+
+
+class EncodedPayload:
+    """An immutable response body with its ETag and compressed variants."""
+
+    __slots__ = ("body", "content_type", "etag", "_etags", "_variants")
+
+    def __init__(self, body: bytes, content_type: str = "application/json") -> None:
+        self.body = body
+        self.content_type = content_type
+        self.etag = f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+        # Each content coding is a different representation, so it gets its
+        # own strong ETag; all of them validate against the same body
+        self._etags = {self.etag} | {
+            f'{self.etag[:-1]}-{coding}"' for coding in ("gzip", "br")
+        }
+        self._variants: Dict[str, bytes] = {"identity": body}
+
+    def precompress(self) -> None:
+        """Compress every supported encoding now rather than on first use."""
+        for encoding in ("gzip", "br") if brotli is not None else ("gzip",):
+            self.encoded(encoding)
+
+    def encoded(self, encoding: str) -> bytes:
+        """Return the body in ``encoding``, compressing it on first use."""
+        if len(self.body) < MIN_COMPRESS_BYTES:
+            return self.body
+        variant = self._variants.get(encoding)
+        if variant is None:
+            variant = self._variants[encoding] = _compress(self.body, encoding)
+        return variant
+
+    def not_modified(self, if_none_match: Optional[str]) -> bool:
+        """Whether an ``If-None-Match`` header matches this payload."""
+        if not if_none_match:
+            return False
+        for tag in if_none_match.split(","):
+            tag = tag.strip()
+            # If-None-Match uses weak comparison
+            if tag == "*" or tag.removeprefix("W/") in self._etags:
+                return True
+        return False
+
+    def respond(
+        self, request: web.Request, headers: Optional[Dict[str, str]] = None
+    ) -> web.Response:
+        """Build the (possibly 304) response for ``request``."""
+        out = {
+            "Content-Type": self.content_type,
+            "Vary": "Accept-Encoding",
+            "Cache-Control": "no-cache",
+            **(headers or {}),
+        }
+        encoding = negotiate_encoding(request.headers.get("Accept-Encoding", ""))
+        body = self.encoded(encoding)
+        if body is self.body:
+            out["ETag"] = self.etag
+        else:
+            out["ETag"] = f'{self.etag[:-1]}-{encoding}"'
+            out["Content-Encoding"] = encoding
+        if self.not_modified(request.headers.get("If-None-Match")):
+            return web.Response(status=304, headers=out)
+        return web.Response(body=body, headers=out)
@@ -3,7 +3,7 @@ import math
 import time
 from datetime import datetime
 from enum import Enum
-from typing import Any, List, Tuple
+from typing import Any, List, Optional, Tuple
 
 import dbus
 import pytz
@@ -11,6 +11,7 @@ import pytz
 from .config import Config, ScheduleItem, parse_hhmm_to_minutes
 from .constants import ChargingLimits, ModbusRegisters
 from .dbus_utils import EVC_CHARGE, EVC_MODE, EVC_STATUS
+from .energy_attribution import EnergyFlows
 from .exceptions import StatusMappingError
 from .logging_utils import get_logger
 from .modbus_utils import read_holding_registers, read_uint16
@@ -29,6 +30,78 @@ def set_config(config: Config) -> None:
     _config = config
 
 
+_live_feed: Any = None  # Optional TibberLiveFeed providing real-time grid power
+
+
+def set_live_feed(feed: Any) -> None:
+    """Set (or clear with None) the Tibber live feed used by AUTO mode."""
+    global _live_feed
+    _live_feed = feed
+
+
+_charge_planner: Any = None  # Optional ChargePlanner for SCHEDULED mode
+
+
+def set_charge_planner(planner: Any) -> None:
+    """Set (or clear with None) the precompiled SCHEDULED-mode planner."""
+    global _charge_planner
+    _charge_planner = planner
+
+
+def _get_live_grid_reading() -> Any:
+    """Return a fresh Tibber live reading, or None if unavailable or stale."""
+    if _live_feed is None or _config is None:
+        return None
+    try:
+        return _live_feed.get_reading(float(_config.tibber.live_max_age_seconds))
+    except Exception:
+        return None
+
+
+# Last system flows read (by AUTO mode or get_energy_flows) and when
+_last_flows: Optional[EnergyFlows] = None
+_last_flows_time = 0.0
+
+
+def _remember_flows(flows: EnergyFlows) -> None:
+    global _last_flows, _last_flows_time
+    _last_flows = flows
+    _last_flows_time = time.time()
+
+
+def get_energy_flows(max_age_seconds: float = 5.0) -> Optional[EnergyFlows]:
+    """Return PV/consumption/battery flows for energy attribution.
+
+    Reuses the values AUTO mode fetched for its excess calculation when they
+    are fresh; otherwise reads ``com.victronenergy.system`` once.
+    """
+    if _last_flows is not None and time.time() - _last_flows_time <= max_age_seconds:
+        return _last_flows
+    try:
+        bus = dbus.SystemBus()
+        system = bus.get_object("com.victronenergy.system", "/")
+        all_values = system.GetValue()
+        flows = EnergyFlows(
+            pv_w=float(
+                all_values.get("Dc/Pv/Power", 0.0)
+                + all_values.get("Ac/PvOnOutput/L1/Power", 0.0)
+                + all_values.get("Ac/PvOnOutput/L2/Power", 0.0)
+                + all_values.get("Ac/PvOnOutput/L3/Power", 0.0)
+            ),
+            consumption_w=float(
+                all_values.get("Ac/Consumption/L1/Power", 0.0)
+                + all_values.get("Ac/Consumption/L2/Power", 0.0)
+                + all_values.get("Ac/Consumption/L3/Power", 0.0)
+            ),
+            battery_w=float(all_values.get("Dc/Battery/Power", 0.0)),
+        )
+    except Exception as e:
+        get_logger("alfen_driver.logic").debug(f"Failed to read system flows: {e}")
+        return None
+    _remember_flows(flows)
+    return flows
+
+
 # Schedule check cache to reduce excessive logging
 _schedule_cache = {
     "last_check_time": 0,
@@ -193,6 +266,7 @@ def get_excess_solar_current(
             "Dc/Battery/Power", 0.0
         )  # Positive: charging, negative: discharging
         battery_soc = all_values.get("Dc/Battery/Soc", 100.0)
+        _remember_flows(EnergyFlows(total_pv, consumption, battery_power))
 
         # Get minimum SOC from Victron settings
         min_battery_soc = get_victron_min_soc()
@@ -204,6 +278,32 @@ def get_excess_solar_current(
         # Ignore battery charging (positive) - it will adapt to available solar
         excess = max(0.0, total_pv - adjusted_consumption)
 
+        # Optional Tibber Pulse grid reading: same balance seen from the grid side
+        live_note = ""
+        live = _get_live_grid_reading()
+        if live is not None and _config is not None:
+            live_excess = max(0.0, ev_power + max(0.0, battery_power) - live.net_grid_w)
+            live_source = _config.tibber.live_grid_source
+            victron_missing = all(
+                key not in all_values
+                for key in (
+                    "Ac/Consumption/L1/Power",
+                    "Ac/Consumption/L2/Power",
+                    "Ac/Consumption/L3/Power",
+                )
+            )
+            if live_source == "prefer" or (
+                live_source == "fallback" and victron_missing
+            ):
+                excess = live_excess
+                live_note = f" | Tibber grid: {live.net_grid_w:+.0f}W (used)"
+            elif live_source == "cross_check":
+                live_note = (
+                    f" | Tibber grid: {live.net_grid_w:+.0f}W "
+                    f"(excess {live_excess:.0f}W vs {excess:.0f}W)"
+                )
+                excess = min(excess, live_excess)
+
         # If battery SOC too low, set excess to 0
         if low_soc:
             excess = 0.0
@@ -228,6 +328,7 @@ def get_excess_solar_current(
             f"Battery: {battery_power:+.0f}W (SOC: {battery_soc:.0f}%) | "
             f"Excess: {excess:.0f}W = {current:.1f}A "
             f"on {active_phases}ph -> {clamped_current:.1f}A"
+            f"{live_note}"
         )
 
         if clamp_reason:
@@ -326,7 +427,24 @@ def compute_effective_current(
         else:
             # Check if we should use Tibber or legacy schedules
             global _config
-            if _config and hasattr(_config, "tibber") and _config.tibber.enabled:
+            if _charge_planner is not None:
+                # Precompiled plan: one bisect instead of re-evaluating windows
+                interval, source = _charge_planner.decision(
+                    now, schedules, timezone, station_max_current
+                )
+                effective = interval.allowed_current
+                if source != "schedule":
+                    label = "Tibber" if source == "tibber" else f"prices: {source}"
+                    explanation = (
+                        f"Scheduled mode ({label}): {interval.reason}, "
+                        f"set to {effective:.2f}A"
+                    )
+                else:
+                    explanation = (
+                        f"Scheduled mode: {interval.reason} "
+                        f"(timezone: {timezone}), set to {effective:.2f}A"
+                    )
+            elif _config and hasattr(_config, "tibber") and _config.tibber.enabled:
                 # Use Tibber API for dynamic pricing
                 from .tibber import check_tibber_schedule
 
@@ -524,7 +642,12 @@ def apply_mode_specific_status(
             # apply_mode_specific_status should not gate charging on legacy schedules
             within_schedule = True
         else:
-            within_schedule = is_within_any_schedule(schedules, time.time(), timezone)
+            now = time.time()
+            planned = _charge_planner.peek(now) if _charge_planner is not None else None
+            if planned is not None:
+                within_schedule = planned.allowed_current > 0
+            else:
+                within_schedule = is_within_any_schedule(schedules, now, timezone)
 
     if current_mode == EVC_MODE.SCHEDULED and connected:
         if not within_schedule:
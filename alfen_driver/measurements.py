@@ -0,0 +1,99 @@
+"""Per-tick charger measurements decoded once from raw Modbus registers."""
+
+import math
+from typing import Dict, List, Optional, Tuple
+
+from .modbus_utils import decode_32bit_float, decode_64bit_float
+
+Phases = Tuple[float, float, float]
+
+
+def _decode_phases(registers: Optional[List[int]]) -> Optional[Phases]:
+    if not registers or len(registers) < 6:
+        return None
+    try:
+        return (
+            decode_32bit_float(registers[0:2]),
+            decode_32bit_float(registers[2:4]),
+            decode_32bit_float(registers[4:6]),
+        )
+    except Exception:
+        return None
+
+
+class Measurements:
+    """Immutable record of one poll's readings.
+
+    ``None`` means the block could not be read this tick; consumers keep the
+    previous value in that case. Slotted: one instance is created per poll.
+
+    Attributes:
+        voltages: L1..L3 voltage (V).
+        currents: L1..L3 current (A).
+        phase_power: L1..L3 active power (W).
+        power_w: Total active power (W).
+        energy_kwh: Lifetime meter reading (kWh).
+    """
+
+    __slots__ = ("voltages", "currents", "phase_power", "power_w", "energy_kwh")
+
+    voltages: Optional[Phases]
+    currents: Optional[Phases]
+    phase_power: Optional[Phases]
+    power_w: Optional[float]
+    energy_kwh: Optional[float]
+
+    def __init__(
+        self,
+        voltages: Optional[Phases] = None,
+        currents: Optional[Phases] = None,
+        phase_power: Optional[Phases] = None,
+        power_w: Optional[float] = None,
+        energy_kwh: Optional[float] = None,
+    ) -> None:
+        set_ = object.__setattr__
+        set_(self, "voltages", voltages)
+        set_(self, "currents", currents)
+        set_(self, "phase_power", phase_power)
+        set_(self, "power_w", power_w)
+        set_(self, "energy_kwh", energy_kwh)
+
+    def __setattr__(self, name: str, value: object) -> None:
+        raise AttributeError("Measurements is immutable")
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"Measurements({fields})"
+
+    @classmethod
+    def from_raw(cls, raw_data: Dict[str, Optional[List[int]]]) -> "Measurements":
+        """Decode the register blocks returned by ``fetch_raw_data``."""
+        power = raw_data.get("power")
+        phase_power = _decode_phases(power)
+        power_w: Optional[float] = None
+        if power and len(power) >= 8:
+            try:
+                # Total power is in the last two registers of the 8-register block
+                power_w = decode_32bit_float(power[6:8])
+            except Exception:
+                power_w = None
+        energy = raw_data.get("energy")
+        energy_kwh: Optional[float] = None
+        if energy and len(energy) >= 4:
+            try:
+                energy_kwh = decode_64bit_float(energy) / 1000.0
+            except Exception:
+                energy_kwh = None
+        return cls(
+            voltages=_decode_phases(raw_data.get("voltages")),
+            currents=_decode_phases(raw_data.get("currents")),
+            phase_power=phase_power,
+            power_w=power_w,
+            energy_kwh=energy_kwh,
+        )
+
+    @property
+    def charging_power_w(self) -> float:
+        """Total power for session logic (0 when unknown or not finite)."""
+        power = self.power_w
+        return power if power is not None and math.isfinite(power) else 0.0
@@ -0,0 +1,217 @@
+"""In-process metrics registry with Prometheus text exposition.
+
+Counters and histograms are updated on the hot path, so they are plain
+slotted objects: ``inc`` is an attribute add and ``observe`` a bisect plus
+two adds, with no locks (they are only written from the GLib thread and a
+scrape tolerates reading a value mid-update). Gauges cost nothing per
+tick: they are callbacks evaluated when ``/metrics`` is scraped, typically
+reading the published status snapshot.
+
+Example:
+    ```python
+    from alfen_driver.metrics import MODBUS_READS, REGISTRY
+
+    MODBUS_READS.inc()
+    REGISTRY.gauge("alfen_mode", "Charging mode", lambda: 1.0)
+    print(REGISTRY.render())
+    ```
+"""
+
+import bisect
+import math
+from typing import Callable, Dict, List, Mapping, Optional, Sequence, TypeVar, Union
+
+GaugeValue = Union[Optional[float], Mapping[str, Optional[float]]]
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _format_value(value: float) -> str:
+    if math.isnan(value):
+        return "NaN"
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value))
+
+
+class Counter:
+    """Monotonically increasing count."""
+
+    __slots__ = ("name", "description", "value")
+
+    def __init__(self, name: str, description: str) -> None:
+        self.name = name
+        self.description = description
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.value += amount
+
+    def render(self) -> List[str]:
+        return [
+            f"# HELP {self.name} {self.description}",
+            f"# TYPE {self.name} counter",
+            f"{self.name} {_format_value(self.value)}",
+        ]
+
+
+class Histogram:
+    """Distribution of observed values over fixed upper bounds."""
+
+    __slots__ = ("name", "description", "bounds", "counts", "sum", "count")
+
+    def __init__(self, name: str, description: str, bounds: Sequence[float]) -> None:
+        self.name = name
+        self.description = description
+        self.bounds = tuple(sorted(bounds))
+        # One slot per bound plus the implicit +Inf bucket
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def render(self) -> List[str]:
+        lines = [
+            f"# HELP {self.name} {self.description}",
+            f"# TYPE {self.name} histogram",
+        ]
+        cumulative = 0
+        for bound, count in zip(self.bounds, self.counts):
+            cumulative += count
+            lines.append(f'{self.name}_bucket{{le="{bound}"}} {cumulative}')
+        lines.append(f'{self.name}_bucket{{le="+Inf"}} {self.count}')
+        lines.append(f"{self.name}_sum {_format_value(self.sum)}")
+        lines.append(f"{self.name}_count {self.count}")
+        return lines
+
+
+class Gauge:
+    """Value computed at scrape time; ``None`` values are omitted.
+
+    With ``label`` set, the callback returns a mapping of label value to
+    sample value (e.g. ``{"L1": 230.1, "L2": 229.8}``).
+    """
+
+    __slots__ = ("name", "description", "fn", "label")
+
+    def __init__(
+        self,
+        name: str,
+        description: str,
+        fn: Callable[[], GaugeValue],
+        label: Optional[str] = None,
+    ) -> None:
+        self.name = name
+        self.description = description
+        self.fn = fn
+        self.label = label
+
+    def render(self) -> List[str]:
+        try:
+            value = self.fn()
+        except Exception:
+            return []
+        if isinstance(value, Mapping):
+            samples = [
+                f'{self.name}{{{self.label}="{key}"}} {_format_value(v)}'
+                for key, v in value.items()
+                if v is not None
+            ]
+        elif value is not None:
+            samples = [f"{self.name} {_format_value(value)}"]
+        else:
+            samples = []
+        if not samples:
+            return []
+        return [
+            f"# HELP {self.name} {self.description}",
+            f"# TYPE {self.name} gauge",
+            *samples,
+        ]
+
+
+Metric = Union[Counter, Histogram, Gauge]
+M = TypeVar("M", Counter, Histogram, Gauge)
+
+
+class Registry:
+    """Named collection of metrics, rendered in registration order."""
+
+    def __init__(self) -> None:
+        self._metrics: Dict[str, Metric] = {}
+
+    def _register(self, metric: M) -> M:
+        # Re-registering a name replaces it (e.g. gauges bound to a new driver)
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, description: str) -> Counter:
+        return self._register(Counter(name, description))
+
+    def histogram(
+        self, name: str, description: str, bounds: Sequence[float]
+    ) -> Histogram:
+        return self._register(Histogram(name, description, bounds))
+
+    def gauge(
+        self,
+        name: str,
+        description: str,
+        fn: Callable[[], GaugeValue],
+        label: Optional[str] = None,
+    ) -> Gauge:
+        return self._register(Gauge(name, description, fn, label))
+
+    def get(self, name: str) -> Optional[Metric]:
+        return self._metrics.get(name)
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in list(self._metrics.values()):
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+MODBUS_READS = REGISTRY.counter(
+    "alfen_modbus_reads_total", "Modbus register block reads"
+)
+MODBUS_WRITES = REGISTRY.counter(
+    "alfen_modbus_writes_total", "Modbus register block writes"
+)
+MODBUS_ERRORS = REGISTRY.counter(
+    "alfen_modbus_errors_total", "Failed Modbus reads and writes"
+)
+MODBUS_RETRIES = REGISTRY.counter(
+    "alfen_modbus_retries_total", "Modbus operations retried after an error"
+)
+MODBUS_RECONNECTS = REGISTRY.counter(
+    "alfen_modbus_reconnects_total", "Modbus reconnect attempts"
+)
+DBUS_PUBLISHES = REGISTRY.counter(
+    "alfen_dbus_publishes_total", "Measurement updates published to D-Bus"
+)
+TIBBER_FETCHES = REGISTRY.counter(
+    "alfen_tibber_fetches_total", "Tibber price API requests"
+)
+
+TICK_SECONDS = REGISTRY.histogram(
+    "alfen_tick_duration_seconds",
+    "Duration of one poll tick",
+    (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+MODBUS_RTT_SECONDS = REGISTRY.histogram(
+    "alfen_modbus_rtt_seconds",
+    "Round-trip time of Modbus requests",
+    (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0),
+)
+DECODE_SECONDS = REGISTRY.histogram(
+    "alfen_decode_duration_seconds",
+    "Time to decode one poll's register blocks",
+    (0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.005),
+)
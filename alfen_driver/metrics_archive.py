@@ -0,0 +1,295 @@
+"""Memory-mapped, fixed-record archive of per-minute metrics.
+
+The archive is a single preallocated file::
+
+    [header 64 B][day index: days x 12 B][records: capacity x 24 B]
+
+Records form a ring addressed by a monotonically increasing sequence
+number (slot = seq % capacity), so an append is one 24-byte write plus a
+header update and retention is bounded by the configured file size. The
+day index maps ``day % days`` to the first sequence number of that day,
+which narrows range reads to a binary search within one day. Reads return
+tuples unpacked straight from ``memoryview`` slices of the map (no copy of
+the underlying data).
+
+At 24 bytes per minute a year needs about 12.6 MB.
+"""
+
+import math
+import mmap
+import os
+import struct
+import threading
+from typing import IO, Iterator, List, Optional, Tuple
+
+from .logging_utils import get_logger
+
+MAGIC = b"ALFNARCH"
+VERSION = 1
+# magic, version, record size, capacity, day slots, total records written
+HEADER = struct.Struct("<8sIIIIQ")
+HEADER_SIZE = 64
+DAY_ENTRY = struct.Struct("<IQ")  # day number, first sequence number
+# minute epoch, avg power W, energy delta kWh, setpoint A, price, status
+RECORD = struct.Struct("<IffffB3x")
+MINUTE = 60
+DAY = 86400
+
+ArchiveRow = Tuple[int, float, float, float, float, int]
+
+
+def _capacity_for(max_bytes: int) -> Tuple[int, int]:
+    """Largest (record capacity, day slots) fitting in ``max_bytes``."""
+    per_day = 1440 * RECORD.size + DAY_ENTRY.size
+    days = max(2, (max_bytes - HEADER_SIZE) // per_day + 1)
+    capacity = (max_bytes - HEADER_SIZE - days * DAY_ENTRY.size) // RECORD.size
+    return max(MINUTE, capacity), days
+
+
+class MetricsArchive:
+    """Ring of per-minute aggregates in a memory-mapped file.
+
+    Appends happen on the GLib thread and reads on the web thread; a lock
+    serializes access to the header fields.
+    """
+
+    def __init__(self, path: str, max_bytes: int) -> None:
+        self.path = path
+        self.logger = get_logger("alfen_driver.metrics_archive")
+        self.capacity, self.days = _capacity_for(max_bytes)
+        self.records_offset = HEADER_SIZE + self.days * DAY_ENTRY.size
+        self.size = self.records_offset + self.capacity * RECORD.size
+        self.total = 0
+        self._lock = threading.Lock()
+        self._file: Optional[IO[bytes]] = None
+        self._map: Optional[mmap.mmap] = None
+        self._view: Optional[memoryview] = None
+        try:
+            self._open()
+        except OSError as e:
+            self.logger.warning(f"Metrics archive disabled ({path}): {e}")
+            self.close()
+
+    @property
+    def available(self) -> bool:
+        return self._map is not None
+
+    def _open(self) -> None:
+        exists = os.path.exists(self.path)
+        if exists and not self._header_matches():
+            # Size or format changed: keep the old file aside and start fresh
+            os.replace(self.path, f"{self.path}.old")
+            self.logger.warning(
+                f"Metrics archive layout changed; moved old file to {self.path}.old"
+            )
+            exists = False
+        mode = "r+b" if exists else "w+b"
+        # Kept open for the lifetime of the map
+        f = open(self.path, mode)
+        self._file = f
+        if not exists:
+            f.truncate(self.size)
+        self._map = mmap.mmap(f.fileno(), self.size)
+        self._view = memoryview(self._map)
+        if exists:
+            self.total = HEADER.unpack_from(self._view, 0)[5]
+        else:
+            self._write_header()
+
+    def _header_matches(self) -> bool:
+        try:
+            if os.path.getsize(self.path) != self.size:
+                return False
+            with open(self.path, "rb") as f:
+                raw = f.read(HEADER.size)
+            magic, version, rec_size, capacity, days, _ = HEADER.unpack(raw)
+        except (OSError, struct.error):
+            return False
+        return (magic, version, rec_size, capacity, days) == (
+            MAGIC,
+            VERSION,
+            RECORD.size,
+            self.capacity,
+            self.days,
+        )
+
+    def _write_header(self) -> None:
+        assert self._view is not None
+        HEADER.pack_into(
+            self._view,
+            0,
+            MAGIC,
+            VERSION,
+            RECORD.size,
+            self.capacity,
+            self.days,
+            self.total,
+        )
+
+    def _record_offset(self, seq: int) -> int:
+        return self.records_offset + (seq % self.capacity) * RECORD.size
+
+    def _minute_at(self, seq: int) -> int:
+        assert self._view is not None
+        return int(RECORD.unpack_from(self._view, self._record_offset(seq))[0])
+
+    @property
+    def oldest_seq(self) -> int:
+        return max(0, self.total - self.capacity)
+
+    def append(
+        self,
+        minute_ts: int,
+        power_w: float,
+        energy_kwh: float,
+        setpoint_a: float,
+        price: Optional[float],
+        status: int,
+    ) -> None:
+        """Append one per-minute record (O(1))."""
+        if self._view is None:
+            return
+        minute_ts = int(minute_ts) // MINUTE * MINUTE
+        with self._lock:
+            seq = self.total
+            if seq > self.oldest_seq and minute_ts <= self._minute_at(seq - 1):
+                return  # Never go back in time (e.g. clock step)
+            RECORD.pack_into(
+                self._view,
+                self._record_offset(seq),
+                minute_ts,
+                power_w,
+                energy_kwh,
+                setpoint_a,
+                math.nan if price is None else price,
+                int(status) & 0xFF,
+            )
+            day = minute_ts // DAY
+            slot_offset = HEADER_SIZE + (day % self.days) * DAY_ENTRY.size
+            if DAY_ENTRY.unpack_from(self._view, slot_offset)[0] != day:
+                DAY_ENTRY.pack_into(self._view, slot_offset, day, seq)
+            self.total = seq + 1
+            self._write_header()
+
+    def _search(self, lo: int, hi: int, ts: int) -> int:
+        """First seq in [lo, hi) whose minute is >= ``ts``."""
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._minute_at(mid) < ts:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def _start_seq(self, from_ts: int) -> int:
+        assert self._view is not None
+        lo, hi = self.oldest_seq, self.total
+        day = from_ts // DAY
+        entry_day, first = DAY_ENTRY.unpack_from(
+            self._view, HEADER_SIZE + (day % self.days) * DAY_ENTRY.size
+        )
+        if entry_day == day and lo <= first < hi:
+            # Day index hit: only search within that day's records
+            return self._search(first, min(hi, first + 1440), from_ts)
+        return self._search(lo, hi, from_ts)
+
+    def read(self, from_ts: float, to_ts: float) -> List[ArchiveRow]:
+        """Return records with ``from_ts <= minute < to_ts``, oldest first."""
+        if self._view is None:
+            return []
+        with self._lock:
+            start = self._start_seq(int(from_ts))
+            rows: List[ArchiveRow] = []
+            for row in self._iter_from(start):
+                if row[0] >= to_ts:
+                    break
+                rows.append(row)
+            return rows
+
+    def _iter_from(self, start: int) -> Iterator[ArchiveRow]:
+        """Unpack records from ``start`` to the newest via memoryview slices."""
+        assert self._view is not None
+        end = self.total
+        while start < end:
+            slot = start % self.capacity
+            count = min(end - start, self.capacity - slot)
+            offset = self.records_offset + slot * RECORD.size
+            chunk = self._view[offset : offset + count * RECORD.size]
+            yield from RECORD.iter_unpack(chunk)
+            start += count
+
+    def flush(self) -> None:
+        if self._map is not None:
+            self._map.flush()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._view is not None:
+                self._view.release()
+                self._view = None
+            if self._map is not None:
+                self._map.flush()
+                self._map.close()
+                self._map = None
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+class MinuteAggregator:
+    """Folds per-poll samples into one archive record per minute."""
+
+    def __init__(self, archive: MetricsArchive) -> None:
+        self.archive = archive
+        self._minute: Optional[int] = None
+        self._power_sum = 0.0
+        self._count = 0
+        self._energy_start: Optional[float] = None
+        self._energy_last: Optional[float] = None
+        self._setpoint = 0.0
+        self._price: Optional[float] = None
+        self._status = 0
+
+    def add(
+        self,
+        ts: float,
+        power_w: float,
+        energy_total_kwh: float,
+        setpoint_a: float,
+        price: Optional[float],
+        status: int,
+    ) -> None:
+        minute = int(ts) // MINUTE * MINUTE
+        if self._minute is not None and minute != self._minute:
+            self._emit()
+        if self._minute != minute:
+            self._minute = minute
+            self._power_sum = 0.0
+            self._count = 0
+            # Delta is measured from the end of the previous minute
+            self._energy_start = self._energy_last
+        if math.isfinite(power_w):
+            self._power_sum += power_w
+            self._count += 1
+        if energy_total_kwh > 0:
+            if self._energy_start is None:
+                self._energy_start = energy_total_kwh
+            self._energy_last = energy_total_kwh
+        self._setpoint = setpoint_a
+        self._price = price
+        self._status = status
+
+    def _emit(self) -> None:
+        if self._minute is None:
+            return
+        delta = 0.0
+        if self._energy_start is not None and self._energy_last is not None:
+            delta = max(0.0, self._energy_last - self._energy_start)
+        self.archive.append(
+            self._minute,
+            self._power_sum / self._count if self._count else 0.0,
+            delta,
+            self._setpoint,
+            self._price,
+            self._status,
+        )
@@ -48,6 +48,39 @@ from .exceptions import (
     ModbusError,
 )
 from .logging_utils import get_logger
+from .metrics import (
+    MODBUS_ERRORS,
+    MODBUS_READS,
+    MODBUS_RECONNECTS,
+    MODBUS_RETRIES,
+    MODBUS_RTT_SECONDS,
+    MODBUS_WRITES,
+)
+from .timings import TIMINGS
+
+
+def _timed_modbus(kind: str, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """Run one Modbus transaction and record its metrics.
+
+    Counts the request (``kind`` is "read" or "write"), observes the round
+    trip in the RTT histogram and the ``modbus_<kind>`` timing, and counts
+    raised exceptions and error responses as Modbus errors. The response is
+    returned unchanged.
+    """
+    (MODBUS_WRITES if kind == "write" else MODBUS_READS).inc()
+    started = time.perf_counter()
+    try:
+        response = fn(*args, **kwargs)
+    except Exception:
+        MODBUS_ERRORS.inc()
+        raise
+    finally:
+        now = time.perf_counter()
+        MODBUS_RTT_SECONDS.observe(now - started)
+        TIMINGS.record(f"modbus_{kind}", now - started, now)
+    if response.isError():
+        MODBUS_ERRORS.inc()
+    return response
 
 
 def read_holding_registers(
@@ -88,7 +121,10 @@ def read_holding_registers(
         and converts Modbus-specific errors to the driver's exception hierarchy.
     """
     rr = cast(
-        ModbusResponse, client.read_holding_registers(address, count, slave=slave)
+        ModbusResponse,
+        _timed_modbus(
+            "read", client.read_holding_registers, address, count, slave=slave
+        ),
     )
     if rr.isError():
         raise ModbusError("read", str(rr), address=address, slave_id=slave)
@@ -295,6 +331,7 @@ def reconnect(
         to reconnect. The retry logic includes exponential backoff and
         proper error logging for monitoring connection health.
     """
+    MODBUS_RECONNECTS.inc()
     client.close()
     attempt = 0
 
@@ -377,6 +414,8 @@ def retry_modbus_operation(
             if logger:
                 logger.error(f"Modbus error on attempt {attempt + 1}: {e}")
             if attempt < retries - 1:
+                # Counted only when another attempt follows the delay
+                MODBUS_RETRIES.inc()
                 time.sleep(retry_delay)
     if logger:
         logger.error(f"Operation failed after {retries} retries")
@@ -1,19 +1,62 @@
-"""Configuration and state persistence for Alfen driver."""
-
+"""Configuration and state persistence for Alfen driver.
+
+State lives in memory and is written to flash only when it changed. Every
+mutation marks its key dirty and arms a short debounce deadline, so bursts
+of changes (e.g. dragging the current slider) coalesce into one write; the
+driver calls ``flush_due`` from its poll loop. A write is skipped when the
+serialized content hash matches what is already on disk, and goes through
+a temp file, fsync and atomic rename so a power cut leaves either the old
+or the new file intact.
+"""
+
+import hashlib
 import json
 import logging
+import os
+import time
+from datetime import date
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Dict, Optional, Set
 
 logger = logging.getLogger(__name__)
 
+_MISSING = object()
+
+
+def fsync_dir(directory: Path) -> None:
+    """Make a rename inside ``directory`` durable (best effort per platform)."""
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
 
 class PersistenceManager:
     """Manages persistent configuration and state."""
 
-    def __init__(self, config_path: str = "/data/alfen_driver_config.json"):
+    # Days of write statistics kept in ``bytes_by_day``
+    STATS_DAYS = 7
+
+    def __init__(
+        self,
+        config_path: str = "/data/alfen_driver_config.json",
+        debounce_seconds: float = 2.0,
+    ):
         self.config_path = Path(config_path)
+        self.debounce_seconds = debounce_seconds
         self._state: Dict[str, Any] = {}
+        self._dirty: Set[str] = set()
+        self._deadline: Optional[float] = None
+        self._written_hash: Optional[str] = None
+        self.writes = 0
+        self.skipped_writes = 0
+        self.bytes_by_day: Dict[str, int] = {}
         self._load_state()
 
     def _load_state(self) -> None:
@@ -29,36 +72,123 @@ class PersistenceManager:
         except Exception as e:
             logger.error(f"Failed to load state: {e}")
             self._state = {}
+            return
+        # Only a rewrite in the old (indented) format differs from disk
+        try:
+            payload = self.config_path.read_bytes()
+            if payload == self._serialize():
+                self._written_hash = hashlib.sha256(payload).hexdigest()
+        except OSError:
+            pass
+
+    def _serialize(self) -> bytes:
+        return json.dumps(self._state, sort_keys=True, separators=(",", ":")).encode()
+
+    def _mark_dirty(self, key: str) -> None:
+        self._dirty.add(key)
+        if self._deadline is None:
+            self._deadline = time.monotonic() + self.debounce_seconds
+
+    @property
+    def dirty(self) -> bool:
+        """Whether in-memory state has changes not yet written."""
+        return bool(self._dirty)
+
+    @property
+    def dirty_keys(self) -> Set[str]:
+        return set(self._dirty)
+
+    def flush_due(self, now: Optional[float] = None) -> bool:
+        """Write pending changes once the debounce window has passed.
+
+        Returns:
+            True if a save was attempted.
+        """
+        if not self._dirty or self._deadline is None:
+            return False
+        if (time.monotonic() if now is None else now) < self._deadline:
+            return False
+        self.save_state()
+        return True
+
+    def flush(self) -> bool:
+        """Write pending changes now, ignoring the debounce window.
+
+        Returns:
+            True if nothing was pending or the save succeeded.
+        """
+        if not self._dirty:
+            return True
+        return self.save_state()
 
     def save_state(self) -> bool:
-        """Save current state to disk."""
+        """Save current state to disk now (skipped if the content is unchanged)."""
         try:
+            payload = self._serialize()
+            digest = hashlib.sha256(payload).hexdigest()
+            if digest == self._written_hash:
+                self.skipped_writes += 1
+                self._dirty.clear()
+                self._deadline = None
+                return True
+
             # Ensure directory exists
             self.config_path.parent.mkdir(parents=True, exist_ok=True)
 
-            # Write atomically using temp file
+            # Write atomically: temp file, fsync, rename, fsync directory
             temp_path = self.config_path.with_suffix(".tmp")
-            with open(temp_path, "w") as f:
-                json.dump(self._state, f, indent=2)
+            with open(temp_path, "wb") as f:
+                f.write(payload)
+                f.flush()
+                os.fsync(f.fileno())
             temp_path.replace(self.config_path)
+            fsync_dir(self.config_path.parent)
 
+            self._written_hash = digest
+            self._dirty.clear()
+            self._deadline = None
+            self._count_bytes(len(payload))
             logger.debug(f"Saved state to {self.config_path}")
             return True
         except Exception as e:
             logger.error(f"Failed to save state: {e}")
             return False
 
+    def _count_bytes(self, size: int) -> None:
+        day = date.today().isoformat()
+        self.writes += 1
+        self.bytes_by_day[day] = self.bytes_by_day.get(day, 0) + size
+        for old in sorted(self.bytes_by_day)[: -self.STATS_DAYS]:
+            del self.bytes_by_day[old]
+
+    @property
+    def bytes_written_today(self) -> int:
+        return self.bytes_by_day.get(date.today().isoformat(), 0)
+
+    def stats(self) -> Dict[str, Any]:
+        """Write statistics for diagnostics."""
+        return {
+            "writes": self.writes,
+            "skipped_writes": self.skipped_writes,
+            "bytes_written_today": self.bytes_written_today,
+            "bytes_by_day": dict(self.bytes_by_day),
+            "dirty_keys": sorted(self._dirty),
+        }
+
     def get(self, key: str, default: Any = None) -> Any:
         """Get a persisted value."""
         return self._state.get(key, default)
 
     def set(self, key: str, value: Any) -> None:
         """Set a value to be persisted."""
-        self._state[key] = value
+        if self._state.get(key, _MISSING) != value:
+            self._state[key] = value
+            self._mark_dirty(key)
 
     def update(self, data: Dict[str, Any]) -> None:
         """Update multiple values at once."""
-        self._state.update(data)
+        for key, value in data.items():
+            self.set(key, value)
 
     def get_section(self, section: str) -> Dict[str, Any]:
         """Get all values in a section."""
@@ -67,10 +197,18 @@ class PersistenceManager:
 
     def set_section(self, section: str, data: Dict[str, Any]) -> None:
         """Set all values in a section."""
-        self._state[section] = data
+        self.set(section, data)
+
+    def remove(self, key: str) -> None:
+        """Drop a key from the persisted state."""
+        if key in self._state:
+            del self._state[key]
+            self._mark_dirty(key)
 
     def clear(self) -> None:
         """Clear all persisted state."""
+        for key in self._state:
+            self._mark_dirty(key)
         self._state = {}
 
     @property
@@ -0,0 +1,551 @@
+"""Pluggable electricity price providers behind a common ``PriceTimeline``.
+
+Providers (Tibber, a generic day-ahead JSON/CSV feed, a local file) each
+produce an immutable ``PriceTimeline`` of consecutive price slots. The
+``PriceEngine`` refreshes them on their own schedule, tries them in the
+configured failover order, keeps the winning timeline in memory and mirrors it
+to a small disk cache so a restart does not start without prices.
+
+Supported feed/file formats:
+
+- JSON: either a list of slots or an object with a ``prices`` (or ``data``)
+  list. Each slot has ``start`` (ISO 8601 or epoch seconds), ``price`` and
+  optionally ``end`` and ``level``. Tibber-style ``startsAt``/``total`` keys
+  are accepted as aliases.
+- CSV: a header row with ``start`` and ``price`` columns (optional ``end``).
+
+Example:
+    ```python
+    engine = PriceEngine(config.pricing, config.tibber)
+    rate = engine.price_at(time.time())  # EUR/kWh or None
+    ```
+"""
+
+import abc
+import bisect
+import csv
+import dataclasses
+import io
+import json
+import os
+import threading
+import time
+import urllib.request
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Sequence
+
+from .config import PricingConfig, TibberConfig
+from .logging_utils import get_logger
+from .tibber import refresh_tibber_prices
+
+DEFAULT_SLOT_SECONDS = 3600.0
+
+
+def _parse_timestamp(value: Any) -> Optional[float]:
+    """Parse ISO 8601 strings or epoch numbers to epoch seconds."""
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    if not isinstance(value, str) or not value.strip():
+        return None
+    text = value.strip()
+    try:
+        return float(text)
+    except ValueError:
+        pass
+    try:
+        dt = datetime.fromisoformat(text.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.timestamp()
+
+
+@dataclasses.dataclass(frozen=True)
+class PricePoint:
+    """Price for the half-open interval [start, end).
+
+    Attributes:
+        start: Slot start (epoch seconds).
+        end: Slot end (epoch seconds).
+        price: Energy price per kWh in the configured currency.
+        level: Optional supplier price level (e.g. Tibber ``CHEAP``).
+    """
+
+    start: float
+    end: float
+    price: float
+    level: Optional[str] = None
+
+
+class PriceTimeline:
+    """Immutable, sorted sequence of price slots with O(log n) lookup.
+
+    Instances are never mutated after construction so they can be read from
+    the web thread without locking.
+    """
+
+    def __init__(
+        self,
+        points: Sequence[PricePoint],
+        source: str,
+        fetched_at: Optional[float] = None,
+    ) -> None:
+        self.points: tuple[PricePoint, ...] = tuple(
+            sorted(points, key=lambda p: p.start)
+        )
+        self._starts: List[float] = [p.start for p in self.points]
+        self.source = source
+        self.fetched_at = time.time() if fetched_at is None else fetched_at
+
+    def __len__(self) -> int:
+        return len(self.points)
+
+    @property
+    def end(self) -> float:
+        """End of the last slot (0.0 for an empty timeline)."""
+        return self.points[-1].end if self.points else 0.0
+
+    def point_at(self, ts: float) -> Optional[PricePoint]:
+        """Return the slot covering ``ts``, or None if outside the timeline."""
+        idx = bisect.bisect_right(self._starts, ts) - 1
+        if idx < 0:
+            return None
+        point = self.points[idx]
+        return point if ts < point.end else None
+
+    def price_at(self, ts: float) -> Optional[float]:
+        """Return the price covering ``ts``, or None if outside the timeline."""
+        point = self.point_at(ts)
+        return point.price if point is not None else None
+
+    def covers(self, ts: float) -> bool:
+        """True if some slot covers ``ts``."""
+        return self.point_at(ts) is not None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize for the disk cache and the web UI."""
+        return {
+            "source": self.source,
+            "fetched_at": self.fetched_at,
+            "points": [dataclasses.asdict(p) for p in self.points],
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "PriceTimeline":
+        """Inverse of ``to_dict``."""
+        points = [
+            PricePoint(
+                float(p["start"]),
+                float(p["end"]),
+                float(p["price"]),
+                p.get("level"),
+            )
+            for p in data.get("points", [])
+        ]
+        return cls(
+            points, str(data.get("source", "cache")), float(data.get("fetched_at", 0))
+        )
+
+
+def _points_from_slots(slots: Sequence[Any]) -> List[PricePoint]:
+    """Build price points from loosely-typed slot dicts.
+
+    Missing ``end`` values are filled from the next slot's start (or the
+    previous slot width for the last one). Invalid rows are skipped.
+    """
+    rows: List[tuple[float, Optional[float], float, Optional[str]]] = []
+    for slot in slots:
+        if not isinstance(slot, dict):
+            continue
+        start = _parse_timestamp(slot.get("start", slot.get("startsAt")))
+        raw_price = slot.get("price", slot.get("total"))
+        try:
+            price = float(raw_price) if raw_price not in (None, "") else None
+        except (TypeError, ValueError):
+            price = None
+        if start is None or price is None:
+            continue
+        end = _parse_timestamp(slot.get("end"))
+        level = slot.get("level")
+        rows.append((start, end, price, str(level) if level else None))
+    rows.sort(key=lambda r: r[0])
+
+    points: List[PricePoint] = []
+    for idx, (start, end, price, level) in enumerate(rows):
+        if end is None:
+            if idx + 1 < len(rows):
+                end = rows[idx + 1][0]
+            elif points:
+                end = start + (points[-1].end - points[-1].start)
+            else:
+                end = start + DEFAULT_SLOT_SECONDS
+        if end > start:
+            points.append(PricePoint(start, end, price, level))
+    return points
+
+
+def parse_price_json(data: Any) -> List[PricePoint]:
+    """Parse a day-ahead JSON document into price points."""
+    if isinstance(data, dict):
+        data = data.get("prices", data.get("data", []))
+    if not isinstance(data, list):
+        return []
+    return _points_from_slots(data)
+
+
+def parse_price_csv(text: str) -> List[PricePoint]:
+    """Parse a day-ahead CSV document (header with start/price) into points."""
+    reader = csv.DictReader(io.StringIO(text))
+    rows = [
+        {str(k).strip().lower(): (v or "").strip() for k, v in row.items() if k}
+        for row in reader
+    ]
+    return _points_from_slots(rows)
+
+
+class PriceProvider(abc.ABC):
+    """Base class for price sources.
+
+    Subclasses implement ``fetch`` and may override ``next_refresh`` to align
+    refreshes with the supplier's publication schedule.
+    """
+
+    name = "base"
+
+    def __init__(self, refresh_interval_seconds: float) -> None:
+        self.refresh_interval_seconds = refresh_interval_seconds
+        self.logger = get_logger("alfen_driver.pricing")
+
+    @abc.abstractmethod
+    def fetch(self, now: float) -> Optional[PriceTimeline]:
+        """Return a fresh timeline, or None if the source is unavailable."""
+
+    def next_refresh(self, timeline: PriceTimeline, now: float) -> float:
+        """Epoch at which this provider should be asked again."""
+        return now + self.refresh_interval_seconds
+
+    @property
+    def busy(self) -> bool:
+        """True while a background fetch is running or awaiting pickup."""
+        return False
+
+
+class TibberPriceProvider(PriceProvider):
+    """Tibber price curve via the shared ``TibberClient`` cache."""
+
+    name = "tibber"
+
+    def __init__(self, config: TibberConfig, refresh_interval_seconds: float):
+        super().__init__(refresh_interval_seconds)
+        # Prices are useful for session cost even when Tibber scheduling is off
+        self.config = (
+            config if config.enabled else dataclasses.replace(config, enabled=True)
+        )
+        self._client: Any = None
+        self._timeline: Optional[PriceTimeline] = None
+        self._curve_version = -1
+
+    def fetch(self, now: float) -> Optional[PriceTimeline]:
+        if not self.config.access_token:
+            return None
+        client = refresh_tibber_prices(self.config)
+        if client is None or not client._cached_upcoming:
+            return None
+        self._client = client
+        # Only rebuild the timeline when Tibber actually delivered a new curve
+        if self._timeline is None or client.curve_version != self._curve_version:
+            points: List[PricePoint] = []
+            starts = client._curve_starts()
+            for idx, entry in enumerate(client._cached_upcoming):
+                total = entry.get("total")
+                if starts[idx] <= 0 or not isinstance(total, (int, float)):
+                    continue
+                start, end = client._slot_bounds(idx)
+                points.append(PricePoint(start, end, float(total), entry.get("level")))
+            self._timeline = PriceTimeline(points, self.name, now)
+            self._curve_version = client.curve_version
+        return self._timeline
+
+    def next_refresh(self, timeline: PriceTimeline, now: float) -> float:
+        # Follow the client's own slot-aligned refresh/backoff schedule
+        if self._client is not None and self._client._cache_next_refresh > now:
+            return float(self._client._cache_next_refresh)
+        return super().next_refresh(timeline, now)
+
+
+class DayAheadFeedProvider(PriceProvider):
+    """Generic HTTP(S) day-ahead feed in JSON or CSV."""
+
+    name = "feed"
+    TIMEOUT_SECONDS = 10.0
+
+    def __init__(self, url: str, fmt: str, refresh_interval_seconds: float) -> None:
+        super().__init__(refresh_interval_seconds)
+        self.url = url
+        self.format = fmt
+        self._lock = threading.Lock()
+        self._worker: Optional[threading.Thread] = None
+        self._result: Optional[PriceTimeline] = None
+        self._result_ready = False
+
+    def fetch(self, now: float) -> Optional[PriceTimeline]:
+        """Return the last completed download and start a new one if idle.
+
+        The HTTP request runs on a worker thread so the GLib poll loop never
+        waits up to ``TIMEOUT_SECONDS`` on the network; the engine polls back
+        while ``busy`` and picks the result up on a later tick.
+        """
+        if not self.url.startswith(("https://", "http://")):
+            return None
+        with self._lock:
+            if self._result_ready:
+                self._result_ready = False
+                return self._result
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(
+                    target=self._download, name="PriceFeedFetch", daemon=True
+                )
+                self._worker.start()
+            return self._result
+
+    @property
+    def busy(self) -> bool:
+        worker = self._worker
+        return self._result_ready or (worker is not None and worker.is_alive())
+
+    def _download(self) -> None:
+        timeline = self._fetch_timeline()
+        with self._lock:
+            self._result = timeline
+            self._result_ready = True
+
+    def _fetch_timeline(self) -> Optional[PriceTimeline]:
+        request = urllib.request.Request(
+            self.url,
+            headers={"User-Agent": "victron-alfen-charger/1.0 (+https://github.com/)"},
+        )
+        try:
+            with urllib.request.urlopen(  # nosec B310 - scheme checked in fetch
+                request, timeout=self.TIMEOUT_SECONDS
+            ) as response:
+                body = response.read().decode("utf-8")
+        except Exception as e:
+            self.logger.warning(f"Price feed request failed: {e}")
+            return None
+        try:
+            if self.format == "csv":
+                points = parse_price_csv(body)
+            else:
+                points = parse_price_json(json.loads(body))
+        except Exception as e:
+            self.logger.warning(f"Price feed could not be parsed: {e}")
+            return None
+        return PriceTimeline(points, self.name) if points else None
+
+
+class FilePriceProvider(PriceProvider):
+    """Local JSON/CSV price file, re-read only when its mtime changes."""
+
+    name = "file"
+    # Checking an mtime is cheap; poll more often than remote feeds
+    POLL_SECONDS = 60.0
+
+    def __init__(self, path: str, fmt: str, refresh_interval_seconds: float) -> None:
+        super().__init__(min(refresh_interval_seconds, self.POLL_SECONDS))
+        self.path = path
+        self.format = fmt
+        self._mtime: Optional[float] = None
+        self._timeline: Optional[PriceTimeline] = None
+
+    def fetch(self, now: float) -> Optional[PriceTimeline]:
+        if not self.path:
+            return None
+        try:
+            mtime = os.path.getmtime(self.path)
+        except OSError:
+            return None
+        if self._timeline is not None and mtime == self._mtime:
+            return self._timeline
+        fmt = self.format
+        if fmt not in ("json", "csv"):
+            fmt = "csv" if self.path.lower().endswith(".csv") else "json"
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                body = f.read()
+            if fmt == "csv":
+                points = parse_price_csv(body)
+            else:
+                points = parse_price_json(json.loads(body))
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"Price file {self.path} could not be read: {e}")
+            return None
+        self._mtime = mtime
+        self._timeline = PriceTimeline(points, self.name, now) if points else None
+        return self._timeline
+
+
+def build_providers(
+    pricing: PricingConfig, tibber: Optional[TibberConfig]
+) -> List[PriceProvider]:
+    """Instantiate providers in the configured failover order."""
+    providers: List[PriceProvider] = []
+    interval = float(pricing.refresh_interval_seconds)
+    for name in pricing.providers:
+        if name == "tibber" and tibber is not None:
+            providers.append(TibberPriceProvider(tibber, interval))
+        elif name == "feed" and pricing.feed_url:
+            providers.append(
+                DayAheadFeedProvider(pricing.feed_url, pricing.feed_format, interval)
+            )
+        elif name == "file" and pricing.file_path:
+            providers.append(
+                FilePriceProvider(pricing.file_path, pricing.feed_format, interval)
+            )
+    return providers
+
+
+class PriceEngine:
+    """Refreshes providers in failover order and serves one in-memory timeline.
+
+    Only the GLib thread refreshes; the current timeline is swapped as a
+    whole, so readers on other threads always see a consistent object.
+    """
+
+    # Retry interval while every provider fails or a fallback is in use
+    RETRY_SECONDS = 300.0
+    # Re-check this soon while a provider downloads in the background
+    PENDING_POLL_SECONDS = 5.0
+
+    def __init__(
+        self, pricing: PricingConfig, tibber: Optional[TibberConfig] = None
+    ) -> None:
+        self.logger = get_logger("alfen_driver.pricing")
+        self.timeline: Optional[PriceTimeline] = None
+        # Bumped whenever a different timeline is adopted (plan invalidation)
+        self.version = 0
+        self.next_refresh = 0.0
+        self.set_config(pricing, tibber)
+        self._load_cache()
+
+    def set_config(
+        self, pricing: PricingConfig, tibber: Optional[TibberConfig] = None
+    ) -> None:
+        """Swap configuration and rebuild providers; refresh on next use."""
+        self.pricing = pricing
+        self.tibber = tibber
+        self.providers = build_providers(pricing, tibber)
+        self.next_refresh = 0.0
+
+    @property
+    def enabled(self) -> bool:
+        return self.pricing.source == "dynamic" and bool(self.providers)
+
+    def get_timeline(self, now: Optional[float] = None) -> Optional[PriceTimeline]:
+        """Return the current timeline, refreshing providers if due."""
+        now = time.time() if now is None else now
+        if not self.enabled:
+            return None
+        # refresh() never schedules past the adopted timeline's end, so a
+        # timeline running out is caught here without retrying every tick
+        if now >= self.next_refresh:
+            self.refresh(now)
+        return self.timeline
+
+    def price_at(self, now: Optional[float] = None) -> Optional[float]:
+        """Price per kWh at ``now`` from the current timeline, if known."""
+        now = time.time() if now is None else now
+        timeline = self.get_timeline(now)
+        return timeline.price_at(now) if timeline is not None else None
+
+    def refresh(self, now: float) -> None:
+        """Ask providers in order and adopt the first timeline covering ``now``."""
+        for position, provider in enumerate(self.providers):
+            try:
+                timeline = provider.fetch(now)
+            except Exception as e:
+                self.logger.warning(f"Price provider {provider.name} failed: {e}")
+                timeline = None
+            if timeline is None or not timeline.covers(now):
+                self.logger.debug(f"Price provider {provider.name} has no price now")
+                continue
+            self._adopt(timeline)
+            next_refresh = min(provider.next_refresh(timeline, now), timeline.end)
+            if position > 0:
+                # Serving from a fallback: retry the preferred providers soon
+                next_refresh = min(next_refresh, now + self.RETRY_SECONDS)
+            self.next_refresh = self._poll_pending(next_refresh, now)
+            return
+        pending = any(p.busy for p in self.providers)
+        if self.timeline is not None and self.timeline.covers(now):
+            if not pending:
+                self.logger.warning(
+                    "All price providers failed; "
+                    f"keeping {self.timeline.source} prices"
+                )
+        else:
+            if self.timeline is not None:
+                # Stale prices must not be served (or trigger refreshes) again
+                self.timeline = None
+                self.version += 1
+            if pending:
+                self.logger.debug("Waiting for price download")
+            else:
+                self.logger.warning("All price providers failed; no price available")
+        self.next_refresh = self._poll_pending(now + self.RETRY_SECONDS, now)
+
+    def _poll_pending(self, next_refresh: float, now: float) -> float:
+        if any(p.busy for p in self.providers):
+            return min(next_refresh, now + self.PENDING_POLL_SECONDS)
+        return next_refresh
+
+    def _adopt(self, timeline: PriceTimeline) -> None:
+        if timeline is self.timeline:
+            return
+        self.timeline = timeline
+        self.version += 1
+        self.logger.info(
+            f"Using {len(timeline)} price slot(s) from {timeline.source} "
+            f"until {datetime.fromtimestamp(timeline.end).isoformat()}"
+        )
+        self._save_cache(timeline)
+
+    def _save_cache(self, timeline: PriceTimeline) -> None:
+        path = self.pricing.cache_file
+        if not path:
+            return
+        try:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            temp_path = f"{path}.tmp"
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(timeline.to_dict(), f)
+            os.replace(temp_path, path)
+        except OSError as e:
+            self.logger.debug(f"Failed to write price cache: {e}")
+
+    def _load_cache(self) -> None:
+        path = self.pricing.cache_file
+        if not path or not os.path.exists(path):
+            return
+        try:
+            with open(path, encoding="utf-8") as f:
+                timeline = PriceTimeline.from_dict(json.load(f))
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            self.logger.warning(f"Ignoring unreadable price cache {path}: {e}")
+            return
+        if timeline.end > time.time():
+            self.timeline = timeline
+            self.version += 1
+            self.logger.info(f"Loaded {len(timeline)} cached price slot(s)")
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize the current state for the web UI."""
+        timeline = self.timeline
+        return {
+            "enabled": self.enabled,
+            "providers": [p.name for p in self.providers],
+            "next_refresh": self.next_refresh or None,
+            "timeline": timeline.to_dict() if timeline is not None else None,
+        }
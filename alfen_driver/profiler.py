@@ -0,0 +1,124 @@
+"""Statistical sampling profiler for diagnosing CPU use in place.
+
+A background thread wakes every ``interval`` seconds, grabs the current
+frame of each watched thread via ``sys._current_frames`` and counts the
+stack it finds. Nothing is instrumented, so the profiled threads only pay
+for the sampler holding the GIL while it walks a few stacks.
+
+Results are collapsed stacks (``thread;module:function;... count``), the
+input format of ``flamegraph.pl`` and speedscope. Only one profile runs at
+a time and its duration is capped.
+
+Example:
+    ```python
+    profile = PROFILER.run(10.0, {threading.main_thread().ident: "glib"})
+    if profile is not None:
+        print(profile.collapsed())
+    ```
+"""
+
+import math
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from types import FrameType
+from typing import Any, Dict, List, Mapping, NamedTuple, Optional
+
+from .constants import WebDefaults
+
+
+class Profile(NamedTuple):
+    """Result of one sampling run."""
+
+    seconds: float
+    interval: float
+    samples: int
+    stacks: Dict[str, int]
+
+    def collapsed(self) -> str:
+        """Render as collapsed stacks, hottest first."""
+        ranked = sorted(self.stacks.items(), key=lambda item: (-item[1], item[0]))
+        return "".join(f"{stack} {count}\n" for stack, count in ranked)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "seconds": round(self.seconds, 3),
+            "interval_ms": round(self.interval * 1000, 3),
+            "samples": self.samples,
+            "stacks": self.stacks,
+        }
+
+
+def _frame_label(frame: FrameType) -> str:
+    code = frame.f_code
+    module = os.path.splitext(os.path.basename(code.co_filename))[0]
+    return f"{module}:{code.co_name}"
+
+
+def collapse_stack(thread_name: str, frame: Optional[FrameType]) -> str:
+    """Return ``thread;outermost;...;innermost`` for ``frame``."""
+    labels: List[str] = []
+    while frame is not None:
+        labels.append(_frame_label(frame))
+        frame = frame.f_back
+    labels.append(thread_name)
+    return ";".join(reversed(labels))
+
+
+class SamplingProfiler:
+    """Sample the stacks of selected threads; one run at a time."""
+
+    def __init__(
+        self,
+        interval: float = WebDefaults.PROFILE_INTERVAL_SECONDS,
+        max_seconds: float = WebDefaults.PROFILE_MAX_SECONDS,
+    ) -> None:
+        self.interval = interval
+        self.max_seconds = max_seconds
+        self._lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        return self._lock.locked()
+
+    def run(self, seconds: float, threads: Mapping[int, str]) -> Optional[Profile]:
+        """Sample ``threads`` (ident -> name) for up to ``seconds``.
+
+        Blocks the calling thread; returns None if a run is in progress.
+
+        Raises:
+            ValueError: If ``seconds`` is not finite (NaN defeats the cap).
+        """
+        if not math.isfinite(seconds):
+            raise ValueError(f"Profile duration must be finite, got {seconds}")
+        if not self._lock.acquire(blocking=False):
+            return None
+        try:
+            return self._sample(min(max(seconds, 0.0), self.max_seconds), threads)
+        finally:
+            self._lock.release()
+
+    def _sample(self, seconds: float, threads: Mapping[int, str]) -> Profile:
+        stacks: Counter[str] = Counter()
+        samples = 0
+        started = time.monotonic()
+        deadline = started + seconds
+        while True:
+            frames = sys._current_frames()
+            for ident, name in threads.items():
+                frame = frames.get(ident)
+                if frame is not None:
+                    stacks[collapse_stack(name, frame)] += 1
+            samples += 1
+            # Don't keep the sampled frames (and their locals) alive
+            frames.clear()
+            now = time.monotonic()
+            if now >= deadline:
+                break
+            time.sleep(min(self.interval, deadline - now))
+        return Profile(time.monotonic() - started, self.interval, samples, dict(stacks))
+
+
+PROFILER = SamplingProfiler()
@@ -0,0 +1,428 @@
+"""Precompiled charge-decision plan for SCHEDULED mode.
+
+Instead of re-evaluating every schedule window (or the Tibber strategy) on
+each poll, the planner compiles a sorted table of non-overlapping intervals
+``(start, end, allowed_current, reason)`` covering the local day. A tick then
+costs one ``bisect`` lookup. The plan is rebuilt when the local day rolls
+over, when the schedule/config or station limit changes, or when Tibber
+delivers a new price curve.
+
+Example:
+    ```python
+    planner = ChargePlanner(config)
+    interval, source = planner.decision(
+        time.time(), config.schedule.items, config.timezone, 32.0
+    )
+    print(interval.allowed_current, interval.reason)
+    ```
+"""
+
+import bisect
+import dataclasses
+from datetime import date, datetime, timedelta
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Sequence, Tuple
+
+import pytz
+
+from .config import Config, ScheduleItem, parse_hhmm_to_minutes
+from .logging_utils import get_logger
+from .tibber import TibberClient, refresh_tibber_prices
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .pricing import PriceEngine
+
+MINUTES_PER_DAY = 24 * 60
+
+
+@dataclasses.dataclass(frozen=True)
+class PlanInterval:
+    """A half-open interval [start, end) with a fixed charging decision.
+
+    Attributes:
+        start: Interval start (epoch seconds).
+        end: Interval end (epoch seconds).
+        allowed_current: Current to apply inside the interval in amperes.
+        reason: Human-readable explanation of the decision.
+    """
+
+    start: float
+    end: float
+    allowed_current: float
+    reason: str
+
+    def to_dict(self, tz: Any = None) -> Dict[str, Any]:
+        """Serialize for JSON consumers such as the web UI."""
+        return {
+            "start": datetime.fromtimestamp(self.start, tz).isoformat(),
+            "end": datetime.fromtimestamp(self.end, tz).isoformat(),
+            "start_ts": self.start,
+            "end_ts": self.end,
+            "allowed_current": self.allowed_current,
+            "reason": self.reason,
+        }
+
+
+class ChargePlan:
+    """Immutable, sorted interval table with O(log n) lookup.
+
+    Instances are never mutated after construction so they can be handed to
+    other threads (e.g. the web server) without locking.
+    """
+
+    def __init__(
+        self,
+        intervals: Sequence[PlanInterval],
+        valid_until: float,
+        source: str,
+        key: Tuple[Any, ...],
+        default_reason: str,
+        curve_version: int = 0,
+    ) -> None:
+        self.intervals: Tuple[PlanInterval, ...] = tuple(intervals)
+        self._starts: List[float] = [i.start for i in self.intervals]
+        self.valid_until = valid_until
+        self.source = source
+        self.key = key
+        self.default_reason = default_reason
+        self.curve_version = curve_version
+
+    def lookup(self, ts: float) -> Optional[PlanInterval]:
+        """Return the interval containing ``ts``, or None if not covered."""
+        idx = bisect.bisect_right(self._starts, ts) - 1
+        if idx < 0:
+            return None
+        interval = self.intervals[idx]
+        return interval if ts < interval.end else None
+
+    def extended(self, valid_until: float) -> "ChargePlan":
+        """Copy of this plan with a new expiry (intervals unchanged)."""
+        return ChargePlan(
+            self.intervals,
+            valid_until,
+            self.source,
+            self.key,
+            self.default_reason,
+            self.curve_version,
+        )
+
+
+def _local_day(now: float, tz: Any) -> date:
+    return datetime.fromtimestamp(now, tz).date()
+
+
+def _local_epoch(tz: Any, day: date, minute: int) -> float:
+    """Epoch seconds for ``minute`` minutes after local midnight of ``day``."""
+    naive = datetime(day.year, day.month, day.day) + timedelta(minutes=minute)
+    return float(tz.localize(naive).timestamp())
+
+
+def compile_schedule_intervals(
+    schedules: Sequence[ScheduleItem],
+    day: date,
+    tz: Any,
+    allowed_current: float,
+) -> List[PlanInterval]:
+    """Compile legacy schedule windows for one local day into intervals.
+
+    Mirrors ``logic.is_within_any_schedule``: a window applies on days whose
+    bit is set in ``days_mask`` (bit 0 = Sunday); overnight windows cover
+    both the early-morning and the late-evening part of that same day.
+    """
+    sun_based_index = (day.weekday() + 1) % 7
+    windows: List[Tuple[int, int, str]] = []
+    for item in schedules:
+        if item.enabled == 0:
+            continue
+        if not item.days_mask & (1 << sun_based_index):
+            continue
+        start_min = parse_hhmm_to_minutes(item.start)
+        end_min = parse_hhmm_to_minutes(item.end)
+        if start_min == end_min:
+            continue
+        label = f"{item.start}-{item.end}"
+        if start_min < end_min:
+            windows.append((start_min, end_min, label))
+        else:
+            windows.append((0, end_min, label))
+            windows.append((start_min, MINUTES_PER_DAY, label))
+    windows.sort()
+
+    # Union overlapping windows so the table stays non-overlapping
+    merged: List[Tuple[int, int, List[str]]] = []
+    for start_min, end_min, label in windows:
+        if merged and start_min <= merged[-1][1]:
+            last_start, last_end, labels = merged[-1]
+            if label not in labels:
+                labels.append(label)
+            merged[-1] = (last_start, max(last_end, end_min), labels)
+        else:
+            merged.append((start_min, end_min, [label]))
+
+    intervals: List[PlanInterval] = []
+    cursor = 0
+    for start_min, end_min, labels in merged:
+        if start_min > cursor:
+            intervals.append(
+                PlanInterval(
+                    _local_epoch(tz, day, cursor),
+                    _local_epoch(tz, day, start_min),
+                    0.0,
+                    "not within schedule",
+                )
+            )
+        intervals.append(
+            PlanInterval(
+                _local_epoch(tz, day, start_min),
+                _local_epoch(tz, day, end_min),
+                allowed_current,
+                f"within schedule {', '.join(labels)}",
+            )
+        )
+        cursor = end_min
+    if cursor < MINUTES_PER_DAY:
+        intervals.append(
+            PlanInterval(
+                _local_epoch(tz, day, cursor),
+                _local_epoch(tz, day, MINUTES_PER_DAY),
+                0.0,
+                "not within schedule",
+            )
+        )
+    return intervals
+
+
+def compile_tibber_intervals(
+    slots: Sequence[Tuple[float, float, bool, str]],
+    day_start: float,
+    allowed_current: float,
+) -> List[PlanInterval]:
+    """Turn Tibber per-slot decisions into intervals starting at ``day_start``."""
+    intervals: List[PlanInterval] = []
+    for start, end, charge, reason in slots:
+        if end <= day_start:
+            continue
+        if intervals and start < intervals[-1].end:
+            # Defensive: never emit overlapping slots
+            start = intervals[-1].end
+            if start >= end:
+                continue
+        intervals.append(
+            PlanInterval(start, end, allowed_current if charge else 0.0, reason)
+        )
+    return intervals
+
+
+def _schedule_key(schedules: Sequence[ScheduleItem]) -> Tuple[Any, ...]:
+    """Snapshot the fields ``compile_schedule_intervals`` reads.
+
+    Keying on content (not list identity) means an equal schedule reuses the
+    plan and an in-place edit rebuilds it.
+    """
+    return tuple((i.enabled, i.days_mask, i.start, i.end) for i in schedules)
+
+
+class ChargePlanner:
+    """Owns the current ``ChargePlan`` and rebuilds it when it goes stale."""
+
+    def __init__(
+        self, config: Config, price_engine: Optional["PriceEngine"] = None
+    ) -> None:
+        self.config = config
+        self.price_engine = price_engine
+        self.logger = get_logger("alfen_driver.schedule_plan")
+        self.plan: Optional[ChargePlan] = None
+        self.timezone = config.timezone
+
+    def set_config(self, config: Config) -> None:
+        """Swap the configuration and force a rebuild on next use."""
+        self.config = config
+        self.plan = None
+
+    def invalidate(self) -> None:
+        """Drop the current plan (e.g. after a schedule change)."""
+        self.plan = None
+
+    def decision(
+        self,
+        now: float,
+        schedules: Sequence[ScheduleItem],
+        timezone: str,
+        station_max_current: float,
+    ) -> Tuple[PlanInterval, str]:
+        """Return the interval that applies at ``now`` and the plan source.
+
+        Rebuilds the plan first if it expired or its inputs changed.
+        """
+        key = (
+            _schedule_key(schedules),
+            timezone,
+            float(station_max_current),
+        )
+        plan = self.plan
+        if plan is None or now >= plan.valid_until or plan.key != key:
+            plan = self._rebuild(now, schedules, timezone, station_max_current, key)
+        interval = plan.lookup(now)
+        if interval is None:
+            interval = PlanInterval(now, plan.valid_until, 0.0, plan.default_reason)
+        return interval, plan.source
+
+    def peek(self, now: float) -> Optional[PlanInterval]:
+        """Look up ``now`` in the current plan without rebuilding it."""
+        plan = self.plan
+        if plan is None or now >= plan.valid_until:
+            return None
+        return plan.lookup(now)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize the current plan for the web UI."""
+        plan = self.plan
+        if plan is None:
+            return {"source": None, "valid_until": None, "intervals": []}
+        try:
+            tz = pytz.timezone(self.timezone)
+        except Exception:
+            tz = pytz.utc
+        return {
+            "source": plan.source,
+            "valid_until": plan.valid_until,
+            "intervals": [i.to_dict(tz) for i in plan.intervals],
+        }
+
+    def _rebuild(
+        self,
+        now: float,
+        schedules: Sequence[ScheduleItem],
+        timezone: str,
+        station_max_current: float,
+        key: Tuple[Any, ...],
+    ) -> ChargePlan:
+        tz = pytz.timezone(timezone)
+        self.timezone = timezone
+        day = _local_day(now, tz)
+        day_start = _local_epoch(tz, day, 0)
+        day_end = _local_epoch(tz, day, MINUTES_PER_DAY)
+        tibber_cfg = getattr(self.config, "tibber", None)
+
+        if tibber_cfg is not None and tibber_cfg.enabled:
+            if self.price_engine is not None and self.price_engine.enabled:
+                plan = self._rebuild_priced(
+                    now, tibber_cfg, day_start, station_max_current, key
+                )
+            else:
+                plan = self._rebuild_tibber(
+                    now, tibber_cfg, day_start, station_max_current, key
+                )
+        else:
+            intervals = compile_schedule_intervals(
+                schedules, day, tz, station_max_current
+            )
+            plan = ChargePlan(
+                intervals, day_end, "schedule", key, "not within schedule"
+            )
+            self.logger.debug(
+                f"Compiled schedule plan for {day.isoformat()}: "
+                f"{sum(1 for i in intervals if i.allowed_current > 0)} window(s)"
+            )
+        self.plan = plan
+        return plan
+
+    def _rebuild_tibber(
+        self,
+        now: float,
+        tibber_cfg: Any,
+        day_start: float,
+        station_max_current: float,
+        key: Tuple[Any, ...],
+    ) -> ChargePlan:
+        if not tibber_cfg.access_token:
+            return ChargePlan(
+                [], now + 3600.0, "tibber", key, "No Tibber access token configured"
+            )
+        client: Optional[TibberClient] = refresh_tibber_prices(tibber_cfg)
+        if client is None:
+            return ChargePlan([], now + 60.0, "tibber", key, "Tibber unavailable")
+        # Re-evaluate when the client wants to refresh (next slot or backoff)
+        valid_until = client._cache_next_refresh
+        if valid_until <= now:
+            valid_until = now + 60.0
+
+        previous = self.plan
+        if (
+            previous is not None
+            and previous.source == "tibber"
+            and previous.key == key
+            and previous.curve_version == client.curve_version
+            and previous.intervals
+            and previous.intervals[0].end > day_start
+        ):
+            return previous.extended(valid_until)
+
+        intervals = compile_tibber_intervals(
+            client.plan_slots(), day_start, station_max_current
+        )
+        self.logger.debug(
+            f"Compiled Tibber plan: {len(intervals)} slot(s), "
+            f"{sum(1 for i in intervals if i.allowed_current > 0)} chargeable"
+        )
+        return ChargePlan(
+            intervals,
+            valid_until,
+            "tibber",
+            key,
+            "Could not fetch Tibber price",
+            client.curve_version,
+        )
+
+    def _rebuild_priced(
+        self,
+        now: float,
+        tibber_cfg: Any,
+        day_start: float,
+        station_max_current: float,
+        key: Tuple[Any, ...],
+    ) -> ChargePlan:
+        """Apply the Tibber strategy to the price engine's timeline."""
+        engine = self.price_engine
+        assert engine is not None
+        timeline = engine.get_timeline(now)
+        if timeline is None:
+            return ChargePlan([], now + 60.0, "prices", key, "No price data available")
+        valid_until = engine.next_refresh
+        if valid_until <= now:
+            valid_until = now + 60.0
+
+        previous = self.plan
+        if (
+            previous is not None
+            and previous.source == timeline.source
+            and previous.key == key
+            and previous.curve_version == engine.version
+            and previous.intervals
+            and previous.intervals[0].end > day_start
+        ):
+            return previous.extended(valid_until)
+
+        entries = [
+            {
+                "startsAt": datetime.fromtimestamp(p.start, pytz.utc).isoformat(),
+                "total": p.price,
+                "level": p.level or "NORMAL",
+            }
+            for p in timeline.points
+        ]
+        client = TibberClient.for_curve(tibber_cfg, entries)
+        intervals = compile_tibber_intervals(
+            client.plan_slots(), day_start, station_max_current
+        )
+        self.logger.debug(
+            f"Compiled {timeline.source} price plan: {len(intervals)} slot(s), "
+            f"{sum(1 for i in intervals if i.allowed_current > 0)} chargeable"
+        )
+        return ChargePlan(
+            intervals,
+            valid_until,
+            timeline.source,
+            key,
+            "No price for the current slot",
+            engine.version,
+        )
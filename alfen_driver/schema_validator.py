@@ -0,0 +1,457 @@
+"""Compile the configuration schema into a tree of check closures.
+
+``compile_schema`` walks the canonical schema (``config_schema``) once and
+turns every field into a closure with its type test, bounds, enum set and
+format check already resolved. Validating a document is then a single
+pass over its values with no schema lookups, and every failing field is
+reported (path, message, value, suggestion) instead of stopping at the
+first one.
+
+Schema keys used for validation, next to the UI keys (``title``, ``step``,
+``ui``, ``advanced``) that are ignored here:
+
+- ``type``: integer, number, string, boolean, enum, time, array, object,
+  list (a section holding ``items``)
+- ``min`` / ``max``, ``values`` (+ ``ignore_case``), ``format`` (ipv4,
+  timezone), ``nonempty``, ``required``
+- ``label``: noun used in messages (defaults to the title without its
+  unit), ``hint``: suggestion shown with every error of the field
+
+Example:
+    ```python
+    compiled = compile_schema(get_config_schema())
+    compiled.validate(config_dict, lambda *error: print(error))
+    ```
+"""
+
+import ipaddress
+import math
+import re
+from typing import Any, Callable, Collection, Dict, List, Optional, Tuple
+
+import pytz
+
+# report(field_path, message, value, suggestion)
+Report = Callable[[str, str, Any, Optional[str]], None]
+Check = Callable[[Any, str, Report], None]
+Predicate = Callable[[Any], bool]
+
+_TIMES = frozenset(
+    f"{hour:02d}:{minute:02d}" for hour in range(24) for minute in range(60)
+)
+_INT_ONLY = frozenset((int,))
+_UNIT_RE = re.compile(r"\s*\(.*\)$")
+_MISSING = object()
+
+_TYPE_NAMES = {
+    "integer": "an integer",
+    "number": "a number",
+    "string": "a string",
+    "boolean": "boolean",
+    "array": "a list",
+    "object": "a dictionary",
+}
+
+
+def is_valid_ip(value: Any) -> bool:
+    try:
+        ipaddress.ip_address(value)
+        return True
+    except (ValueError, TypeError):
+        return False
+
+
+def is_valid_timezone(value: Any) -> bool:
+    try:
+        pytz.timezone(value)
+        return True
+    except (pytz.UnknownTimeZoneError, AttributeError):
+        return False
+
+
+def is_valid_time(value: Any) -> bool:
+    """Zero-padded ``HH:MM``."""
+    return value.__class__ is str and value in _TIMES
+
+
+def compile_predicate(spec: Dict[str, Any]) -> Optional[Predicate]:
+    """Compile a fast ``valid(value)`` test, or None for complex fields.
+
+    Predicates only answer yes/no; when one fails, the field's full check
+    runs to produce the message. Valid documents (the common case) thus
+    never build paths or messages.
+    """
+    kind = spec.get("type", "string")
+    if kind in ("integer", "number"):
+        low = spec.get("min", float("-inf"))
+        high = spec.get("max", float("inf"))
+        if kind == "integer":
+            return lambda v: v.__class__ is int and low <= v <= high
+        isfinite = math.isfinite
+        return lambda v: (
+            v.__class__ is int or (v.__class__ is float and isfinite(v))
+        ) and (low <= v <= high)
+    if kind == "boolean":
+        return lambda v: v is True or v is False
+    if kind == "time":
+        return is_valid_time
+    if kind == "enum" and not spec.get("ignore_case"):
+        allowed = frozenset(v for v in spec.get("values", ()) if isinstance(v, str))
+        return lambda v: v.__class__ is str and v in allowed
+    if kind == "string" and "format" not in spec:
+        if spec.get("nonempty"):
+            return lambda v: v.__class__ is str and v != ""
+        return lambda v: v.__class__ is str
+    if kind == "array":
+        items = spec.get("items", {})
+        low, high = items.get("min"), items.get("max")
+        if (
+            items.get("type") == "integer"
+            and low is not None
+            and high is not None
+            and high - low < 64
+        ):
+            # Small enumerable ranges (weekdays, phases): set membership in C.
+            # The type test runs first so unhashable items never reach it.
+            members = frozenset(range(low, high + 1))
+            return lambda v: (
+                v.__class__ is list
+                and _INT_ONLY.issuperset(map(type, v))
+                and members.issuperset(v)
+            )
+        item = compile_predicate(items)
+        if item is not None:
+            return lambda v: v.__class__ is list and all(map(item, v))
+    return None
+
+
+def _object_predicate(
+    fields: Tuple[Tuple[str, Optional[Predicate], bool], ...],
+) -> Optional[Predicate]:
+    checks: List[Tuple[str, Predicate, bool]] = []
+    for field, valid, required in fields:
+        if valid is None:
+            return None
+        checks.append((field, valid, required))
+
+    def valid_object(value: Any) -> bool:
+        if value.__class__ is not dict:
+            return False
+        for field, valid, required in checks:
+            field_value = value.get(field, _MISSING)
+            if field_value is _MISSING:
+                if required:
+                    return False
+            elif not valid(field_value):
+                return False
+        return True
+
+    return valid_object
+
+
+def _is_type(kind: str) -> Callable[[Any], bool]:
+    # bool is an int subclass, but never a valid number in the config
+    if kind == "integer":
+        return lambda v: isinstance(v, int) and not isinstance(v, bool)
+    if kind == "number":
+        return lambda v: isinstance(v, (int, float)) and not isinstance(v, bool)
+    if kind == "boolean":
+        return lambda v: isinstance(v, bool)
+    if kind == "array":
+        return lambda v: isinstance(v, list)
+    if kind == "object":
+        return lambda v: isinstance(v, dict)
+    return lambda v: isinstance(v, str)
+
+
+def _label(name: str, spec: Dict[str, Any]) -> str:
+    label = spec.get("label") or _UNIT_RE.sub("", spec.get("title", "")) or name
+    return str(label)
+
+
+def _bounds_check(spec: Dict[str, Any], label: str, hint: Optional[str]) -> Check:
+    low: Optional[float] = spec.get("min")
+    high: Optional[float] = spec.get("max")
+    if low is not None and high is not None:
+        suggestion = hint or f"Use a value between {low} and {high}"
+    elif low is not None:
+        suggestion = hint or f"Use a value of at least {low}"
+    else:
+        suggestion = hint or f"Use a value of at most {high}"
+
+    def check(value: Any, path: str, report: Report) -> None:
+        # NaN compares False both ways, so it would pass the range tests
+        if isinstance(value, float) and not math.isfinite(value):
+            report(
+                path,
+                f"{label} must be a finite number, got {value}",
+                value,
+                suggestion,
+            )
+        elif low is not None and value < low:
+            if low == 0:
+                report(path, f"{label} cannot be negative: {value}", value, suggestion)
+            elif high is not None:
+                report(
+                    path,
+                    f"{label} {value} is out of valid range ({low}, {high})",
+                    value,
+                    suggestion,
+                )
+            else:
+                report(path, f"{label} {value} is below {low}", value, suggestion)
+        elif high is not None and value > high:
+            if low is not None:
+                report(
+                    path,
+                    f"{label} {value} is out of valid range ({low}, {high})",
+                    value,
+                    suggestion,
+                )
+            else:
+                report(path, f"{label} {value} is above {high}", value, suggestion)
+
+    return check
+
+
+def compile_field(name: str, spec: Dict[str, Any]) -> Check:
+    """Compile one field spec into ``check(value, path, report)``."""
+    kind = spec.get("type", "string")
+    label = _label(name, spec)
+    hint: Optional[str] = spec.get("hint")
+    checks: List[Check] = []
+
+    if kind == "object":
+        return _compile_object(name, spec)
+
+    if kind == "enum":
+        values = tuple(spec.get("values", ()))
+        allowed = frozenset(
+            v.upper() if isinstance(v, str) and spec.get("ignore_case") else v
+            for v in values
+        )
+        normalize: Callable[[Any], Any] = (
+            (lambda v: v.upper() if isinstance(v, str) else v)
+            if spec.get("ignore_case")
+            else (lambda v: v)
+        )
+        suggestion = hint or f"Use one of: {', '.join(str(v) for v in values)}"
+
+        def check_enum(value: Any, path: str, report: Report) -> None:
+            try:
+                ok = normalize(value) in allowed
+            except TypeError:  # unhashable
+                ok = False
+            if not ok:
+                report(path, f"Invalid {label.lower()}: '{value}'", value, suggestion)
+
+        return check_enum
+
+    if kind == "time":
+        suggestion = hint or "Use HH:MM format (e.g., '08:00' or '22:30')"
+
+        def check_time(value: Any, path: str, report: Report) -> None:
+            if not is_valid_time(value):
+                report(path, f"Invalid time format: '{value}'", value, suggestion)
+
+        return check_time
+
+    is_type = _is_type(kind)
+    type_hint = hint or f"Use {_TYPE_NAMES.get(kind, 'a string')} value"
+    type_message = f"{label} must be {_TYPE_NAMES.get(kind, 'a string')}, got "
+
+    if "min" in spec or "max" in spec:
+        checks.append(_bounds_check(spec, label, hint))
+    if spec.get("nonempty"):
+        empty_hint = hint or f"Specify a {label.lower()}"
+
+        def check_nonempty(value: Any, path: str, report: Report) -> None:
+            if not value:
+                report(path, f"{label} cannot be empty", value, empty_hint)
+
+        checks.append(check_nonempty)
+    fmt = spec.get("format")
+    if fmt == "ipv4":
+        ip_hint = hint or "Use a valid IPv4 address format (e.g., '192.168.1.100')"
+
+        def check_ip(value: Any, path: str, report: Report) -> None:
+            if not is_valid_ip(value):
+                report(path, f"Invalid IP address format: '{value}'", value, ip_hint)
+
+        checks.append(check_ip)
+    elif fmt == "timezone":
+        tz_hint = hint or (
+            "Use a valid timezone like 'UTC', 'Europe/Amsterdam', "
+            "or 'America/New_York'"
+        )
+
+        def check_timezone(value: Any, path: str, report: Report) -> None:
+            if not is_valid_timezone(value):
+                report(path, f"Invalid timezone: '{value}'", value, tz_hint)
+
+        checks.append(check_timezone)
+    if kind == "array":
+        checks.append(_compile_items(spec))
+
+    value_checks = tuple(checks)
+    valid = compile_predicate(spec) or (lambda v: False)
+
+    def check_field(value: Any, path: str, report: Report) -> None:
+        if valid(value):
+            return
+        if not is_type(value):
+            report(path, type_message + type(value).__name__, value, type_hint)
+            return
+        for value_check in value_checks:
+            value_check(value, path, report)
+
+    return check_field
+
+
+def _compile_items(spec: Dict[str, Any]) -> Check:
+    item_spec = spec.get("items", {})
+    item_label = item_spec.get("label", "item")
+    suggestion = item_spec.get("hint") or spec.get("hint")
+    item_check = compile_field(item_label, item_spec)
+
+    def check_items(values: List[Any], path: str, report: Report) -> None:
+        # Item errors are reported against the list, naming the bad value
+        failed: List[Optional[str]] = []
+
+        def collect(path: str, message: str, value: Any, hint: Optional[str]) -> None:
+            failed.append(hint)
+
+        for value in values:
+            item_check(value, path, collect)
+            if failed:
+                report(
+                    path,
+                    f"Invalid {item_label} value: {value!r}",
+                    value,
+                    suggestion or failed[0],
+                )
+                failed.clear()
+
+    return check_items
+
+
+def _compile_object(name: str, spec: Dict[str, Any]) -> Check:
+    label = _label(name, spec)
+    fields = tuple(
+        (
+            field,
+            compile_predicate(field_spec) or (lambda v: False),
+            compile_field(field, field_spec),
+            bool(field_spec.get("required")),
+        )
+        for field, field_spec in spec.get("fields", {}).items()
+    )
+    required_hints = {
+        field: field_spec.get("hint") or f"Add the '{field}' field"
+        for field, field_spec in spec.get("fields", {}).items()
+    }
+    labels = {
+        field: _label(field, field_spec)
+        for field, field_spec in spec.get("fields", {}).items()
+    }
+
+    def check_object(value: Any, path: str, report: Report) -> None:
+        if not isinstance(value, dict):
+            report(
+                path,
+                f"{label} must be a dictionary, got {type(value).__name__}",
+                value,
+                f"Use a mapping of {label.lower()} settings",
+            )
+            return
+        for field, valid, check, required in fields:
+            field_value = value.get(field, _MISSING)
+            if field_value is _MISSING:
+                if required:
+                    report(
+                        f"{path}.{field}",
+                        f"{labels[field]} is required",
+                        None,
+                        required_hints[field],
+                    )
+            elif not valid(field_value):
+                check(field_value, f"{path}.{field}", report)
+
+    return check_object
+
+
+def _compile_list_section(name: str, spec: Dict[str, Any]) -> Check:
+    label = _label(name, spec)
+    item_spec = {"title": f"{label} item", **spec["item"]}
+    item_check = _compile_object(name, item_spec)
+    item_valid = _object_predicate(
+        tuple(
+            (field, compile_predicate(field_spec), bool(field_spec.get("required")))
+            for field, field_spec in item_spec.get("fields", {}).items()
+        )
+    ) or (lambda v: False)
+
+    def check_list(value: Any, path: str, report: Report) -> None:
+        if not isinstance(value, dict):
+            report(
+                path,
+                f"{label} must be a dictionary, got {type(value).__name__}",
+                value,
+                "Use a mapping with an 'items' list",
+            )
+            return
+        items = value.get("items", [])
+        if not isinstance(items, list):
+            report(
+                f"{path}.items",
+                f"{label} items must be a list, got {type(items).__name__}",
+                items,
+                f"Use a list of {label.lower()} entries",
+            )
+            return
+        for index, item in enumerate(items):
+            if not item_valid(item):
+                item_check(item, f"{path}.items[{index}]", report)
+
+    return check_list
+
+
+class CompiledSchema:
+    """Precompiled checks for each top-level key of a configuration."""
+
+    def __init__(self, sections: Dict[str, Check], required: Tuple[str, ...]) -> None:
+        self.sections = sections
+        self.required = required
+
+    def validate(
+        self,
+        config: Dict[str, Any],
+        report: Report,
+        sections: Optional[Collection[str]] = None,
+    ) -> None:
+        """Check ``config`` (only ``sections`` when given) in one pass."""
+        for name in self.required:
+            if name not in config:
+                report(
+                    name,
+                    f"Required configuration section '{name}' is missing",
+                    None,
+                    f"Add a '{name}' section to your configuration file",
+                )
+        for name, check in self.sections.items():
+            if name in config and (sections is None or name in sections):
+                check(config[name], name, report)
+
+
+def compile_schema(schema: Dict[str, Any]) -> CompiledSchema:
+    """Compile a ``{"sections": {...}}`` schema into a ``CompiledSchema``."""
+    compiled: Dict[str, Check] = {}
+    for name, spec in schema["sections"].items():
+        if spec.get("type") == "list":
+            compiled[name] = _compile_list_section(name, spec)
+        else:
+            compiled[name] = compile_field(name, spec)
+    required = tuple(
+        name for name, spec in schema["sections"].items() if spec.get("required")
+    )
+    return CompiledSchema(compiled, required)
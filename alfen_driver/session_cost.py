@@ -0,0 +1,196 @@
+"""Streaming per-slot cost integration for charging sessions.
+
+Each tick the meter's energy delta is priced with the price slot active at
+that moment and added to running totals, so the session cost is exact even
+when the tariff changes mid-session. A tick costs O(1): the price source is
+only consulted again once the cached slot has ended. Memory is O(slots).
+"""
+
+import dataclasses
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .constants import SessionDefaults
+
+# (slot_start, slot_end, price_per_kwh) for the slot covering a timestamp
+PriceSlot = Tuple[float, float, float]
+PriceLookup = Callable[[float], Optional[PriceSlot]]
+
+
+@dataclasses.dataclass
+class SlotCost:
+    """Energy and cost accumulated within one price slot.
+
+    Attributes:
+        start: Slot start (epoch seconds).
+        end: Slot end (epoch seconds).
+        price: Price per kWh applied to this slot.
+        energy_kwh: Energy delivered within the slot.
+        cost: Cost of that energy.
+    """
+
+    start: float
+    end: float
+    price: float
+    energy_kwh: float = 0.0
+    cost: float = 0.0
+
+
+class MeterReadFilter:
+    """Keeps glitched meter reads from moving an energy baseline.
+
+    A reading that goes backwards or jumps by more than
+    ``SessionDefaults.METER_MAX_TICK_KWH`` is held back: a one-off glitch
+    (e.g. a failed register read decoded as 0.0) is dropped, while a jump the
+    next reading confirms (meter reset, long polling gap) re-bases without
+    the jump itself being counted.
+    """
+
+    __slots__ = ("_pending",)
+
+    def __init__(self) -> None:
+        self._pending: Optional[float] = None
+
+    def delta(self, baseline: float, reading: float) -> Optional[float]:
+        """Energy to count when moving from ``baseline`` to ``reading``.
+
+        Returns None while the reading is held back; the caller then keeps
+        its baseline. Otherwise the caller moves the baseline to ``reading``.
+        """
+        limit = SessionDefaults.METER_MAX_TICK_KWH
+        pending = self._pending
+        self._pending = None
+        if 0 <= reading - baseline <= limit:
+            return reading - baseline
+        if pending is not None and 0 <= reading - pending <= limit:
+            return reading - pending
+        self._pending = reading
+        return None
+
+
+class SessionCostIntegrator:
+    """Running cost of one session, priced slot by slot."""
+
+    __slots__ = (
+        "energy_kwh",
+        "cost",
+        "unpriced_energy_kwh",
+        "slots",
+        "_last_energy_kwh",
+        "_reads",
+        "_summary",
+    )
+
+    def __init__(self, start_energy_kwh: float) -> None:
+        self.energy_kwh = 0.0
+        self.cost = 0.0
+        # Energy delivered while no price was known (not included in cost)
+        self.unpriced_energy_kwh = 0.0
+        self.slots: List[SlotCost] = []
+        self._last_energy_kwh = start_energy_kwh
+        self._reads = MeterReadFilter()
+        self._summary: Tuple[Dict[str, Any], ...] = ()
+
+    def add(self, total_energy_kwh: float, now: float, lookup: PriceLookup) -> None:
+        """Price the meter delta since the previous call and accumulate it.
+
+        Args:
+            total_energy_kwh: Lifetime meter reading in kWh.
+            now: Timestamp of the reading (epoch seconds).
+            lookup: Returns the price slot covering a timestamp, or None.
+        """
+        delta = self._reads.delta(self._last_energy_kwh, total_energy_kwh)
+        if delta is None:
+            # Glitched read: keep pricing from the last trusted reading
+            return
+        self._last_energy_kwh = total_energy_kwh
+        if delta <= 0:
+            return
+        self.energy_kwh += delta
+
+        slot = self.slots[-1] if self.slots else None
+        if slot is None or not slot.start <= now < slot.end:
+            priced = lookup(now)
+            if priced is None:
+                self.unpriced_energy_kwh += delta
+                return
+            start, end, price = priced
+            slot = SlotCost(start, end, float(price))
+            self.slots.append(slot)
+
+        slot_cost = delta * slot.price
+        slot.energy_kwh += delta
+        slot.cost += slot_cost
+        self.cost += slot_cost
+
+    def slot_summary(self, include_open: bool = False) -> Tuple[Dict[str, Any], ...]:
+        """Rounded per-slot breakdown for the status snapshot.
+
+        The open (last) slot is left out unless ``include_open`` is set, e.g.
+        for a finished session; its running figures are already in ``cost``.
+        The tuple is therefore rebuilt once per slot, not once per tick, and
+        is the same object in between.
+        """
+        count = len(self.slots) if include_open else max(len(self.slots) - 1, 0)
+        if count != len(self._summary):
+            self._summary = tuple(
+                {
+                    "start_ts": slot.start,
+                    "end_ts": slot.end,
+                    "price": slot.price,
+                    "energy_kwh": round(slot.energy_kwh, 3),
+                    "cost": round(slot.cost, 4),
+                }
+                for slot in self.slots[:count]
+            )
+        return self._summary
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize for persistence."""
+        return {
+            "energy_kwh": self.energy_kwh,
+            "cost": self.cost,
+            "unpriced_energy_kwh": self.unpriced_energy_kwh,
+            "last_energy_kwh": self._last_energy_kwh,
+            "slots": [dataclasses.asdict(s) for s in self.slots],
+        }
+
+    def checkpoint(self) -> List[Any]:
+        """Compact running state for journal checkpoints.
+
+        Totals, meter baseline and the open slot; closed slots are already in
+        the last snapshot or an earlier checkpoint's open slot.
+        """
+        slot = self.slots[-1] if self.slots else None
+        return [
+            self.energy_kwh,
+            self.cost,
+            self.unpriced_energy_kwh,
+            self._last_energy_kwh,
+            dataclasses.astuple(slot) if slot is not None else None,
+        ]
+
+    def restore_checkpoint(self, data: List[Any]) -> None:
+        """Apply ``checkpoint`` output on top of the restored state."""
+        energy, cost, unpriced, last_energy, slot = data
+        self.energy_kwh = float(energy)
+        self.cost = float(cost)
+        self.unpriced_energy_kwh = float(unpriced)
+        self._last_energy_kwh = float(last_energy)
+        if slot is not None:
+            open_slot = SlotCost(*slot)
+            if self.slots and self.slots[-1].start == open_slot.start:
+                self.slots[-1] = open_slot
+            else:
+                self.slots.append(open_slot)
+
+    @classmethod
+    def from_dict(
+        cls, data: Dict[str, Any], start_energy_kwh: float
+    ) -> "SessionCostIntegrator":
+        """Restore from ``to_dict`` output (tolerates missing keys)."""
+        integrator = cls(float(data.get("last_energy_kwh", start_energy_kwh)))
+        integrator.energy_kwh = float(data.get("energy_kwh", 0.0))
+        integrator.cost = float(data.get("cost", 0.0))
+        integrator.unpriced_energy_kwh = float(data.get("unpriced_energy_kwh", 0.0))
+        integrator.slots = [SlotCost(**s) for s in data.get("slots", [])]
+        return integrator
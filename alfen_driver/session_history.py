@@ -0,0 +1,206 @@
+"""Durable, append-only charging session history.
+
+Finished sessions are inserted into a small SQLite database in WAL mode.
+Rows are never updated, so a crash can at worst lose the session that was
+being written, never corrupt earlier history. Indexes on start time and on
+``(month, id)`` keep paginated queries fast even on a GX device.
+
+Example:
+    ```python
+    history = SessionHistory("/data/alfen_driver_sessions.db")
+    page = history.query(limit=50, month="2025-01")
+    older = history.query(limit=50, before=page["next_before"])
+    ```
+"""
+
+import dataclasses
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from .logging_utils import get_logger
+
+_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS sessions (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        start_ts REAL NOT NULL,
+        end_ts REAL NOT NULL,
+        month TEXT NOT NULL,
+        start_energy_kwh REAL NOT NULL,
+        end_energy_kwh REAL NOT NULL,
+        energy_kwh REAL NOT NULL,
+        peak_power_w REAL NOT NULL,
+        cost REAL,
+        mode INTEGER
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_sessions_start ON sessions(start_ts)",
+    "CREATE INDEX IF NOT EXISTS idx_sessions_month ON sessions(month, id)",
+)
+
+_COLUMNS = (
+    "id",
+    "start_ts",
+    "end_ts",
+    "month",
+    "start_energy_kwh",
+    "end_energy_kwh",
+    "energy_kwh",
+    "peak_power_w",
+    "cost",
+    "mode",
+)
+
+
+@dataclasses.dataclass(frozen=True)
+class SessionRecord:
+    """One finished charging session.
+
+    Attributes:
+        start_ts: Session start (epoch seconds).
+        end_ts: Session end (epoch seconds).
+        start_energy_kwh: Meter reading at start.
+        end_energy_kwh: Meter reading at end.
+        peak_power_w: Highest charging power seen during the session.
+        cost: Integrated session cost, or None if no price was known.
+        mode: Charging mode (EVC_MODE value) when the session ended.
+    """
+
+    start_ts: float
+    end_ts: float
+    start_energy_kwh: float
+    end_energy_kwh: float
+    peak_power_w: float = 0.0
+    cost: Optional[float] = None
+    mode: Optional[int] = None
+
+    @property
+    def energy_kwh(self) -> float:
+        return max(0.0, self.end_energy_kwh - self.start_energy_kwh)
+
+    @property
+    def month(self) -> str:
+        """Local calendar month of the session start (``YYYY-MM``)."""
+        return datetime.fromtimestamp(self.start_ts).strftime("%Y-%m")
+
+
+class SessionHistory:
+    """SQLite-backed session log with paginated queries.
+
+    The connection is shared between the GLib thread (appends) and the web
+    thread (queries) and serialized with a lock; every statement is short.
+    """
+
+    MAX_PAGE_SIZE = 500
+
+    def __init__(self, path: str = "/data/alfen_driver_sessions.db") -> None:
+        self.path = path
+        self.logger = get_logger("alfen_driver.session_history")
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        try:
+            conn = sqlite3.connect(path, check_same_thread=False, timeout=5.0)
+            conn.execute("PRAGMA journal_mode=WAL")
+            # Sessions are rare; make each committed session durable
+            conn.execute("PRAGMA synchronous=FULL")
+            for statement in _SCHEMA:
+                conn.execute(statement)
+            conn.commit()
+            self._conn = conn
+        except sqlite3.Error as e:
+            self.logger.warning(f"Session history disabled ({path}): {e}")
+
+    @property
+    def available(self) -> bool:
+        return self._conn is not None
+
+    def append(self, record: SessionRecord) -> Optional[int]:
+        """Insert a finished session and return its id (None on failure)."""
+        if self._conn is None:
+            return None
+        try:
+            with self._lock:
+                cursor = self._conn.execute(
+                    "INSERT INTO sessions (start_ts, end_ts, month, start_energy_kwh,"
+                    " end_energy_kwh, energy_kwh, peak_power_w, cost, mode)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        record.start_ts,
+                        record.end_ts,
+                        record.month,
+                        record.start_energy_kwh,
+                        record.end_energy_kwh,
+                        record.energy_kwh,
+                        record.peak_power_w,
+                        record.cost,
+                        record.mode,
+                    ),
+                )
+                self._conn.commit()
+                return cursor.lastrowid
+        except sqlite3.Error as e:
+            self.logger.error(f"Failed to append session to history: {e}")
+            return None
+
+    def query(
+        self,
+        limit: int = 50,
+        before: Optional[int] = None,
+        month: Optional[str] = None,
+        start_ts: Optional[float] = None,
+        end_ts: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        """Return a page of sessions, newest first.
+
+        Args:
+            limit: Page size (capped at ``MAX_PAGE_SIZE``).
+            before: Only sessions with an id below this cursor.
+            month: Only sessions starting in this ``YYYY-MM`` month.
+            start_ts: Only sessions starting at or after this epoch.
+            end_ts: Only sessions starting before this epoch.
+
+        Returns:
+            ``{"items": [...], "next_before": id or None}``; pass
+            ``next_before`` back as ``before`` to fetch the next page.
+        """
+        if self._conn is None:
+            return {"items": [], "next_before": None}
+        limit = max(1, min(int(limit), self.MAX_PAGE_SIZE))
+        clauses: List[str] = []
+        params: List[Any] = []
+        if month:
+            clauses.append("month = ?")
+            params.append(month)
+        if before is not None:
+            clauses.append("id < ?")
+            params.append(int(before))
+        if start_ts is not None:
+            clauses.append("start_ts >= ?")
+            params.append(float(start_ts))
+        if end_ts is not None:
+            clauses.append("start_ts < ?")
+            params.append(float(end_ts))
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        # Only fixed clause strings are interpolated; values are bound
+        sql = (
+            f"SELECT {', '.join(_COLUMNS)} FROM sessions{where}"  # noqa: S608 # nosec B608
+            " ORDER BY id DESC LIMIT ?"
+        )
+        params.append(limit + 1)
+        try:
+            with self._lock:
+                rows = self._conn.execute(sql, params).fetchall()
+        except sqlite3.Error as e:
+            self.logger.error(f"Session history query failed: {e}")
+            return {"items": [], "next_before": None}
+        items = [dict(zip(_COLUMNS, row)) for row in rows[:limit]]
+        next_before = items[-1]["id"] if len(rows) > limit else None
+        return {"items": items, "next_before": next_before}
+
+    def close(self) -> None:
+        if self._conn is not None:
+            with self._lock:
+                self._conn.close()
+                self._conn = None
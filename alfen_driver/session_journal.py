@@ -0,0 +1,124 @@
+"""Write-ahead journal of charging session events.
+
+The journal is a JSON-lines file. Its first line is an optional snapshot
+of the full session manager state (written by compaction); every further
+line is one event::
+
+    {"ev": "candidate", "ts": 1700000000.0, "e": 1234.5}
+    {"ev": "start", "ts": 1700000005.0, "e": 1234.5}
+    {"ev": "checkpoint", "ts": 1700000300.0, "e": 1235.6, "p": 11040.0}
+    {"ev": "end", "ts": 1700003600.0, "e": 1245.0}
+
+Events are appended and fsynced as they happen, so a power loss can lose
+at most the event being written (a torn last line is ignored on replay).
+Compaction rewrites the file as a single snapshot line via temp file,
+fsync and rename; recovery therefore replays only the events since the
+last compaction.
+
+Example:
+    ```python
+    journal = SessionJournal("/data/alfen_driver_sessions.journal")
+    state, events = journal.load()
+    journal.append("start", time.time(), e=1234.5)
+    journal.compact(manager.get_state())
+    ```
+"""
+
+import json
+import os
+from pathlib import Path
+from typing import IO, Any, Dict, List, Optional, Tuple
+
+from .logging_utils import get_logger
+from .persistence import fsync_dir
+
+SNAPSHOT = "snapshot"
+
+
+class SessionJournal:
+    """Append-only session event log with snapshot compaction."""
+
+    def __init__(self, path: str = "/data/alfen_driver_sessions.journal") -> None:
+        self.path = Path(path)
+        self.logger = get_logger("alfen_driver.session_journal")
+        self.events_since_compaction = 0
+        self.bytes_written = 0
+        self._file: Optional[IO[str]] = None
+
+    @property
+    def exists(self) -> bool:
+        return self.path.exists()
+
+    def load(self) -> Tuple[Optional[Dict[str, Any]], List[Dict[str, Any]]]:
+        """Read the last snapshot and the events recorded after it.
+
+        Returns:
+            ``(state, events)``; ``state`` is None if the journal has never
+            been compacted.
+        """
+        state: Optional[Dict[str, Any]] = None
+        events: List[Dict[str, Any]] = []
+        try:
+            with open(self.path) as f:
+                lines = f.readlines()
+        except FileNotFoundError:
+            return None, []
+        except OSError as e:
+            self.logger.error(f"Failed to read session journal: {e}")
+            return None, []
+        for number, line in enumerate(lines, 1):
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                # Torn write from a power loss; only the tail can be affected
+                self.logger.warning(
+                    f"Ignoring unreadable session journal line {number}"
+                )
+                continue
+            if entry.get("ev") == SNAPSHOT:
+                state = entry.get("state") or {}
+                events = []
+            else:
+                events.append(entry)
+        self.events_since_compaction = len(events)
+        return state, events
+
+    def append(self, event: str, ts: float, **fields: Any) -> None:
+        """Durably append one event."""
+        line = json.dumps({"ev": event, "ts": round(ts, 3), **fields}) + "\n"
+        try:
+            if self._file is None:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                self._file = open(self.path, "a")
+            self._file.write(line)
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self.events_since_compaction += 1
+            self.bytes_written += len(line)
+        except OSError as e:
+            self.logger.error(f"Failed to append to session journal: {e}")
+
+    def compact(self, state: Dict[str, Any]) -> bool:
+        """Replace the journal with a single snapshot of ``state``."""
+        line = json.dumps({"ev": SNAPSHOT, "state": state}) + "\n"
+        temp_path = self.path.with_suffix(".tmp")
+        try:
+            self.close()
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(temp_path, "w") as f:
+                f.write(line)
+                f.flush()
+                os.fsync(f.fileno())
+            temp_path.replace(self.path)
+            fsync_dir(self.path.parent)
+        except OSError as e:
+            self.logger.error(f"Failed to compact session journal: {e}")
+            return False
+        self.events_since_compaction = 0
+        self.bytes_written += len(line)
+        return True
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
@@ -2,9 +2,13 @@
 
 import logging
 from datetime import datetime
-from typing import Any, Dict, Optional
+from typing import Any, Callable, Dict, List, Optional
 
 from .constants import SessionDefaults
+from .energy_attribution import EnergyAttribution, EnergyFlows
+from .session_cost import MeterReadFilter, PriceLookup, SessionCostIntegrator
+from .session_journal import SessionJournal
+from .session_stats import SessionStatsRollup
 
 logger = logging.getLogger(__name__)
 
@@ -12,12 +16,28 @@ logger = logging.getLogger(__name__)
 class ChargingSession:
     """Represents a single charging session."""
 
+    __slots__ = (
+        "start_time",
+        "start_energy_kwh",
+        "end_time",
+        "end_energy_kwh",
+        "current_energy_kwh",
+        "peak_power_w",
+        "cost",
+        "attribution",
+        "reads",
+    )
+
     def __init__(self, start_energy_kwh: float, start_time: Optional[datetime] = None):
         self.start_time = start_time or datetime.now()
         self.start_energy_kwh = start_energy_kwh
         self.end_time: Optional[datetime] = None
         self.end_energy_kwh: Optional[float] = None
         self.current_energy_kwh: float = start_energy_kwh  # Track current energy
+        self.peak_power_w: float = 0.0
+        self.cost = SessionCostIntegrator(start_energy_kwh)
+        self.attribution = EnergyAttribution()
+        self.reads = MeterReadFilter()
 
     @property
     def duration_seconds(self) -> float:
@@ -44,21 +64,47 @@ class ChargingSession:
 class ChargingSessionManager:
     """Manages charging sessions and statistics."""
 
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        on_session_end: Optional[Callable[[ChargingSession], None]] = None,
+        journal: Optional[SessionJournal] = None,
+        stats: Optional[SessionStatsRollup] = None,
+    ) -> None:
+        self.on_session_end = on_session_end
+        self.journal = journal
+        self.stats = stats
+        self._last_tick: Optional[datetime] = None
+        self._checkpoint_energy_kwh = 0.0
         self.current_session: Optional[ChargingSession] = None
         self.last_session: Optional[ChargingSession] = None
         self.total_sessions = 0
         self.total_energy_kwh = 0.0
         self._last_power = 0.0
         self._last_energy_kwh = 0.0
+        self._reads = MeterReadFilter()
         # Candidate session start tracking
         self._candidate_start_energy_kwh: Optional[float] = None
         self._candidate_start_time: Optional[datetime] = None
         # Graceful end tracking to avoid flapping
         self._not_charging_since: Optional[datetime] = None
 
-    def update(self, power_w: float, total_energy_kwh: float) -> None:
-        """Update session state based on power and energy readings."""
+    def update(
+        self,
+        power_w: float,
+        total_energy_kwh: float,
+        price_lookup: Optional[PriceLookup] = None,
+        flows: Optional[EnergyFlows] = None,
+    ) -> None:
+        """Update session state based on power and energy readings.
+
+        Args:
+            power_w: Current charging power in watts.
+            total_energy_kwh: Lifetime meter reading in kWh.
+            price_lookup: Optional price slot source; when given, the energy
+                delta of an active session is priced each tick.
+            flows: Optional system flows used to split the energy delta of an
+                active session into solar, battery and grid.
+        """
         # Consider charging if power > 100W (to avoid noise)
         charging = power_w > 100
 
@@ -70,6 +116,17 @@ class ChargingSessionManager:
 
         now = datetime.now()
 
+        # Price and attribute this tick's energy before the session can end
+        cost = 0.0
+        solar_kwh = 0.0
+        session = self.current_session
+        if session is not None:
+            cost_before = session.cost.cost
+            if price_lookup is not None:
+                session.cost.add(total_energy_kwh, now.timestamp(), price_lookup)
+            cost = session.cost.cost - cost_before
+            solar_kwh = self._attribute(session, total_energy_kwh, power_w, flows)
+
         if charging:
             # Reset end delay timer
             self._not_charging_since = None
@@ -79,6 +136,7 @@ class ChargingSessionManager:
                 if self._candidate_start_energy_kwh is None:
                     self._candidate_start_energy_kwh = total_energy_kwh
                     self._candidate_start_time = now
+                    self._journal("candidate", now, e=total_energy_kwh)
 
                 # Confirm start if enough energy has accumulated OR enough time has passed
                 energy_since_candidate = total_energy_kwh - (
@@ -117,18 +175,89 @@ class ChargingSessionManager:
                     self._end_session(total_energy_kwh)
                     self._not_charging_since = None
 
-        # Update current energy for active session
         if self.current_session is not None:
-            self.current_session.current_energy_kwh = total_energy_kwh
+            if session is None:
+                # Confirmed this tick: attribute the energy since the candidate
+                solar_kwh += self._attribute(
+                    self.current_session, total_energy_kwh, power_w, flows
+                )
+            if power_w > self.current_session.peak_power_w:
+                self.current_session.peak_power_w = power_w
+            if (
+                total_energy_kwh - self._checkpoint_energy_kwh
+                >= SessionDefaults.JOURNAL_CHECKPOINT_KWH
+            ):
+                self._checkpoint_energy_kwh = total_energy_kwh
+                self._journal(
+                    "checkpoint",
+                    now,
+                    e=total_energy_kwh,
+                    p=self.current_session.peak_power_w,
+                    a=self._attribution_fields(self.current_session),
+                    c=self.current_session.cost.checkpoint(),
+                )
+                if (
+                    self.journal is not None
+                    and self.journal.events_since_compaction
+                    >= SessionDefaults.JOURNAL_COMPACT_EVENTS
+                ):
+                    self.compact_journal()
+
+        energy = self._reads.delta(self._last_energy_kwh, total_energy_kwh)
+        if energy is not None:
+            self._last_energy_kwh = total_energy_kwh
+        if self.stats is not None:
+            self._add_tick_stats(now, charging, energy, cost, solar_kwh)
 
         self._last_power = power_w
-        self._last_energy_kwh = total_energy_kwh
+        self._last_tick = now
+
+    @staticmethod
+    def _attribute(
+        session: ChargingSession,
+        total_energy_kwh: float,
+        power_w: float,
+        flows: Optional[EnergyFlows],
+    ) -> float:
+        """Split the session's new energy by source; returns the solar part."""
+        energy = session.reads.delta(session.current_energy_kwh, total_energy_kwh)
+        if energy is None:
+            # Glitched read: keep the last trusted reading as the baseline
+            return 0.0
+        session.current_energy_kwh = total_energy_kwh
+        return session.attribution.add(energy, power_w, flows)
+
+    def _add_tick_stats(
+        self,
+        now: datetime,
+        charging: bool,
+        energy_kwh: Optional[float],
+        cost: float,
+        solar_kwh: float,
+    ) -> None:
+        """Feed this tick's meter delta and charging time into the rollup.
+
+        ``energy_kwh`` is None for a held-back meter read; cost and solar are
+        then dropped too, so the buckets stay consistent with their energy.
+        """
+        assert self.stats is not None
+        if energy_kwh is None:
+            energy_kwh = cost = solar_kwh = 0.0
+        seconds = 0.0
+        if charging and self._last_tick is not None:
+            seconds = min(
+                max(0.0, (now - self._last_tick).total_seconds()),
+                SessionDefaults.STATS_MAX_TICK_SECONDS,
+            )
+        self.stats.add_tick(now, energy_kwh, cost, solar_kwh, charging_seconds=seconds)
 
     def _start_session(self, start_energy_kwh: float) -> None:
         """Start a new charging session."""
         logger.info(f"Starting new charging session at {start_energy_kwh:.2f} kWh")
         self.current_session = ChargingSession(start_energy_kwh)
         self.total_sessions += 1
+        self._checkpoint_energy_kwh = start_energy_kwh
+        self._journal("start", self.current_session.start_time, e=start_energy_kwh)
 
     def _end_session(self, end_energy_kwh: float) -> None:
         """End the current charging session."""
@@ -147,6 +276,99 @@ class ChargingSessionManager:
         self.total_energy_kwh += energy_delivered
         self.last_session = self.current_session
         self.current_session = None
+        self._journal("end", self.last_session.end_time, e=end_energy_kwh)
+        if self.stats is not None and self.last_session.end_time is not None:
+            self.stats.add_session(self.last_session.end_time)
+
+        if self.on_session_end is not None:
+            try:
+                self.on_session_end(self.last_session)
+            except Exception as e:
+                logger.error(f"Session end handler failed: {e}")
+        # A finished session needs no replay; fold it into the snapshot
+        self.compact_journal()
+
+    def _journal(self, event: str, at: Optional[datetime], **fields: Any) -> None:
+        if self.journal is not None:
+            ts = at.timestamp() if at is not None else 0.0
+            self.journal.append(event, ts, **fields)
+
+    @staticmethod
+    def _attribution_fields(session: ChargingSession) -> List[float]:
+        split = session.attribution
+        return [
+            round(split.solar_kwh, 4),
+            round(split.battery_kwh, 4),
+            round(split.grid_kwh, 4),
+        ]
+
+    def compact_journal(self) -> None:
+        """Rewrite the journal as a snapshot of the current state."""
+        if self.journal is not None:
+            self.journal.compact(self.get_state())
+
+    def recover_from_journal(self) -> bool:
+        """Restore state from the journal snapshot plus events replayed after it.
+
+        Returns:
+            False if there is no journal to recover from.
+        """
+        if self.journal is None or not self.journal.exists:
+            return False
+        state, events = self.journal.load()
+        if state:
+            self.restore_state(state)
+        for event in events:
+            try:
+                self._replay(event)
+            except (KeyError, TypeError, ValueError) as e:
+                logger.warning(f"Skipping bad session journal event {event}: {e}")
+        if events:
+            session = self.current_session
+            logger.info(
+                f"Replayed {len(events)} session journal events"
+                + (
+                    f"; active session at {session.energy_delivered_kwh:.2f} kWh"
+                    if session is not None
+                    else ""
+                )
+            )
+        # Start this run from a clean snapshot (also drops a torn tail)
+        self.compact_journal()
+        return True
+
+    def _replay(self, event: Dict[str, Any]) -> None:
+        kind = event["ev"]
+        at = datetime.fromtimestamp(float(event["ts"]))
+        energy = float(event["e"])
+        if kind == "candidate":
+            self._candidate_start_energy_kwh = energy
+            self._candidate_start_time = at
+        elif kind == "start":
+            self.current_session = ChargingSession(energy, at)
+            self.total_sessions += 1
+            self._candidate_start_energy_kwh = None
+            self._candidate_start_time = None
+            self._checkpoint_energy_kwh = energy
+        elif kind == "checkpoint" and self.current_session is not None:
+            self.current_session.current_energy_kwh = energy
+            self.current_session.peak_power_w = max(
+                self.current_session.peak_power_w, float(event.get("p", 0.0))
+            )
+            if event.get("a"):
+                self.current_session.attribution = EnergyAttribution(*event["a"])
+            if event.get("c"):
+                self.current_session.cost.restore_checkpoint(event["c"])
+            self._checkpoint_energy_kwh = energy
+        elif kind == "end" and self.current_session is not None:
+            session = self.current_session
+            session.end_energy_kwh = energy
+            session.current_energy_kwh = energy
+            session.end_time = at
+            self.total_energy_kwh += session.energy_delivered_kwh
+            self.last_session = session
+            self.current_session = None
+        self._last_energy_kwh = energy
 
     def get_session_stats(self) -> Dict[str, Any]:
         """Get current session statistics."""
@@ -161,6 +383,7 @@ class ChargingSessionManager:
                 {
                     "session_duration_min": self.current_session.duration_seconds / 60,
                     "session_energy_kwh": self.current_session.energy_delivered_kwh,
+                    **self._attribution_stats("session", self.current_session),
                 }
             )
 
@@ -170,11 +393,22 @@ class ChargingSessionManager:
                     "last_session_duration_min": self.last_session.duration_seconds
                     / 60,
                     "last_session_energy_kwh": self.last_session.energy_delivered_kwh,
+                    **self._attribution_stats("last_session", self.last_session),
                 }
             )
 
         return stats
 
+    @staticmethod
+    def _attribution_stats(prefix: str, session: ChargingSession) -> Dict[str, Any]:
+        split = session.attribution
+        return {
+            f"{prefix}_solar_kwh": split.solar_kwh,
+            f"{prefix}_battery_kwh": split.battery_kwh,
+            f"{prefix}_grid_kwh": split.grid_kwh,
+            f"{prefix}_solar_share": split.solar_share,
+        }
+
     def restore_state(self, state: Dict[str, Any]) -> None:
         """Restore session manager state from persisted data."""
         self.total_sessions = state.get("total_sessions", 0)
@@ -191,6 +425,16 @@ class ChargingSessionManager:
             self.current_session.current_energy_kwh = session_data.get(
                 "current_energy_kwh", session_data["start_energy_kwh"]
             )
+            self.current_session.peak_power_w = session_data.get("peak_power_w", 0.0)
+            self._checkpoint_energy_kwh = self.current_session.current_energy_kwh
+            if session_data.get("attribution"):
+                self.current_session.attribution = EnergyAttribution.from_dict(
+                    session_data["attribution"]
+                )
+            if session_data.get("cost"):
+                self.current_session.cost = SessionCostIntegrator.from_dict(
+                    session_data["cost"], session_data["start_energy_kwh"]
+                )
             logger.info(
                 f"Restored active session: started {start_time}, "
                 f"energy delivered: {self.current_session.energy_delivered_kwh:.2f} kWh"
@@ -210,6 +454,9 @@ class ChargingSessionManager:
                 "start_time": self.current_session.start_time.isoformat(),
                 "start_energy_kwh": self.current_session.start_energy_kwh,
                 "current_energy_kwh": self.current_session.current_energy_kwh,
+                "peak_power_w": self.current_session.peak_power_w,
+                "cost": self.current_session.cost.to_dict(),
+                "attribution": self.current_session.attribution.to_dict(),
             }
 
         return state
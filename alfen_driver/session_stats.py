@@ -0,0 +1,141 @@
+"""Incremental daily/weekly/monthly charging statistics.
+
+Every meter tick adds its energy, cost and charging time to exactly one
+bucket per period (local day, ISO week, month), and every finished session
+bumps the session counters, so updates are O(1) and queries never scan the
+session history. Buckets are plain dicts kept in insertion (= time) order
+and pruned to a fixed number per period; the whole rollup round-trips
+through ``to_dict``/``restore`` for persistence.
+
+Example:
+    ```python
+    stats = SessionStatsRollup()
+    stats.add_tick(datetime.now(), energy_kwh=0.003, cost=0.001, charging_seconds=1)
+    stats.query("month")  # newest month first
+    ```
+"""
+
+import threading
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+PERIODS = ("day", "week", "month")
+
+# Buckets kept per period: ~13 months of days, 2 years of weeks, 10 years
+RETENTION = {"day": 400, "week": 110, "month": 120}
+
+_FIELDS = ("energy_kwh", "cost", "solar_kwh", "charging_seconds", "sessions")
+
+
+def _day_key(at: datetime) -> str:
+    return at.strftime("%Y-%m-%d")
+
+
+def _week_key(at: datetime) -> str:
+    year, week, _ = at.isocalendar()
+    return f"{year}-W{week:02d}"
+
+
+def _month_key(at: datetime) -> str:
+    return at.strftime("%Y-%m")
+
+
+_KEYS: Dict[str, Callable[[datetime], str]] = {
+    "day": _day_key,
+    "week": _week_key,
+    "month": _month_key,
+}
+
+
+class SessionStatsRollup:
+    """Per-day, per-week and per-month charging aggregates.
+
+    Ticks arrive on the GLib thread and queries on the web thread; a lock
+    keeps both consistent.
+    """
+
+    def __init__(self) -> None:
+        self._buckets: Dict[str, Dict[str, Dict[str, float]]] = {
+            period: {} for period in PERIODS
+        }
+        self._lock = threading.Lock()
+
+    def _bucket(self, period: str, at: datetime) -> Dict[str, float]:
+        buckets = self._buckets[period]
+        key = _KEYS[period](at)
+        bucket = buckets.get(key)
+        if bucket is None:
+            bucket = buckets[key] = dict.fromkeys(_FIELDS, 0.0)
+            while len(buckets) > RETENTION[period]:
+                del buckets[next(iter(buckets))]
+        return bucket
+
+    def add_tick(
+        self,
+        at: datetime,
+        energy_kwh: float = 0.0,
+        cost: float = 0.0,
+        solar_kwh: float = 0.0,
+        charging_seconds: float = 0.0,
+    ) -> None:
+        """Add one meter tick's contribution to the current buckets."""
+        if not (energy_kwh or cost or solar_kwh or charging_seconds):
+            return
+        with self._lock:
+            for period in PERIODS:
+                bucket = self._bucket(period, at)
+                bucket["energy_kwh"] += energy_kwh
+                bucket["cost"] += cost
+                bucket["solar_kwh"] += solar_kwh
+                bucket["charging_seconds"] += charging_seconds
+
+    def add_session(self, at: datetime) -> None:
+        """Count a finished session in the buckets of its end time."""
+        with self._lock:
+            for period in PERIODS:
+                self._bucket(period, at)["sessions"] += 1
+
+    def query(self, period: str, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Return buckets of ``period``, newest first.
+
+        Raises:
+            ValueError: If ``period`` is unknown or ``limit`` is negative.
+        """
+        if period not in self._buckets:
+            raise ValueError(f"Unknown period {period!r}")
+        if limit is not None and limit < 0:
+            raise ValueError("limit must not be negative")
+        with self._lock:
+            keys = list(self._buckets[period])[::-1][:limit]
+            return [_format(key, self._buckets[period][key]) for key in keys]
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                period: {key: dict(bucket) for key, bucket in buckets.items()}
+                for period, buckets in self._buckets.items()
+            }
+
+    def restore(self, data: Dict[str, Any]) -> None:
+        """Load buckets saved by ``to_dict`` (unknown fields are dropped)."""
+        with self._lock:
+            for period in PERIODS:
+                saved = data.get(period) or {}
+                self._buckets[period] = {
+                    key: {f: float(bucket.get(f, 0.0)) for f in _FIELDS}
+                    for key, bucket in sorted(saved.items())
+                    if isinstance(bucket, dict)
+                }
+
+
+def _format(key: str, bucket: Dict[str, float]) -> Dict[str, Any]:
+    energy = bucket["energy_kwh"]
+    return {
+        "period": key,
+        "energy_kwh": round(energy, 3),
+        "cost": round(bucket["cost"], 2),
+        "solar_kwh": round(bucket["solar_kwh"], 3),
+        "solar_share": round(bucket["solar_kwh"] / energy, 3) if energy > 0 else None,
+        "charging_seconds": int(bucket["charging_seconds"]),
+        "sessions": int(bucket["sessions"]),
+    }
@@ -0,0 +1,86 @@
+"""In-memory, precompressed delivery of the bundled web UI.
+
+At startup every file of the ``webui`` directory is read once, given a
+content-hash fingerprinted name (``app.js`` -> ``app.1a2b3c4d5e6f.js``)
+and compressed with every supported encoding. HTML pages are rewritten to
+reference the fingerprinted names, so those URLs can be cached by the
+browser for a year: a new release changes the hash and thereby the URL.
+Pages and the plain names stay revalidated through their ETags.
+
+Example:
+    ```python
+    assets = StaticAssets(Path("alfen_driver/webui"))
+    payload, cache_control = assets.get("index.html")
+    ```
+"""
+
+import hashlib
+import mimetypes
+import re
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from .http_cache import EncodedPayload
+from .logging_utils import get_logger
+
+FINGERPRINT_LENGTH = 12
+IMMUTABLE = "public, max-age=31536000, immutable"
+REVALIDATE = "no-cache"
+
+_REFERENCE = re.compile(r'(src|href)="/ui/([^"?#]+)"')
+_TEXT_TYPES = {"application/javascript", "application/json", "image/svg+xml"}
+
+
+def fingerprinted_name(name: str, body: bytes) -> str:
+    """Return ``name`` with a short content hash before its extension."""
+    digest = hashlib.sha256(body).hexdigest()[:FINGERPRINT_LENGTH]
+    stem, dot, ext = name.rpartition(".")
+    return f"{stem}.{digest}.{ext}" if dot else f"{name}.{digest}"
+
+
+def _content_type(name: str) -> str:
+    content_type = mimetypes.guess_type(name)[0] or "application/octet-stream"
+    if content_type.startswith("text/") or content_type in _TEXT_TYPES:
+        content_type += "; charset=utf-8"
+    return content_type
+
+
+class StaticAssets:
+    """Precompressed web UI files keyed by plain and fingerprinted name."""
+
+    def __init__(self, directory: Path) -> None:
+        self.logger = get_logger("alfen_driver.static_assets")
+        self._assets: Dict[str, Tuple[EncodedPayload, str]] = {}
+        self.fingerprints: Dict[str, str] = {}
+
+        files = {
+            path.name: path.read_bytes()
+            for path in sorted(directory.iterdir())
+            if path.is_file() and not path.name.startswith(".")
+        }
+        pages = {name for name in files if name.endswith(".html")}
+        for name in files.keys() - pages:
+            self.fingerprints[name] = fingerprinted_name(name, files[name])
+        for name in pages:
+            files[name] = self._rewrite(files[name])
+
+        for name, body in files.items():
+            payload = EncodedPayload(body, _content_type(name))
+            payload.precompress()
+            self._assets[name] = (payload, REVALIDATE)
+            if name in self.fingerprints:
+                self._assets[self.fingerprints[name]] = (payload, IMMUTABLE)
+        self.logger.debug(f"Loaded {len(files)} web UI assets from {directory}")
+
+    def _rewrite(self, page: bytes) -> bytes:
+        """Point ``/ui/<name>`` references at the fingerprinted names."""
+
+        def _replace(match: "re.Match[str]") -> str:
+            name = self.fingerprints.get(match.group(2), match.group(2))
+            return f'{match.group(1)}="/ui/{name}"'
+
+        return _REFERENCE.sub(_replace, page.decode("utf-8")).encode("utf-8")
+
+    def get(self, name: str) -> Optional[Tuple[EncodedPayload, str]]:
+        """Return the payload and its Cache-Control value, if known."""
+        return self._assets.get(name)
@@ -0,0 +1,120 @@
+"""Versioned status snapshot shared between the poll loop and the web server.
+
+The driver feeds each tick's values into ``StatusSnapshot.update``; only the
+fields whose value actually changed bump the snapshot version and record
+that version as their ``changed_at``. Readers can therefore fetch either
+the whole snapshot or just the fields changed since a version they already
+hold.
+
+Published snapshots are copy-on-write: ``update`` builds a new state and
+swaps the reference, so a dict handed to a reader is never mutated
+afterwards and readers (the web server thread) never lock.
+
+Example:
+    ```python
+    status = StatusSnapshot({"mode": 0})
+    status.update({"mode": 1, "ac_power": 0.0})  # -> 1
+    status.changes_since(0)  # (1, {"mode": 1, "ac_power": 0.0})
+    ```
+"""
+
+import math
+import threading
+from typing import Any, Callable, Dict, List, Mapping, NamedTuple, Optional, Tuple
+
+
+def _same(old: Any, new: Any) -> bool:
+    if old is new:
+        return True
+    if type(old) is not type(new):
+        # 1 and 1.0 compare equal but serialize differently
+        return False
+    if isinstance(old, float) and math.isnan(old) and math.isnan(new):
+        return True
+    return bool(old == new)
+
+
+class Published(NamedTuple):
+    """One published state: replaced as a whole, never modified."""
+
+    version: int
+    values: Dict[str, Any]
+    changed_at: Dict[str, int]
+
+
+class StatusSnapshot:
+    """Incrementally updated status dict with per-field change versions.
+
+    The version, values and per-field versions are published together as
+    one ``Published`` tuple. Updates build a new tuple and swap the
+    reference (a single atomic store), so readers on other threads never
+    take a lock and always see a consistent state. The lock only
+    serializes writers.
+    """
+
+    def __init__(self, initial: Optional[Mapping[str, Any]] = None) -> None:
+        values = dict(initial or {})
+        self._published = Published(0, values, dict.fromkeys(values, 0))
+        self._write_lock = threading.Lock()
+        self._listeners: List[Callable[[int], None]] = []
+
+    @property
+    def version(self) -> int:
+        return self._published.version
+
+    @property
+    def current(self) -> Dict[str, Any]:
+        """The latest published snapshot; callers must not mutate it."""
+        return self._published.values
+
+    def snapshot(self) -> Tuple[int, Dict[str, Any]]:
+        """Return the version and snapshot as one consistent pair."""
+        published = self._published
+        return published.version, published.values
+
+    def subscribe(self, listener: Callable[[int], None]) -> None:
+        """Call ``listener(version)`` after each version bump.
+
+        Listeners run on the updating thread and must not block.
+        """
+        self._listeners.append(listener)
+
+    def update(self, values: Mapping[str, Any]) -> int:
+        """Merge ``values`` and return the (possibly unchanged) version."""
+        with self._write_lock:
+            old = self._published
+            changed = {
+                key: value
+                for key, value in values.items()
+                if key not in old.values or not _same(old.values[key], value)
+            }
+            if not changed:
+                return old.version
+            version = old.version + 1
+            merged = dict(old.values)
+            merged.update(changed)
+            changed_at = dict(old.changed_at)
+            changed_at.update(dict.fromkeys(changed, version))
+            self._published = Published(version, merged, changed_at)
+        for listener in self._listeners:
+            listener(version)
+        return version
+
+    def changes_since(self, version: int) -> Tuple[int, Dict[str, Any]]:
+        """Return the current version and the fields changed after ``version``.
+
+        A version from the future (e.g. held by a client across a driver
+        restart) yields the full snapshot.
+        """
+        published = self._published
+        if version > published.version or version < 0:
+            return published.version, published.values
+        return published.version, {
+            key: published.values[key]
+            for key, changed_at in published.changed_at.items()
+            if changed_at > version
+        }
+
+    def field_versions(self) -> Dict[str, int]:
+        """Return the version at which each field last changed."""
+        return dict(self._published.changed_at)
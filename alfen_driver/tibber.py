@@ -1,16 +1,31 @@
 """Tibber API integration for dynamic electricity pricing."""
 
 import asyncio
+import bisect
 import json
 import time
 import urllib.error
 import urllib.request
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 from enum import Enum
 from typing import Any, Dict, Optional, Tuple, cast
 
 from .config import TibberConfig
 from .logging_utils import get_logger
+from .metrics import TIBBER_FETCHES
+
+
+def _parse_starts_at(value: Any) -> float:
+    """Parse a Tibber ``startsAt`` ISO timestamp to epoch seconds (0.0 if invalid)."""
+    if not isinstance(value, str) or not value:
+        return 0.0
+    try:
+        dt = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return 0.0
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.timestamp()
 
 
 class PriceLevel(Enum):
@@ -27,6 +42,14 @@ class TibberClient:
     """Client for Tibber API interactions."""
 
     GRAPHQL_URL = "https://api.tibber.com/v1-beta/gql"
+    # Pooled HTTP client: a small keep-alive pool is plenty for one poller
+    HTTP_POOL_LIMIT = 2
+    HTTP_KEEPALIVE_SECONDS = 300.0
+    HTTP_TIMEOUT_SECONDS = 10.0
+    # Skip the query while the cached price curve still covers this far ahead
+    CURVE_HORIZON_SECONDS = 6 * 3600.0
+    # Tomorrow's day-ahead prices are published around 13:00 local time
+    TOMORROW_PUBLISH_HOUR = 13
 
     def __init__(self, config: TibberConfig):
         """Initialize Tibber client.
@@ -41,16 +64,142 @@ class TibberClient:
         self._cache_ttl: int = 300  # Cache for 5 minutes
         self._cache_next_refresh: float = 0.0  # Absolute epoch when we should refresh
         self._cached_upcoming: list[dict[str, Any]] = []
+        self._cached_starts: list[float] = []
+        # Bumped whenever a fresh price curve is fetched (plan invalidation)
+        self.curve_version: int = 0
+        # Long-lived aiohttp session bound to the loop it was created on
+        self._http_session: Any = None
+        self._http_session_loop: Optional[asyncio.AbstractEventLoop] = None
         # No native priceRating in this query; we'll derive LOW/NORMAL/HIGH locally
 
-    def _fetch_graphql_sync(self, query: str) -> Optional[Dict[str, Any]]:
-        """Synchronous GraphQL POST using standard library (fallback if aiohttp is missing)."""
-        headers = {
+    @classmethod
+    def for_curve(
+        cls, config: TibberConfig, entries: list[dict[str, Any]]
+    ) -> "TibberClient":
+        """Offline client that evaluates the strategy over a supplied curve.
+
+        Args:
+            config: Tibber configuration holding the strategy settings.
+            entries: Tibber-style slots (``startsAt``, ``total``, ``level``).
+        """
+        client = cls(config)
+        client._cached_upcoming = sorted(
+            entries, key=lambda e: _parse_starts_at(e.get("startsAt"))
+        )
+        return client
+
+    def _request_headers(self) -> Dict[str, str]:
+        return {
             "Authorization": f"Bearer {self.config.access_token.strip()}",
             "Content-Type": "application/json",
             "Accept": "application/json",
             "User-Agent": "victron-alfen-charger/1.0 (+https://github.com/)",
         }
+
+    def _get_http_session(self, aiohttp_mod: Any) -> Any:
+        """Return the pooled aiohttp session, creating it on first use.
+
+        A session is tied to the event loop it was created on; if the caller
+        runs on a different loop the old session is dropped and a new one is
+        built so keep-alive connections are never shared across loops.
+        """
+        loop = asyncio.get_running_loop()
+        session = self._http_session
+        if (
+            session is not None
+            and not session.closed
+            and self._http_session_loop is loop
+        ):
+            return session
+        if session is not None and not session.closed:
+            # Cannot await a close on a foreign loop; just release the session
+            self.logger.debug("Event loop changed; recreating Tibber HTTP session")
+            session.detach()
+        connector = aiohttp_mod.TCPConnector(
+            limit=self.HTTP_POOL_LIMIT,
+            keepalive_timeout=self.HTTP_KEEPALIVE_SECONDS,
+            ttl_dns_cache=self.HTTP_KEEPALIVE_SECONDS,
+        )
+        self._http_session = aiohttp_mod.ClientSession(
+            connector=connector,
+            headers=self._request_headers(),
+            timeout=aiohttp_mod.ClientTimeout(total=self.HTTP_TIMEOUT_SECONDS),
+        )
+        self._http_session_loop = loop
+        return self._http_session
+
+    async def close(self) -> None:
+        """Close the pooled HTTP session, if any."""
+        session = self._http_session
+        self._http_session = None
+        self._http_session_loop = None
+        if session is not None and not session.closed:
+            await session.close()
+
+    def _curve_starts(self) -> list[float]:
+        """Start epochs aligned with ``_cached_upcoming`` (rebuilt if stale)."""
+        if len(self._cached_starts) != len(self._cached_upcoming):
+            self._cached_starts = [
+                _parse_starts_at(entry.get("startsAt"))
+                for entry in self._cached_upcoming
+            ]
+        return self._cached_starts
+
+    def _slot_bounds(self, idx: int) -> Tuple[float, float]:
+        """Return (start, end) epochs for the cached slot at ``idx``."""
+        starts = self._curve_starts()
+        start = starts[idx]
+        if idx + 1 < len(starts):
+            return start, starts[idx + 1]
+        # Last slot: assume the same length as the previous one (hourly otherwise)
+        width = start - starts[idx - 1] if idx > 0 else 3600.0
+        return start, start + (width if width > 0 else 3600.0)
+
+    def _cached_slot_index(self, ts: float) -> Optional[int]:
+        """Index of the cached slot covering ``ts``, or None if outside the curve."""
+        starts = self._curve_starts()
+        if not starts:
+            return None
+        idx = bisect.bisect_right(starts, ts) - 1
+        if idx < 0 or starts[idx] <= 0:
+            return None
+        _, end = self._slot_bounds(idx)
+        return idx if ts < end else None
+
+    def _curve_covers_horizon(self, now: float) -> bool:
+        """True if the cached curve covers ``now`` and the configured horizon."""
+        if self._cached_slot_index(now) is None:
+            return False
+        _, curve_end = self._slot_bounds(len(self._curve_starts()) - 1)
+        return curve_end >= now + self.CURVE_HORIZON_SECONDS
+
+    def _awaiting_tomorrow(self, now: float) -> bool:
+        """True if tomorrow's prices should be out but the cached curve lacks them.
+
+        Local time is taken from the current slot's ``startsAt`` offset, which
+        Tibber reports in the home's timezone.
+        """
+        idx = self._cached_slot_index(now)
+        if idx is None:
+            return False
+        try:
+            slot_start = datetime.fromisoformat(
+                str(self._cached_upcoming[idx].get("startsAt")).replace("Z", "+00:00")
+            )
+        except ValueError:
+            return False
+        local_now = datetime.fromtimestamp(now, slot_start.tzinfo or timezone.utc)
+        if local_now.hour < self.TOMORROW_PUBLISH_HOUR:
+            return False
+        tomorrow = (local_now + timedelta(days=1)).replace(
+            hour=0, minute=0, second=0, microsecond=0
+        )
+        _, curve_end = self._slot_bounds(len(self._curve_starts()) - 1)
+        return curve_end <= tomorrow.timestamp()
+
+    def _fetch_graphql_sync(self, query: str) -> Optional[Dict[str, Any]]:
+        """Synchronous GraphQL POST using standard library (fallback if aiohttp is missing)."""
+        headers = self._request_headers()
         payload = {"query": query, "variables": {}}
         data_bytes = json.dumps(payload).encode("utf-8")
         request = urllib.request.Request(
@@ -126,6 +275,13 @@ class TibberClient:
             # No cached data yet, respect backoff and avoid hammering the API
             return None
 
+        # The cached curve already holds the slot for now and enough of the
+        # horizon ahead: advance to the current slot without a network
+        # round-trip, unless tomorrow's prices are due (the planner and the
+        # percentile threshold should see them as soon as they are out)
+        if self._curve_covers_horizon(now) and not self._awaiting_tomorrow(now):
+            return self._advance_from_cache(now)
+
         try:
             # Query Tibber API including next slot to know when to refresh
             query = """
@@ -158,48 +314,42 @@ class TibberClient:
             except Exception as e:  # pragma: no cover - optional dependency
                 self.logger.debug(f"aiohttp not available, using urllib fallback: {e}")
 
+            TIBBER_FETCHES.inc()
             if aiohttp_available and aiohttp_mod is not None:
-                headers = {
-                    "Authorization": f"Bearer {self.config.access_token.strip()}",
-                    "Content-Type": "application/json",
-                    "Accept": "application/json",
-                    "User-Agent": "victron-alfen-charger/1.0 (+https://github.com/)",
-                }
-                async with aiohttp_mod.ClientSession() as session:
-                    async with session.post(
-                        self.GRAPHQL_URL,
-                        json={"query": query, "variables": {}},
-                        headers=headers,
-                        timeout=aiohttp_mod.ClientTimeout(total=10),
-                    ) as response:
-                        if response.status != 200:
-                            # Try to extract JSON error detail
+                # Reuse the pooled session so keep-alive skips TLS/DNS setup
+                session = self._get_http_session(aiohttp_mod)
+                async with session.post(
+                    self.GRAPHQL_URL,
+                    json={"query": query, "variables": {}},
+                ) as response:
+                    if response.status != 200:
+                        # Try to extract JSON error detail
+                        body_text = ""
+                        try:
+                            body_text = await response.text()
+                        except Exception:
                             body_text = ""
+                        detail = ""
+                        if body_text:
                             try:
-                                body_text = await response.text()
-                            except Exception:
-                                body_text = ""
-                            detail = ""
-                            if body_text:
-                                try:
-                                    parsed = json.loads(body_text)
-                                    errors = parsed.get("errors")
-                                    if errors:
-                                        detail = errors[0].get("message", "")
-                                except Exception as parse_error:
-                                    self.logger.debug(
-                                        f"Failed to parse Tibber error body as JSON: {parse_error}"
-                                    )
-                            msg = f"Tibber API error: {response.status}" + (
-                                f" - {detail}" if detail else ""
-                            )
-                            self.logger.error(msg)
-                            # Short backoff to avoid hammering on failure
-                            self._cache_next_refresh = max(
-                                self._cache_next_refresh, now + 60
-                            )
-                            return None
-                        data = await response.json()
+                                parsed = json.loads(body_text)
+                                errors = parsed.get("errors")
+                                if errors:
+                                    detail = errors[0].get("message", "")
+                            except Exception as parse_error:
+                                self.logger.debug(
+                                    f"Failed to parse Tibber error body as JSON: {parse_error}"
+                                )
+                        msg = f"Tibber API error: {response.status}" + (
+                            f" - {detail}" if detail else ""
+                        )
+                        self.logger.error(msg)
+                        # Short backoff to avoid hammering on failure
+                        self._cache_next_refresh = max(
+                            self._cache_next_refresh, now + 60
+                        )
+                        return None
+                    data = await response.json()
             else:
                 # Fallback to standard library in a thread to avoid blocking
                 data = await asyncio.to_thread(self._fetch_graphql_sync, query)
@@ -259,15 +409,12 @@ class TibberClient:
 
             # Cache upcoming windows [{startsAt, total, level} sorted]
             combined = [*prices_today, *prices_tomorrow]
-
-            def parse_ts(s: str) -> float:
-                try:
-                    return datetime.fromisoformat(s.replace("Z", "+00:00")).timestamp()
-                except Exception:
-                    return 0.0
-
-            combined.sort(key=lambda e: parse_ts(e.get("startsAt", "")))
+            combined.sort(key=lambda e: _parse_starts_at(e.get("startsAt")))
             self._cached_upcoming = combined
+            self._cached_starts = [
+                _parse_starts_at(entry.get("startsAt")) for entry in combined
+            ]
+            self.curve_version += 1
 
             # Determine next refresh time by finding the next slot in today/tomorrow lists
             next_refresh: float = 0.0
@@ -333,32 +480,8 @@ class TibberClient:
             # Add a small safety margin to avoid racing the boundary
             self._cache_next_refresh = max(next_refresh + 1.0, now + 5.0)
 
-            level_str = price_info.get("level", "NORMAL")
-            total_val = price_info.get("total", 0)
-            if self.config.strategy == "level":
-                self.logger.info(
-                    f"Current Tibber price level: {level_str} (price: {float(total_val):.4f})"
-                )
-            elif (
-                self.config.strategy == "threshold" and self.config.max_price_total > 0
-            ):
-                self.logger.info(
-                    f"Current Tibber price total: {float(total_val):.4f} (strategy=threshold<= {self.config.max_price_total:.4f})"
-                )
-            elif self.config.strategy == "percentile":
-                thr = self._determine_threshold()
-                if thr is not None:
-                    self.logger.info(
-                        f"Current Tibber price total: {float(total_val):.4f} (strategy=percentile p={self.config.cheap_percentile:.2f} thr={thr:.4f})"
-                    )
-                else:
-                    self.logger.info(
-                        f"Current Tibber price total: {float(total_val):.4f} (strategy=percentile p={self.config.cheap_percentile:.2f} thr n/a)"
-                    )
-            else:
-                self.logger.info(f"Current Tibber price total: {float(total_val):.4f}")
-
-            return PriceLevel(level_str)
+            self._log_current_price(price_info)
+            return PriceLevel(price_info.get("level", "NORMAL"))
 
         except asyncio.TimeoutError:
             self.logger.error("Tibber API timeout")
@@ -371,6 +494,44 @@ class TibberClient:
             self._cache_next_refresh = max(self._cache_next_refresh, now + 60)
             return None
 
+    def _advance_from_cache(self, now: float) -> Optional[PriceLevel]:
+        """Select the cached slot covering ``now`` as the current price."""
+        idx = self._cached_slot_index(now)
+        if idx is None:
+            return None
+        price_info = dict(self._cached_upcoming[idx])
+        self._cache = {"current_price": price_info}
+        self._cache_time = now
+        _, slot_end = self._slot_bounds(idx)
+        self._cache_next_refresh = max(slot_end + 1.0, now + 5.0)
+        self._log_current_price(price_info)
+        return PriceLevel(price_info.get("level", "NORMAL"))
+
+    def _log_current_price(self, price_info: Dict[str, Any]) -> None:
+        """Log the current slot price in the form relevant to the strategy."""
+        level_str = price_info.get("level", "NORMAL")
+        total_val = price_info.get("total", 0)
+        if self.config.strategy == "level":
+            self.logger.info(
+                f"Current Tibber price level: {level_str} (price: {float(total_val):.4f})"
+            )
+        elif self.config.strategy == "threshold" and self.config.max_price_total > 0:
+            self.logger.info(
+                f"Current Tibber price total: {float(total_val):.4f} (strategy=threshold<= {self.config.max_price_total:.4f})"
+            )
+        elif self.config.strategy == "percentile":
+            thr = self._determine_threshold()
+            if thr is not None:
+                self.logger.info(
+                    f"Current Tibber price total: {float(total_val):.4f} (strategy=percentile p={self.config.cheap_percentile:.2f} thr={thr:.4f})"
+                )
+            else:
+                self.logger.info(
+                    f"Current Tibber price total: {float(total_val):.4f} (strategy=percentile p={self.config.cheap_percentile:.2f} thr n/a)"
+                )
+        else:
+            self.logger.info(f"Current Tibber price total: {float(total_val):.4f}")
+
     def _get_upcoming_prices_window(self) -> list[dict[str, Any]]:
         """Return cached upcoming prices list if available."""
         return list(self._cached_upcoming)
@@ -419,19 +580,27 @@ class TibberClient:
             except Exception:
                 current_total = None
 
+        return self._decide(current_total, price_level, self._determine_threshold())
+
+    def _decide(
+        self,
+        total: Optional[float],
+        price_level: PriceLevel,
+        threshold: Optional[float],
+    ) -> bool:
+        """Apply the configured strategy to one price slot."""
         # Strategy: threshold
         if (
             self.config.strategy == "threshold"
-            and current_total is not None
+            and total is not None
             and self.config.max_price_total > 0
         ):
-            return current_total <= self.config.max_price_total
+            return total <= self.config.max_price_total
 
         # Strategy: percentile
-        if self.config.strategy == "percentile" and current_total is not None:
-            threshold = self._determine_threshold()
+        if self.config.strategy == "percentile" and total is not None:
             if threshold is not None:
-                return current_total <= threshold
+                return total <= threshold
 
         # Default strategy: level
         if price_level == PriceLevel.VERY_CHEAP and self.config.charge_on_very_cheap:
@@ -441,21 +610,134 @@ class TibberClient:
 
         return False
 
+    def describe_decision(
+        self,
+        price_level: PriceLevel,
+        price_info: Optional[Dict[str, Any]],
+        should_charge: bool,
+        threshold: Optional[float],
+    ) -> str:
+        """Build the human-readable explanation for a price slot decision."""
+        config = self.config
+        explanation_parts: list[str] = []
+        if price_info is not None:
+            try:
+                total_val = price_info.get("total")
+                if isinstance(total_val, (int, float)):
+                    explanation_parts.append(f"total={float(total_val):.4f}")
+                starts = price_info.get("startsAt")
+                if isinstance(starts, str):
+                    explanation_parts.append(f"slot={starts}")
+            except Exception as exc:
+                # Log and continue; explanation is optional meta
+                self.logger.debug(f"Failed to enrich Tibber explanation: {exc}")
+
+        if config.strategy == "level":
+            explanation_parts.insert(0, f"level={price_level.value}")
+        elif config.strategy == "threshold" and config.max_price_total > 0:
+            explanation_parts.append(
+                f"strategy=threshold<= {config.max_price_total:.4f}"
+            )
+        elif config.strategy == "percentile":
+            if threshold is not None:
+                explanation_parts.append(
+                    f"strategy=percentile p={config.cheap_percentile:.2f} thr={threshold:.4f}"
+                )
+            else:
+                explanation_parts.append(
+                    f"strategy=percentile p={config.cheap_percentile:.2f} (thr n/a)"
+                )
+        else:
+            explanation_parts.append("strategy=unknown")
+
+        if should_charge:
+            return ", ".join(explanation_parts) + " - charging enabled"
+        return ", ".join(explanation_parts) + " - waiting for cheaper price"
+
+    def plan_slots(self) -> list[Tuple[float, float, bool, str]]:
+        """Evaluate the strategy for every cached slot.
+
+        Returns:
+            (start_epoch, end_epoch, should_charge, explanation) per slot,
+            in chronological order.
+        """
+        threshold = self._determine_threshold()
+        starts = self._curve_starts()
+        slots: list[Tuple[float, float, bool, str]] = []
+        for idx, entry in enumerate(self._cached_upcoming):
+            if starts[idx] <= 0:
+                continue
+            try:
+                level = PriceLevel(entry.get("level", "NORMAL"))
+            except ValueError:
+                level = PriceLevel.NORMAL
+            total_val = entry.get("total")
+            total = float(total_val) if isinstance(total_val, (int, float)) else None
+            charge = self._decide(total, level, threshold)
+            start, end = self._slot_bounds(idx)
+            slots.append(
+                (
+                    start,
+                    end,
+                    charge,
+                    self.describe_decision(level, entry, charge, threshold),
+                )
+            )
+        return slots
+
 
 # Shared client to persist cache across schedule checks
 _SHARED_CLIENT: Optional[TibberClient] = None
 _SHARED_CLIENT_KEY: Optional[Tuple[str, str]] = None
 
 
+def _close_client_session(client: TibberClient) -> None:
+    """Best-effort close of a client's pooled session from synchronous code."""
+    loop = client._http_session_loop
+    if loop is None or loop.is_closed() or loop.is_running():
+        return
+    try:
+        loop.run_until_complete(client.close())
+    except Exception as exc:  # pragma: no cover - defensive
+        get_logger("alfen_driver.tibber").debug(
+            f"Failed to close Tibber HTTP session: {exc}"
+        )
+
+
 def _get_shared_client(config: TibberConfig) -> TibberClient:
     global _SHARED_CLIENT, _SHARED_CLIENT_KEY
     key = (config.access_token, config.home_id)
     if _SHARED_CLIENT is None or _SHARED_CLIENT_KEY != key:
+        if _SHARED_CLIENT is not None:
+            _close_client_session(_SHARED_CLIENT)
         _SHARED_CLIENT = TibberClient(config)
         _SHARED_CLIENT_KEY = key
     return _SHARED_CLIENT
 
 
+def refresh_tibber_prices(config: TibberConfig) -> Optional[TibberClient]:
+    """Refresh the shared client's price cache (if due) and return the client.
+
+    Synchronous wrapper for the GLib thread; returns None when Tibber is
+    disabled or unconfigured.
+    """
+    if not config.enabled or not config.access_token:
+        return None
+
+    try:
+        loop = asyncio.get_event_loop()
+    except RuntimeError:
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+
+    client = _get_shared_client(config)
+    try:
+        loop.run_until_complete(client.get_current_price_level())
+    except Exception as e:
+        get_logger("alfen_driver.tibber").error(f"Error refreshing Tibber prices: {e}")
+    return client
+
+
 def check_tibber_schedule(config: TibberConfig) -> Tuple[bool, str]:
     """Check if charging should be enabled based on Tibber pricing.
 
@@ -497,45 +779,11 @@ def check_tibber_schedule(config: TibberConfig) -> Tuple[bool, str]:
     should_charge = client.should_charge(price_level)
 
     # Build explanation including strategy & threshold if available
-    explanation_parts: list[str] = []
     price_info = client._cache.get("current_price") if client._cache else None
-    current_total = None
-    if price_info is not None:
-        try:
-            total_val = price_info.get("total")
-            if isinstance(total_val, (int, float)):
-                current_total = float(total_val)
-                explanation_parts.append(f"total={current_total:.4f}")
-            starts = price_info.get("startsAt")
-            if isinstance(starts, str):
-                explanation_parts.append(f"slot={starts}")
-        except Exception as exc:
-            # Log and continue; explanation is optional meta
-            get_logger("alfen_driver.tibber").debug(
-                f"Failed to enrich Tibber explanation: {exc}"
-            )
-
-    if config.strategy == "level":
-        explanation_parts.insert(0, f"level={price_level.value}")
-    elif config.strategy == "threshold" and config.max_price_total > 0:
-        explanation_parts.append(f"strategy=threshold<= {config.max_price_total:.4f}")
-    elif config.strategy == "percentile":
-        threshold = client._determine_threshold()
-        if threshold is not None:
-            explanation_parts.append(
-                f"strategy=percentile p={config.cheap_percentile:.2f} thr={threshold:.4f}"
-            )
-        else:
-            explanation_parts.append(
-                f"strategy=percentile p={config.cheap_percentile:.2f} (thr n/a)"
-            )
-    else:
-        explanation_parts.append("strategy=unknown")
-
-    if should_charge:
-        return True, ", ".join(explanation_parts) + " - charging enabled"
-    else:
-        return False, ", ".join(explanation_parts) + " - waiting for cheaper price"
+    explanation = client.describe_decision(
+        price_level, price_info, should_charge, client._determine_threshold()
+    )
+    return should_charge, explanation
 
 
 # --- New helper: hourly overview -------------------------------------------------
@@ -0,0 +1,248 @@
+"""Tibber Pulse real-time grid measurements over the GraphQL websocket.
+
+The feed keeps a single ``liveMeasurement`` subscription open on a background
+thread with its own asyncio loop (like the web server) and reconnects with
+exponential backoff. The most recent reading is published as an immutable
+``LiveReading`` so the GLib polling thread can read it without locking.
+"""
+
+import asyncio
+import dataclasses
+import json
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from .config import TibberConfig
+from .logging_utils import get_logger
+
+BOOTSTRAP_QUERY = """
+query LiveBootstrap {
+    viewer {
+        websocketSubscriptionUrl
+        homes { id features { realTimeConsumptionEnabled } }
+    }
+}
+"""
+
+SUBSCRIPTION_QUERY = """
+subscription LiveMeasurement($homeId: ID!) {
+    liveMeasurement(homeId: $homeId) { timestamp power powerProduction }
+}
+"""
+
+
+@dataclasses.dataclass(frozen=True)
+class LiveReading:
+    """A single liveMeasurement sample.
+
+    Attributes:
+        received_at: Monotonic time the sample was received.
+        power_w: Grid import power in watts.
+        power_production_w: Grid export power in watts.
+    """
+
+    received_at: float
+    power_w: float
+    power_production_w: float
+
+    @property
+    def net_grid_w(self) -> float:
+        """Net grid power in watts (positive: importing, negative: exporting)."""
+        return self.power_w - self.power_production_w
+
+    def age_seconds(self, now: Optional[float] = None) -> float:
+        """Seconds since the sample was received."""
+        return (time.monotonic() if now is None else now) - self.received_at
+
+
+def parse_live_message(message: Dict[str, Any]) -> Optional[LiveReading]:
+    """Extract a reading from a graphql-transport-ws ``next`` message."""
+    if message.get("type") != "next":
+        return None
+    data = (message.get("payload") or {}).get("data") or {}
+    measurement = data.get("liveMeasurement")
+    if not isinstance(measurement, dict):
+        return None
+    power = measurement.get("power")
+    production = measurement.get("powerProduction")
+    if not isinstance(power, (int, float)):
+        return None
+    if not isinstance(production, (int, float)):
+        production = 0.0
+    return LiveReading(time.monotonic(), float(power), float(production))
+
+
+class TibberLiveFeed:
+    """Background websocket subscription to Tibber ``liveMeasurement``."""
+
+    GRAPHQL_URL = "https://api.tibber.com/v1-beta/gql"
+    SUBPROTOCOL = "graphql-transport-ws"
+    BACKOFF_INITIAL_SECONDS = 2.0
+    BACKOFF_MAX_SECONDS = 300.0
+    # Tibber sends a sample every ~2s; treat a silent socket as dead after this
+    RECEIVE_TIMEOUT_SECONDS = 60.0
+
+    def __init__(self, config: TibberConfig) -> None:
+        self.config = config
+        self.logger = get_logger("alfen_driver.tibber_live")
+        self.latest: Optional[LiveReading] = None
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.thread: Optional[threading.Thread] = None
+        # Set from the driver thread by stop(), read by the feed's loop
+        self._stop_event = threading.Event()
+        self._backoff = self.BACKOFF_INITIAL_SECONDS
+
+    def get_reading(self, max_age_seconds: float) -> Optional[LiveReading]:
+        """Return the latest reading if it is fresher than ``max_age_seconds``."""
+        reading = self.latest
+        if reading is None or reading.age_seconds() > max_age_seconds:
+            return None
+        return reading
+
+    def _headers(self) -> Dict[str, str]:
+        return {
+            "Authorization": f"Bearer {self.config.access_token.strip()}",
+            "Content-Type": "application/json",
+            "User-Agent": "victron-alfen-charger/1.0 (+https://github.com/)",
+        }
+
+    async def _bootstrap(self, session: Any) -> Optional[Dict[str, str]]:
+        """Resolve the websocket URL and the home to subscribe to."""
+        async with session.post(
+            self.GRAPHQL_URL,
+            json={"query": BOOTSTRAP_QUERY, "variables": {}},
+            headers=self._headers(),
+        ) as response:
+            if response.status != 200:
+                self.logger.error(f"Tibber live bootstrap failed: {response.status}")
+                return None
+            data = await response.json()
+        viewer = (data or {}).get("data", {}).get("viewer", {}) or {}
+        ws_url = viewer.get("websocketSubscriptionUrl")
+        homes = viewer.get("homes") or []
+        if not ws_url or not homes:
+            self.logger.error("Tibber live bootstrap returned no websocket URL/homes")
+            return None
+        home_id = self.config.home_id
+        if not home_id:
+            live_homes = [
+                h
+                for h in homes
+                if (h.get("features") or {}).get("realTimeConsumptionEnabled")
+            ]
+            home_id = (live_homes or homes)[0].get("id", "")
+        if not home_id:
+            return None
+        return {"url": str(ws_url), "home_id": str(home_id)}
+
+    async def _subscribe_once(self, aiohttp_mod: Any) -> None:
+        """Open one websocket session and consume readings until it drops."""
+        timeout = aiohttp_mod.ClientTimeout(total=None, connect=15)
+        async with aiohttp_mod.ClientSession(timeout=timeout) as session:
+            target = await self._bootstrap(session)
+            if target is None:
+                return
+            async with session.ws_connect(
+                target["url"],
+                protocols=(self.SUBPROTOCOL,),
+                headers={"User-Agent": self._headers()["User-Agent"]},
+                heartbeat=30,
+            ) as ws:
+                await ws.send_json(
+                    {
+                        "type": "connection_init",
+                        "payload": {"token": self.config.access_token.strip()},
+                    }
+                )
+                ack = await ws.receive_json(timeout=self.RECEIVE_TIMEOUT_SECONDS)
+                if ack.get("type") != "connection_ack":
+                    self.logger.error(f"Tibber live handshake rejected: {ack}")
+                    return
+                await ws.send_json(
+                    {
+                        "id": "1",
+                        "type": "subscribe",
+                        "payload": {
+                            "query": SUBSCRIPTION_QUERY,
+                            "variables": {"homeId": target["home_id"]},
+                        },
+                    }
+                )
+                self.logger.info(
+                    f"Tibber live feed subscribed for home {target['home_id']}"
+                )
+                while not self._stop_event.is_set():
+                    msg = await ws.receive(timeout=self.RECEIVE_TIMEOUT_SECONDS)
+                    if msg.type != aiohttp_mod.WSMsgType.TEXT:
+                        self.logger.debug(f"Tibber live socket closed: {msg.type}")
+                        return
+                    message = json.loads(msg.data)
+                    if message.get("type") == "ping":
+                        await ws.send_json({"type": "pong"})
+                        continue
+                    if message.get("type") in ("error", "complete"):
+                        self.logger.warning(
+                            f"Tibber live subscription ended: {message}"
+                        )
+                        return
+                    reading = parse_live_message(message)
+                    if reading is not None:
+                        self.latest = reading
+                        # Healthy stream: the next failure starts backoff afresh
+                        self._backoff = self.BACKOFF_INITIAL_SECONDS
+
+    async def _run(self) -> None:
+        import importlib
+
+        try:
+            aiohttp_mod = importlib.import_module("aiohttp")
+        except Exception as e:  # pragma: no cover - optional dependency
+            self.logger.warning(f"Tibber live feed requires aiohttp: {e}")
+            return
+        while not self._stop_event.is_set():
+            try:
+                await self._subscribe_once(aiohttp_mod)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.logger.warning(f"Tibber live feed error: {e}")
+            if self._stop_event.is_set():
+                break
+            self.logger.debug(f"Reconnecting Tibber live feed in {self._backoff:.0f}s")
+            await asyncio.sleep(self._backoff)
+            self._backoff = min(self._backoff * 2, self.BACKOFF_MAX_SECONDS)
+
+    def start(self) -> None:
+        if self.thread is not None:
+            return
+        self._stop_event.clear()
+
+        def _thread_target() -> None:
+            self.loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(self.loop)
+            try:
+                self.loop.run_until_complete(self._run())
+            except asyncio.CancelledError:
+                pass
+            finally:  # pragma: no cover
+                self.loop.close()
+
+        self.thread = threading.Thread(
+            target=_thread_target, name="TibberLiveFeed", daemon=True
+        )
+        self.thread.start()
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        loop = self.loop
+        if loop is not None and not loop.is_closed():
+
+            def _cancel_all() -> None:
+                for task in asyncio.all_tasks(loop):
+                    task.cancel()
+
+            loop.call_soon_threadsafe(_cancel_all)
+        if self.thread is not None:
+            self.thread.join(timeout=2.0)
+            self.thread = None
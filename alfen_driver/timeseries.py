@@ -0,0 +1,216 @@
+"""In-process time-series recorder with fixed-size, multi-resolution rings.
+
+Every sample is folded into one accumulator per resolution (1 s, 10 s,
+1 min by default). When a sample falls into a new bucket, the finished
+bucket's min/max/avg is written into an ``array``-backed ring buffer, so
+memory is constant and allocated up front. Queries pick the finest
+resolution whose ring still reaches back to the requested start time.
+
+Example:
+    ```python
+    recorder = TimeSeriesRecorder(("power", "current"))
+    recorder.record(time.time(), {"power": 7200.0, "current": 10.4})
+    data = recorder.query(["power"], from_ts=time.time() - 600)
+    ```
+"""
+
+import math
+import threading
+from array import array
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+# (bucket seconds, number of buckets): 1 s for an hour, 10 s for a day,
+# 1 min for 30 days
+DEFAULT_RESOLUTIONS: Tuple[Tuple[int, int], ...] = (
+    (1, 3600),
+    (10, 8640),
+    (60, 43200),
+)
+
+
+class _Level:
+    """One resolution: shared bucket timestamps plus min/max/avg per series."""
+
+    def __init__(self, step: int, capacity: int, series: Sequence[str]) -> None:
+        self.step = step
+        self.capacity = capacity
+        # Bucket start as unsigned 32-bit epoch seconds (valid until 2106)
+        self.ts = array("I", bytes(4 * capacity))
+        self.mins = {name: array("f", bytes(4 * capacity)) for name in series}
+        self.maxs = {name: array("f", bytes(4 * capacity)) for name in series}
+        self.avgs = {name: array("f", bytes(4 * capacity)) for name in series}
+        self.head = 0  # Next write position
+        self.size = 0
+        # Accumulator for the bucket currently being filled
+        self.bucket: Optional[int] = None
+        self.acc_min = dict.fromkeys(series, math.inf)
+        self.acc_max = dict.fromkeys(series, -math.inf)
+        self.acc_sum = dict.fromkeys(series, 0.0)
+        self.acc_count = dict.fromkeys(series, 0)
+
+    def add(self, ts: float, values: Dict[str, float]) -> None:
+        bucket = int(ts) // self.step * self.step
+        if self.bucket is not None and bucket != self.bucket:
+            self._flush()
+        self.bucket = bucket
+        for name, value in values.items():
+            if name not in self.acc_sum:
+                continue
+            if value < self.acc_min[name]:
+                self.acc_min[name] = value
+            if value > self.acc_max[name]:
+                self.acc_max[name] = value
+            self.acc_sum[name] += value
+            self.acc_count[name] += 1
+
+    def _flush(self) -> None:
+        if self.bucket is None:
+            return
+        idx = self.head
+        self.ts[idx] = self.bucket
+        for name, count in self.acc_count.items():
+            if count:
+                self.mins[name][idx] = self.acc_min[name]
+                self.maxs[name][idx] = self.acc_max[name]
+                self.avgs[name][idx] = self.acc_sum[name] / count
+            else:
+                nan = math.nan
+                self.mins[name][idx] = self.maxs[name][idx] = nan
+                self.avgs[name][idx] = nan
+            self.acc_min[name] = math.inf
+            self.acc_max[name] = -math.inf
+            self.acc_sum[name] = 0.0
+            self.acc_count[name] = 0
+        self.head = (idx + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+        self.bucket = None
+
+    def _physical(self, logical: int) -> int:
+        """Ring index of the ``logical``-th oldest bucket."""
+        return (self.head - self.size + logical) % self.capacity
+
+    def oldest(self) -> Optional[int]:
+        if self.size == 0:
+            return self.bucket
+        return int(self.ts[self._physical(0)])
+
+    def _first_at_or_after(self, ts: float) -> int:
+        lo, hi = 0, self.size
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.ts[self._physical(mid)] < ts:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def rows(
+        self, name: str, from_ts: float, to_ts: float
+    ) -> List[Tuple[int, Optional[float], Optional[float], Optional[float]]]:
+        out: List[Tuple[int, Optional[float], Optional[float], Optional[float]]] = []
+        for logical in range(self._first_at_or_after(from_ts), self.size):
+            idx = self._physical(logical)
+            bucket = int(self.ts[idx])
+            if bucket > to_ts:
+                break
+            out.append(
+                (
+                    bucket,
+                    _finite(self.mins[name][idx]),
+                    _finite(self.maxs[name][idx]),
+                    _finite(self.avgs[name][idx]),
+                )
+            )
+        # Include the bucket still being filled so charts are current
+        count = self.acc_count.get(name, 0)
+        if self.bucket is not None and count and from_ts <= self.bucket <= to_ts:
+            out.append(
+                (
+                    self.bucket,
+                    self.acc_min[name],
+                    self.acc_max[name],
+                    self.acc_sum[name] / count,
+                )
+            )
+        return out
+
+
+def _finite(value: float) -> Optional[float]:
+    return value if math.isfinite(value) else None
+
+
+class TimeSeriesRecorder:
+    """Records named series at several resolutions in constant memory.
+
+    ``record`` runs on the GLib thread and ``query`` on the web thread; a
+    lock keeps both consistent. Both are cheap: O(resolutions) per sample,
+    O(log n + rows) per query.
+    """
+
+    def __init__(
+        self,
+        series: Iterable[str],
+        resolutions: Sequence[Tuple[int, int]] = DEFAULT_RESOLUTIONS,
+    ) -> None:
+        self.series: Tuple[str, ...] = tuple(series)
+        self.levels = [
+            _Level(step, capacity, self.series)
+            for step, capacity in sorted(resolutions)
+        ]
+        self._lock = threading.Lock()
+
+    @property
+    def resolutions(self) -> List[int]:
+        return [level.step for level in self.levels]
+
+    def record(self, ts: float, values: Dict[str, float]) -> None:
+        """Add one sample; non-finite values are ignored."""
+        clean = {
+            k: float(v)
+            for k, v in values.items()
+            if isinstance(v, (int, float)) and math.isfinite(v)
+        }
+        if not clean:
+            return
+        with self._lock:
+            for level in self.levels:
+                level.add(ts, clean)
+
+    def _pick_level(self, from_ts: float, res: Optional[int]) -> _Level:
+        if res is not None:
+            candidates = [lvl for lvl in self.levels if lvl.step >= res]
+            if candidates:
+                return candidates[0]
+            return self.levels[-1]
+        for level in self.levels:
+            oldest = level.oldest()
+            # A ring that has not wrapped yet still holds all history
+            if level.size < level.capacity or (
+                oldest is not None and oldest <= from_ts
+            ):
+                return level
+        return self.levels[-1]
+
+    def query(
+        self,
+        series: Sequence[str],
+        from_ts: float,
+        to_ts: float = math.inf,
+        res: Optional[int] = None,
+    ) -> Dict[str, object]:
+        """Return ``[bucket_ts, min, max, avg]`` rows per requested series.
+
+        Args:
+            series: Series names; unknown names are skipped.
+            from_ts: Start of the range (epoch seconds).
+            to_ts: End of the range (epoch seconds).
+            res: Bucket size in seconds; chosen automatically when omitted.
+        """
+        with self._lock:
+            level = self._pick_level(from_ts, res)
+            data = {
+                name: level.rows(name, from_ts, to_ts)
+                for name in series
+                if name in self.series
+            }
+        return {"res": level.step, "series": data}
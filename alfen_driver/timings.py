@@ -0,0 +1,193 @@
+"""Per-stage timing of the poll loop with rolling percentiles.
+
+Each poll stage (fetch, decode, logic, D-Bus, controls) and each Modbus
+transaction is timed with ``time.perf_counter`` and recorded into a
+fixed-memory, log-spaced histogram: four buckets per octave from 10 µs to
+about 80 s, so a percentile is accurate to within ~19%. Each stage keeps
+two windows (current and previous) that are swapped in place, so the
+reported p50/p95/p99 cover the last one to two windows and memory never
+grows.
+
+Recording is switched off by default and can be toggled at runtime; a
+disabled recorder costs one attribute check per stage.
+
+Example:
+    ```python
+    from alfen_driver.timings import TIMINGS
+
+    TIMINGS.enabled = True
+    with TIMINGS.stage("fetch"):
+        raw = driver.fetch_raw_data()
+    TIMINGS.snapshot()["stages"]["fetch"]["p95_ms"]
+    ```
+"""
+
+import math
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+_MIN_SECONDS = 1e-5
+_BUCKETS_PER_OCTAVE = 4
+_BUCKET_COUNT = 93
+# Upper bound of each bucket; one extra overflow bucket follows the last
+BOUNDS: Tuple[float, ...] = tuple(
+    _MIN_SECONDS * 2 ** (i / _BUCKETS_PER_OCTAVE) for i in range(_BUCKET_COUNT)
+)
+
+PERCENTILES = (0.5, 0.95, 0.99)
+
+
+def _bucket(seconds: float) -> int:
+    if seconds <= _MIN_SECONDS:
+        return 0
+    index = math.ceil(math.log2(seconds / _MIN_SECONDS) * _BUCKETS_PER_OCTAVE)
+    return min(index, _BUCKET_COUNT)
+
+
+class RollingHistogram:
+    """Bucketed durations over the current and the previous window."""
+
+    __slots__ = (
+        "window_seconds",
+        "_current",
+        "_previous",
+        "_max",
+        "_previous_max",
+        "_window_started",
+        "last",
+        "total",
+    )
+
+    def __init__(self, window_seconds: float = 300.0) -> None:
+        self.window_seconds = window_seconds
+        self._current = [0] * (_BUCKET_COUNT + 1)
+        self._previous = [0] * (_BUCKET_COUNT + 1)
+        self._max = 0.0
+        self._previous_max = 0.0
+        self._window_started: Optional[float] = None
+        self.last = 0.0
+        self.total = 0
+
+    def observe(self, seconds: float, now: float) -> None:
+        started = self._window_started
+        if started is None:
+            self._window_started = now
+        elif now - started >= self.window_seconds:
+            self._rotate(now, stale=now - started >= 2 * self.window_seconds)
+        self._current[_bucket(seconds)] += 1
+        if seconds > self._max:
+            self._max = seconds
+        self.last = seconds
+        self.total += 1
+
+    def _rotate(self, now: float, stale: bool) -> None:
+        # Reuse both lists so memory stays fixed
+        self._previous, self._current = self._current, self._previous
+        self._previous_max = self._max
+        if stale:
+            # Nothing was recorded for a whole window: the old data is gone
+            self._previous[:] = [0] * len(self._previous)
+            self._previous_max = 0.0
+        self._current[:] = [0] * len(self._current)
+        self._max = 0.0
+        self._window_started = now
+
+    def summary(self) -> Dict[str, Any]:
+        """Return the count, percentiles and max (in ms) over both windows."""
+        counts = [a + b for a, b in zip(self._current, self._previous)]
+        count = sum(counts)
+        peak = max(self._max, self._previous_max)
+        result: Dict[str, Any] = {"count": count, "total": self.total}
+        for q in PERCENTILES:
+            result[f"p{round(q * 100)}_ms"] = _percentile(counts, count, q, peak)
+        result["max_ms"] = round(peak * 1000, 3) if count else None
+        result["last_ms"] = round(self.last * 1000, 3) if self.total else None
+        return result
+
+
+def _percentile(counts: List[int], count: int, q: float, peak: float) -> Any:
+    if not count:
+        return None
+    rank = max(1, math.ceil(q * count))
+    cumulative = 0
+    for index, bucket_count in enumerate(counts):
+        cumulative += bucket_count
+        if cumulative >= rank:
+            # The bucket bound overestimates by at most one bucket width;
+            # never report more than the largest value actually seen
+            bound = BOUNDS[index] if index < _BUCKET_COUNT else peak
+            return round(min(bound, peak) * 1000, 3)
+    return round(peak * 1000, 3)  # pragma: no cover
+
+
+class _StageTimer:
+    """Reusable context manager timing one named stage."""
+
+    __slots__ = ("_timings", "_name", "_started")
+
+    def __init__(self, timings: "Timings", name: str) -> None:
+        self._timings = timings
+        self._name = name
+        self._started = 0.0
+
+    def __enter__(self) -> "_StageTimer":
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        if self._timings.enabled:
+            now = time.perf_counter()
+            self._timings.record(self._name, now - self._started, now)
+
+
+class Timings:
+    """Named rolling histograms, one per poll stage or transaction type."""
+
+    def __init__(self, window_seconds: float = 300.0, enabled: bool = False) -> None:
+        self.enabled = enabled
+        self.window_seconds = window_seconds
+        self._stages: Dict[str, RollingHistogram] = {}
+        self._timers: Dict[str, _StageTimer] = {}
+
+    def stage(self, name: str) -> _StageTimer:
+        """Return the (cached) context manager timing ``name``.
+
+        Stage timers are not re-entrant: nest different names only.
+        """
+        timer = self._timers.get(name)
+        if timer is None:
+            timer = self._timers[name] = _StageTimer(self, name)
+        return timer
+
+    def record(self, name: str, seconds: float, now: Optional[float] = None) -> None:
+        """Record one duration for ``name`` if recording is enabled."""
+        if not self.enabled:
+            return
+        histogram = self._stages.get(name)
+        if histogram is None:
+            histogram = self._stages[name] = RollingHistogram(self.window_seconds)
+        histogram.observe(seconds, time.perf_counter() if now is None else now)
+
+    def last(self) -> Dict[str, float]:
+        """Return the most recent duration of each stage in ms."""
+        return {
+            name: round(histogram.last * 1000, 3)
+            for name, histogram in list(self._stages.items())
+        }
+
+    def reset(self) -> None:
+        self._stages = {}
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return per-stage percentiles; safe to call from another thread."""
+        return {
+            "enabled": self.enabled,
+            "window_seconds": self.window_seconds,
+            "stages": {
+                name: histogram.summary()
+                for name, histogram in list(self._stages.items())
+            },
+        }
+
+
+TIMINGS = Timings()
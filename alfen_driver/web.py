@@ -1,10 +1,12 @@
 import asyncio
 import json
 import logging
+import math
 import os
 import threading
+import time
 from pathlib import Path
-from typing import Any, Awaitable, Callable, Dict, Optional
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
 
 from aiohttp import web
 from aiohttp.abc import AbstractAccessLogger
@@ -12,6 +14,14 @@ from aiohttp.web_request import BaseRequest
 from gi.repository import GLib
 
 from .config_schema import get_config_schema
+from .constants import WebDefaults
+from .http_cache import EncodedPayload
+from .metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE
+from .metrics import REGISTRY
+from .profiler import PROFILER
+from .static_assets import StaticAssets
+from .status_snapshot import StatusSnapshot
+from .timings import TIMINGS
 
 
 class ConfigurableAccessLogger(AbstractAccessLogger):
@@ -58,6 +68,14 @@ class WebServer:
         self.runner: Optional[web.AppRunner] = None
         self.thread: Optional[threading.Thread] = None
         self.access_logger = logging.getLogger("alfen_driver.http")
+        # Last serialized status snapshot; only touched on the event loop
+        self._status_cache: Optional[Tuple[Dict[str, Any], EncodedPayload]] = None
+        self._schema_payload: Optional[EncodedPayload] = None
+        # /api/stream: set (and replaced) on every new status version
+        self._status_changed: Optional[asyncio.Event] = None
+        self._diff_cache: Optional[Tuple[int, int, bytes]] = None
+        self.stream_clients = 0
+        self.static_assets: Optional[StaticAssets] = None
         # Respect configured logging level (default to root effective level)
         cfg_logging = getattr(getattr(driver, "config", None), "logging", None)
         if cfg_logging is not None:
@@ -121,23 +139,211 @@ class WebServer:
         return str(value)
 
     async def handle_status(self, request: web.Request) -> web.Response:
-        snapshot: Dict[str, Any]
+        # Published snapshots are never mutated (the driver swaps in a new
+        # dict), so they are serialized without holding any lock.
+        # ``?since=N`` returns only the fields changed after version N.
+        status = getattr(self.driver, "status", None)
+        if not isinstance(status, StatusSnapshot):
+            return web.json_response(
+                {"ok": False, "error": "Status unavailable"}, status=503
+            )
+        since = request.query.get("since")
+        if since:
+            try:
+                version, changes = status.changes_since(int(since))
+            except ValueError:
+                return web.json_response(
+                    {"ok": False, "error": "Invalid query parameter"}, status=400
+                )
+            return web.json_response(
+                {"version": version, "changes": self._sanitize_for_json(changes)},
+                headers={"X-Status-Version": str(version)},
+            )
+        version, snapshot = status.snapshot()
+        return self._status_payload(snapshot).respond(
+            request, {"X-Status-Version": str(version)}
+        )
+
+    def _status_payload(self, snapshot: Dict[str, Any]) -> EncodedPayload:
+        """Serialize a published snapshot once and reuse it until replaced."""
+        cached = self._status_cache
+        if cached is None or cached[0] is not snapshot:
+            # Ensure JSON validity by sanitizing NaN/Infinity to null
+            body = json.dumps(self._sanitize_for_json(snapshot)).encode()
+            cached = self._status_cache = (snapshot, EncodedPayload(body))
+        return cached[1]
+
+    async def handle_metrics(self, request: web.Request) -> web.Response:
+        # Counters are plain attributes and gauges read the published
+        # snapshot, so a scrape needs no hop onto the GLib thread
+        return web.Response(
+            text=REGISTRY.render(), headers={"Content-Type": METRICS_CONTENT_TYPE}
+        )
+
+    async def handle_get_timings(self, request: web.Request) -> web.Response:
+        return web.json_response(TIMINGS.snapshot())
+
+    async def handle_set_timings(self, request: web.Request) -> web.Response:
         try:
-            # Use a lock if available on the driver for snapshot consistency
-            lock = getattr(self.driver, "status_lock", None)
-            if lock is not None:
-                with lock:
-                    snapshot = dict(getattr(self.driver, "status_snapshot", {}) or {})
-            else:
-                snapshot = dict(getattr(self.driver, "status_snapshot", {}) or {})
-        except Exception:
-            snapshot = {}
-        # Ensure JSON validity by sanitizing NaN/Infinity to null
-        sanitized = self._sanitize_for_json(snapshot)
-        return web.json_response(sanitized)
+            data = await request.json()
+        except json.JSONDecodeError:
+            return web.json_response({"ok": False, "error": "Invalid JSON"}, status=400)
+        if not isinstance(data, dict):
+            return web.json_response(
+                {"ok": False, "error": "Expected a JSON object"}, status=400
+            )
+
+        def _apply() -> Dict[str, Any]:
+            if data.get("reset"):
+                TIMINGS.reset()
+            if "enabled" in data:
+                TIMINGS.enabled = bool(data["enabled"])
+            return TIMINGS.snapshot()
+
+        # Histograms are written on the GLib thread; reset there too
+        return web.json_response(await self._run_on_glib(_apply))
+
+    async def handle_profile(self, request: web.Request) -> web.Response:
+        config = getattr(self.driver, "config", None)
+        if not getattr(getattr(config, "web", None), "profiler", False):
+            return web.json_response(
+                {"ok": False, "error": "Profiler disabled (set web.profiler)"},
+                status=404,
+            )
+        try:
+            seconds = float(
+                request.query.get("seconds", WebDefaults.PROFILE_DEFAULT_SECONDS)
+            )
+        except ValueError:
+            seconds = math.nan
+        # NaN slips through min()/max() and would never reach its deadline
+        if not math.isfinite(seconds):
+            return web.json_response(
+                {"ok": False, "error": "Invalid query parameter"}, status=400
+            )
+        threads = {
+            threading.main_thread().ident or 0: "glib",
+            threading.get_ident(): "web",
+        }
+        # Sampling blocks, so it runs in a worker thread; the web thread
+        # keeps serving (and is itself profiled) meanwhile
+        profile = await asyncio.get_running_loop().run_in_executor(
+            None, PROFILER.run, seconds, threads
+        )
+        if profile is None:
+            return web.json_response(
+                {"ok": False, "error": "A profile is already running"}, status=409
+            )
+        if request.query.get("format") == "json":
+            return web.json_response(profile.to_dict())
+        return web.Response(text=profile.collapsed(), content_type="text/plain")
+
+    def _on_status_changed(self, version: int) -> None:
+        """StatusSnapshot listener; runs on the GLib thread."""
+        loop = self.loop
+        if loop is None or loop.is_closed():
+            return
+        try:
+            loop.call_soon_threadsafe(self._wake_streams)
+        except RuntimeError:  # pragma: no cover - loop shutting down
+            pass
+
+    def _wake_streams(self) -> None:
+        event = self._status_changed
+        self._status_changed = asyncio.Event()
+        if event is not None:
+            event.set()
+
+    def _stream_diff(self, since: int, version: int, changes: Dict[str, Any]) -> bytes:
+        """Encode a diff event, shared by all clients at the same version."""
+        cached = self._diff_cache
+        if cached is None or cached[:2] != (since, version):
+            data = json.dumps(self._sanitize_for_json(changes))
+            event = f"id: {version}\nevent: diff\ndata: {data}\n\n".encode()
+            cached = self._diff_cache = (since, version, event)
+        return cached[2]
+
+    async def handle_stream(self, request: web.Request) -> web.StreamResponse:
+        """Push status changes as Server-Sent Events.
+
+        The first event is the full snapshot (``event: snapshot``); later
+        events carry only the fields changed since the previous one
+        (``event: diff``). The event id is the status version, so a client
+        reconnecting with ``Last-Event-ID`` resumes with a diff. A slow
+        client is never queued for: it receives one merged diff once it
+        has caught up, and is dropped if a write stalls.
+        """
+        status = getattr(self.driver, "status", None)
+        if not isinstance(status, StatusSnapshot):
+            return web.json_response(
+                {"ok": False, "error": "Status unavailable"}, status=503
+            )
+        if self.stream_clients >= WebDefaults.STREAM_MAX_CLIENTS:
+            return web.json_response(
+                {"ok": False, "error": "Too many stream clients"}, status=503
+            )
+        response = web.StreamResponse(
+            headers={
+                "Content-Type": "text/event-stream",
+                "Cache-Control": "no-cache",
+                "Access-Control-Allow-Origin": "*",
+            }
+        )
+        await response.prepare(request)
+        if self._status_changed is None:
+            self._status_changed = asyncio.Event()
+
+        sent: Optional[int] = None
+        last_id = request.headers.get("Last-Event-ID", "")
+        if last_id.isdigit() and int(last_id) <= status.version:
+            sent = int(last_id)
+
+        async def _write(data: bytes) -> None:
+            await asyncio.wait_for(
+                response.write(data), WebDefaults.STREAM_WRITE_TIMEOUT_SECONDS
+            )
+
+        self.stream_clients += 1
+        try:
+            while True:
+                # Take the event before reading the status so that a version
+                # published in between still wakes this client
+                changed = self._status_changed
+                if sent is None:
+                    version, snapshot = status.snapshot()
+                    body = self._status_payload(snapshot).body
+                    await _write(
+                        b"id: %d\nevent: snapshot\ndata: %s\n\n" % (version, body)
+                    )
+                    sent = version
+                else:
+                    version, changes = status.changes_since(sent)
+                    if version != sent:
+                        await _write(self._stream_diff(sent, version, changes))
+                        sent = version
+                try:
+                    await asyncio.wait_for(
+                        changed.wait(), WebDefaults.STREAM_HEARTBEAT_SECONDS
+                    )
+                except asyncio.TimeoutError:
+                    await _write(b": ping\n\n")
+        except asyncio.TimeoutError:
+            self.access_logger.debug("Dropping stalled status stream client")
+        except (ConnectionResetError, RuntimeError):
+            # Client went away
+            pass
+        finally:
+            self.stream_clients -= 1
+        return response
 
     async def handle_get_schema(self, request: web.Request) -> web.Response:
-        return web.json_response(get_config_schema())
+        # The schema is fixed for the process: serialized once, revalidated
+        # by ETag
+        payload = self._schema_payload
+        if payload is None:
+            body = json.dumps(get_config_schema()).encode()
+            payload = self._schema_payload = EncodedPayload(body)
+        return payload.respond(request)
 
     async def handle_get_config(self, request: web.Request) -> web.Response:
         # Get current config dict from driver
@@ -156,6 +362,108 @@ class WebServer:
         except json.JSONDecodeError:
             return web.json_response({"ok": False, "error": "Invalid JSON"}, status=400)
 
+    async def handle_get_plan(self, request: web.Request) -> web.Response:
+        plan = await self._run_on_glib(self.driver.get_charge_plan)
+        return web.json_response(self._sanitize_for_json(plan))
+
+    async def handle_get_prices(self, request: web.Request) -> web.Response:
+        prices = await self._run_on_glib(self.driver.get_price_timeline)
+        return web.json_response(self._sanitize_for_json(prices))
+
+    async def handle_get_sessions(self, request: web.Request) -> web.Response:
+        history = getattr(self.driver, "session_history", None)
+        if history is None:
+            return web.json_response({"items": [], "next_before": None})
+        query = request.query
+        try:
+            limit = int(query.get("limit", "50"))
+            before = int(query["before"]) if query.get("before") else None
+            start_ts = float(query["from"]) if query.get("from") else None
+            end_ts = float(query["to"]) if query.get("to") else None
+        except ValueError:
+            return web.json_response(
+                {"ok": False, "error": "Invalid query parameter"}, status=400
+            )
+        # Indexed SQLite reads take milliseconds; no need to hop to GLib
+        page = history.query(
+            limit=limit,
+            before=before,
+            month=query.get("month") or None,
+            start_ts=start_ts,
+            end_ts=end_ts,
+        )
+        return web.json_response(self._sanitize_for_json(page))
+
+    async def handle_get_history(self, request: web.Request) -> web.Response:
+        recorder = getattr(self.driver, "timeseries", None)
+        if recorder is None:
+            return web.json_response({"res": None, "series": {}})
+        query = request.query
+        series = [n for n in query.get("series", "power").split(",") if n]
+        try:
+            now = time.time()
+            from_ts = float(query.get("from") or now - 3600)
+            to_ts = float(query.get("to") or now)
+            res = int(query["res"]) if query.get("res") else None
+        except ValueError:
+            return web.json_response(
+                {"ok": False, "error": "Invalid query parameter"}, status=400
+            )
+        # Constant-time-ish ring reads under a short lock; safe on this thread
+        data = recorder.query(series, from_ts, to_ts, res)
+        return web.json_response(self._sanitize_for_json(data))
+
+    async def handle_get_archive(self, request: web.Request) -> web.Response:
+        fields = ["ts", "power_w", "energy_kwh", "setpoint_a", "price", "status"]
+        archive = getattr(self.driver, "metrics_archive", None)
+        if archive is None:
+            return web.json_response({"fields": fields, "rows": []})
+        query = request.query
+        try:
+            now = time.time()
+            from_ts = float(query.get("from") or now - 86400)
+            to_ts = float(query.get("to") or now)
+        except ValueError:
+            from_ts = to_ts = math.nan
+        # NaN or infinite bounds would defeat the span limit below
+        span = to_ts - from_ts
+        if not math.isfinite(span):
+            return web.json_response(
+                {"ok": False, "error": "Invalid query parameter"}, status=400
+            )
+        # The read holds the archive lock on this loop; keep it bounded
+        if span > WebDefaults.ARCHIVE_MAX_SPAN_SECONDS:
+            return web.json_response(
+                {
+                    "ok": False,
+                    "error": "Range too long (max "
+                    f"{WebDefaults.ARCHIVE_MAX_SPAN_SECONDS // 86400} days)",
+                },
+                status=400,
+            )
+        # Index lookup plus a sequential unpack of the mapped file
+        rows = archive.read(from_ts, to_ts)
+        return web.json_response(
+            {"fields": fields, "rows": self._sanitize_for_json(rows)}
+        )
+
+    async def handle_get_stats(self, request: web.Request) -> web.Response:
+        stats = getattr(self.driver, "session_stats", None)
+        query = request.query
+        periods = [p for p in query.get("period", "day,week,month").split(",") if p]
+        try:
+            limit = int(query["limit"]) if query.get("limit") else None
+            data = {
+                period: stats.query(period, limit) if stats is not None else []
+                for period in periods
+            }
+        except ValueError:
+            return web.json_response(
+                {"ok": False, "error": "Invalid query parameter"}, status=400
+            )
+        # Pre-aggregated buckets; no history scan, safe on this thread
+        return web.json_response(data)
+
     async def handle_set_mode(self, request: web.Request) -> web.Response:
         data = await request.json()
         mode = int(data.get("mode", 0))
@@ -179,6 +487,33 @@ class WebServer:
         )
         return web.json_response({"ok": bool(result)})
 
+    async def handle_commands(self, request: web.Request) -> web.Response:
+        # One GLib hop and one setpoint write for a batch of control changes
+        try:
+            data = await request.json()
+        except json.JSONDecodeError:
+            return web.json_response({"ok": False, "error": "Invalid JSON"}, status=400)
+        commands = data.get("commands") if isinstance(data, dict) else data
+        if not isinstance(commands, list) or not all(
+            isinstance(c, dict) for c in commands
+        ):
+            return web.json_response(
+                {"ok": False, "error": "Expected a list of commands"}, status=400
+            )
+        result = await self._run_on_glib(self.driver.apply_commands, commands)
+        return web.json_response(result, status=200 if result.get("ok") else 400)
+
+    async def handle_ui_asset(self, request: web.Request) -> web.Response:
+        found = (
+            self.static_assets.get(request.match_info["name"])
+            if self.static_assets is not None
+            else None
+        )
+        if found is None:
+            raise web.HTTPNotFound()
+        payload, cache_control = found
+        return payload.respond(request, {"Cache-Control": cache_control})
+
     async def index(self, request: web.Request) -> web.Response:
         return web.Response(
             text="Alfen Charger Web UI. Visit /ui/", content_type="text/plain"
@@ -194,7 +529,8 @@ class WebServer:
             handler: Callable[[web.Request], Awaitable[web.StreamResponse]],
         ) -> web.StreamResponse:
             response: web.StreamResponse = await handler(request)
-            if request.path.startswith("/api/"):
+            # Streams have sent their headers already and set CORS themselves
+            if request.path.startswith("/api/") and not response.prepared:
                 response.headers["Access-Control-Allow-Origin"] = "*"
                 response.headers["Access-Control-Allow-Headers"] = "Content-Type"
                 response.headers[
@@ -208,12 +544,24 @@ class WebServer:
             [
                 web.get("/", self.index),
                 web.get("/api/status", self.handle_status),
+                web.get("/metrics", self.handle_metrics),
+                web.get("/api/debug/timings", self.handle_get_timings),
+                web.post("/api/debug/timings", self.handle_set_timings),
+                web.get("/api/debug/profile", self.handle_profile),
+                web.get("/api/stream", self.handle_stream),
                 web.get("/api/config/schema", self.handle_get_schema),
                 web.get("/api/config", self.handle_get_config),
                 web.put("/api/config", self.handle_put_config),
+                web.get("/api/schedule/plan", self.handle_get_plan),
+                web.get("/api/prices", self.handle_get_prices),
+                web.get("/api/sessions", self.handle_get_sessions),
+                web.get("/api/stats", self.handle_get_stats),
+                web.get("/api/history", self.handle_get_history),
+                web.get("/api/archive", self.handle_get_archive),
                 web.post("/api/mode", self.handle_set_mode),
                 web.post("/api/startstop", self.handle_startstop),
                 web.post("/api/set_current", self.handle_set_current),
+                web.post("/api/commands", self.handle_commands),
             ]
         )
 
@@ -223,13 +571,18 @@ class WebServer:
             async def _redirect_root(request: web.Request) -> web.Response:
                 return web.HTTPFound("/ui/index.html")
 
+            # Assets are loaded and compressed once, then served from memory
+            self.static_assets = StaticAssets(static_dir)
             app.router.add_get("/ui", _redirect_root)
             app.router.add_get("/ui/", _redirect_root)
-            app.router.add_static("/ui/", str(static_dir), show_index=False)
+            app.router.add_get("/ui/{name}", self.handle_ui_asset)
         return app
 
     async def _start_async(self) -> None:
         self.loop = asyncio.get_running_loop()
+        status = getattr(self.driver, "status", None)
+        if isinstance(status, StatusSnapshot):
+            status.subscribe(self._on_status_changed)
         app = await self._create_app()
         self.runner = web.AppRunner(
             app,
@@ -47,6 +47,38 @@ function addHistoryPoint(s) {
   drawChart();
 }
 
+// Seed the chart with server-side history so it is populated right after load
+async function preloadHistory() {
+  try {
+    const from = Date.now() / 1000 - chartHistory.maxBufferSec;
+    const res = await fetch(`/api/history?series=current,setpoint,station&from=${from}`);
+    const data = await res.json();
+    const series = data.series || {};
+    const byTs = new Map();
+    const merge = (name, key) => {
+      (series[name] || []).forEach(([t, , , avg]) => {
+        if (avg === null || avg === undefined) {
+          return;
+        }
+        const p = byTs.get(t) || { t, current: 0, allowed: 0, station: 0 };
+        p[key] = Number(avg);
+        byTs.set(t, p);
+      });
+    };
+    merge('current', 'current');
+    merge('setpoint', 'allowed');
+    merge('station', 'station');
+    const firstLive = chartHistory.points.length ? chartHistory.points[0].t : Infinity;
+    const seeded = Array.from(byTs.values())
+      .filter(p => p.t < firstLive)
+      .sort((a, b) => a.t - b.t);
+    chartHistory.points = seeded.concat(chartHistory.points);
+    drawChart();
+  } catch (e) {
+    // History is optional; live polling fills the chart anyway
+  }
+}
+
 function drawDotOnChart(ctx, x, y, color) {
   ctx.fillStyle = color;
   ctx.beginPath();
@@ -583,167 +615,165 @@ $('current_slider').addEventListener('pointerup', () => {
   });
 })();
 
-async function fetchStatus() {
-  try {
-    const res = await fetch('/api/status');
-    const s = await res.json();
-    s._last_update_ts = Date.now() / 1000;
-    setConnectionState(true);
-    showError('');
-    window.lastStatusData = s; // Store for session timer
-    setTextIfExists('product', s.product_name || '');
-    setTextIfExists('serial', s.serial ? `SN ${s.serial}` : '');
-    setTextIfExists('firmware', s.firmware ? `FW ${s.firmware}` : '');
-    // If server confirmed pending mode, clear pending and let UI reflect server
-    if (pendingMode !== null && Number(s.mode ?? 0) === Number(pendingMode)) {
-      pendingMode = null;
-      modeDirtyUntil = 0;
-      if (pendingModeTimer) {
-        clearTimeout(pendingModeTimer);
-        pendingModeTimer = null;
-      }
+function renderStatus(s) {
+  s._last_update_ts = Date.now() / 1000;
+  window.lastStatusData = s; // Store for session timer
+  setTextIfExists('product', s.product_name || '');
+  setTextIfExists('serial', s.serial ? `SN ${s.serial}` : '');
+  setTextIfExists('firmware', s.firmware ? `FW ${s.firmware}` : '');
+  // If server confirmed pending mode, clear pending and let UI reflect server
+  if (pendingMode !== null && Number(s.mode ?? 0) === Number(pendingMode)) {
+    pendingMode = null;
+    modeDirtyUntil = 0;
+    if (pendingModeTimer) {
+      clearTimeout(pendingModeTimer);
+      pendingModeTimer = null;
     }
-    setModeUI(Number(s.mode ?? 0));
-    setChargeUI(Number(s.start_stop ?? 1) === 1);
-    // Determine which current to display based on mode
-    const mode = Number(s.mode ?? 0);
-    const setpoint = Number(s.set_current ?? 6.0);
-    let displayCurrent = setpoint;
+  }
+  setModeUI(Number(s.mode ?? 0));
+  setChargeUI(Number(s.start_stop ?? 1) === 1);
+  // Determine which current to display based on mode
+  const mode = Number(s.mode ?? 0);
+  const setpoint = Number(s.set_current ?? 6.0);
+  let displayCurrent = setpoint;
+  if (mode === 1) {
+    // AUTO
+    displayCurrent = Number(s.applied_current ?? setpoint);
+  } else if (mode === 2) {
+    // SCHEDULED
+    displayCurrent = Number(s.applied_current ?? setpoint);
+  }
+  // Update display and slider separately
+  const stationMax = Number(s.station_max_current ?? 0);
+  setCurrentUI(displayCurrent, stationMax);
+  const slider = $('current_slider');
+  if (slider && Date.now() >= currentDirtyUntil) {
     if (mode === 1) {
-      // AUTO
-      displayCurrent = Number(s.applied_current ?? setpoint);
-    } else if (mode === 2) {
-      // SCHEDULED
-      displayCurrent = Number(s.applied_current ?? setpoint);
+      slider.value = String(displayCurrent);
+      slider.setAttribute('aria-valuenow', String(Math.round(displayCurrent)));
+    } else {
+      slider.value = String(setpoint);
+      slider.setAttribute('aria-valuenow', String(Math.round(setpoint)));
     }
-    // Update display and slider separately
-    const stationMax = Number(s.station_max_current ?? 0);
-    setCurrentUI(displayCurrent, stationMax);
-    const slider = $('current_slider');
-    if (slider && Date.now() >= currentDirtyUntil) {
-      if (mode === 1) {
-        slider.value = String(displayCurrent);
-        slider.setAttribute('aria-valuenow', String(Math.round(displayCurrent)));
-      } else {
-        slider.value = String(setpoint);
-        slider.setAttribute('aria-valuenow', String(Math.round(setpoint)));
-      }
+  }
+  setTextIfExists('di', s.device_instance ?? '');
+  const stName = statusNames[s.status] || '-';
+  setTextIfExists('status', stName);
+  setTextIfExists(
+    'status_text',
+    s.status === 2 ? `Charging ${Number(s.active_phases) === 1 ? '1P' : '3P'}` : stName
+  );
+  const p = Number(s.ac_power || 0);
+
+  // Animate power value changes
+  const powerEl = $('hero_power_w');
+  if (powerEl) {
+    const currentPower = parseInt(powerEl.textContent) || 0;
+    const newPower = Math.round(p);
+
+    if (Math.abs(newPower - currentPower) > 10) {
+      powerEl.style.transform = 'scale(1.1)';
+      powerEl.style.transition = 'all 0.3s ease';
+      setTimeout(() => {
+        powerEl.style.transform = '';
+      }, 300);
     }
-    setTextIfExists('di', s.device_instance ?? '');
-    const stName = statusNames[s.status] || '-';
-    setTextIfExists('status', stName);
-    setTextIfExists(
-      'status_text',
-      s.status === 2 ? `Charging ${Number(s.active_phases) === 1 ? '1P' : '3P'}` : stName
-    );
-    const p = Number(s.ac_power || 0);
-
-    // Animate power value changes
-    const powerEl = $('hero_power_w');
-    if (powerEl) {
-      const currentPower = parseInt(powerEl.textContent) || 0;
-      const newPower = Math.round(p);
 
-      if (Math.abs(newPower - currentPower) > 10) {
-        powerEl.style.transform = 'scale(1.1)';
-        powerEl.style.transition = 'all 0.3s ease';
-        setTimeout(() => {
-          powerEl.style.transform = '';
-        }, 300);
-      }
+    // Display power in watts or kW if >= 1000W
+    powerEl.textContent = newPower >= 1000 ? (newPower / 1000).toFixed(2) : newPower;
+  }
+  // Display power with conditional units
+  setTextIfExists('active_power', p >= 1000 ? (p / 1000).toFixed(2) : Math.round(p));
+  const unitEl = $('hero_power_unit');
+  if (unitEl) {
+    unitEl.textContent = p >= 1000 ? 'kW' : 'W';
+  }
 
-      // Display power in watts or kW if >= 1000W
-      powerEl.textContent = newPower >= 1000 ? (newPower / 1000).toFixed(2) : newPower;
+  // Update session info elements with actual data from backend
+  if ($('session_time')) {
+    // Prefer charger-reported ChargingTime (seconds) to avoid timezone issues
+    if (typeof s.charging_time === 'number' && s.charging_time > 0) {
+      const duration = Math.floor(s.charging_time);
+      const hours = Math.floor(duration / 3600);
+      const minutes = Math.floor((duration % 3600) / 60);
+      const seconds = duration % 60;
+      $('session_time').textContent = `${hours.toString().padStart(2, '0')}:${minutes
+        .toString()
+        .padStart(2, '0')}:${seconds.toString().padStart(2, '0')}`;
+    } else if (s.session && s.session.start_ts) {
+      // Fallback: compute from session start/end timestamps
+      const startTime = new Date(s.session.start_ts).getTime();
+      const endTime = s.session.end_ts ? new Date(s.session.end_ts).getTime() : Date.now();
+      const duration = Math.floor((endTime - startTime) / 1000);
+      const hours = Math.floor(duration / 3600);
+      const minutes = Math.floor((duration % 3600) / 60);
+      const seconds = duration % 60;
+      $('session_time').textContent = `${hours.toString().padStart(2, '0')}:${minutes
+        .toString()
+        .padStart(2, '0')}:${seconds.toString().padStart(2, '0')}`;
+    } else {
+      $('session_time').textContent = '00:00:00';
     }
-    // Display power with conditional units
-    setTextIfExists('active_power', p >= 1000 ? (p / 1000).toFixed(2) : Math.round(p));
-    const unitEl = $('hero_power_unit');
-    if (unitEl) {
-      unitEl.textContent = p >= 1000 ? 'kW' : 'W';
+  }
+  if ($('session_energy')) {
+    // Use actual session energy from Ac/Energy/Forward
+    $('session_energy').textContent = (s.energy_forward_kwh ?? 0).toFixed(2);
+  }
+  if ($('session_cost')) {
+    // Prefer server-calculated session_cost (hourly price aware) if provided
+    let cost = s.session_cost;
+    if (cost === null || cost === undefined) {
+      const energy = s.energy_forward_kwh ?? 0;
+      // Fallback: flat rate per kWh when hourly breakdown is unavailable
+      const rate = s.energy_rate ?? 0.25;
+      cost = energy * rate;
     }
+    const currency = s.pricing_currency || '€';
+    $('session_cost').textContent = `${currency}${Number(cost).toFixed(2)}`;
+  }
+  if ($('total_energy')) {
+    // Use total lifetime energy available from charger
+    const totalEnergy = s.total_energy_kwh ?? 0;
+    $('total_energy').textContent = Number(totalEnergy).toFixed(2);
+  }
+  // Update active status indicator
+  if ($('active_status')) {
+    $('active_status').style.color = s.status === 2 ? '#22c55e' : '#666';
+  }
+  // Update charging port animation
+  const chargingPort = document.querySelector('.charging-port');
+  if (chargingPort) {
+    chargingPort.style.fill = s.status === 2 ? '#22c55e' : '#666';
+  }
+  setTextIfExists('ac_current', `${(s.ac_current ?? 0).toFixed(2)} A`);
+  setTextIfExists('ac_power', p >= 1000 ? `${(p / 1000).toFixed(2)} kW` : `${Math.round(p)} W`);
+  setTextIfExists('energy', `${(s.energy_forward_kwh ?? 0).toFixed(3)} kWh`);
+  setTextIfExists(
+    'l1',
+    `${(s.l1_voltage ?? 0).toFixed(1)} V / ${(s.l1_current ?? 0).toFixed(2)} A / ${Math.round(
+      s.l1_power ?? 0
+    )} W`
+  );
+  setTextIfExists(
+    'l2',
+    `${(s.l2_voltage ?? 0).toFixed(1)} V / ${(s.l2_current ?? 0).toFixed(2)} A / ${Math.round(
+      s.l2_power ?? 0
+    )} W`
+  );
+  setTextIfExists(
+    'l3',
+    `${(s.l3_voltage ?? 0).toFixed(1)} V / ${(s.l3_current ?? 0).toFixed(2)} A / ${Math.round(
+      s.l3_power ?? 0
+    )} W`
+  );
+}
 
-    // Update session info elements with actual data from backend
-    if ($('session_time')) {
-      // Prefer charger-reported ChargingTime (seconds) to avoid timezone issues
-      if (typeof s.charging_time === 'number' && s.charging_time > 0) {
-        const duration = Math.floor(s.charging_time);
-        const hours = Math.floor(duration / 3600);
-        const minutes = Math.floor((duration % 3600) / 60);
-        const seconds = duration % 60;
-        $('session_time').textContent = `${hours.toString().padStart(2, '0')}:${minutes
-          .toString()
-          .padStart(2, '0')}:${seconds.toString().padStart(2, '0')}`;
-      } else if (s.session && s.session.start_ts) {
-        // Fallback: compute from session start/end timestamps
-        const startTime = new Date(s.session.start_ts).getTime();
-        const endTime = s.session.end_ts ? new Date(s.session.end_ts).getTime() : Date.now();
-        const duration = Math.floor((endTime - startTime) / 1000);
-        const hours = Math.floor(duration / 3600);
-        const minutes = Math.floor((duration % 3600) / 60);
-        const seconds = duration % 60;
-        $('session_time').textContent = `${hours.toString().padStart(2, '0')}:${minutes
-          .toString()
-          .padStart(2, '0')}:${seconds.toString().padStart(2, '0')}`;
-      } else {
-        $('session_time').textContent = '00:00:00';
-      }
-    }
-    if ($('session_energy')) {
-      // Use actual session energy from Ac/Energy/Forward
-      $('session_energy').textContent = (s.energy_forward_kwh ?? 0).toFixed(2);
-    }
-    if ($('session_cost')) {
-      // Prefer server-calculated session_cost (hourly price aware) if provided
-      let cost = s.session_cost;
-      if (cost === null || cost === undefined) {
-        const energy = s.energy_forward_kwh ?? 0;
-        // Fallback: flat rate per kWh when hourly breakdown is unavailable
-        const rate = s.energy_rate ?? 0.25;
-        cost = energy * rate;
-      }
-      const currency = s.pricing_currency || '€';
-      $('session_cost').textContent = `${currency}${Number(cost).toFixed(2)}`;
-    }
-    if ($('total_energy')) {
-      // Use total lifetime energy available from charger
-      const totalEnergy = s.total_energy_kwh ?? 0;
-      $('total_energy').textContent = Number(totalEnergy).toFixed(2);
-    }
-    // Update active status indicator
-    if ($('active_status')) {
-      $('active_status').style.color = s.status === 2 ? '#22c55e' : '#666';
-    }
-    // Update charging port animation
-    const chargingPort = document.querySelector('.charging-port');
-    if (chargingPort) {
-      chargingPort.style.fill = s.status === 2 ? '#22c55e' : '#666';
-    }
-    setTextIfExists('ac_current', `${(s.ac_current ?? 0).toFixed(2)} A`);
-    setTextIfExists('ac_power', p >= 1000 ? `${(p / 1000).toFixed(2)} kW` : `${Math.round(p)} W`);
-    setTextIfExists('energy', `${(s.energy_forward_kwh ?? 0).toFixed(3)} kWh`);
-    setTextIfExists(
-      'l1',
-      `${(s.l1_voltage ?? 0).toFixed(1)} V / ${(s.l1_current ?? 0).toFixed(2)} A / ${Math.round(
-        s.l1_power ?? 0
-      )} W`
-    );
-    setTextIfExists(
-      'l2',
-      `${(s.l2_voltage ?? 0).toFixed(1)} V / ${(s.l2_current ?? 0).toFixed(2)} A / ${Math.round(
-        s.l2_power ?? 0
-      )} W`
-    );
-    setTextIfExists(
-      'l3',
-      `${(s.l3_voltage ?? 0).toFixed(1)} V / ${(s.l3_current ?? 0).toFixed(2)} A / ${Math.round(
-        s.l3_power ?? 0
-      )} W`
-    );
-    addHistoryPoint(s);
-    // only rebuild form when closed to avoid flicker while editing
-    if (!isConfigOpen && currentSchema && currentConfig) {
-      // no-op here; form rebuild is heavy and only needed after save
-    }
+async function fetchStatus() {
+  try {
+    const res = await fetch('/api/status');
+    renderStatus(await res.json());
+    setConnectionState(true);
+    showError('');
   } catch (e) {
     setConnectionState(false);
     showError('Failed to fetch status. Retrying…');
@@ -752,6 +782,34 @@ async function fetchStatus() {
   }
 }
 
+// Live status: the server pushes a full snapshot, then only changed fields.
+// While the stream is down (or unsupported) fall back to polling.
+let statusStream = null;
+let statusStreamOpen = false;
+
+function startStatusStream() {
+  if (typeof EventSource === 'undefined') {
+    return;
+  }
+  statusStream = new EventSource('/api/stream');
+  statusStream.addEventListener('open', () => {
+    statusStreamOpen = true;
+    setConnectionState(true);
+    showError('');
+  });
+  statusStream.addEventListener('snapshot', e => {
+    renderStatus(JSON.parse(e.data));
+  });
+  statusStream.addEventListener('diff', e => {
+    renderStatus({ ...(window.lastStatusData || {}), ...JSON.parse(e.data) });
+  });
+  statusStream.addEventListener('error', () => {
+    // EventSource reconnects by itself, resuming via Last-Event-ID; polling
+    // reports the connection state meanwhile
+    statusStreamOpen = false;
+  });
+}
+
 async function getJSON(url) {
   const res = await fetch(url);
   return await res.json();
@@ -844,7 +902,14 @@ function createInput(fieldKey, def, value, path) {
       break;
     }
     case 'array': {
-      // Only special case we support here is days-of-week chips
+      if (def.ui === 'csv') {
+        // Ordered list of strings edited as comma-separated text
+        input = document.createElement('input');
+        input.type = 'text';
+        input.value = (value || []).join(', ');
+        break;
+      }
+      // Otherwise render days-of-week chips
       const container = document.createElement('div');
       container.className = 'days';
       const days = ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun'];
@@ -887,6 +952,12 @@ function getValueFromInput(input, def) {
   if (def.type === 'number') {
     return input.value === '' ? null : parseFloat(input.value);
   }
+  if (def.type === 'array' && def.ui === 'csv') {
+    return input.value
+      .split(',')
+      .map(v => v.trim())
+      .filter(v => v);
+  }
   if (def.type === 'array' && def.ui === 'days') {
     const arr = [];
     Array.from(input.querySelectorAll('.day-chip')).forEach((chip, idx) => {
@@ -1274,13 +1345,20 @@ function initUX() {
 
 // Kick off
 resizeChartCanvas();
+preloadHistory();
 fetchStatus();
+startStatusStream();
 initConfigForm();
 initUX();
-// Reduce polling frequency to 2s to lower UI churn
+// Chart cadence stays at 2s; status is only polled while the stream is down
 setInterval(() => {
   resizeChartCanvas();
-  fetchStatus();
+  if (!statusStreamOpen) {
+    fetchStatus();
+  }
+  if (window.lastStatusData) {
+    addHistoryPoint(window.lastStatusData);
+  }
 }, 2000);
 
 // Update session time more frequently when charging
@@ -4,7 +4,7 @@ import logging
 import os
 import sys
 import tempfile
-from typing import Generator
+from typing import Callable, Generator, List
 from unittest.mock import MagicMock, Mock
 
 import pytest
@@ -33,6 +33,38 @@ from alfen_driver.config import (  # noqa: E402
 # Disable logging during tests unless explicitly enabled
 logging.disable(logging.CRITICAL)
 
+# Lines reported by benchmarks, printed in the terminal summary
+_BENCHMARK_RESULTS: List[str] = []
+
+
+def pytest_collection_modifyitems(
+    config: pytest.Config, items: List[pytest.Item]
+) -> None:
+    """Skip wall-clock benchmarks unless ALFEN_BENCHMARKS is set."""
+    if os.environ.get("ALFEN_BENCHMARKS"):
+        return
+    skip = pytest.mark.skip(reason="benchmark; set ALFEN_BENCHMARKS=1 to run")
+    for item in items:
+        if "benchmark" in item.keywords:
+            item.add_marker(skip)
+
+
+def pytest_terminal_summary(terminalreporter: pytest.TerminalReporter) -> None:
+    if _BENCHMARK_RESULTS:
+        terminalreporter.section("benchmarks")
+        for line in _BENCHMARK_RESULTS:
+            terminalreporter.write_line(line)
+
+
+@pytest.fixture
+def benchmark_report(request: pytest.FixtureRequest) -> Callable[[str], None]:
+    """Report a benchmark result line in the pytest terminal summary."""
+
+    def report(line: str) -> None:
+        _BENCHMARK_RESULTS.append(f"{request.node.nodeid}: {line}")
+
+    return report
+
 
 @pytest.fixture
 def mock_modbus_client() -> Mock:
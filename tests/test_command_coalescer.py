@@ -0,0 +1,56 @@
+from alfen_driver.command_coalescer import CommandCoalescer
+
+
+class _Timers:
+    def __init__(self) -> None:
+        self.pending = []
+
+    def __call__(self, delay_ms, callback):
+        self.pending.append((delay_ms, callback))
+        return len(self.pending)
+
+    def fire(self) -> None:
+        pending, self.pending = self.pending, []
+        for _, callback in pending:
+            assert callback() is False
+
+
+def test_slider_burst_becomes_one_write() -> None:
+    calls = []
+    timers = _Timers()
+    coalescer = CommandCoalescer(lambda *a: calls.append(a), 250, timers)
+    for amps in (6.0, 8.0, 10.0, 12.0, 16.0):
+        coalescer.submit("SetCurrent change", amps, apply=True, refresh_station=True)
+
+    # One timer armed by the first change; nothing written yet
+    assert [delay for delay, _ in timers.pending] == [250]
+    assert calls == []
+    timers.fire()
+    assert calls == [("SetCurrent change", 16.0, True, True)]
+    assert (coalescer.submitted, coalescer.flushes) == (5, 1)
+    assert not coalescer.pending
+
+
+def test_sources_and_flags_are_merged() -> None:
+    calls = []
+    timers = _Timers()
+    coalescer = CommandCoalescer(lambda *a: calls.append(a), 250, timers)
+    coalescer.submit("SetCurrent change", 10.0, refresh_station=True)
+    coalescer.submit("StartStop change", 0.0, apply=True)
+    timers.fire()
+    assert calls == [("SetCurrent change + StartStop change", 0.0, True, True)]
+
+    # The next burst arms a new timer
+    coalescer.submit("Mode change", apply=True)
+    timers.fire()
+    assert calls[-1] == ("Mode change", None, True, False)
+
+
+def test_zero_window_applies_immediately() -> None:
+    calls = []
+    timers = _Timers()
+    coalescer = CommandCoalescer(lambda *a: calls.append(a), 0, timers)
+    coalescer.submit("Mode change", apply=True)
+    coalescer.submit("Mode change", apply=True)
+    assert len(calls) == 2
+    assert timers.pending == []
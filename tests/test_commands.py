@@ -0,0 +1,137 @@
+import asyncio
+import json
+from unittest.mock import MagicMock
+
+import pytest
+from aiohttp import web
+
+from alfen_driver.dbus_utils import EVC_CHARGE, EVC_MODE
+from alfen_driver.driver import AlfenDriver, MutableValue
+from alfen_driver.web import WebServer
+
+
+@pytest.fixture
+def driver(monkeypatch):
+    monkeypatch.setattr(
+        "alfen_driver.driver.update_station_max_current", lambda *a: 32.0
+    )
+    drv = MagicMock()
+    drv.current_mode = MutableValue(EVC_MODE.AUTO.value)
+    drv.start_stop = MutableValue(EVC_CHARGE.ENABLED.value)
+    drv.intended_set_current = MutableValue(6.0)
+    drv._apply_current_change = MagicMock(return_value=True)
+    return drv
+
+
+def test_mode_and_current_apply_with_one_write(driver) -> None:
+    result = AlfenDriver.apply_commands(
+        driver,
+        [
+            {"command": "mode", "value": EVC_MODE.MANUAL.value},
+            {"command": "set_current", "value": 99},
+        ],
+    )
+    assert result == {"ok": True, "applied": True}
+    assert driver.current_mode.value == EVC_MODE.MANUAL.value
+    assert driver.intended_set_current.value == 64.0
+    driver._apply_current_change.assert_called_once_with(
+        "Commands", 64.0, force_verify=True
+    )
+    driver._persist_state.assert_called_once_with()
+    driver._merge_status_snapshot.assert_called_once_with(
+        {"set_current": 64.0, "mode": EVC_MODE.MANUAL.value}
+    )
+
+
+def test_invalid_batch_changes_nothing(driver) -> None:
+    result = AlfenDriver.apply_commands(
+        driver,
+        [
+            {"command": "set_current", "value": 10},
+            {"command": "mode", "value": 42},
+        ],
+    )
+    assert result["ok"] is False
+    assert driver.intended_set_current.value == 6.0
+    driver._apply_current_change.assert_not_called()
+    driver._persist_state.assert_not_called()
+
+
+def test_auto_mode_current_waits_for_next_poll(driver) -> None:
+    result = AlfenDriver.apply_commands(
+        driver, [{"command": "set_current", "value": 8}]
+    )
+    assert result == {"ok": True, "applied": False}
+    driver._apply_current_change.assert_not_called()
+
+    AlfenDriver.apply_commands(driver, [{"command": "start_stop", "value": False}])
+    driver._apply_current_change.assert_called_once_with(
+        "Commands", 0.0, force_verify=True
+    )
+
+
+def test_unexpected_error_is_reported_not_raised(driver, monkeypatch) -> None:
+    def broken(*args):
+        raise RuntimeError("station register decode failed")
+
+    monkeypatch.setattr("alfen_driver.driver.update_station_max_current", broken)
+    result = AlfenDriver.apply_commands(
+        driver, [{"command": "set_current", "value": 10}]
+    )
+    assert result == {"ok": False, "error": "station register decode failed"}
+    driver._apply_current_change.assert_not_called()
+
+
+def test_scheduled_mode_logs_price_overview(driver, monkeypatch) -> None:
+    monkeypatch.setattr(
+        "alfen_driver.driver.get_hourly_overview_text", lambda cfg: "overview"
+    )
+    driver.config.tibber.enabled = True
+    driver._log_mode_change = lambda: AlfenDriver._log_mode_change(driver)
+
+    result = AlfenDriver.apply_commands(
+        driver, [{"command": "mode", "value": EVC_MODE.SCHEDULED.value}]
+    )
+    assert result == {"ok": True, "applied": False}
+    driver.logger.info.assert_any_call("Mode changed to SCHEDULED")
+    driver.logger.info.assert_any_call("overview")
+
+
+@pytest.mark.asyncio
+async def test_commands_endpoint_uses_one_glib_hop(monkeypatch) -> None:
+    hops = []
+
+    class FakeGLib:
+        PRIORITY_DEFAULT = 0
+
+        @staticmethod
+        def idle_add(fn, priority=0):
+            hops.append(fn)
+            fn()
+            return True
+
+    monkeypatch.setattr("alfen_driver.web.GLib", FakeGLib)
+    drv = MagicMock()
+    drv.apply_commands = MagicMock(return_value={"ok": True, "applied": True})
+    server = WebServer(drv)
+    server.loop = asyncio.get_running_loop()
+
+    commands = [{"command": "mode", "value": 0}, {"command": "start_stop", "value": 1}]
+    req = MagicMock(spec=web.Request)
+
+    async def _json():
+        return {"commands": commands}
+
+    req.json = _json
+    resp = await server.handle_commands(req)
+    assert resp.status == 200
+    assert json.loads(resp.text) == {"ok": True, "applied": True}
+    drv.apply_commands.assert_called_once_with(commands)
+    assert len(hops) == 1
+
+    async def _bad_json():
+        return {"commands": "mode"}
+
+    req.json = _bad_json
+    resp = await server.handle_commands(req)
+    assert resp.status == 400
@@ -94,6 +94,13 @@ class TestControlsConfig:
         assert "max_set_current" in str(exc_info.value)
         assert "must be positive" in str(exc_info.value)
 
+    def test_controls_config_coalesce_window_range(self) -> None:
+        """Test validation error for an out-of-range coalescing window."""
+        assert ControlsConfig().command_coalesce_ms == 250
+        with pytest.raises(ValidationError) as exc_info:
+            ControlsConfig(command_coalesce_ms=-1)
+        assert "command_coalesce_ms" in str(exc_info.value)
+
 
 class TestConfig:
     """Tests for main Config dataclass."""
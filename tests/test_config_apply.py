@@ -0,0 +1,94 @@
+import copy
+import dataclasses
+from unittest.mock import MagicMock
+
+import pytest
+
+from alfen_driver.config import Config
+from alfen_driver.config_validator import _COMPILED_SCHEMA
+from alfen_driver.driver import AlfenDriver
+
+
+@pytest.fixture
+def base_dict():
+    return dataclasses.asdict(Config.from_dict({"modbus": {"ip": "192.168.1.10"}}))
+
+
+@pytest.fixture
+def driver(base_dict, tmp_path, monkeypatch):
+    monkeypatch.setattr("alfen_driver.driver.set_logic_config", lambda cfg: None)
+    drv = MagicMock()
+    drv.config = Config.from_dict(base_dict)
+    drv.config_file_path = str(tmp_path / "config.yaml")
+    drv._charger_params_stale = False
+    drv._reconfigure = lambda changed, old: AlfenDriver._reconfigure(drv, changed, old)
+    return drv
+
+
+def test_diff_reports_changed_sections(base_dict) -> None:
+    old = Config.from_dict(base_dict)
+    new_dict = copy.deepcopy(base_dict)
+    new_dict["tibber"]["strategy"] = "percentile"
+    new_dict["timezone"] = "Europe/Amsterdam"
+    assert old.diff(Config.from_dict(new_dict)) == {"tibber", "timezone"}
+    # Defaults filled in by from_dict are not changes
+    assert old.diff(Config.from_dict({"modbus": {"ip": "192.168.1.10"}})) == set()
+
+
+def test_tibber_change_touches_nothing_in_modbus(
+    driver, base_dict, monkeypatch
+) -> None:
+    def _fail(value, path, report):
+        raise AssertionError("schedule section was not changed")
+
+    monkeypatch.setitem(_COMPILED_SCHEMA.sections, "schedule", _fail)
+    client = driver.client
+    new_dict = copy.deepcopy(base_dict)
+    new_dict["tibber"]["strategy"] = "percentile"
+
+    result = AlfenDriver.apply_config_from_dict(driver, new_dict)
+
+    assert result == {"ok": True, "changed": ["tibber"]}
+    assert driver.config.tibber.strategy == "percentile"
+    assert driver.client is client
+    client.close.assert_not_called()
+    driver._read_charger_parameters.assert_not_called()
+    assert driver._charger_params_stale is False
+    driver.price_engine.set_config.assert_called_once_with(
+        driver.config.pricing, driver.config.tibber
+    )
+    driver._sync_tibber_live_feed.assert_called_once_with()
+    driver.charge_planner.set_config.assert_called_once_with(driver.config)
+
+
+def test_modbus_change_defers_charger_reads(driver, base_dict) -> None:
+    old_client = driver.client
+    new_dict = copy.deepcopy(base_dict)
+    new_dict["modbus"]["ip"] = "192.168.1.11"
+
+    result = AlfenDriver.apply_config_from_dict(driver, new_dict)
+
+    assert result == {"ok": True, "changed": ["modbus"]}
+    old_client.close.assert_called_once_with()
+    assert driver.client is not old_client
+    assert driver.client.comm_params.host == "192.168.1.11"
+    # No blocking reads on the calling thread; the next tick re-reads
+    driver._read_charger_parameters.assert_not_called()
+    assert driver._charger_params_stale is True
+    driver.price_engine.set_config.assert_not_called()
+    driver.charge_planner.set_config.assert_not_called()
+
+
+def test_unchanged_config_is_a_no_op(driver, base_dict, tmp_path) -> None:
+    result = AlfenDriver.apply_config_from_dict(driver, copy.deepcopy(base_dict))
+    assert result == {"ok": True, "changed": []}
+    assert not (tmp_path / "config.yaml").exists()
+
+
+def test_invalid_changed_section_is_rejected(driver, base_dict) -> None:
+    old_config = driver.config
+    new_dict = copy.deepcopy(base_dict)
+    new_dict["logging"]["level"] = "LOUD"
+    result = AlfenDriver.apply_config_from_dict(driver, new_dict)
+    assert result["ok"] is False
+    assert driver.config is old_config
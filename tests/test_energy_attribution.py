@@ -0,0 +1,119 @@
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from alfen_driver import logic
+from alfen_driver.energy_attribution import (
+    EnergyAttribution,
+    EnergyFlows,
+    split_power,
+)
+from alfen_driver.session_manager import ChargingSessionManager
+from alfen_driver.session_stats import SessionStatsRollup
+
+
+@pytest.mark.parametrize(
+    ("flows", "expected"),
+    [
+        # 10 kW PV, 1 kW house + 7 kW EV: all solar
+        (EnergyFlows(10000, 8000, 2000), (1.0, 0.0, 0.0)),
+        # 4.5 kW PV, 1 kW house: 3.5 of 7 kW from PV, battery adds 2 kW
+        (EnergyFlows(4500, 8000, -2000), (0.5, 2 / 7, 1.5 / 7)),
+        # Night, battery first covers the 1 kW house load
+        (EnergyFlows(0, 8000, -1500), (0.0, 0.5 / 7, 6.5 / 7)),
+        # No PV, no battery: grid only
+        (EnergyFlows(0, 8000, 0), (0.0, 0.0, 1.0)),
+    ],
+)
+def test_split_power(flows, expected) -> None:
+    assert split_power(7000.0, flows) == pytest.approx(expected)
+
+
+def test_attribution_totals_match_energy() -> None:
+    split = EnergyAttribution()
+    assert split.add(1.0, 7000.0, EnergyFlows(4500, 8000, -2000)) == 0.5
+    # Unknown flows are counted as grid so the totals still add up
+    split.add(0.5, 7000.0, None)
+    assert split.total_kwh == pytest.approx(1.5)
+    assert split.solar_share == pytest.approx(1 / 3)
+    assert EnergyAttribution.from_dict(split.to_dict()).grid_kwh == pytest.approx(
+        split.grid_kwh, abs=1e-4
+    )
+    assert EnergyAttribution().solar_share is None
+
+
+def test_session_accumulates_and_persists_split(monkeypatch) -> None:
+    now = [datetime(2025, 6, 1, 12, 0)]
+
+    class Clock:
+        @classmethod
+        def now(cls) -> datetime:
+            return now[0]
+
+        @staticmethod
+        def fromisoformat(s: str) -> datetime:
+            return datetime.fromisoformat(s)
+
+    monkeypatch.setattr("alfen_driver.session_manager.datetime", Clock)
+    stats = SessionStatsRollup()
+    mgr = ChargingSessionManager(stats=stats)
+    sunny = EnergyFlows(12000, 8000, 0)
+    energy = 50.0
+    for _ in range(30):
+        mgr.update(7000.0, energy, flows=sunny)
+        now[0] += timedelta(seconds=10)
+        energy += 7.0 / 360
+
+    session = mgr.current_session
+    assert session is not None
+    assert session.attribution.total_kwh == pytest.approx(session.energy_delivered_kwh)
+    assert mgr.get_session_stats()["session_solar_share"] == pytest.approx(1.0)
+    assert stats.query("day")[0]["solar_share"] == pytest.approx(1.0)
+
+    restored = ChargingSessionManager()
+    restored.restore_state(mgr.get_state())
+    assert restored.current_session.attribution.solar_kwh == pytest.approx(
+        session.attribution.solar_kwh, abs=1e-4
+    )
+
+
+def test_glitched_read_does_not_move_the_attribution_baseline(monkeypatch) -> None:
+    now = [datetime(2025, 6, 1, 12, 0)]
+
+    class Clock:
+        @classmethod
+        def now(cls) -> datetime:
+            return now[0]
+
+    monkeypatch.setattr("alfen_driver.session_manager.datetime", Clock)
+    mgr = ChargingSessionManager()
+    sunny = EnergyFlows(12000, 8000, 0)
+    for energy in (12000.0, 12000.1, 12000.2, 0.0, 12000.3):
+        mgr.update(7000.0, energy, flows=sunny)
+        now[0] += timedelta(seconds=10)
+
+    session = mgr.current_session
+    assert session is not None
+    assert session.current_energy_kwh == pytest.approx(12000.3)
+    assert session.attribution.total_kwh == pytest.approx(0.3)
+    assert session.attribution.total_kwh == pytest.approx(session.energy_delivered_kwh)
+
+
+def test_get_energy_flows_reuses_fresh_auto_mode_read(monkeypatch) -> None:
+    monkeypatch.setattr(logic, "_last_flows", None)
+    values = {
+        "Dc/Pv/Power": 3000.0,
+        "Ac/PvOnOutput/L1/Power": 1000.0,
+        "Ac/Consumption/L1/Power": 2500.0,
+        "Dc/Battery/Power": -500.0,
+    }
+    system = MagicMock()
+    system.GetValue.return_value = values
+    bus = MagicMock()
+    bus.get_object.return_value = system
+    with patch("alfen_driver.logic.dbus.SystemBus", return_value=bus):
+        flows = logic.get_energy_flows()
+        assert flows == EnergyFlows(4000.0, 2500.0, -500.0)
+        assert logic.get_energy_flows() is flows
+    assert system.GetValue.call_count == 1
@@ -0,0 +1,88 @@
+import struct
+import sys
+import tracemalloc
+from datetime import datetime, timedelta
+
+import pytest
+
+from alfen_driver.energy_attribution import EnergyFlows
+from alfen_driver.measurements import Measurements
+from alfen_driver.session_manager import ChargingSession, ChargingSessionManager
+from alfen_driver.session_stats import SessionStatsRollup
+
+# A full day at a 10 s tick keeps the run short under tracemalloc
+TICK_SECONDS = 10
+DAY_TICKS = 86400 // TICK_SECONDS
+
+
+def _registers(fmt: str, *values: float) -> list:
+    raw = struct.pack(fmt, *values)
+    return [int.from_bytes(raw[i : i + 2], "big") for i in range(0, len(raw), 2)]
+
+
+def _raw(power_w: float, energy_wh: float) -> dict:
+    phase = power_w / 3
+    return {
+        "voltages": _registers(">3f", 230.0, 231.0, 229.0),
+        "currents": _registers(">3f", phase / 230, phase / 230, phase / 230),
+        "power": _registers(">4f", phase, phase, phase, power_w),
+        "energy": _registers(">d", energy_wh),
+    }
+
+
+def test_decode_once_and_missing_blocks() -> None:
+    m = Measurements.from_raw(_raw(6900.0, 1234500.0))
+    assert m.voltages == (230.0, 231.0, 229.0)
+    assert m.power_w == pytest.approx(6900.0)
+    assert m.energy_kwh == 1234.5
+
+    partial = Measurements.from_raw({"voltages": None, "power": [1, 2]})
+    assert partial.voltages is None and partial.phase_power is None
+    assert partial.charging_power_w == 0.0
+    with pytest.raises(AttributeError):
+        partial.power_w = 5.0  # type: ignore[misc]
+
+
+def test_tick_models_are_slotted() -> None:
+    assert not hasattr(Measurements(), "__dict__")
+    assert not hasattr(ChargingSession(0.0), "__dict__")
+    assert sys.getsizeof(Measurements()) < 100
+
+
+def test_simulated_day_has_bounded_memory(monkeypatch) -> None:
+    """Allocation benchmark: a simulated day of decode + session ticks."""
+    now = [datetime(2025, 6, 1, 0, 0)]
+
+    class Clock:
+        @classmethod
+        def now(cls) -> datetime:
+            return now[0]
+
+    monkeypatch.setattr("alfen_driver.session_manager.datetime", Clock)
+    mgr = ChargingSessionManager(stats=SessionStatsRollup())
+    flows = EnergyFlows(6000.0, 8000.0, 0.0)
+    energy_wh = 1_000_000.0
+
+    tracemalloc.start()
+    baseline = tracemalloc.take_snapshot()
+    for tick in range(DAY_TICKS):
+        second = tick * TICK_SECONDS
+        # Two charging windows a day, idle otherwise
+        charging = 8 * 3600 <= second < 10 * 3600 or 18 * 3600 <= second < 21 * 3600
+        if charging:
+            energy_wh += 7000.0 * TICK_SECONDS / 3600
+        m = Measurements.from_raw(_raw(7000.0 if charging else 0.0, energy_wh))
+        mgr.update(m.charging_power_w, m.energy_kwh or 0.0, flows=flows)
+        now[0] += timedelta(seconds=TICK_SECONDS)
+    _, peak = tracemalloc.get_traced_memory()
+    growth = sum(
+        stat.size_diff
+        for stat in tracemalloc.take_snapshot().compare_to(baseline, "filename")
+    )
+    tracemalloc.stop()
+
+    assert mgr.total_sessions == 2
+    assert mgr.total_energy_kwh == pytest.approx(35.0, abs=0.1)
+    # A day of ticks retains only O(sessions) objects and a few rollup buckets
+    assert growth < 32 * 1024
+    assert peak < 64 * 1024
@@ -0,0 +1,124 @@
+from unittest.mock import MagicMock, Mock
+
+import pytest
+from aiohttp import web
+from pymodbus.exceptions import ModbusException
+
+from alfen_driver.exceptions import AlfenDriverError, ModbusError
+from alfen_driver.metrics import (
+    CONTENT_TYPE,
+    MODBUS_ERRORS,
+    MODBUS_READS,
+    MODBUS_RETRIES,
+    MODBUS_RTT_SECONDS,
+    MODBUS_WRITES,
+    Registry,
+)
+from alfen_driver.modbus_utils import (
+    _timed_modbus,
+    read_holding_registers,
+    retry_modbus_operation,
+)
+from alfen_driver.status_snapshot import StatusSnapshot
+from alfen_driver.web import WebServer
+
+
+def test_counter_and_histogram_render() -> None:
+    registry = Registry()
+    reads = registry.counter("reads_total", "Reads")
+    rtt = registry.histogram("rtt_seconds", "RTT", (0.01, 0.1))
+    reads.inc()
+    reads.inc(2)
+    for value in (0.005, 0.01, 0.05, 3.0):
+        rtt.observe(value)
+
+    lines = registry.render().splitlines()
+    assert "# TYPE reads_total counter" in lines
+    assert "reads_total 3.0" in lines
+    assert 'rtt_seconds_bucket{le="0.01"} 2' in lines
+    assert 'rtt_seconds_bucket{le="0.1"} 3' in lines
+    assert 'rtt_seconds_bucket{le="+Inf"} 4' in lines
+    assert "rtt_seconds_count 4" in lines
+    assert "rtt_seconds_sum 3.065" in lines
+
+
+def test_gauges_are_read_at_scrape_time() -> None:
+    registry = Registry()
+    status = StatusSnapshot({"ac_power": 0.0, "l1_voltage": 230.0})
+    registry.gauge("power_watts", "Power", lambda: status.current["ac_power"])
+    registry.gauge(
+        "voltage_volts",
+        "Voltage",
+        lambda: {"L1": status.current["l1_voltage"], "L2": None},
+        label="phase",
+    )
+    registry.gauge("missing", "Omitted when None", lambda: None)
+    registry.gauge("broken", "Omitted on error", lambda: 1 / 0)
+
+    status.update({"ac_power": 7200.0})
+    text = registry.render()
+    assert "power_watts 7200.0" in text
+    assert 'voltage_volts{phase="L1"} 230.0' in text
+    assert "L2" not in text
+    assert "missing" not in text
+    assert "broken" not in text
+
+
+def test_read_holding_registers_counts_reads_and_errors() -> None:
+    client = Mock()
+    ok = Mock()
+    ok.isError.return_value = False
+    ok.registers = [1, 2]
+    client.read_holding_registers.return_value = ok
+    reads, errors, rtts = (
+        MODBUS_READS.value,
+        MODBUS_ERRORS.value,
+        MODBUS_RTT_SECONDS.count,
+    )
+
+    read_holding_registers(client, 306, 2, 1)
+    assert MODBUS_READS.value == reads + 1
+    assert MODBUS_RTT_SECONDS.count == rtts + 1
+
+    failed = Mock()
+    failed.isError.return_value = True
+    client.read_holding_registers.return_value = failed
+    with pytest.raises(ModbusError):
+        read_holding_registers(client, 306, 2, 1)
+    assert MODBUS_ERRORS.value == errors + 1
+
+
+def test_timed_modbus_counts_writes_and_exceptions() -> None:
+    writes, errors = MODBUS_WRITES.value, MODBUS_ERRORS.value
+    ok = Mock()
+    ok.isError.return_value = False
+    assert _timed_modbus("write", lambda *a, **kw: ok, 1000, [0, 0], slave=1) is ok
+    assert MODBUS_WRITES.value == writes + 1
+
+    def broken(*args, **kwargs):
+        raise ModbusException("timeout")
+
+    with pytest.raises(ModbusException):
+        _timed_modbus("write", broken)
+    assert MODBUS_WRITES.value == writes + 2
+    assert MODBUS_ERRORS.value == errors + 1
+
+
+def test_retries_count_only_attempts_that_follow() -> None:
+    def failing():
+        raise ModbusException("timeout")
+
+    retries = MODBUS_RETRIES.value
+    with pytest.raises(AlfenDriverError):
+        retry_modbus_operation(failing, retries=3, retry_delay=0.0)
+    # Three failures, two of them followed by a delayed retry
+    assert MODBUS_RETRIES.value == retries + 2
+
+
+@pytest.mark.asyncio
+async def test_handle_metrics() -> None:
+    server = WebServer(MagicMock())
+    resp = await server.handle_metrics(MagicMock(spec=web.Request))
+    assert resp.headers["Content-Type"] == CONTENT_TYPE
+    assert "# TYPE alfen_modbus_reads_total counter" in resp.text
+    assert "# TYPE alfen_tick_duration_seconds histogram" in resp.text
@@ -0,0 +1,129 @@
+import json
+import math
+import os
+from unittest.mock import MagicMock
+
+import pytest
+from aiohttp.test_utils import make_mocked_request
+
+from alfen_driver.constants import WebDefaults
+from alfen_driver.metrics_archive import RECORD, MetricsArchive, MinuteAggregator
+from alfen_driver.web import WebServer
+
+T0 = 1_700_006_400  # Midnight UTC
+MB = 1024 * 1024
+
+
+@pytest.fixture
+def archive(tmp_path):
+    arch = MetricsArchive(str(tmp_path / "metrics.bin"), MB)
+    yield arch
+    arch.close()
+
+
+def test_file_size_is_fixed_and_bounded(archive) -> None:
+    assert archive.available
+    assert os.path.getsize(archive.path) == archive.size <= MB
+    # 1 MB keeps about four weeks of minutes
+    assert archive.capacity > 28 * 1440
+
+
+def test_append_and_range_read(archive) -> None:
+    for i in range(3 * 1440):
+        archive.append(T0 + i * 60, float(i), 0.01, 16.0, 0.25, 2)
+
+    rows = archive.read(T0 + 1440 * 60 + 120, T0 + 1440 * 60 + 300)
+    assert [r[0] for r in rows] == [T0 + 1440 * 60 + m * 60 for m in range(2, 5)]
+    assert rows[0][1] == 1442.0
+    assert rows[0][4] == pytest.approx(0.25)
+    assert rows[0][5] == 2
+    # Out-of-order minutes are dropped
+    archive.append(T0, 1.0, 0.0, 0.0, None, 0)
+    assert archive.total == 3 * 1440
+
+
+def test_ring_overwrites_oldest_minutes(tmp_path) -> None:
+    archive = MetricsArchive(str(tmp_path / "metrics.bin"), 64 * 1024)
+    for i in range(archive.capacity + 100):
+        archive.append(T0 + i * 60, 1.0, 0.0, 6.0, None, 0)
+
+    rows = archive.read(0, math.inf)
+    assert len(rows) == archive.capacity
+    assert rows[0][0] == T0 + 100 * 60
+    assert [r[0] for r in rows] == sorted(r[0] for r in rows)
+    assert math.isnan(rows[0][4])
+    archive.close()
+
+
+def test_reopen_keeps_records_and_resets_on_layout_change(tmp_path) -> None:
+    path = str(tmp_path / "metrics.bin")
+    first = MetricsArchive(path, MB)
+    first.append(T0, 7000.0, 0.12, 10.0, 0.3, 2)
+    first.close()
+
+    reopened = MetricsArchive(path, MB)
+    assert reopened.read(T0, T0 + 60)[0][1] == 7000.0
+    reopened.close()
+
+    resized = MetricsArchive(path, 2 * MB)
+    assert resized.total == 0
+    assert os.path.exists(path + ".old")
+    resized.close()
+
+
+def test_unwritable_path_disables_archive(tmp_path) -> None:
+    archive = MetricsArchive(str(tmp_path / "missing" / "metrics.bin"), MB)
+    assert not archive.available
+    archive.append(T0, 1.0, 0.0, 0.0, None, 0)
+    assert archive.read(0, math.inf) == []
+
+
+def test_minute_aggregator(archive) -> None:
+    agg = MinuteAggregator(archive)
+    for s in range(0, 180, 10):
+        agg.add(T0 + s, 1000.0 + s, 100.0 + s / 1000, 16.0, 0.2, 2)
+
+    rows = archive.read(T0, T0 + 180)
+    # The minute in progress is not written yet
+    assert [r[0] for r in rows] == [T0, T0 + 60]
+    assert rows[0][1] == pytest.approx(1025.0)
+    assert rows[0][2] == pytest.approx(0.05, abs=1e-6)
+    # Energy delta continues from the last reading of the previous minute
+    assert rows[1][2] == pytest.approx(0.06, abs=1e-6)
+    assert RECORD.size == 24
+
+
+@pytest.mark.asyncio
+async def test_archive_endpoint(archive) -> None:
+    archive.append(T0, 7000.0, 0.1, 10.0, None, 2)
+    driver = MagicMock()
+    driver.metrics_archive = archive
+    server = WebServer(driver)
+
+    resp = await server.handle_get_archive(
+        make_mocked_request("GET", f"/api/archive?from={T0}&to={T0 + 60}")
+    )
+    body = json.loads(resp.text)
+    assert body["fields"][0] == "ts"
+    assert body["rows"] == [[T0, 7000.0, pytest.approx(0.1), 10.0, None, 2]]
+
+    bad = await server.handle_get_archive(
+        make_mocked_request("GET", "/api/archive?to=now")
+    )
+    assert bad.status == 400
+
+    year = await server.handle_get_archive(
+        make_mocked_request("GET", f"/api/archive?from={T0 - 365 * 86400}&to={T0}")
+    )
+    assert year.status == 400
+    unbounded = await server.handle_get_archive(
+        make_mocked_request("GET", "/api/archive?from=-inf")
+    )
+    assert unbounded.status == 400
+    since = T0 + 60 - WebDefaults.ARCHIVE_MAX_SPAN_SECONDS
+    week = await server.handle_get_archive(
+        make_mocked_request("GET", f"/api/archive?from={since}&to={T0 + 60}")
+    )
+    assert json.loads(week.text)["rows"] == [
+        [T0, 7000.0, pytest.approx(0.1), 10.0, None, 2]
+    ]
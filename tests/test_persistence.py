@@ -1,5 +1,8 @@
+import time
 from pathlib import Path
+from unittest.mock import MagicMock
 
+from alfen_driver.driver import AlfenDriver
 from alfen_driver.persistence import PersistenceManager
 
 
@@ -58,3 +61,78 @@ def test_save_failure_is_handled(monkeypatch) -> None:
 
     monkeypatch.setattr(Path, "mkdir", fail_mkdir, raising=True)
     assert pm.save_state() is False
+
+
+def test_unchanged_values_are_not_dirty(tmp_path: Path) -> None:
+    pm = PersistenceManager(str(tmp_path / "state.json"))
+    pm.update({"mode": 1, "set_current": 10.0})
+    assert pm.dirty_keys == {"mode", "set_current"}
+    assert pm.save_state() is True
+    assert not pm.dirty
+
+    pm.update({"mode": 1, "set_current": 10.0})
+    pm.set_section("session", {})
+    assert pm.dirty_keys == {"session"}
+
+
+def test_writes_are_debounced_and_coalesced(tmp_path: Path) -> None:
+    cfg = tmp_path / "state.json"
+    pm = PersistenceManager(str(cfg), debounce_seconds=2.0)
+    start = time.monotonic()
+    for amps in (6.0, 8.0, 10.0, 12.0):
+        pm.set("set_current", amps)
+    assert pm.flush_due(start) is False
+    assert not cfg.exists()
+
+    assert pm.flush_due(start + 5) is True
+    assert pm.writes == 1
+    assert PersistenceManager(str(cfg)).set_current == 12.0
+    # Nothing dirty -> nothing to do
+    assert pm.flush_due(start + 10) is False
+
+
+def test_flush_ignores_debounce_window(tmp_path: Path) -> None:
+    cfg = tmp_path / "state.json"
+    pm = PersistenceManager(str(cfg), debounce_seconds=60.0)
+    pm.set("mode", 2)
+    assert pm.flush() is True
+    assert PersistenceManager(str(cfg)).mode == 2
+    assert not pm.dirty
+    assert pm.flush() is True
+    assert pm.writes == 1
+
+
+def test_driver_shutdown_flushes_staged_state(tmp_path: Path) -> None:
+    cfg = tmp_path / "state.json"
+    drv = MagicMock()
+    drv.persistence = PersistenceManager(str(cfg), debounce_seconds=60.0)
+    # A UI change staged just before the restart
+    drv._persist_state = lambda include_stats=False: drv.persistence.set("mode", 2)
+
+    AlfenDriver.shutdown(drv)
+
+    assert PersistenceManager(str(cfg)).mode == 2
+    drv.client.close.assert_called_once_with()
+
+
+def test_identical_content_is_not_rewritten(tmp_path: Path) -> None:
+    cfg = tmp_path / "state.json"
+    pm = PersistenceManager(str(cfg))
+    pm.set("mode", 2)
+    pm.save_state()
+    written = pm.bytes_written_today
+    assert written == cfg.stat().st_size
+
+    # Change and revert before the flush: same bytes, no second write
+    pm.set("mode", 1)
+    pm.set("mode", 2)
+    assert pm.save_state() is True
+    assert pm.writes == 1
+    assert pm.skipped_writes == 1
+    assert pm.stats()["bytes_written_today"] == written
+
+    # A fresh instance recognizes its own file and does not rewrite it
+    reloaded = PersistenceManager(str(cfg))
+    reloaded.set("mode", 2)
+    reloaded.save_state()
+    assert reloaded.writes == 0
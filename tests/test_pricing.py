@@ -0,0 +1,236 @@
+import io
+import json
+import threading
+import time
+
+import pytest
+
+import alfen_driver.pricing as pricing
+from alfen_driver.config import PricingConfig, TibberConfig
+from alfen_driver.config_validator import ConfigValidator
+from alfen_driver.pricing import (
+    PriceEngine,
+    PricePoint,
+    PriceProvider,
+    PriceTimeline,
+    parse_price_csv,
+    parse_price_json,
+)
+from alfen_driver.schedule_plan import ChargePlanner
+
+HOUR = 3600.0
+
+
+def _slots(start: float, prices: list[float]) -> list[dict]:
+    return [
+        {"start": start + i * HOUR, "price": price} for i, price in enumerate(prices)
+    ]
+
+
+class _StaticProvider(PriceProvider):
+    name = "static-test"
+
+    def __init__(self, timeline, name="static-test") -> None:
+        super().__init__(4 * HOUR)
+        self.timeline = timeline
+        self.name = name
+        self.calls = 0
+
+    def fetch(self, now):
+        self.calls += 1
+        return self.timeline
+
+
+def test_parse_json_and_csv() -> None:
+    points = parse_price_json(
+        {
+            "prices": [
+                {"start": "2025-01-01T01:00:00Z", "price": 0.30},
+                {"startsAt": "2025-01-01T00:00:00Z", "total": 0.20, "level": "CHEAP"},
+                {"start": "bogus", "price": 1.0},
+            ]
+        }
+    )
+    assert [p.price for p in points] == [0.20, 0.30]
+    assert points[0].level == "CHEAP"
+    assert points[0].end == points[1].start
+    assert points[1].end - points[1].start == HOUR
+
+    csv_points = parse_price_csv(
+        "Start,End,Price\n"
+        "2025-01-01T00:00:00Z,2025-01-01T00:15:00Z,0.1\n"
+        "2025-01-01T00:15:00Z,,0.2\n"
+    )
+    assert [p.end - p.start for p in csv_points] == [900.0, 900.0]
+
+
+def test_timeline_lookup_and_roundtrip() -> None:
+    timeline = PriceTimeline(parse_price_json(_slots(1000.0, [0.1, 0.2])), "feed")
+    assert timeline.price_at(999.0) is None
+    assert timeline.price_at(1000.0) == 0.1
+    assert timeline.price_at(1000.0 + HOUR) == 0.2
+    assert not timeline.covers(1000.0 + 2 * HOUR)
+
+    restored = PriceTimeline.from_dict(json.loads(json.dumps(timeline.to_dict())))
+    assert restored.points == timeline.points
+    assert restored.source == "feed"
+
+
+def test_provider_without_fetch_cannot_be_instantiated() -> None:
+    class _Incomplete(PriceProvider):
+        name = "incomplete"
+
+    with pytest.raises(TypeError):
+        _Incomplete(HOUR)
+
+
+def test_engine_fails_over_and_caches_to_disk(tmp_path) -> None:
+    now = time.time()
+    cache_file = tmp_path / "prices.json"
+    price_file = tmp_path / "prices.csv"
+    price_file.write_text(
+        "start,price\n"
+        + "".join(f"{now - HOUR + i * HOUR},0.{i + 1}\n" for i in range(3))
+    )
+    pricing = PricingConfig(
+        source="dynamic",
+        providers=["feed", "file"],
+        feed_url="ftp://unsupported",
+        file_path=str(price_file),
+        feed_format="csv",
+        cache_file=str(cache_file),
+    )
+    engine = PriceEngine(pricing)
+    assert [p.name for p in engine.providers] == ["feed", "file"]
+
+    assert engine.price_at(now) == pytest.approx(0.2)
+    assert engine.timeline is not None and engine.timeline.source == "file"
+    # Fallback in use: retry the preferred provider within RETRY_SECONDS
+    assert engine.next_refresh <= now + engine.RETRY_SECONDS
+    assert json.loads(cache_file.read_text())["source"] == "file"
+
+    # A fresh engine starts from the disk cache before any provider answers
+    price_file.unlink()
+    restarted = PriceEngine(pricing)
+    assert restarted.timeline is not None
+    assert restarted.price_at(now) == pytest.approx(0.2)
+
+
+def test_engine_keeps_last_timeline_when_all_providers_fail() -> None:
+    now = time.time()
+    engine = PriceEngine(PricingConfig(source="dynamic", cache_file=""))
+    good = PriceTimeline([PricePoint(now - 10, now + HOUR, 0.15)], "primary")
+    provider = _StaticProvider(good, "primary")
+    engine.providers = [provider]
+
+    assert engine.price_at(now) == 0.15
+    version = engine.version
+    provider.timeline = None
+    engine.refresh(now + 1)
+    assert engine.price_at(now + 1) == 0.15
+    assert engine.version == version
+
+    # Static source disables the engine altogether
+    engine.set_config(PricingConfig(source="static", cache_file=""))
+    assert engine.price_at(now) is None
+
+
+def test_engine_drops_stale_timeline_and_backs_off() -> None:
+    now = time.time()
+    engine = PriceEngine(PricingConfig(source="dynamic", cache_file=""))
+    good = PriceTimeline([PricePoint(now - 10, now + HOUR, 0.15)], "primary")
+    provider = _StaticProvider(good, "primary")
+    engine.providers = [provider]
+    assert engine.price_at(now) == 0.15
+    # Never scheduled past the end of the adopted prices
+    assert engine.next_refresh <= good.end
+
+    provider.timeline = None
+    later = now + 2 * HOUR
+    version = engine.version
+    assert engine.get_timeline(later) is None
+    assert engine.version == version + 1
+    calls = provider.calls
+    for tick in range(10):
+        engine.get_timeline(later + tick)
+    assert provider.calls == calls
+    engine.get_timeline(later + engine.RETRY_SECONDS)
+    assert provider.calls == calls + 1
+
+
+def test_feed_downloads_off_the_calling_thread(monkeypatch) -> None:
+    now = time.time()
+    release = threading.Event()
+    body = json.dumps(_slots(now - HOUR, [0.1, 0.2, 0.3])).encode()
+
+    class _Response(io.BytesIO):
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc):
+            return False
+
+    def slow_urlopen(request, timeout):
+        release.wait(5)
+        return _Response(body)
+
+    monkeypatch.setattr(pricing.urllib.request, "urlopen", slow_urlopen)
+    engine = PriceEngine(
+        PricingConfig(
+            source="dynamic",
+            providers=["feed"],
+            feed_url="https://prices.example/day-ahead.json",
+            cache_file="",
+        )
+    )
+    feed = engine.providers[0]
+
+    started = time.perf_counter()
+    assert engine.price_at(now) is None
+    assert time.perf_counter() - started < 1.0
+    assert feed.busy
+    assert engine.next_refresh <= now + engine.PENDING_POLL_SECONDS
+
+    release.set()
+    feed._worker.join(5)
+    assert engine.price_at(now + engine.PENDING_POLL_SECONDS) == pytest.approx(0.2)
+    assert not feed.busy
+
+
+def test_planner_applies_strategy_to_engine_prices(sample_config) -> None:
+    now = time.time()
+    slot_start = now - (now % HOUR)
+    sample_config.tibber = TibberConfig(
+        enabled=True, strategy="threshold", max_price_total=0.2
+    )
+    engine = PriceEngine(PricingConfig(source="dynamic", cache_file=""))
+    timeline = PriceTimeline(
+        [
+            PricePoint(slot_start, slot_start + HOUR, 0.1),
+            PricePoint(slot_start + HOUR, slot_start + 2 * HOUR, 0.3),
+        ],
+        "feed",
+    )
+    provider = _StaticProvider(timeline, "feed")
+    engine.providers = [provider]
+
+    planner = ChargePlanner(sample_config, engine)
+    interval, source = planner.decision(now, [], "UTC", 16.0)
+    assert source == "feed"
+    assert interval.allowed_current == 16.0
+    interval, _ = planner.decision(slot_start + HOUR + 1, [], "UTC", 16.0)
+    assert interval.allowed_current == 0.0
+    assert provider.calls == 1
+
+
+def test_validator_accepts_dynamic_pricing() -> None:
+    base = {"modbus": {"ip": "192.168.1.10"}}
+    ok, errors = ConfigValidator().validate(
+        {**base, "pricing": {"source": "dynamic", "providers": ["file", "tibber"]}}
+    )
+    assert ok, errors
+    ok, errors = ConfigValidator().validate(
+        {**base, "pricing": {"source": "dynamic", "providers": ["nordpool"]}}
+    )
+    assert not ok
+    assert errors[0].field == "pricing.providers"
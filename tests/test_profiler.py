@@ -0,0 +1,93 @@
+import json
+import threading
+from unittest.mock import MagicMock
+
+import pytest
+from aiohttp import web
+
+from alfen_driver.profiler import PROFILER, SamplingProfiler
+from alfen_driver.web import WebServer
+
+
+def _spin_until(stop: threading.Event) -> None:
+    while not stop.is_set():
+        sum(range(1000))
+
+
+def test_samples_collapse_stacks_of_watched_thread() -> None:
+    stop = threading.Event()
+    worker = threading.Thread(target=_spin_until, args=(stop,))
+    worker.start()
+    try:
+        profile = SamplingProfiler(interval=0.001).run(0.2, {worker.ident: "glib"})
+    finally:
+        stop.set()
+        worker.join()
+
+    assert profile is not None
+    assert profile.samples > 10
+    hottest = profile.collapsed().splitlines()[0]
+    stack, count = hottest.rsplit(" ", 1)
+    assert stack.startswith("glib;")
+    assert "test_profiler:_spin_until" in stack
+    assert int(count) > 0
+
+
+def test_only_one_profile_at_a_time() -> None:
+    profiler = SamplingProfiler(interval=0.001, max_seconds=0.5)
+    results = []
+    runner = threading.Thread(
+        target=lambda: results.append(profiler.run(0.3, {threading.get_ident(): "t"}))
+    )
+    runner.start()
+    while not profiler.running:
+        pass
+    assert profiler.run(0.1, {}) is None
+    runner.join()
+    assert results[0] is not None
+    # Duration is capped
+    capped = profiler.run(60.0, {})
+    assert capped is not None and capped.seconds < 1.0
+
+
+@pytest.mark.parametrize("seconds", [float("nan"), float("inf")])
+def test_non_finite_duration_is_rejected(seconds: float) -> None:
+    profiler = SamplingProfiler(interval=0.001, max_seconds=1.0)
+    with pytest.raises(ValueError):
+        profiler.run(seconds, {})
+    # The single-run lock was never taken
+    assert not profiler.running
+
+
+@pytest.mark.asyncio
+async def test_profile_handler(monkeypatch: pytest.MonkeyPatch) -> None:
+    driver = MagicMock()
+    driver.config.web.profiler = False
+    server = WebServer(driver)
+    req = MagicMock(spec=web.Request)
+    req.query = {"seconds": "0.05"}
+    resp = await server.handle_profile(req)
+    assert resp.status == 404
+
+    driver.config.web.profiler = True
+    resp = await server.handle_profile(req)
+    assert resp.status == 200
+    assert resp.content_type == "text/plain"
+
+    req.query = {"seconds": "0.05", "format": "json"}
+    resp = await server.handle_profile(req)
+    data = json.loads(resp.text)
+    assert data["samples"] >= 1
+    # The web thread is waiting on the executor while it is sampled
+    assert any(stack.startswith("web;") for stack in data["stacks"])
+
+    for bad in ("nan", "inf", "abc"):
+        req.query = {"seconds": bad}
+        resp = await server.handle_profile(req)
+        assert resp.status == 400
+    assert not PROFILER.running
+
+    req.query = {"seconds": "0.05"}
+    monkeypatch.setattr(PROFILER, "run", lambda *a: None)
+    resp = await server.handle_profile(req)
+    assert resp.status == 409
@@ -0,0 +1,149 @@
+from datetime import datetime
+
+import pytest
+import pytz
+
+import alfen_driver.schedule_plan as schedule_plan
+from alfen_driver.config import ScheduleItem, TibberConfig
+from alfen_driver.logic import is_within_any_schedule
+from alfen_driver.schedule_plan import ChargePlanner, compile_schedule_intervals
+from alfen_driver.tibber import TibberClient
+
+TZ = "Europe/Amsterdam"
+
+
+def _ts(year: int, month: int, day: int, hour: int, minute: int = 0) -> float:
+    naive = datetime(year, month, day, hour, minute)
+    return pytz.timezone(TZ).localize(naive).timestamp()
+
+
+def _schedules() -> list[ScheduleItem]:
+    return [
+        # Overnight window on all days
+        ScheduleItem(enabled=1, days_mask=0x7F, start="22:00", end="06:00"),
+        # Overlapping daytime windows on weekdays only (Mon..Fri)
+        ScheduleItem(enabled=1, days_mask=0b0111110, start="10:00", end="12:00"),
+        ScheduleItem(enabled=1, days_mask=0b0111110, start="11:30", end="13:00"),
+        ScheduleItem(enabled=0, days_mask=0x7F, start="15:00", end="16:00"),
+    ]
+
+
+def test_compiled_schedule_matches_is_within_any_schedule() -> None:
+    schedules = _schedules()
+    tz = pytz.timezone(TZ)
+    # Wednesday and Sunday, sampled every 15 minutes
+    for day in (datetime(2025, 1, 8).date(), datetime(2025, 1, 12).date()):
+        intervals = compile_schedule_intervals(schedules, day, tz, 16.0)
+        # Table covers the whole local day without gaps or overlaps
+        assert all(a.end == b.start for a, b in zip(intervals, intervals[1:]))
+        for minute in range(0, 24 * 60, 15):
+            now = _ts(day.year, day.month, day.day, minute // 60, minute % 60)
+            planned = next(i for i in intervals if i.start <= now < i.end)
+            expected = is_within_any_schedule(schedules, now, TZ)
+            assert (planned.allowed_current > 0) == expected, (day, minute)
+
+
+def test_overlapping_windows_are_merged() -> None:
+    intervals = compile_schedule_intervals(
+        _schedules(), datetime(2025, 1, 8).date(), pytz.timezone(TZ), 16.0
+    )
+    charging = [i for i in intervals if i.allowed_current > 0]
+    assert len(charging) == 3
+    assert "10:00-12:00" in charging[1].reason
+    assert "11:30-13:00" in charging[1].reason
+
+
+def test_planner_reuses_plan_until_inputs_change(sample_config, monkeypatch) -> None:
+    calls = {"n": 0}
+    original = schedule_plan.compile_schedule_intervals
+
+    def counting(*args, **kwargs):
+        calls["n"] += 1
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(schedule_plan, "compile_schedule_intervals", counting)
+    planner = ChargePlanner(sample_config)
+    schedules = _schedules()
+
+    interval, source = planner.decision(_ts(2025, 1, 8, 23), schedules, TZ, 16.0)
+    assert source == "schedule"
+    assert interval.allowed_current == 16.0
+    interval, _ = planner.decision(_ts(2025, 1, 8, 14), schedules, TZ, 16.0)
+    assert interval.allowed_current == 0.0
+    assert interval.reason == "not within schedule"
+    assert calls["n"] == 1
+
+    # Station limit change and day rollover both rebuild
+    planner.decision(_ts(2025, 1, 8, 14), schedules, TZ, 10.0)
+    assert calls["n"] == 2
+    planner.decision(_ts(2025, 1, 9, 1), schedules, TZ, 10.0)
+    assert calls["n"] == 3
+    assert planner.peek(_ts(2025, 1, 9, 1)).allowed_current == 10.0
+
+    # Keyed on content: an equal copy reuses, an in-place edit rebuilds
+    planner.decision(_ts(2025, 1, 9, 2), _schedules(), TZ, 10.0)
+    assert calls["n"] == 3
+    schedules[0].end = "03:00"
+    interval, _ = planner.decision(_ts(2025, 1, 9, 4), schedules, TZ, 10.0)
+    assert calls["n"] == 4
+    assert interval.allowed_current == 0.0
+
+    data = planner.to_dict()
+    assert data["source"] == "schedule"
+    assert data["intervals"][0]["start"].startswith("2025-01-09T00:00")
+
+
+def test_planner_compiles_tibber_slots(sample_config, monkeypatch) -> None:
+    cfg = sample_config
+    cfg.tibber = TibberConfig(
+        access_token="x",  # noqa: S106
+        enabled=True,
+        strategy="threshold",
+        max_price_total=0.2,
+    )
+    client = TibberClient(cfg.tibber)
+    client._cached_upcoming = [
+        {"total": 0.30, "startsAt": "2025-01-08T10:00:00+01:00", "level": "NORMAL"},
+        {"total": 0.10, "startsAt": "2025-01-08T11:00:00+01:00", "level": "CHEAP"},
+        {"total": 0.25, "startsAt": "2025-01-08T12:00:00+01:00", "level": "NORMAL"},
+    ]
+    client._cache_next_refresh = _ts(2025, 1, 8, 11)
+    monkeypatch.setattr(schedule_plan, "refresh_tibber_prices", lambda _cfg: client)
+
+    planner = ChargePlanner(cfg)
+    interval, source = planner.decision(_ts(2025, 1, 8, 10, 30), [], TZ, 16.0)
+    assert source == "tibber"
+    assert interval.allowed_current == 0.0
+
+    client._cache_next_refresh = _ts(2025, 1, 8, 12)
+    first_plan = planner.plan
+    interval, _ = planner.decision(_ts(2025, 1, 8, 11, 30), [], TZ, 16.0)
+    assert interval.allowed_current == 16.0
+    assert "charging enabled" in interval.reason
+    # Same price curve: the plan's intervals are reused, not recompiled
+    assert planner.plan.intervals is first_plan.intervals
+
+
+@pytest.mark.parametrize("has_planner", [False, True])
+def test_compute_effective_current_scheduled(
+    sample_config, monkeypatch, has_planner
+) -> None:
+    import alfen_driver.logic as logic
+    from alfen_driver.dbus_utils import EVC_CHARGE, EVC_MODE
+
+    monkeypatch.setattr(logic, "_config", None)
+    monkeypatch.setattr(
+        logic, "_charge_planner", ChargePlanner(sample_config) if has_planner else None
+    )
+    effective, explanation, _, _ = logic.compute_effective_current(
+        EVC_MODE.SCHEDULED,
+        EVC_CHARGE.ENABLED,
+        6.0,
+        16.0,
+        _ts(2025, 1, 8, 23),
+        _schedules(),
+        0.0,
+        timezone=TZ,
+    )
+    assert effective == 16.0
+    assert "Scheduled mode" in explanation
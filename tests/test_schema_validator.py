@@ -0,0 +1,121 @@
+import dataclasses
+import time
+from unittest.mock import MagicMock
+
+import pytest
+from aiohttp import web
+
+from alfen_driver.config import Config
+from alfen_driver.config_schema import get_config_schema
+from alfen_driver.config_validator import ConfigValidator
+from alfen_driver.schema_validator import compile_schema
+from alfen_driver.web import WebServer
+
+
+def _collect(config, sections=None):
+    errors = []
+    compile_schema(get_config_schema()).validate(
+        config, lambda *error: errors.append(error), sections
+    )
+    return errors
+
+
+def test_all_bad_fields_are_reported_in_one_pass() -> None:
+    errors = _collect(
+        {
+            "modbus": {"ip": "10.0.0.300", "port": 0},
+            "tibber": {"strategy": "cheapest", "cheap_percentile": 1.5},
+            "web": {"port": "8088"},
+            "device_instance": True,
+        }
+    )
+    assert [path for path, *_ in errors] == [
+        "modbus.ip",
+        "modbus.port",
+        "tibber.strategy",
+        "tibber.cheap_percentile",
+        "web.port",
+        "device_instance",
+    ]
+    # Every error carries a suggestion
+    assert all(suggestion for *_, suggestion in errors)
+
+
+@pytest.mark.parametrize("value", [float("nan"), float("inf")])
+def test_non_finite_numbers_are_rejected(value: float) -> None:
+    is_valid, errors = ConfigValidator().validate(
+        {
+            "modbus": {"ip": "1.2.3.4"},
+            "defaults": {"intended_set_current": value},
+            "controls": {"max_set_current": value},
+            "pricing": {"static_rate_eur_per_kwh": value},
+        }
+    )
+    assert not is_valid
+    assert [e.field for e in errors if e.severity == "error"] == [
+        "defaults.intended_set_current",
+        "controls.max_set_current",
+        "pricing.static_rate_eur_per_kwh",
+    ]
+
+
+def test_sections_filter_skips_unchanged_sections() -> None:
+    config = {
+        "modbus": {"ip": "192.168.1.10"},
+        "schedule": {"items": [{"days": [9]}]},
+        "logging": {"level": "LOUD"},
+    }
+    assert [path for path, *_ in _collect(config, {"logging"})] == ["logging.level"]
+    assert [path for path, *_ in _collect(config, {"schedule"})] == [
+        "schedule.items[0].days"
+    ]
+
+
+def test_round_tripped_config_is_valid() -> None:
+    config = dataclasses.asdict(Config.from_dict({"modbus": {"ip": "192.168.1.10"}}))
+    assert _collect(config) == []
+
+
+def test_documentation_schema_is_derived_from_canonical_schema() -> None:
+    schema = ConfigValidator().get_config_schema()
+    assert schema["modbus"]["fields"]["port"]["default"] == 502
+    assert schema["modbus"]["fields"]["port"]["range"] == [1, 65535]
+    assert schema["poll_interval_ms"]["default"] == 1000
+    assert set(schema) == set(get_config_schema()["sections"])
+
+
+@pytest.mark.benchmark
+def test_large_schedule_validation_benchmark(benchmark_report) -> None:
+    items = [
+        {
+            "active": True,
+            "days": [0, 1, 2, 3, 4],
+            "start_time": "08:00",
+            "end_time": "17:30",
+        }
+        for _ in range(5000)
+    ]
+    config = {"modbus": {"ip": "192.168.1.10"}, "schedule": {"items": items}}
+    validator = ConfigValidator()
+
+    started = time.perf_counter()
+    is_valid, errors = validator.validate(config)
+    elapsed = time.perf_counter() - started
+
+    assert is_valid and errors == []
+    benchmark_report(f"5000 schedule items validated in {elapsed * 1000:.1f} ms")
+    # ~ a few microseconds per item; generous bound for slow CI hosts
+    assert elapsed < 0.5, f"5000 schedule items took {elapsed * 1000:.1f} ms"
+
+
+@pytest.mark.asyncio
+async def test_schema_is_served_once_with_etag() -> None:
+    server = WebServer(MagicMock())
+    req = MagicMock(spec=web.Request)
+    req.headers = {}
+    first = await server.handle_get_schema(req)
+    etag = first.headers["ETag"]
+    assert (await server.handle_get_schema(req)).headers["ETag"] == etag
+
+    req.headers = {"If-None-Match": etag}
+    assert (await server.handle_get_schema(req)).status == 304
@@ -0,0 +1,131 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from alfen_driver.constants import SessionDefaults
+from alfen_driver.session_cost import SessionCostIntegrator
+from alfen_driver.session_manager import ChargingSessionManager
+
+HOUR = 3600.0
+
+
+def _hourly(prices: dict[int, float]):
+    calls = []
+
+    def lookup(ts: float):
+        calls.append(ts)
+        hour = int(ts // HOUR)
+        if hour not in prices:
+            return None
+        return hour * HOUR, (hour + 1) * HOUR, prices[hour]
+
+    return lookup, calls
+
+
+def test_integrator_prices_each_slot_separately() -> None:
+    lookup, calls = _hourly({0: 0.10, 1: 0.40})
+    integrator = SessionCostIntegrator(start_energy_kwh=100.0)
+
+    integrator.add(101.0, 600.0, lookup)
+    integrator.add(102.0, 1800.0, lookup)
+    integrator.add(103.0, HOUR + 60.0, lookup)
+
+    assert integrator.energy_kwh == pytest.approx(3.0)
+    # 2 kWh at 0.10 plus 1 kWh at 0.40, not 3 kWh at the latest rate
+    assert integrator.cost == pytest.approx(0.60)
+    assert [s.energy_kwh for s in integrator.slots] == pytest.approx([2.0, 1.0])
+    # The price source is consulted once per slot, not once per tick
+    assert len(calls) == 2
+
+
+def test_slot_summary_only_changes_when_a_slot_closes() -> None:
+    lookup, _ = _hourly({0: 0.10, 1: 0.40})
+    integrator = SessionCostIntegrator(start_energy_kwh=0.0)
+    integrator.add(1.0, 600.0, lookup)
+    assert integrator.slot_summary() == ()
+
+    integrator.add(2.0, 1200.0, lookup)
+    integrator.add(3.0, HOUR + 60.0, lookup)
+    closed = integrator.slot_summary()
+    assert [s["energy_kwh"] for s in closed] == pytest.approx([2.0])
+    integrator.add(4.0, HOUR + 120.0, lookup)
+    # Same object between slot closes: the status snapshot skips it
+    assert integrator.slot_summary() is closed
+
+    final = integrator.slot_summary(include_open=True)
+    assert [s["energy_kwh"] for s in final] == pytest.approx([2.0, 2.0])
+    assert integrator.slot_summary(include_open=True) is final
+
+
+def test_integrator_ignores_resets_and_tracks_unpriced_energy() -> None:
+    lookup, _ = _hourly({0: 0.20})
+    integrator = SessionCostIntegrator(start_energy_kwh=10.0)
+    integrator.add(9.0, 10.0, lookup)  # meter went backwards
+    integrator.add(10.5, 20.0, lookup)
+    assert integrator.energy_kwh == pytest.approx(0.5)
+
+    integrator.add(11.0, 2 * HOUR, lookup)  # no price known for hour 2
+    assert integrator.unpriced_energy_kwh == pytest.approx(0.5)
+    assert integrator.cost == pytest.approx(0.10)
+
+    restored = SessionCostIntegrator.from_dict(integrator.to_dict(), 10.0)
+    assert restored.cost == pytest.approx(integrator.cost)
+    assert restored.slots == integrator.slots
+
+
+def test_integrator_drops_a_glitched_read() -> None:
+    lookup, _ = _hourly({0: 0.25})
+    integrator = SessionCostIntegrator(start_energy_kwh=12000.0)
+    integrator.add(12000.5, 60.0, lookup)
+    integrator.add(0.0, 120.0, lookup)  # failed read decoded as zero
+    integrator.add(12000.58, 180.0, lookup)
+
+    assert integrator.energy_kwh == pytest.approx(0.58)
+    assert integrator.cost == pytest.approx(0.145)
+
+
+def test_integrator_rebases_on_a_confirmed_jump() -> None:
+    lookup, _ = _hourly({0: 0.25})
+    integrator = SessionCostIntegrator(start_energy_kwh=100.0)
+    integrator.add(102.0, 60.0, lookup)  # polling gap: held back
+    integrator.add(102.5, 120.0, lookup)  # confirmed: counted from 102.0
+    integrator.add(103.0, 180.0, lookup)
+
+    assert integrator.energy_kwh == pytest.approx(1.0)
+    assert integrator.cost == pytest.approx(0.25)
+
+
+def test_session_manager_integrates_cost(monkeypatch) -> None:
+    base = datetime(2025, 1, 1, 12, 0, 0)
+    clock = {"now": base}
+
+    class FauxDatetime:
+        @classmethod
+        def now(cls):
+            return clock["now"]
+
+        fromisoformat = datetime.fromisoformat
+
+    monkeypatch.setattr("alfen_driver.session_manager.datetime", FauxDatetime)
+
+    def lookup(ts: float):
+        return ts - ts % HOUR, ts - ts % HOUR + HOUR, 0.25
+
+    mgr = ChargingSessionManager()
+    mgr.update(3000.0, 50.0, lookup)
+    clock["now"] = base + timedelta(
+        seconds=SessionDefaults.START_CONFIRMATION_SECONDS + 1
+    )
+    mgr.update(3000.0, 50.5, lookup)
+    assert mgr.current_session is not None
+    clock["now"] += timedelta(minutes=10)
+    mgr.update(3000.0, 51.0, lookup)
+    clock["now"] += timedelta(minutes=10)
+    mgr.update(3000.0, 52.0, lookup)
+
+    assert mgr.current_session.cost.cost == pytest.approx(0.5)
+    state = mgr.get_state()
+    restored = ChargingSessionManager()
+    restored.restore_state(state)
+    assert restored.current_session is not None
+    assert restored.current_session.cost.cost == pytest.approx(0.5)
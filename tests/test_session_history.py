@@ -0,0 +1,101 @@
+import json
+import time
+from datetime import datetime
+from unittest.mock import MagicMock
+
+import pytest
+from aiohttp.test_utils import make_mocked_request
+
+from alfen_driver.session_history import SessionHistory, SessionRecord
+from alfen_driver.web import WebServer
+
+DAY = 86400.0
+
+
+def _record(start_ts: float, energy: float = 10.0) -> SessionRecord:
+    return SessionRecord(
+        start_ts=start_ts,
+        end_ts=start_ts + 3600,
+        start_energy_kwh=1000.0,
+        end_energy_kwh=1000.0 + energy,
+        peak_power_w=11000.0,
+        cost=energy * 0.25,
+        mode=2,
+    )
+
+
+@pytest.fixture
+def history(tmp_path):
+    hist = SessionHistory(str(tmp_path / "sessions.db"))
+    yield hist
+    hist.close()
+
+
+def test_append_and_paginate_newest_first(history) -> None:
+    start = datetime(2025, 1, 1).timestamp()
+    for day in range(365):
+        assert history.append(_record(start + day * DAY)) is not None
+
+    seen = []
+    before = None
+    while True:
+        page = history.query(limit=100, before=before)
+        seen.extend(item["id"] for item in page["items"])
+        before = page["next_before"]
+        if before is None:
+            break
+
+    assert len(seen) == 365
+    assert seen == sorted(seen, reverse=True)
+
+    first = history.query(limit=1)["items"][0]
+    assert first["energy_kwh"] == pytest.approx(10.0)
+    assert first["month"] == "2025-12"
+
+
+def test_month_and_time_filters(history) -> None:
+    start = datetime(2025, 1, 30).timestamp()
+    for day in range(5):
+        history.append(_record(start + day * DAY))
+
+    january = history.query(month="2025-01")["items"]
+    assert len(january) == 2
+    window = history.query(start_ts=start + DAY, end_ts=start + 3 * DAY)["items"]
+    assert len(window) == 2
+
+
+def test_history_survives_reopen(tmp_path) -> None:
+    path = str(tmp_path / "sessions.db")
+    first = SessionHistory(path)
+    first.append(_record(time.time()))
+    first.close()
+
+    reopened = SessionHistory(path)
+    assert len(reopened.query()["items"]) == 1
+    reopened.close()
+
+
+def test_unwritable_path_disables_history(tmp_path) -> None:
+    history = SessionHistory(str(tmp_path / "missing" / "sessions.db"))
+    assert not history.available
+    assert history.append(_record(time.time())) is None
+    assert history.query() == {"items": [], "next_before": None}
+
+
+@pytest.mark.asyncio
+async def test_sessions_endpoint(history) -> None:
+    history.append(_record(datetime(2025, 3, 1).timestamp()))
+    driver = MagicMock()
+    driver.session_history = history
+    server = WebServer(driver)
+
+    resp = await server.handle_get_sessions(
+        make_mocked_request("GET", "/api/sessions?month=2025-03&limit=10")
+    )
+    assert resp.status == 200
+    assert len(json.loads(resp.text)["items"]) == 1
+
+    bad = await server.handle_get_sessions(
+        make_mocked_request("GET", "/api/sessions?limit=abc")
+    )
+    assert bad.status == 400
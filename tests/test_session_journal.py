@@ -0,0 +1,154 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from alfen_driver.constants import SessionDefaults
+from alfen_driver.session_journal import SessionJournal
+from alfen_driver.session_manager import ChargingSessionManager
+
+
+class _Clock:
+    """Stand-in for ``datetime`` in session_manager with a settable now()."""
+
+    current = datetime(2025, 1, 1, 12, 0, 0)
+
+    @classmethod
+    def now(cls) -> datetime:
+        return cls.current
+
+    @staticmethod
+    def fromisoformat(s: str) -> datetime:
+        return datetime.fromisoformat(s)
+
+    @staticmethod
+    def fromtimestamp(ts: float) -> datetime:
+        return datetime.fromtimestamp(ts)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    _Clock.current = datetime(2025, 1, 1, 12, 0, 0)
+    monkeypatch.setattr("alfen_driver.session_manager.datetime", _Clock)
+    return _Clock
+
+
+def _tick(mgr, clock, seconds: float, power: float, energy: float) -> None:
+    clock.current += timedelta(seconds=seconds)
+    mgr.update(power, energy)
+
+
+def _start_session(mgr, clock, energy: float = 100.0) -> None:
+    _tick(mgr, clock, 0, 11000.0, energy)
+    _tick(mgr, clock, SessionDefaults.START_CONFIRMATION_SECONDS, 11000.0, energy)
+    assert mgr.current_session is not None
+
+
+def test_active_session_recovers_exactly_after_crash(tmp_path, clock) -> None:
+    path = str(tmp_path / "sessions.journal")
+    mgr = ChargingSessionManager(journal=SessionJournal(path))
+    _start_session(mgr, clock)
+    for i in range(1, 5):
+        _tick(mgr, clock, 60, 11000.0, 100.0 + i * 0.25)
+    # Simulate power loss: no compaction, no clean shutdown
+    mgr.journal.close()
+
+    recovered = ChargingSessionManager(journal=SessionJournal(path))
+    assert recovered.recover_from_journal() is True
+    session = recovered.current_session
+    assert session is not None
+    assert session.start_energy_kwh == 100.0
+    assert session.start_time == mgr.current_session.start_time
+    assert session.energy_delivered_kwh == pytest.approx(1.0)
+    assert session.peak_power_w == 11000.0
+    assert recovered.total_sessions == 1
+
+
+def test_recovered_session_keeps_its_cost(tmp_path, clock) -> None:
+    path = str(tmp_path / "sessions.journal")
+    mgr = ChargingSessionManager(journal=SessionJournal(path))
+
+    def lookup(ts: float):
+        hour = ts - ts % 3600
+        return hour, hour + 3600, 0.20 if hour % 7200 else 0.40
+
+    _start_session(mgr, clock)
+    energy = 100.0
+    for _ in range(10):
+        energy += 0.2
+        clock.current += timedelta(minutes=15)
+        mgr.update(11000.0, energy, lookup)
+    cost = mgr.current_session.cost.cost
+    mgr.journal.close()
+
+    recovered = ChargingSessionManager(journal=SessionJournal(path))
+    recovered.recover_from_journal()
+    session = recovered.current_session
+    assert session.cost.cost == pytest.approx(cost)
+    assert sum(s.cost for s in session.cost.slots) == pytest.approx(cost)
+
+    # The first tick after recovery prices only its own delta
+    clock.current += timedelta(seconds=10)
+    recovered.update(11000.0, energy + 0.01, lookup)
+    price = lookup(clock.current.timestamp())[2]
+    assert session.cost.cost == pytest.approx(cost + 0.01 * price)
+
+
+def test_session_end_compacts_journal(tmp_path, clock) -> None:
+    path = tmp_path / "sessions.journal"
+    mgr = ChargingSessionManager(journal=SessionJournal(str(path)))
+    _start_session(mgr, clock)
+    _tick(mgr, clock, 600, 11000.0, 102.0)
+    _tick(mgr, clock, 1, 0.0, 102.0)
+    _tick(mgr, clock, SessionDefaults.SESSION_END_DELAY_SECONDS, 0.0, 102.0)
+    assert mgr.current_session is None
+
+    # Only the snapshot remains to be read at startup
+    assert len(path.read_text().splitlines()) == 1
+    recovered = ChargingSessionManager(journal=SessionJournal(str(path)))
+    recovered.recover_from_journal()
+    assert recovered.current_session is None
+    assert recovered.total_sessions == 1
+    assert recovered.total_energy_kwh == pytest.approx(2.0)
+
+
+def test_checkpoints_are_sparse_and_compacted(tmp_path, clock, monkeypatch) -> None:
+    monkeypatch.setattr(SessionDefaults, "JOURNAL_COMPACT_EVENTS", 5)
+    journal = SessionJournal(str(tmp_path / "sessions.journal"))
+    mgr = ChargingSessionManager(journal=journal)
+    _start_session(mgr, clock)
+    # 1 s ticks at 11 kW: one checkpoint per 0.1 kWh, not per tick
+    energy = 100.0
+    for _ in range(120):
+        energy += 11.0 / 3600
+        _tick(mgr, clock, 1, 11000.0, energy)
+    assert journal.events_since_compaction < 5
+    assert journal.bytes_written < 2000
+
+    recovered = ChargingSessionManager(journal=SessionJournal(str(journal.path)))
+    recovered.recover_from_journal()
+    assert recovered.current_session.energy_delivered_kwh == pytest.approx(
+        energy - 100.0, abs=SessionDefaults.JOURNAL_CHECKPOINT_KWH
+    )
+
+
+def test_torn_last_line_is_ignored(tmp_path, clock) -> None:
+    path = tmp_path / "sessions.journal"
+    mgr = ChargingSessionManager(journal=SessionJournal(str(path)))
+    _start_session(mgr, clock)
+    mgr.journal.close()
+    with open(path, "a") as f:
+        f.write('{"ev": "checkpoint", "ts": 17')
+
+    recovered = ChargingSessionManager(journal=SessionJournal(str(path)))
+    assert recovered.recover_from_journal() is True
+    assert recovered.current_session.start_energy_kwh == 100.0
+    # Recovery compacts, so later appends never follow the torn fragment
+    assert len(path.read_text().splitlines()) == 1
+
+
+def test_missing_journal_reports_nothing_to_recover(tmp_path) -> None:
+    mgr = ChargingSessionManager(
+        journal=SessionJournal(str(tmp_path / "sessions.journal"))
+    )
+    assert mgr.recover_from_journal() is False
+    assert ChargingSessionManager().recover_from_journal() is False
@@ -0,0 +1,129 @@
+import json
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock
+
+import pytest
+from aiohttp.test_utils import make_mocked_request
+
+from alfen_driver.constants import SessionDefaults
+from alfen_driver.energy_attribution import EnergyFlows
+from alfen_driver.session_manager import ChargingSessionManager
+from alfen_driver.session_stats import RETENTION, SessionStatsRollup
+from alfen_driver.web import WebServer
+
+
+def test_ticks_and_sessions_roll_up_per_period() -> None:
+    stats = SessionStatsRollup()
+    # Sunday 2025-03-30 and Monday 2025-03-31 fall in different ISO weeks
+    stats.add_tick(datetime(2025, 3, 30, 23, 0), 2.0, 0.5, 1.0, 600)
+    stats.add_tick(datetime(2025, 3, 31, 1, 0), 3.0, 0.75, 0.0, 900)
+    stats.add_session(datetime(2025, 3, 31, 1, 0))
+    stats.add_tick(datetime(2025, 4, 1, 12, 0), 1.0, 0.2)
+
+    days = stats.query("day")
+    assert [d["period"] for d in days] == ["2025-04-01", "2025-03-31", "2025-03-30"]
+    assert days[1]["sessions"] == 1
+    weeks = stats.query("week")
+    assert [w["period"] for w in weeks] == ["2025-W14", "2025-W13"]
+    march = stats.query("month")[1]
+    assert march["period"] == "2025-03"
+    assert march["energy_kwh"] == 5.0
+    assert march["cost"] == 1.25
+    assert march["solar_share"] == 0.2
+    assert march["charging_seconds"] == 1500
+    assert stats.query("month", limit=1)[0]["period"] == "2025-04"
+
+    with pytest.raises(ValueError):
+        stats.query("year")
+
+
+def test_retention_and_restore_roundtrip() -> None:
+    stats = SessionStatsRollup()
+    start = datetime(2024, 1, 1, 12, 0)
+    for day in range(RETENTION["day"] + 10):
+        stats.add_tick(start + timedelta(days=day), energy_kwh=1.0)
+    assert len(stats.query("day")) == RETENTION["day"]
+
+    restored = SessionStatsRollup()
+    restored.restore(json.loads(json.dumps(stats.to_dict())))
+    assert restored.query("day", 3) == stats.query("day", 3)
+    assert restored.query("month") == stats.query("month")
+
+
+def test_session_manager_feeds_meter_deltas(monkeypatch) -> None:
+    now = [datetime(2025, 5, 1, 10, 0)]
+
+    class Clock:
+        @classmethod
+        def now(cls) -> datetime:
+            return now[0]
+
+    monkeypatch.setattr("alfen_driver.session_manager.datetime", Clock)
+    stats = SessionStatsRollup()
+    mgr = ChargingSessionManager(stats=stats)
+    energy = 100.0
+    for _ in range(60):
+        mgr.update(11000.0, energy)
+        now[0] += timedelta(seconds=1)
+        energy += 11.0 / 3600
+    for _ in range(SessionDefaults.SESSION_END_DELAY_SECONDS + 2):
+        mgr.update(0.0, energy)
+        now[0] += timedelta(seconds=1)
+    # Meter reset / jump is not counted as charged energy
+    mgr.update(0.0, energy + 50)
+
+    day = stats.query("day")[0]
+    assert day["energy_kwh"] == pytest.approx(11.0 * 60 / 3600, abs=0.01)
+    assert day["charging_seconds"] == 59
+    assert day["sessions"] == 1
+
+
+def test_rejected_reads_add_no_cost_or_solar(monkeypatch) -> None:
+    now = [datetime(2025, 5, 1, 10, 0)]
+
+    class Clock:
+        @classmethod
+        def now(cls) -> datetime:
+            return now[0]
+
+    monkeypatch.setattr("alfen_driver.session_manager.datetime", Clock)
+    stats = SessionStatsRollup()
+    mgr = ChargingSessionManager(stats=stats)
+    sunny = EnergyFlows(12000, 8000, 0)
+
+    def lookup(ts: float):
+        return ts - ts % 3600, ts - ts % 3600 + 3600, 1.0
+
+    for energy in (12000.0, 12000.1, 12000.2, 0.0, 12000.3, 14000.0, 12000.4):
+        mgr.update(7000.0, energy, lookup, sunny)
+        now[0] += timedelta(seconds=10)
+
+    # Both glitched reads are dropped as a whole; the ticks after them count
+    # from the last trusted reading, so energy, cost and solar stay in step
+    day = stats.query("day")[0]
+    assert day["energy_kwh"] == pytest.approx(0.4)
+    assert day["cost"] == pytest.approx(0.4)
+    assert day["solar_share"] == pytest.approx(1.0)
+
+    mgr._add_tick_stats(now[0], True, None, 0.5, 0.5)
+    day = stats.query("day")[0]
+    assert (day["energy_kwh"], day["cost"]) == pytest.approx((0.4, 0.4))
+
+
+@pytest.mark.asyncio
+async def test_stats_endpoint() -> None:
+    stats = SessionStatsRollup()
+    stats.add_tick(datetime(2025, 6, 1, 8, 0), energy_kwh=4.0)
+    driver = MagicMock()
+    driver.session_stats = stats
+    server = WebServer(driver)
+
+    resp = await server.handle_get_stats(
+        make_mocked_request("GET", "/api/stats?period=month")
+    )
+    assert json.loads(resp.text) == {"month": stats.query("month")}
+
+    bad = await server.handle_get_stats(
+        make_mocked_request("GET", "/api/stats?period=year")
+    )
+    assert bad.status == 400
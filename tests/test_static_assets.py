@@ -0,0 +1,69 @@
+import gzip
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import pytest
+from aiohttp.test_utils import TestClient, TestServer
+
+from alfen_driver.static_assets import (
+    IMMUTABLE,
+    REVALIDATE,
+    StaticAssets,
+    fingerprinted_name,
+)
+from alfen_driver.web import WebServer
+
+
+def test_fingerprinted_name() -> None:
+    name = fingerprinted_name("app.js", b"console.log(1)")
+    assert name.startswith("app.") and name.endswith(".js")
+    assert name != fingerprinted_name("app.js", b"console.log(2)")
+
+
+def test_index_references_fingerprinted_assets(tmp_path: Path) -> None:
+    (tmp_path / "app.js").write_text("let x = 1;\n" * 100)
+    (tmp_path / "styles.css").write_text("body { margin: 0; }\n")
+    (tmp_path / "index.html").write_text(
+        '<link href="/ui/styles.css" /><script src="/ui/app.js"></script>'
+        '<a href="https://example.com/ui/app.js">x</a>'
+    )
+    assets = StaticAssets(tmp_path)
+
+    page, cache_control = assets.get("index.html")
+    assert cache_control == REVALIDATE
+    html = page.body.decode()
+    assert f'src="/ui/{assets.fingerprints["app.js"]}"' in html
+    assert f'href="/ui/{assets.fingerprints["styles.css"]}"' in html
+    assert 'href="https://example.com/ui/app.js"' in html
+    assert page.content_type == "text/html; charset=utf-8"
+
+    script, cache_control = assets.get(assets.fingerprints["app.js"])
+    assert cache_control == IMMUTABLE
+    assert assets.get("app.js")[0] is script
+    assert assets.get("missing.js") is None
+
+
+@pytest.mark.asyncio
+async def test_bundled_ui_is_served_compressed_and_cacheable() -> None:
+    server = WebServer(MagicMock())
+    async with TestClient(TestServer(await server._create_app())) as client:
+        resp = await client.get(
+            "/ui/index.html", headers={"Accept-Encoding": "gzip"}, auto_decompress=False
+        )
+        assert resp.status == 200
+        assert resp.headers["Content-Encoding"] == "gzip"
+        assert resp.headers["Cache-Control"] == REVALIDATE
+        html = gzip.decompress(await resp.read()).decode()
+        script = server.static_assets.fingerprints["app.js"]
+        assert f"/ui/{script}" in html
+
+        resp = await client.get(f"/ui/{script}")
+        assert resp.status == 200
+        assert resp.headers["Cache-Control"] == IMMUTABLE
+        assert "javascript" in resp.headers["Content-Type"]
+
+        etag = resp.headers["ETag"]
+        resp = await client.get(f"/ui/{script}", headers={"If-None-Match": etag})
+        assert resp.status == 304
+
+        assert (await client.get("/ui/nope.js")).status == 404
@@ -0,0 +1,133 @@
+import asyncio
+import math
+import threading
+import time
+from typing import List
+from unittest.mock import MagicMock
+
+import pytest
+
+from alfen_driver.status_snapshot import StatusSnapshot
+from alfen_driver.web import WebServer
+
+
+def test_unchanged_values_keep_the_version() -> None:
+    status = StatusSnapshot({"mode": 0, "ac_power": 0.0})
+    assert status.update({"mode": 0, "ac_power": 0.0}) == 0
+    assert status.update({"ac_power": 3500.0}) == 1
+    assert status.update({"ac_power": 3500.0, "mode": 0}) == 1
+    assert status.field_versions() == {"mode": 0, "ac_power": 1}
+
+
+def test_changes_since_returns_only_newer_fields() -> None:
+    status = StatusSnapshot({"mode": 0, "ac_power": 0.0, "session": {}})
+    status.update({"ac_power": 3500.0})
+    status.update({"session": {"start_ts": "2025-01-01T12:00:00Z"}})
+
+    assert status.changes_since(0) == (
+        2,
+        {"ac_power": 3500.0, "session": {"start_ts": "2025-01-01T12:00:00Z"}},
+    )
+    assert status.changes_since(1) == (
+        2,
+        {"session": {"start_ts": "2025-01-01T12:00:00Z"}},
+    )
+    assert status.changes_since(2) == (2, {})
+    # Unknown (future) versions get the full snapshot
+    version, full = status.changes_since(99)
+    assert version == 2 and set(full) == {"mode", "ac_power", "session"}
+
+
+def test_published_snapshot_is_copy_on_write() -> None:
+    status = StatusSnapshot({"ac_power": 0.0})
+    version, before = status.snapshot()
+    status.update({"ac_power": 11000.0})
+    assert before == {"ac_power": 0.0}
+    assert status.current == {"ac_power": 11000.0}
+    assert status.snapshot() == (version + 1, status.current)
+
+
+def test_nan_and_type_changes() -> None:
+    status = StatusSnapshot({"ac_power": math.nan, "status": 0})
+    assert status.update({"ac_power": math.nan}) == 0
+    # 0 == 0.0 but the serialized value differs
+    assert status.update({"status": 0.0}) == 1
+
+
+def test_readers_always_see_a_consistent_state() -> None:
+    status = StatusSnapshot({"tick": 0})
+    stop = threading.Event()
+    mismatches = []
+
+    def reader() -> None:
+        while not stop.is_set():
+            version, values = status.snapshot()
+            if values["tick"] != version:
+                mismatches.append((version, values["tick"]))
+
+    thread = threading.Thread(target=reader)
+    thread.start()
+    for tick in range(1, 20001):
+        status.update({"tick": tick})
+    stop.set()
+    thread.join()
+    assert not mismatches
+
+
+@pytest.mark.benchmark
+@pytest.mark.asyncio
+async def test_status_requests_do_not_stall_ticks(benchmark_report) -> None:
+    """Benchmark: hammer /api/status while a thread runs simulated ticks."""
+    from aiohttp.test_utils import TestClient, TestServer
+
+    fields = {f"field_{i}": 0.0 for i in range(40)}
+    driver = MagicMock()
+    driver.status = StatusSnapshot({"tick": 0, **fields})
+    server = WebServer(driver)
+    server.loop = asyncio.get_running_loop()
+    driver.status.subscribe(server._on_status_changed)
+
+    interval = 0.01
+    durations: List[float] = []
+    jitter: List[float] = []
+    stop = threading.Event()
+
+    def ticks() -> None:
+        tick = 0
+        deadline = time.perf_counter()
+        while not stop.is_set():
+            deadline += interval
+            time.sleep(max(0.0, deadline - time.perf_counter()))
+            started = time.perf_counter()
+            jitter.append(started - deadline)
+            tick += 1
+            driver.status.update({"tick": tick, **{k: float(tick % 7) for k in fields}})
+            durations.append(time.perf_counter() - started)
+
+    async with TestClient(TestServer(await server._create_app())) as client:
+
+        async def hammer() -> None:
+            for _ in range(400):
+                resp = await client.get("/api/status")
+                assert resp.status == 200
+                await resp.read()
+
+        thread = threading.Thread(target=ticks)
+        thread.start()
+        try:
+            await asyncio.gather(*(hammer() for _ in range(8)))
+        finally:
+            stop.set()
+            thread.join()
+
+    durations.sort()
+    jitter.sort()
+    p99 = durations[int(len(durations) * 0.99)]
+    benchmark_report(
+        f"{len(durations)} ticks under load: update p99 {p99 * 1e3:.2f} ms, "
+        f"jitter p50 {jitter[len(jitter) // 2] * 1e3:.2f} ms / "
+        f"max {jitter[-1] * 1e3:.2f} ms"
+    )
+    assert len(durations) > 10
+    # Publication is a reference swap; readers never hold up the tick
+    assert p99 < 0.05
@@ -1,4 +1,7 @@
+import time
+
 import pytest
+import pytest_asyncio
 
 from alfen_driver.config import TibberConfig
 from alfen_driver.tibber import (
@@ -95,3 +98,130 @@ def test_get_hourly_overview_text_with_data(monkeypatch: pytest.MonkeyPatch) ->
     # Should include entries
     assert "2025-01-01T00:00:00Z" in text
     assert "priceRating=" in text
+
+
+def _price_payload(now: float, slots: int) -> dict:
+    """Build a Tibber-style priceInfo payload with hourly slots starting this hour."""
+    from datetime import datetime, timezone
+
+    start = int(now // 3600 * 3600)
+    entries = [
+        {
+            "total": 0.10 + 0.01 * i,
+            "level": "CHEAP",
+            "startsAt": datetime.fromtimestamp(start + i * 3600, timezone.utc)
+            .isoformat()
+            .replace("+00:00", "Z"),
+        }
+        for i in range(slots)
+    ]
+    return {
+        "data": {
+            "viewer": {
+                "homes": [
+                    {
+                        "id": "home-1",
+                        "currentSubscription": {
+                            "priceInfo": {
+                                "current": entries[0],
+                                "today": entries,
+                                "tomorrow": [],
+                            }
+                        },
+                    }
+                ]
+            }
+        }
+    }
+
+
+@pytest_asyncio.fixture
+async def tibber_stub_server():
+    """Local GraphQL stub recording one peer port per TCP connection."""
+    from aiohttp import web
+    from aiohttp.test_utils import TestServer
+
+    state = {"requests": 0, "connections": set(), "slots": 3}
+
+    async def handler(request: web.Request) -> web.Response:
+        state["requests"] += 1
+        peer = request.transport.get_extra_info("peername")
+        state["connections"].add(peer[1] if peer else None)
+        return web.json_response(_price_payload(time.time(), state["slots"]))
+
+    app = web.Application()
+    app.router.add_post("/gql", handler)
+    server = TestServer(app)
+    await server.start_server()
+    state["url"] = str(server.make_url("/gql"))
+    yield state
+    await server.close()
+
+
+@pytest.mark.asyncio
+async def test_pooled_session_reuses_connection(tibber_stub_server) -> None:
+    cfg = TibberConfig(access_token="x", enabled=True)  # noqa: S106
+    client = TibberClient(cfg)
+    client.GRAPHQL_URL = tibber_stub_server["url"]
+    try:
+        for _ in range(3):
+            # Force a refetch on every call: no backoff and a curve too short
+            client._cache_next_refresh = 0.0
+            assert await client.get_current_price_level() == PriceLevel.CHEAP
+        assert tibber_stub_server["requests"] == 3
+        # All three queries rode the same keep-alive connection
+        assert len(tibber_stub_server["connections"]) == 1
+    finally:
+        await client.close()
+
+
+@pytest.mark.asyncio
+async def test_refetch_skipped_while_curve_covers_horizon(tibber_stub_server) -> None:
+    cfg = TibberConfig(access_token="x", enabled=True)  # noqa: S106
+    client = TibberClient(cfg)
+    client.GRAPHQL_URL = tibber_stub_server["url"]
+    tibber_stub_server["slots"] = 24
+    try:
+        assert await client.get_current_price_level() == PriceLevel.CHEAP
+        assert tibber_stub_server["requests"] == 1
+
+        # Slot boundary passed: the cached curve still covers the horizon
+        client._cache_next_refresh = 0.0
+        assert await client.get_current_price_level() == PriceLevel.CHEAP
+        assert tibber_stub_server["requests"] == 1
+        assert client._cache["current_price"]["startsAt"]
+    finally:
+        await client.close()
+
+
+def test_tomorrow_prices_are_refetched_after_publication() -> None:
+    from datetime import datetime, timezone
+
+    client = TibberClient(TibberConfig(access_token="x", enabled=True))  # noqa: S106
+    midnight = datetime(2025, 1, 8, tzinfo=timezone.utc).timestamp()
+
+    def load(hours: int) -> None:
+        client._cached_upcoming = [
+            {
+                "total": 0.1,
+                "level": "CHEAP",
+                "startsAt": datetime.fromtimestamp(midnight + i * 3600, timezone.utc)
+                .isoformat()
+                .replace("+00:00", "Z"),
+            }
+            for i in range(hours)
+        ]
+        client._cached_starts = []
+
+    # Today only: fine in the morning, stale once tomorrow's prices are out
+    load(24)
+    morning = midnight + 9 * 3600
+    afternoon = midnight + 14 * 3600 + 1800
+    assert client._curve_covers_horizon(morning)
+    assert not client._awaiting_tomorrow(morning)
+    assert client._curve_covers_horizon(afternoon)
+    assert client._awaiting_tomorrow(afternoon)
+
+    # Tomorrow already cached: no refetch needed
+    load(48)
+    assert not client._awaiting_tomorrow(afternoon)
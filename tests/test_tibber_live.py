@@ -0,0 +1,156 @@
+import asyncio
+import time
+from unittest.mock import MagicMock
+
+import pytest
+import pytest_asyncio
+
+from alfen_driver.config import TibberConfig
+from alfen_driver.tibber_live import LiveReading, TibberLiveFeed, parse_live_message
+
+
+def test_parse_live_message() -> None:
+    msg = {
+        "id": "1",
+        "type": "next",
+        "payload": {"data": {"liveMeasurement": {"power": 0, "powerProduction": 1500}}},
+    }
+    reading = parse_live_message(msg)
+    assert reading is not None
+    assert reading.net_grid_w == -1500.0
+
+    assert parse_live_message({"type": "ka"}) is None
+    assert parse_live_message({"type": "next", "payload": {"data": {}}}) is None
+
+
+def test_get_reading_respects_max_age() -> None:
+    feed = TibberLiveFeed(TibberConfig(access_token="x", enabled=True))  # noqa: S106
+    assert feed.get_reading(10.0) is None
+    feed.latest = LiveReading(time.monotonic() - 30.0, 100.0, 0.0)
+    assert feed.get_reading(10.0) is None
+    assert feed.get_reading(60.0) is feed.latest
+
+
+@pytest_asyncio.fixture
+async def tibber_ws_stub():
+    """Local stub serving the bootstrap query and a graphql-transport-ws socket."""
+    from aiohttp import WSMsgType, web
+    from aiohttp.test_utils import TestServer
+
+    state = {"subscribed": None}
+
+    async def gql(request: web.Request) -> web.Response:
+        return web.json_response(
+            {
+                "data": {
+                    "viewer": {
+                        "websocketSubscriptionUrl": str(request.url.with_path("/ws")),
+                        "homes": [
+                            {"id": "h1", "features": {"realTimeConsumptionEnabled": 1}}
+                        ],
+                    }
+                }
+            }
+        )
+
+    async def ws(request: web.Request) -> web.WebSocketResponse:
+        sock = web.WebSocketResponse(protocols=("graphql-transport-ws",))
+        await sock.prepare(request)
+        async for msg in sock:
+            if msg.type != WSMsgType.TEXT:
+                break
+            data = msg.json()
+            if data["type"] == "connection_init":
+                await sock.send_json({"type": "connection_ack"})
+            elif data["type"] == "subscribe":
+                state["subscribed"] = data["payload"]["variables"]["homeId"]
+                await sock.send_json(
+                    {
+                        "id": "1",
+                        "type": "next",
+                        "payload": {
+                            "data": {
+                                "liveMeasurement": {
+                                    "power": 250.0,
+                                    "powerProduction": 0.0,
+                                }
+                            }
+                        },
+                    }
+                )
+        return sock
+
+    app = web.Application()
+    app.router.add_post("/gql", gql)
+    app.router.add_get("/ws", ws)
+    server = TestServer(app)
+    await server.start_server()
+    state["url"] = str(server.make_url("/gql"))
+    yield state
+    await server.close()
+
+
+@pytest.mark.asyncio
+async def test_feed_receives_reading_from_stub(tibber_ws_stub) -> None:
+    import aiohttp
+
+    feed = TibberLiveFeed(TibberConfig(access_token="x", enabled=True))  # noqa: S106
+    feed.GRAPHQL_URL = tibber_ws_stub["url"]
+    feed.RECEIVE_TIMEOUT_SECONDS = 0.5
+
+    task = asyncio.ensure_future(feed._subscribe_once(aiohttp))
+    for _ in range(50):
+        if feed.latest is not None:
+            break
+        await asyncio.sleep(0.02)
+    feed._stop_event.set()
+    with pytest.raises(asyncio.TimeoutError):
+        await task
+
+    assert tibber_ws_stub["subscribed"] == "h1"
+    assert feed.latest is not None
+    assert feed.latest.net_grid_w == 250.0
+
+
+def _mock_system_values(values: dict) -> MagicMock:
+    bus = MagicMock()
+    bus.get_object.return_value.GetValue.return_value = values
+    return bus
+
+
+@pytest.mark.parametrize(
+    "source,victron_values,expected",
+    [
+        # Victron consumption missing: fallback uses grid export 2760W -> 12A
+        ("fallback", {"Dc/Pv/Power": 0.0}, 12.0),
+        # Victron says no excess; prefer trusts the live grid export
+        ("prefer", {"Ac/Consumption/L1/Power": 5000.0}, 12.0),
+        # Cross-check keeps the lower of both estimates (9000W vs 2760W)
+        ("cross_check", {"Dc/Pv/Power": 9000.0}, 12.0),
+    ],
+)
+def test_excess_solar_uses_live_grid(
+    sample_config, monkeypatch, source, victron_values, expected
+) -> None:
+    import alfen_driver.logic as logic
+
+    sample_config.tibber = TibberConfig(
+        access_token="x",  # noqa: S106
+        enabled=True,
+        live_enabled=True,
+        live_grid_source=source,
+    )
+    feed = MagicMock()
+    feed.get_reading.return_value = LiveReading(time.monotonic(), 0.0, 2760.0)
+    monkeypatch.setattr(logic, "_config", sample_config)
+    monkeypatch.setattr(logic, "_live_feed", feed)
+    monkeypatch.setattr(logic, "get_victron_min_soc", lambda: 10.0)
+    monkeypatch.setattr(
+        logic.dbus, "SystemBus", lambda: _mock_system_values(victron_values)
+    )
+
+    current, explanation, _, _ = logic.get_excess_solar_current(
+        ev_power=0.0, station_max=32.0, active_phases=1
+    )
+    assert current == pytest.approx(expected)
+    assert "Tibber grid" in explanation
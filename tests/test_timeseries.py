@@ -0,0 +1,71 @@
+import json
+import math
+from unittest.mock import MagicMock
+
+import pytest
+from aiohttp.test_utils import make_mocked_request
+
+from alfen_driver.timeseries import TimeSeriesRecorder
+from alfen_driver.web import WebServer
+
+T0 = 1_700_000_000
+
+
+def test_downsampling_min_max_avg() -> None:
+    recorder = TimeSeriesRecorder(("power",), resolutions=((1, 100), (10, 100)))
+    for i in range(25):
+        recorder.record(T0 + i, {"power": float(i)})
+
+    fine = recorder.query(["power"], T0, res=1)
+    assert fine["res"] == 1
+    assert [row[3] for row in fine["series"]["power"]] == [float(i) for i in range(25)]
+
+    coarse = recorder.query(["power"], T0, res=10)["series"]["power"]
+    assert coarse[0] == (T0 // 10 * 10, 0.0, 9.0, pytest.approx(4.5))
+    # The bucket still being filled is reported too
+    assert coarse[-1][0] == (T0 + 24) // 10 * 10
+
+
+def test_ring_has_constant_size_and_auto_resolution() -> None:
+    recorder = TimeSeriesRecorder(("power",), resolutions=((1, 60), (10, 60)))
+    for i in range(600):
+        recorder.record(T0 + i, {"power": 1.0, "unknown": 5.0})
+
+    fine, coarse = recorder.levels
+    assert fine.size == 60 and len(fine.ts) == 60
+    # Last minute is served at 1 s; older ranges fall back to 10 s buckets
+    assert recorder.query(["power"], T0 + 545)["res"] == 1
+    older = recorder.query(["power"], T0 + 100)
+    assert older["res"] == 10
+    assert older["series"]["power"][0][0] >= T0 + 100
+
+
+def test_non_finite_values_are_skipped() -> None:
+    recorder = TimeSeriesRecorder(("power", "voltage"), resolutions=((1, 10),))
+    recorder.record(T0, {"power": 5.0, "voltage": math.nan})
+    recorder.record(T0 + 1, {"power": 6.0, "voltage": math.nan})
+    data = recorder.query(["power", "voltage"], T0)["series"]
+    assert data["power"][0][3] == 5.0
+    assert data["voltage"][0][1:] == (None, None, None)
+
+
+@pytest.mark.asyncio
+async def test_history_endpoint() -> None:
+    recorder = TimeSeriesRecorder(("power",), resolutions=((1, 10),))
+    recorder.record(T0, {"power": 1.0})
+    recorder.record(T0 + 1, {"power": 2.0})
+    driver = MagicMock()
+    driver.timeseries = recorder
+    server = WebServer(driver)
+
+    resp = await server.handle_get_history(
+        make_mocked_request("GET", f"/api/history?series=power&from={T0}&to={T0 + 5}")
+    )
+    body = json.loads(resp.text)
+    assert body["res"] == 1
+    assert [row[3] for row in body["series"]["power"]] == [1.0, 2.0]
+
+    bad = await server.handle_get_history(
+        make_mocked_request("GET", "/api/history?from=yesterday")
+    )
+    assert bad.status == 400
@@ -0,0 +1,108 @@
+import json
+import time
+from unittest.mock import MagicMock
+
+import pytest
+from aiohttp import web
+
+from alfen_driver.timings import TIMINGS, RollingHistogram, Timings
+from alfen_driver.web import WebServer
+
+
+def test_percentiles_within_bucket_resolution() -> None:
+    histogram = RollingHistogram(window_seconds=300.0)
+    # 1..100 ms, one sample each
+    for ms in range(1, 101):
+        histogram.observe(ms / 1000, now=0.0)
+    summary = histogram.summary()
+    assert summary["count"] == 100
+    assert summary["max_ms"] == 100.0
+    # Log buckets are 2**(1/4) wide: estimates are at most ~19% high
+    for key, exact in (("p50_ms", 50), ("p95_ms", 95), ("p99_ms", 99)):
+        assert exact <= summary[key] <= exact * 1.19
+
+
+def test_windows_roll_with_fixed_memory() -> None:
+    histogram = RollingHistogram(window_seconds=10.0)
+    histogram.observe(0.5, now=0.0)
+    histogram.observe(0.001, now=10.0)  # previous window still counted
+    assert histogram.summary()["count"] == 2
+    assert histogram.summary()["max_ms"] == 500.0
+
+    histogram.observe(0.001, now=20.0)  # the 0.5 s sample has aged out
+    summary = histogram.summary()
+    assert summary["count"] == 2
+    assert summary["max_ms"] == 1.0
+    assert summary["total"] == 3
+
+    histogram.observe(0.002, now=100.0)  # idle for many windows
+    assert histogram.summary()["count"] == 1
+    assert len(histogram._current) == len(histogram._previous)
+
+
+def test_disabled_timings_record_nothing() -> None:
+    timings = Timings()
+    with timings.stage("fetch"):
+        pass
+    timings.record("modbus_read", 0.01)
+    assert timings.snapshot()["stages"] == {}
+
+    timings.enabled = True
+    with timings.stage("fetch"):
+        pass
+    timings.record("modbus_read", 0.01)
+    assert set(timings.snapshot()["stages"]) == {"fetch", "modbus_read"}
+    assert timings.last()["modbus_read"] == 10.0
+    timings.reset()
+    assert timings.snapshot()["stages"] == {}
+
+
+@pytest.mark.benchmark
+def test_stage_overhead_is_negligible(benchmark_report) -> None:
+    timings = Timings(enabled=True)
+    rounds = 20000
+    started = time.perf_counter()
+    for _ in range(rounds):
+        with timings.stage("logic"):
+            pass
+    per_stage = (time.perf_counter() - started) / rounds
+    benchmark_report(f"timed stage overhead {per_stage * 1e6:.2f} us")
+    # Eight timed stages per 1 s tick must stay well under 1% (10 ms)
+    assert per_stage * 8 < 0.001
+
+
+@pytest.mark.asyncio
+async def test_timings_handlers(monkeypatch: pytest.MonkeyPatch) -> None:
+    server = WebServer(MagicMock())
+
+    async def run_now(func, *args, **kwargs):
+        return func(*args, **kwargs)
+
+    monkeypatch.setattr(server, "_run_on_glib", run_now)
+    monkeypatch.setattr(TIMINGS, "enabled", False)
+    monkeypatch.setattr(TIMINGS, "_stages", {})
+
+    req = MagicMock(spec=web.Request)
+
+    async def body():
+        return {"enabled": True}
+
+    req.json = body
+    resp = await server.handle_set_timings(req)
+    assert json.loads(resp.text)["enabled"] is True
+    TIMINGS.record("fetch", 0.02)
+
+    resp = await server.handle_get_timings(MagicMock(spec=web.Request))
+    data = json.loads(resp.text)
+    assert data["stages"]["fetch"]["p50_ms"] == 20.0
+
+    async def reset():
+        return {"enabled": False, "reset": True}
+
+    req.json = reset
+    resp = await server.handle_set_timings(req)
+    assert json.loads(resp.text) == {
+        "enabled": False,
+        "window_seconds": 300.0,
+        "stages": {},
+    }
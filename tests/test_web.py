@@ -1,10 +1,12 @@
 import asyncio
+import gzip
 import json
 from unittest.mock import MagicMock
 
 import pytest
 from aiohttp import web
 
+from alfen_driver.status_snapshot import StatusSnapshot
 from alfen_driver.web import WebServer
 
 
@@ -12,13 +14,15 @@ from alfen_driver.web import WebServer
 async def test_handle_status_and_schema(monkeypatch: pytest.MonkeyPatch) -> None:
     # Mock driver with status snapshot
     driver = MagicMock()
-    driver.status_snapshot = {"a": 1}
+    driver.status = StatusSnapshot({"a": 1})
 
     # Avoid GLib usage in these handlers
     server = WebServer(driver)
 
     # handle_status
     req = MagicMock(spec=web.Request)
+    req.query = {}
+    req.headers = {}
     resp = await server.handle_status(req)
     assert isinstance(resp, web.Response)
     assert resp.status == 200
@@ -34,6 +38,104 @@ async def test_handle_status_and_schema(monkeypatch: pytest.MonkeyPatch) -> None
     assert "sections" in schema
 
 
+@pytest.mark.asyncio
+async def test_handle_status_since_version() -> None:
+    driver = MagicMock()
+    driver.status = StatusSnapshot({"mode": 0, "ac_power": 0.0})
+    server = WebServer(driver)
+    version = driver.status.update({"mode": 0, "ac_power": 7200.0})
+
+    req = MagicMock(spec=web.Request)
+    req.query = {"since": "0"}
+    resp = await server.handle_status(req)
+    assert resp.headers["X-Status-Version"] == str(version)
+    assert json.loads(resp.text) == {"version": 1, "changes": {"ac_power": 7200.0}}
+
+    req.query = {"since": str(version)}
+    resp = await server.handle_status(req)
+    assert json.loads(resp.text)["changes"] == {}
+
+    req.query = {"since": "abc"}
+    resp = await server.handle_status(req)
+    assert resp.status == 400
+
+    # Driver not yet publishing a status snapshot
+    driver.status = None
+    resp = await server.handle_status(req)
+    assert resp.status == 503
+
+
+@pytest.mark.asyncio
+async def test_handle_status_etag_and_compression() -> None:
+    driver = MagicMock()
+    driver.status = StatusSnapshot({f"field_{i}": float(i) for i in range(50)})
+    server = WebServer(driver)
+    req = MagicMock(spec=web.Request)
+    req.query = {}
+    req.headers = {"Accept-Encoding": "gzip, deflate"}
+
+    resp = await server.handle_status(req)
+    assert resp.headers["Content-Encoding"] == "gzip"
+    assert json.loads(gzip.decompress(resp.body))["field_3"] == 3.0
+    etag = resp.headers["ETag"]
+    # Same snapshot: the cached payload (and compressed bytes) are reused
+    assert (await server.handle_status(req)).body is resp.body
+
+    req.headers = {"If-None-Match": etag}
+    resp = await server.handle_status(req)
+    assert resp.status == 304
+
+    driver.status.update({"field_3": 4.0})
+    resp = await server.handle_status(req)
+    assert resp.status == 200
+    assert resp.headers["ETag"] != etag
+    assert "Content-Encoding" not in resp.headers
+
+
+@pytest.mark.asyncio
+async def test_stream_sends_snapshot_then_diffs() -> None:
+    from aiohttp.test_utils import TestClient, TestServer
+
+    driver = MagicMock()
+    driver.status = StatusSnapshot({"mode": 0, "ac_power": 0.0})
+    server = WebServer(driver)
+    server.loop = asyncio.get_running_loop()
+    driver.status.subscribe(server._on_status_changed)
+
+    async def read_event(resp) -> dict:
+        fields = {}
+        while True:
+            line = (await resp.content.readline()).decode().rstrip("\n")
+            if not line:
+                return fields
+            key, _, value = line.partition(": ")
+            fields[key] = value
+
+    async with TestClient(TestServer(await server._create_app())) as client:
+        resp = await client.get("/api/stream")
+        assert resp.headers["Content-Type"] == "text/event-stream"
+        first = await read_event(resp)
+        assert first["event"] == "snapshot" and first["id"] == "0"
+        assert json.loads(first["data"]) == {"mode": 0, "ac_power": 0.0}
+
+        driver.status.update({"ac_power": 7200.0})
+        driver.status.update({"ac_power": 7300.0, "mode": 1})
+        diffs = [await read_event(resp)]
+        if diffs[0]["id"] != "2":
+            diffs.append(await read_event(resp))
+        assert diffs[-1]["event"] == "diff"
+        assert json.loads(diffs[-1]["data"]) == {"ac_power": 7300.0, "mode": 1}
+        assert server.stream_clients == 1
+        resp.close()
+
+        # Resuming from a known version starts with a diff, not a snapshot
+        resp = await client.get("/api/stream", headers={"Last-Event-ID": "1"})
+        resumed = await read_event(resp)
+        assert resumed["event"] == "diff" and resumed["id"] == "2"
+        assert json.loads(resumed["data"]) == {"ac_power": 7300.0, "mode": 1}
+        resp.close()
+
+
 @pytest.mark.asyncio
 async def test_config_handlers_call_glib(monkeypatch: pytest.MonkeyPatch) -> None:
     # Mock GLib to run callbacks immediately by calling function synchronously